@@ -1,5 +1,11 @@
 import flet as ft
+from model.db.oracle import close_pools
+from controller.async_facade import cerrar_executor
 from view.simple_view import main
 
 if __name__ == '__main__':
-    ft.app(target=main)
+    try:
+        ft.app(target=main)
+    finally:
+        cerrar_executor()  # primero los hilos de BD, luego sus conexiones
+        close_pools()  # al cerrar la ventana: libera las conexiones de los pools
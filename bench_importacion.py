@@ -0,0 +1,92 @@
+# bench_importacion.py
+# Corrida de ImportadorClientes sobre un archivo generado:
+#   python bench_importacion.py                    100000 filas, bloques de 1000
+#   python bench_importacion.py 20000 --chunk 500
+#   python bench_importacion.py --borrar           borra al final los clientes de la corrida
+# Algunas filas vienen mal a propósito (sin colonia, teléfono demasiado largo,
+# correo repetido) para ver los errores por fila en el resumen. Los clientes
+# llevan correo @bench.invalid; los CP/colonias de prueba se quedan en la base.
+import argparse
+import os
+import tempfile
+import time
+from collections import Counter
+
+from model.db.oracle import OracleDB
+from model.db.schema import SchemaIntrospector
+from controller.importador import CAMPOS_CLIENTE, ImportadorClientes
+
+HOST = "200.13.89.10"
+PORT = 1521
+SERVICE_NAME = "pdbcib.lci.ulsa.mx"
+USER = os.environ.get("ORA_USER", "cib700_01")
+
+parser = argparse.ArgumentParser(description="Mide la importación masiva de clientes")
+parser.add_argument("filas", type=int, nargs="?", default=100000)
+parser.add_argument("--chunk", type=int, default=1000, help="filas por bloque (COMMIT por bloque)")
+parser.add_argument("--borrar", action="store_true", help="borra los clientes importados al terminar")
+args = parser.parse_args()
+
+pwd = os.environ.get("ORA_PWD")
+if not pwd:
+    raise SystemExit("Define ORA_PWD primero: export ORA_PWD='TU_PASSWORD'")
+
+corrida = time.strftime("%Y%m%d%H%M%S")
+
+
+def generar(path: str, n: int) -> None:
+    import csv
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(CAMPOS_CLIENTE)
+        for i in range(n):
+            k = i % 500  # 500 CP/colonias distintos
+            fila = {
+                "nombre": f"Cliente {i}", "paterno": "Bench", "materno": "Prueba",
+                "correo": f"bench{corrida}_{i}@bench.invalid",
+                "telefono": f"55{i:08d}", "calle": "Calle de prueba", "num_calle": str(i % 999 + 1),
+                "cp": f"{90000 + k:05d}", "colonia": f"Colonia Bench {k}",
+                "municipio": "Municipio Bench", "estado": "Estado Bench", "pais": "México",
+            }
+            if i % 1000 == 999:
+                fila["colonia"] = ""                # faltan campos
+            elif i % 1499 == 1498:
+                fila["telefono"] = "5" * 60         # no cabe en la columna
+            elif i % 997 == 996:
+                fila["correo"] = f"bench{corrida}_{i - 1}@bench.invalid"  # repetido en el archivo
+            w.writerow([fila[c] for c in CAMPOS_CLIENTE])
+
+
+db = OracleDB(HOST, PORT, SERVICE_NAME, USER, pwd)
+with tempfile.TemporaryDirectory() as tmp:
+    archivo = os.path.join(tmp, "clientes.csv")
+    t0 = time.perf_counter()
+    generar(archivo, args.filas)
+    print(f"Archivo: {args.filas} filas ({os.path.getsize(archivo) / 1e6:.1f} MB) en {time.perf_counter() - t0:.1f} s")
+
+    try:
+        imp = ImportadorClientes(db, chunk_size=args.chunk)
+        t0 = time.perf_counter()
+        res = imp.importar_archivo(archivo)
+        dt = time.perf_counter() - t0
+
+        print(f"Importación: {dt:.1f} s  ({res.leidas / max(dt, 1e-9):.0f} filas/s, bloques de {args.chunk})")
+        print(f"  {res.clientes_nuevos} clientes nuevos, {res.clientes_existentes} existentes, "
+              f"{len(res.errores)} errores")
+        tipos = Counter(e.mensaje.split(":")[0] for e in res.errores)
+        for tipo, cuantos in tipos.most_common():
+            print(f"  {cuantos:6d}  {tipo}")
+        for e in res.errores[:5]:
+            print(f"  línea {e.linea}: {e.mensaje}")
+
+        if args.borrar:
+            cmap = SchemaIntrospector(db).cliente()
+            table = cmap.get("_table") or "CLIENTE"
+            conn = db.get_connection()
+            with conn.cursor() as cur:
+                cur.execute(f"DELETE FROM {table} WHERE {cmap['correo']} LIKE :p",
+                            {"p": f"bench{corrida}_%@bench.invalid"})
+                print(f"Borrados {cur.rowcount} clientes de la corrida.")
+            conn.commit()
+    finally:
+        db.close_connection()
@@ -0,0 +1,90 @@
+# bench_lookup.py
+# CatalogosModelo._lookup_id contra el tamaño de la tabla, sobre una copia
+# de prueba de COLONIA (BENCH_COLONIA, se crea y se borra aquí):
+#   python bench_lookup.py                    1k, 10k y 100k filas
+#   python bench_lookup.py 100000 500000      otros tamaños
+# "Antes" repite lo que hacía _table_cols: leer la tabla completa en cada
+# búsqueda para conocer sus columnas. La tabla lleva el índice por
+# UPPER(TRIM(nombre)) que la búsqueda por nombre necesita.
+import os
+import random
+import sys
+import time
+
+import oracledb
+
+from model.db.oracle import OracleDB
+from model.repositories.catalogos_repo import CatalogosModelo
+
+HOST = "200.13.89.10"
+PORT = 1521
+SERVICE_NAME = "pdbcib.lci.ulsa.mx"
+USER = os.environ.get("ORA_USER", "cib700_01")
+
+pwd = os.environ.get("ORA_PWD")
+if not pwd:
+    raise SystemExit("Define ORA_PWD primero: export ORA_PWD='TU_PASSWORD'")
+
+tamanos = [int(a) for a in sys.argv[1:]] or [1000, 10000, 100000]
+BUSQUEDAS = 200
+TABLA = ["bench_colonia"]
+IDS = ["cve_colonia"]
+NOMBRES = ["nombre"]
+
+
+def borrar_tabla(cur):
+    try:
+        cur.execute("DROP TABLE bench_colonia PURGE")
+    except oracledb.DatabaseError as e:
+        if "ORA-00942" not in str(e):
+            raise
+
+
+def crear_tabla(cur, n: int):
+    borrar_tabla(cur)
+    cur.execute(
+        "CREATE TABLE bench_colonia AS"
+        " SELECT LEVEL cve_colonia, 'Colonia ' || LEVEL nombre, MOD(LEVEL, 5000) + 1 cve_cp"
+        f" FROM dual CONNECT BY LEVEL <= {int(n)}"
+    )
+    cur.execute("CREATE INDEX bench_colonia_nom ON bench_colonia (UPPER(TRIM(nombre)))")
+    cur.execute("BEGIN DBMS_STATS.GATHER_TABLE_STATS(USER, 'BENCH_COLONIA'); END;")
+
+
+def medir(fn, n: int) -> float:
+    """ms por búsqueda (la mitad de los nombres no existe)."""
+    muestras = [(f"Colonia {i}", i % 5000 + 1) for i in random.sample(range(1, n + 1), BUSQUEDAS // 2)]
+    muestras += [(f"No existe {i}", 1) for i in range(BUSQUEDAS // 2)]
+    t0 = time.perf_counter()
+    for nombre, cp in muestras:
+        fn(nombre, cp)
+    return (time.perf_counter() - t0) / len(muestras) * 1000
+
+
+db = OracleDB(HOST, PORT, SERVICE_NAME, USER, pwd)
+try:
+    conn = db.get_connection()
+    print(f"{'Filas':>8}  {'Antes (ms)':>11}  {'Ahora (ms)':>11}")
+    for n in tamanos:
+        with conn.cursor() as cur:
+            crear_tabla(cur, n)
+        cat = CatalogosModelo(db)
+
+        def ahora(nombre, cp):
+            return cat._lookup_id(TABLA, IDS, NOMBRES, nombre, {"cve_cp": cp})
+
+        def antes(nombre, cp):
+            cat.reset_columnas()
+            cat._fetch_all(TABLA)  # columnas leyendo todas las filas
+            return ahora(nombre, cp)
+
+        ahora("Colonia 1", 2)  # calienta memo de columnas y caché de sentencias
+        t_antes = medir(antes, n)
+        t_ahora = medir(ahora, n)
+        print(f"{n:>8}  {t_antes:11.2f}  {t_ahora:11.2f}")
+finally:
+    try:
+        with db.get_connection().cursor() as cur:
+            borrar_tabla(cur)
+    finally:
+        db.close_connection()
@@ -0,0 +1,106 @@
+# bench_snapshot.py
+# Consultas por repintado de la tabla de órdenes: tipos() leído por fila (como
+# antes) contra un CatalogosSnapshot por repintado.
+#   python bench_snapshot.py           página de 50 órdenes
+#   python bench_snapshot.py 200       otro tamaño de página
+# Cuenta las sentencias que llegan a Oracle en cada camino.
+import os
+import sys
+import time
+
+from controller.db_facade import DBFacade
+
+HOST = "200.13.89.10"
+PORT = 1521
+SERVICE_NAME = "pdbcib.lci.ulsa.mx"
+USER = os.environ.get("ORA_USER", "cib700_01")
+
+pwd = os.environ.get("ORA_PWD")
+if not pwd:
+    raise SystemExit("Define ORA_PWD primero: export ORA_PWD='TU_PASSWORD'")
+
+n = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+
+class _Cursor:
+    """Cursor que cuenta execute/executemany en su conexión."""
+
+    def __init__(self, cont, cur):
+        self._cont, self._cur = cont, cur
+
+    def execute(self, *args, **kwargs):
+        self._cont.sentencias += 1
+        return self._cur.execute(*args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        self._cont.sentencias += 1
+        return self._cur.executemany(*args, **kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cur.close()
+
+    def __iter__(self):
+        return iter(self._cur)
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+
+class _Contada:
+    """Conexión de la sesión con contador de sentencias."""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self.sentencias = 0
+
+    def cursor(self, *args, **kwargs):
+        return _Cursor(self, self._conn.cursor(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def repintado(fn):
+    """(sentencias, segundos) de un repintado."""
+    antes = cont.sentencias
+    t0 = time.perf_counter()
+    fn()
+    return cont.sentencias - antes, time.perf_counter() - t0
+
+
+db = DBFacade(HOST, PORT, SERVICE_NAME, USER, pwd)
+real = db.get_connection()
+cont = _Contada(real)
+db._db._conn = cont  # todos los repositorios piden la conexión a OracleDB
+try:
+    ordenes, _ = db.ordenes_pagina(n)
+    if not ordenes:
+        raise SystemExit("No hay órdenes.")
+
+    def por_fila():
+        # lo que hacía _agregar_filas_ordenes: db_instance.tipos() sin caché en cada fila
+        for o in ordenes:
+            db._normalize_tipos(db._catalogos.tipos()).get(int(o.cve_tipo_equipo), (0.0, ""))[1]
+
+    def con_snapshot():
+        snap = db.catalogos_snapshot()
+        for o in ordenes:
+            snap.tipo_nombre(o.cve_tipo_equipo)
+
+    por_fila()  # calienta metadata de columnas y caché de sentencias
+    db.invalidar_catalogos()
+
+    s_antes, t_antes = repintado(por_fila)
+    s_frio, t_frio = repintado(con_snapshot)
+    s_tibio, t_tibio = repintado(con_snapshot)
+
+    print(f"Filas por página:          {len(ordenes)}")
+    print(f"Antes (tipos() por fila):  {s_antes:5d} consultas  {t_antes * 1000:8.1f} ms")
+    print(f"Snapshot, caché vacío:     {s_frio:5d} consultas  {t_frio * 1000:8.1f} ms")
+    print(f"Snapshot, caché lleno:     {s_tibio:5d} consultas  {t_tibio * 1000:8.1f} ms")
+finally:
+    db._db._conn = real
+    db.close_connection()
@@ -0,0 +1,49 @@
+# bench_totales.py
+# Totales de órdenes: una consulta por orden contra el cálculo en bloque.
+#   python bench_totales.py            10000 órdenes (o las que haya)
+#   python bench_totales.py 2000       otra cantidad
+# Verifica además que ambos caminos den exactamente los mismos importes.
+import os
+import sys
+import time
+
+from model.db.oracle import OracleDB
+from model.db.schema import SchemaIntrospector
+from model.repositories import PreciosModelo
+
+HOST = "200.13.89.10"
+PORT = 1521
+SERVICE_NAME = "pdbcib.lci.ulsa.mx"
+USER = os.environ.get("ORA_USER", "cib700_01")
+
+pwd = os.environ.get("ORA_PWD")
+if not pwd:
+    raise SystemExit("Define ORA_PWD primero: export ORA_PWD='TU_PASSWORD'")
+
+n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+db = OracleDB(HOST, PORT, SERVICE_NAME, USER, pwd)
+try:
+    precios = PreciosModelo(db, schema=SchemaIntrospector(db))
+    with db.get_connection().cursor() as cur:
+        cur.execute("SELECT cve_orden FROM orden ORDER BY cve_orden FETCH FIRST :n ROWS ONLY", {"n": n})
+        ids = [int(r[0]) for r in cur.fetchall()]
+    if not ids:
+        raise SystemExit("No hay órdenes.")
+
+    precios.totales(ids[:10])  # calienta el caché de sentencias
+
+    t0 = time.perf_counter()
+    por_orden = {i: precios.total(i) for i in ids}
+    t1 = time.perf_counter()
+    en_bloque = precios.totales(ids)
+    t2 = time.perf_counter()
+
+    distintos = [i for i in ids if (por_orden[i] and por_orden[i].total) != (en_bloque.get(i) and en_bloque[i].total)]
+    print(f"Órdenes:    {len(ids)}")
+    print(f"Por orden:  {t1 - t0:8.3f} s  ({(t1 - t0) / len(ids) * 1000:.2f} ms/orden)")
+    print(f"En bloque:  {t2 - t1:8.3f} s  ({(t1 - t0) / max(t2 - t1, 1e-9):.0f}x)")
+    print("Totales iguales." if not distintos else f"Totales distintos en {len(distintos)} órdenes: {distintos[:10]}")
+    print("Suma:", sum(t.total for t in en_bloque.values()))
+finally:
+    db.close_connection()
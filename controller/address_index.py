@@ -0,0 +1,175 @@
+# controller/address_index.py
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+import threading
+
+from utils.texto import plegar
+
+
+_LOAD_SQL = """
+    SELECT c.cve_colonia, c.colonia, cp.cve_cp, cp.cp,
+           m.cve_municipio, m.municipio, m.cve_estado
+    FROM colonia c
+    JOIN cp ON cp.cve_cp = c.cve_cp
+    LEFT JOIN municipio m ON m.cve_municipio = cp.cve_municipio
+"""
+
+
+class AddressIndex:
+    """
+    Índice en memoria CP -> colonias (y CP -> municipio -> estado).
+    - Llaves plegadas (sin acentos/mayúsculas, ver utils.texto.plegar).
+    - Se carga con una sola consulta. Si un CP o una colonia no aparece,
+      cargar_cp() relee sólo ese CP (encuentra lo que otras sesiones
+      confirmaron, sin importar el orden de sus llaves); refrescar() relee todo.
+    - Un índice por esquema compartido por todas las sesiones (compartido()):
+      agregar_*() sólo con datos ya confirmados (la fachada publica sus altas
+      después del COMMIT).
+    """
+
+    _shared: Dict[str, "AddressIndex"] = {}
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def compartido(cls, key: str) -> "AddressIndex":
+        with cls._shared_lock:
+            idx = cls._shared.get(key)
+            if idx is None:
+                idx = cls._shared[key] = cls()
+            return idx
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self.cargado = False
+        # cp -> (cve_cp, cve_municipio)
+        self._cps: Dict[str, Tuple[int, Optional[int]]] = {}
+        # cve_cp -> [(cve_colonia, llave, nombre)]
+        self._colonias: Dict[int, List[Tuple[int, str, str]]] = {}
+        # cve_municipio -> (nombre, cve_estado)
+        self._municipios: Dict[int, Tuple[str, Optional[int]]] = {}
+        # (cve_estado, llave) -> cve_municipio
+        self._mun_por_nombre: Dict[Tuple[Optional[int], str], int] = {}
+
+    # ====================== carga ======================
+    def cargar(self, conn) -> None:
+        with conn.cursor() as cur:
+            cur.execute(_LOAD_SQL)
+            rows = cur.fetchall()
+            cur.execute("SELECT cve_cp, cp, cve_municipio FROM cp")
+            cps = cur.fetchall()
+        with self._lock:
+            self._cps.clear(); self._colonias.clear()
+            self._municipios.clear(); self._mun_por_nombre.clear()
+            self._ingerir(rows, cps)
+            self.cargado = True
+
+    def asegurar(self, conn) -> "AddressIndex":
+        if not self.cargado:
+            with self._lock:
+                if not self.cargado:
+                    self.cargar(conn)
+        return self
+
+    def refrescar(self, conn) -> int:
+        """Relee todo (altas de otras sesiones). Devuelve cuántas colonias hay."""
+        self.cargar(conn)
+        return self.stats()["colonias"]
+
+    def cargar_cp(self, conn, cp: str, omitir_cps=(), omitir_colonias=()) -> None:
+        """
+        Relee un solo CP y sus colonias. omitir_*: llaves que la sesión de
+        `conn` insertó sin COMMIT (su conexión las ve, las demás no).
+        """
+        with conn.cursor() as cur:
+            cur.execute(_LOAD_SQL + " WHERE cp.cp = :cp", {"cp": str(cp)})
+            rows = [r for r in cur.fetchall()
+                    if int(r[0]) not in omitir_colonias and int(r[2]) not in omitir_cps]
+            cur.execute("SELECT cve_cp, cp, cve_municipio FROM cp WHERE cp = :cp", {"cp": str(cp)})
+            cps = [r for r in cur.fetchall() if int(r[0]) not in omitir_cps]
+        with self._lock:
+            self._ingerir(rows, cps)
+
+    def _ingerir(self, rows, cps) -> None:
+        for cve_cp, cp, cve_mun in cps:
+            self._cps[str(cp)] = (int(cve_cp), int(cve_mun) if cve_mun is not None else None)
+        for cve_col, nombre, cve_cp, cp, cve_mun, mun, cve_est in rows:
+            self._cps.setdefault(str(cp), (int(cve_cp), int(cve_mun) if cve_mun is not None else None))
+            if cve_mun is not None:
+                self._agregar_municipio(int(cve_mun), mun, cve_est)
+            self._agregar_colonia(int(cve_col), nombre, int(cve_cp))
+
+    def _agregar_municipio(self, cve_mun: int, nombre, cve_estado) -> None:
+        est = int(cve_estado) if cve_estado is not None else None
+        self._municipios[cve_mun] = (str(nombre or ""), est)
+        self._mun_por_nombre[(est, plegar(nombre))] = cve_mun
+
+    def _agregar_colonia(self, cve_col: int, nombre, cve_cp: int) -> None:
+        lista = self._colonias.setdefault(cve_cp, [])
+        if not any(c[0] == cve_col for c in lista):
+            lista.append((cve_col, plegar(nombre), str(nombre or "")))
+
+    # ================ actualización incremental ================
+    def agregar_cp(self, cp: str, cve_cp: int, cve_municipio: Optional[int]) -> None:
+        with self._lock:
+            self._cps[str(cp)] = (int(cve_cp), cve_municipio)
+
+    def agregar_colonia(self, cve_colonia: int, nombre: str, cve_cp: int) -> None:
+        with self._lock:
+            self._agregar_colonia(int(cve_colonia), nombre, int(cve_cp))
+
+    def agregar_municipio(self, cve_municipio: int, nombre: str, cve_estado: Optional[int]) -> None:
+        with self._lock:
+            self._agregar_municipio(int(cve_municipio), nombre, cve_estado)
+
+    # ======================== consultas ========================
+    def cp(self, cp: str) -> Optional[Tuple[int, Optional[int]]]:
+        """(cve_cp, cve_municipio) o None."""
+        return self._cps.get(str(cp))
+
+    def municipio(self, cve_municipio: Optional[int]) -> Optional[Tuple[str, Optional[int]]]:
+        """(nombre, cve_estado) o None."""
+        if cve_municipio is None:
+            return None
+        return self._municipios.get(int(cve_municipio))
+
+    def municipio_id(self, cve_estado: Optional[int], nombre: str) -> Optional[int]:
+        est = int(cve_estado) if cve_estado is not None else None
+        return self._mun_por_nombre.get((est, plegar(nombre)))
+
+    def colonias(self, cp: str) -> List[Tuple[int, str]]:
+        """[(cve_colonia, nombre)] del CP, ordenadas por nombre."""
+        info = self._cps.get(str(cp))
+        if not info:
+            return []
+        with self._lock:
+            lista = list(self._colonias.get(info[0], ()))
+        return [(c, n) for c, _, n in sorted(lista, key=lambda x: x[1])]
+
+    def colonia_id(self, cp: str, nombre: str) -> Optional[int]:
+        info = self._cps.get(str(cp))
+        if not info:
+            return None
+        llave = plegar(nombre)
+        with self._lock:
+            for cve, k, _ in self._colonias.get(info[0], ()):
+                if k == llave:
+                    return cve
+        return None
+
+    def sugerir(self, cp: str, texto: str = "", limite: int = 20) -> List[Tuple[int, str]]:
+        """Colonias del CP cuyo nombre plegado empieza con (o contiene) `texto`."""
+        t = plegar(texto)
+        todas = self.colonias(cp)
+        if not t:
+            return todas[:limite]
+        pref = [(c, n) for c, n in todas if plegar(n).startswith(t)]
+        resto = [(c, n) for c, n in todas if t in plegar(n) and (c, n) not in pref]
+        return (pref + resto)[:limite]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "cps": len(self._cps),
+                "colonias": sum(len(v) for v in self._colonias.values()),
+                "municipios": len(self._municipios),
+            }
@@ -1,6 +1,6 @@
 # controller/app_controller.py
 from __future__ import annotations
-from typing import Tuple, Optional
+from typing import Any, Tuple, Optional
 
 from controller.db_facade import DBFacade
 
@@ -21,6 +21,7 @@ class AppController:
         service_name: str,
         username: str,
         password: str,
+        **pool_opts: Any,
     ) -> Tuple[DBFacade, object]:
         self.db = DBFacade(
             hostname=hostname,
@@ -28,6 +29,7 @@ class AppController:
             service_name=service_name,
             username=username,
             password=password,
+            **pool_opts,
         )
         self.connection = self.db.get_connection()
         return self.db, self.connection
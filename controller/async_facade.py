@@ -0,0 +1,120 @@
+# controller/async_facade.py
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+import asyncio
+import functools
+import threading
+
+
+# Un solo ejecutor para todo el proceso, acotado al tamaño por omisión del
+# pool de conexiones (pool_max=8): nunca hay más hilos esperando a Oracle
+# que conexiones que el pool pueda prestar.
+MAX_WORKERS = 8
+_EXECUTOR: ThreadPoolExecutor | None = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="db")
+        return _EXECUTOR
+
+
+def cerrar_executor() -> None:
+    """Apaga el ejecutor compartido (al salir de la aplicación)."""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        ex, _EXECUTOR = _EXECUTOR, None
+    if ex is not None:
+        ex.shutdown(wait=False, cancel_futures=True)
+
+
+class AsyncDBFacade:
+    """
+    Versión awaitable de DBFacade para handlers async de Flet.
+      adb = db_instance.asincrono()
+      ordenes = await adb.ordenes_pagina(50, None)
+      await adb.llamar(funcion_que_guarda_todo)   # varios pasos + commit en un hilo
+    - Cualquier método de la fachada se puede esperar (await adb.<metodo>(...)).
+    - Las llamadas de una misma sesión van en fila (una a la vez): comparten
+      conexión y transacción, así que el orden de los pasos se respeta.
+    - Cancelar la tarea (task.cancel() / cancelar()) saca la llamada de la cola
+      o interrumpe la que está en curso con connection.cancel() (la función
+      recibe el error de Oracle y hace su rollback). Si ya había terminado,
+      se devuelve su resultado.
+    """
+
+    def __init__(self, facade, executor: ThreadPoolExecutor | None = None) -> None:
+        self._f = facade
+        self._executor = executor
+        self._fila: asyncio.Lock | None = None
+        self._tareas: set[asyncio.Task] = set()
+        self.en_curso = 0  # llamadas pendientes (para indicadores de progreso)
+
+    @property
+    def sync(self):
+        """La fachada síncrona envuelta."""
+        return self._f
+
+    def _candado(self) -> asyncio.Lock:
+        # se crea dentro del loop de Flet (no en el hilo que armó la vista)
+        if self._fila is None:
+            self._fila = asyncio.Lock()
+        return self._fila
+
+    async def llamar(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Ejecuta fn(*args, **kwargs) en el ejecutor, en la fila de la sesión."""
+        tarea = asyncio.current_task()
+        if tarea is not None:
+            self._tareas.add(tarea)
+        self.en_curso += 1
+        try:
+            async with self._candado():
+                cf = (self._executor or _executor()).submit(functools.partial(fn, *args, **kwargs))
+                fut = asyncio.wrap_future(cf)
+                try:
+                    return await asyncio.shield(fut)
+                except asyncio.CancelledError:
+                    if cf.cancel():
+                        raise  # seguía en cola: no llegó a la base
+                    # el hilo está dentro de Oracle: se interrumpe y se espera a
+                    # que suelte la conexión antes de dejar pasar a la siguiente
+                    self._interrumpir()
+                    await asyncio.wait([fut])
+                    if fut.exception() is None:
+                        return fut.result()  # terminó antes de poder interrumpirla
+                    raise
+        finally:
+            self.en_curso -= 1
+            if tarea is not None:
+                self._tareas.discard(tarea)
+
+    def _interrumpir(self) -> None:
+        try:
+            self._f.get_connection().cancel()
+        except Exception:
+            pass
+
+    def cancelar(self) -> int:
+        """Cancela todas las llamadas pendientes de la sesión. Devuelve cuántas."""
+        tareas = [t for t in self._tareas if not t.done()]
+        for t in tareas:
+            t.cancel()
+        return len(tareas)
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._f, name)
+        if not callable(attr):
+            return attr
+
+        async def _awaitable(*args: Any, **kwargs: Any) -> Any:
+            return await self.llamar(attr, *args, **kwargs)
+
+        _awaitable.__name__ = name
+        return _awaitable
+
+
+__all__ = ["AsyncDBFacade", "cerrar_executor", "MAX_WORKERS"]
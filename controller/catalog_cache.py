@@ -0,0 +1,110 @@
+# controller/catalog_cache.py
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+import copy
+import threading
+import time
+
+
+_NO_KEY = object()
+
+
+class CatalogCache:
+    """
+    Caché de catálogos para la fachada.
+    - TTL por catálogo (segundos); 0 o negativo = no cachear.
+    - Catálogos con parámetro (p. ej. estados(pais)) guardan hasta
+      `max_entries` llaves con política LRU.
+    - Cada catálogo lleva una versión que sube al invalidarlo; las
+      entradas de versiones anteriores se descartan.
+    - Contadores de hits/misses por catálogo (ver stats()).
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[Dict[str, float]] = None,
+        default_ttl: float = 300.0,
+        max_entries: int = 32,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ttl = dict(ttl or {})
+        self._default_ttl = float(default_ttl)
+        self._max_entries = max(1, int(max_entries))
+        self._clock = clock
+        self._lock = threading.RLock()
+        # nombre -> OrderedDict[llave -> (version, expira_en, valor)]
+        self._data: Dict[str, OrderedDict] = {}
+        self._versions: Dict[str, int] = {}
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+
+    # ------------------------------------------------------------------
+    def ttl_for(self, name: str) -> float:
+        return float(self._ttl.get(name, self._default_ttl))
+
+    def version(self, name: str) -> int:
+        with self._lock:
+            return self._versions.get(name, 0)
+
+    def get(self, name: str, loader: Callable[[], Any], key: Hashable = _NO_KEY) -> Any:
+        """Devuelve una copia del valor cacheado o lo carga con `loader()`."""
+        ttl = self.ttl_for(name)
+        now = self._clock()
+        with self._lock:
+            version = self._versions.get(name, 0)
+            bucket = self._data.get(name)
+            if bucket is not None and key in bucket:
+                ver, expires, value = bucket[key]
+                if ver == version and expires > now:
+                    bucket.move_to_end(key)
+                    self._hits[name] = self._hits.get(name, 0) + 1
+                    return copy.copy(value)
+                del bucket[key]
+            self._misses[name] = self._misses.get(name, 0) + 1
+
+        value = loader()
+        if ttl <= 0:
+            return value
+
+        with self._lock:
+            # si alguien invalidó mientras cargábamos, no guardamos un valor viejo
+            if self._versions.get(name, 0) == version:
+                bucket = self._data.setdefault(name, OrderedDict())
+                bucket[key] = (version, now + ttl, value)
+                bucket.move_to_end(key)
+                while len(bucket) > self._max_entries:
+                    bucket.popitem(last=False)
+        return copy.copy(value)
+
+    def invalidate(self, name: Optional[str] = None, key: Hashable = _NO_KEY) -> None:
+        """
+        Invalida un catálogo (todas sus llaves), sólo una llave de un catálogo
+        con parámetro, o todo si name es None.
+        """
+        with self._lock:
+            if name is None:
+                for n in set(self._data) | set(self._versions):
+                    self._versions[n] = self._versions.get(n, 0) + 1
+                self._data.clear()
+                return
+            if key is not _NO_KEY:
+                bucket = self._data.get(name)
+                if bucket is not None:
+                    bucket.pop(key, None)
+                return
+            self._versions[name] = self._versions.get(name, 0) + 1
+            self._data.pop(name, None)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            names = set(self._hits) | set(self._misses) | set(self._versions)
+            return {
+                n: {
+                    "hits": self._hits.get(n, 0),
+                    "misses": self._misses.get(n, 0),
+                    "version": self._versions.get(n, 0),
+                    "entries": len(self._data.get(n, ())),
+                }
+                for n in sorted(names)
+            }
@@ -0,0 +1,215 @@
+# controller/catalogo_index.py
+from __future__ import annotations
+from bisect import bisect_left
+from heapq import nsmallest
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+import re
+import threading
+import time
+
+from utils.texto import plegar
+
+_NO_ALNUM = re.compile(r"[^a-z0-9]+")
+
+# Prefijos guardados por palabra; las palabras de búsqueda más largas se
+# buscan con bisect sobre las llaves completas ordenadas.
+MAX_PREFIJO = 8
+NGRAMA = 3
+
+
+def _compacto(txt) -> str:
+    """'AB-20/40 x' -> 'ab2040x' (para buscar números de parte sin separadores)."""
+    return _NO_ALNUM.sub("", plegar(txt))
+
+
+def _ngramas(s: str) -> Set[str]:
+    return {s[i:i + NGRAMA] for i in range(len(s) - NGRAMA + 1)}
+
+
+class CatalogoIndex:
+    """
+    Índice de búsqueda "mientras escribes" para un catálogo (PARTE, SERVICIO).
+    - Por renglón: palabras plegadas del código y la descripción
+      (utils.texto.plegar) y el código compacto, sin separadores.
+    - Prefijos (hasta MAX_PREFIJO letras) -> ids: cada palabra tecleada se
+      resuelve con un dict, sin recorrer el catálogo. Más larga, con bisect
+      sobre las llaves completas ordenadas (como OrderIndex): no depende de
+      cuántos renglones comparten los primeros MAX_PREFIJO caracteres.
+    - Trigramas del código compacto -> ids: '2040' encuentra 'AB-2040X'.
+    - buscar(texto, k): todas las palabras deben aparecer; devuelve sólo los
+      k mejores: código exacto, código que empieza igual, código que lo
+      contiene, descripción que empieza igual y el resto; dentro de cada
+      grupo por descripción. Los grupos salen de conjuntos, no se calcula
+      una llave por cada candidato.
+    Se carga de una vez con la lista del catálogo (el lugar de cada renglón
+    por descripción se calcula ahí, una sola vez) y se recarga al vencer el
+    TTL o con invalidar(): la aplicación no escribe en PARTE/SERVICIO.
+    """
+
+    _shared: Dict[str, "CatalogoIndex"] = {}
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def compartido(cls, key: str, id_col: str, codigo_col: Optional[str],
+                   texto_col: str = "descripcion", ttl: float = 600.0) -> "CatalogoIndex":
+        with cls._shared_lock:
+            idx = cls._shared.get(key)
+            if idx is None:
+                idx = cls._shared[key] = cls(id_col, codigo_col, texto_col, ttl)
+            return idx
+
+    def __init__(self, id_col: str, codigo_col: Optional[str] = None,
+                 texto_col: str = "descripcion", ttl: float = 600.0) -> None:
+        self.id_col = id_col
+        self.codigo_col = codigo_col
+        self.texto_col = texto_col
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._cargado_en: Optional[float] = None
+        self._filas: Dict[int, Dict[str, Any]] = {}
+        self._claves: Dict[int, Tuple[str, str, Tuple[str, ...]]] = {}  # id -> (código compacto, descripción plegada, palabras)
+        self._por_prefijo: Dict[str, Set[int]] = {}
+        self._por_ngrama: Dict[str, Set[int]] = {}
+        self._por_codigo: Dict[str, Set[int]] = {}  # prefijos del código compacto
+        self._por_inicio: Dict[str, Set[int]] = {}  # prefijos de la descripción
+        # llaves completas -> ids ("palabra", "codigo" compacto, "texto" de la
+        # descripción) y las mismas llaves ordenadas, para prefijos largos
+        self._completas: Dict[str, Dict[str, Set[int]]] = {"palabra": {}, "codigo": {}, "texto": {}}
+        self._ordenadas: Dict[str, List[str]] = {}
+        self._pos: Dict[int, int] = {}  # id -> lugar por descripción
+
+    # ====================== carga ======================
+    @property
+    def cargado(self) -> bool:
+        t = self._cargado_en
+        return t is not None and (self.ttl <= 0 or time.monotonic() - t < self.ttl)
+
+    def cargar(self, filas: Iterable[Dict[str, Any]]) -> None:
+        with self._lock:
+            for d in (self._filas, self._claves, self._por_prefijo, self._por_ngrama,
+                      self._por_codigo, self._por_inicio, *self._completas.values()):
+                d.clear()
+            for f in filas:
+                self._poner(f)
+            self._ordenadas = {n: sorted(d) for n, d in self._completas.items()}
+            orden = sorted(self._claves, key=lambda i: (self._claves[i][1], i))
+            self._pos = {i: n for n, i in enumerate(orden)}
+            self._cargado_en = time.monotonic()
+
+    def asegurar(self, leer: Callable[[], Iterable[Dict[str, Any]]]) -> "CatalogoIndex":
+        """Carga (o recarga vencido el TTL) con leer() -> lista del catálogo."""
+        if not self.cargado:
+            with self._lock:
+                if not self.cargado:
+                    self.cargar(leer() or [])
+        return self
+
+    def invalidar(self) -> None:
+        with self._lock:
+            self._cargado_en = None
+
+    def _poner(self, fila: Dict[str, Any]) -> None:
+        i = int(fila[self.id_col])
+        codigo = fila.get(self.codigo_col) if self.codigo_col else None
+        texto = plegar(fila.get(self.texto_col))
+        compacto = _compacto(codigo)
+        palabras = set(f"{plegar(codigo)} {texto}".replace("-", " ").split())
+        palabras.add(str(i))
+        if compacto:
+            palabras.add(compacto)
+        self._filas[i] = fila
+        self._claves[i] = (compacto, texto, tuple(palabras))
+        for d, k in self._llaves(compacto, texto, palabras):
+            d.setdefault(k, set()).add(i)
+
+    def _llaves(self, compacto: str, texto: str, palabras: Iterable[str]):
+        """(dict, llave) donde se registra un renglón."""
+        for p in palabras:
+            yield self._completas["palabra"], p
+            for n in range(1, min(len(p), MAX_PREFIJO) + 1):
+                yield self._por_prefijo, p[:n]
+        if compacto:
+            yield self._completas["codigo"], compacto
+        for n in range(1, min(len(compacto), MAX_PREFIJO) + 1):
+            yield self._por_codigo, compacto[:n]
+        if texto:
+            yield self._completas["texto"], texto
+        for n in range(1, min(len(texto), MAX_PREFIJO) + 1):
+            yield self._por_inicio, texto[:n]
+        for g in _ngramas(compacto):
+            yield self._por_ngrama, g
+
+    # ======================== consultas ========================
+    def __len__(self) -> int:
+        return len(self._filas)
+
+    def fila(self, id_: int) -> Optional[Dict[str, Any]]:
+        return self._filas.get(int(id_))
+
+    def _con_prefijo(self, prefijos: Dict[str, Set[int]], llave: str, prefijo: str) -> Set[int]:
+        """Ids con alguna llave `llave` ("palabra", "codigo", "texto") que empieza con `prefijo`."""
+        if len(prefijo) <= MAX_PREFIJO:
+            return prefijos.get(prefijo, set())
+        completas = self._completas[llave]
+        llaves = self._ordenadas.get(llave, [])
+        out: Set[int] = set()
+        i = bisect_left(llaves, prefijo)
+        while i < len(llaves) and llaves[i].startswith(prefijo):
+            out |= completas[llaves[i]]
+            i += 1
+        return out
+
+    def _en_codigo(self, trozo: str) -> Set[int]:
+        """Ids cuyo código compacto contiene `trozo` (intersección de trigramas)."""
+        if len(trozo) < NGRAMA:
+            return set()
+        grams = sorted((self._por_ngrama.get(g, set()) for g in _ngramas(trozo)), key=len)
+        if not grams[0]:
+            return set()
+        return {i for i in grams[0].intersection(*grams[1:]) if trozo in self._claves[i][0]}
+
+    def _candidatos(self, palabra: str) -> Set[int]:
+        ids = self._con_prefijo(self._por_prefijo, "palabra", palabra)
+        sub = self._en_codigo(palabra)
+        return ids | sub if sub else ids
+
+    def buscar(self, texto: str, k: int = 20) -> List[Dict[str, Any]]:
+        """Los k renglones que mejor coinciden con `texto` (vacío -> [])."""
+        palabras = plegar(texto).replace("-", " ").split()
+        if not palabras or k <= 0:
+            return []
+        compacta = _compacto(texto)
+        inicio = " ".join(palabras)
+        with self._lock:
+            conjuntos = sorted((self._candidatos(p) for p in palabras), key=len)
+            sel = conjuntos[0].intersection(*conjuntos[1:])
+            if not sel:
+                return []
+            pos = self._pos
+            pref = self._con_prefijo(self._por_codigo, "codigo", compacta) if compacta else set()
+            grupos = (
+                self._completas["codigo"].get(compacta, set()),
+                pref,
+                self._en_codigo(compacta) if compacta else set(),
+                self._con_prefijo(self._por_inicio, "texto", inicio),
+                sel,
+            )
+            out: List[int] = []
+            vistos: Set[int] = set()
+            for g in grupos:
+                cand = sel if g is sel else g & sel
+                if vistos:
+                    cand = [i for i in cand if i not in vistos]
+                for i in nsmallest(k - len(out), cand, key=pos.__getitem__):
+                    out.append(i); vistos.add(i)
+                if len(out) >= k:
+                    break
+            return [self._filas[i] for i in out]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"filas": len(self._filas), "prefijos": len(self._por_prefijo),
+                    "ngramas": len(self._por_ngrama)}
+
+
+__all__ = ["CatalogoIndex"]
@@ -1,11 +1,15 @@
 # controller/db_facade.py
 from __future__ import annotations
-from typing import Any, Dict, Optional
+from typing import Any, Dict
 
-from model.oracle_model import OracleDB
+from model.db.oracle import OracleDB
+from model.db.schema import SchemaIntrospector, DEFAULT_CACHE_FILE
+from model.db.keys import KeyAllocator
+from model.db.sentencias import REGISTRO
+from model.entities.catalogos import CatalogosSnapshot
 from model.repositories import (
     OrdenModelo, NotaModelo, ParteModelo, ServicioModelo,
-    ClienteModelo, CatalogosModelo
+    ClienteModelo, CatalogosModelo, KpiModelo, PreciosModelo, TotalOrden, KitModelo
 )
 from controller.orden_controller import OrdenControlador
 from controller.nota_controller import NotaControlador
@@ -13,6 +17,17 @@ from controller.parte_controller import ParteControlador
 from controller.servicio_controller import ServicioControlador
 from controller.cliente_controller import ClienteControlador
 from controller.catalogos_controller import CatalogosControlador
+from controller.kpi_controller import KpiControlador
+from controller.kit_controller import KitControlador
+from controller.catalog_cache import CatalogCache
+from controller.importador import ImportadorClientes, ResumenImportacion
+from controller.address_index import AddressIndex
+from controller.async_facade import AsyncDBFacade
+from controller.reporte_lote import TrabajoReporte
+from controller.notas_pendientes import NotasPendientes
+from controller.notas_index import NotasIndex
+from controller.catalogo_index import CatalogoIndex
+from utils.texto import plegar
 
 
 class DBFacade:
@@ -21,22 +36,74 @@ class DBFacade:
     - Normaliza catálogos (nombres limpios sin prefijos numéricos).
     - Mapea dinámicamente la tabla/columnas de CLIENTE (soporta CLIENTE/CLIENTES/etc.).
     - Tiene fallbacks para obtener cve_cliente desde la orden aunque el controlador no lo exponga.
+    - Cada fachada es una sesión: usa su propia conexión tomada de un pool compartido.
+    - Cachea los catálogos normalizados (TTL por catálogo, LRU para estados(pais)).
     """
 
+    # TTL (segundos) por catálogo; estados se cachea por país con LRU
+    CATALOG_TTL = {
+        "tipos": 600.0,
+        "talleres": 600.0,
+        "statuses": 600.0,
+        "paises": 600.0,
+        "estados": 300.0,
+        "tecnicos": 300.0,
+        "conteos": 60.0,   # agregados de la gráfica; se invalidan al guardar órdenes
+        "partes": 600.0,   # índices de búsqueda mientras escribes (TYPEAHEAD)
+        "servicios": 600.0,
+    }
+    CATALOG_MAX_ENTRIES = 32
+
+    # tabla del repositorio -> catálogo cacheado que afecta
+    _TABLE_TO_CATALOG = {
+        "pais": "paises", "paises": "paises",
+        "estado": "estados", "estados": "estados",
+        "taller": "talleres", "talleres": "talleres",
+        "tipo_equipo": "tipos", "tipo": "tipos", "tipos": "tipos",
+        "status": "statuses", "estatus": "statuses", "statuses": "statuses",
+        "empleado": "tecnicos", "empleado_taller": "tecnicos", "rol": "tecnicos",
+    }
+
+    # catálogos con búsqueda mientras escribes: nombre -> (tabla, id, código)
+    TYPEAHEAD = {
+        "partes": ("parte", "cve_parte", "part_no"),
+        "servicios": ("servicio", "cve_servicio", None),
+    }
+
     # ========================== Init / Wiring ==========================
     def __init__(self, hostname: str, port: str | int, service_name: str,
-                 username: str, password: str) -> None:
+                 username: str, password: str,
+                 schema_cache: str | None = DEFAULT_CACHE_FILE, **pool_opts: Any) -> None:
+        # pool_opts: pool_min, pool_max, pool_increment, acquire_timeout, ping_on_acquire,
+        #            stmtcachesize
+        pool_opts.setdefault("pooled", True)
+        # para procesos de trabajo (reportes por lote), que abren su propia conexión
+        self._conexion = dict(hostname=hostname, port=port, service_name=service_name,
+                              username=username, password=password)
         self._db = OracleDB(
             hostname=hostname, port=port, service_name=service_name,
-            username=username, password=password
+            username=username, password=password, **pool_opts
         )
-
-        om = OrdenModelo(self._db)
-        nm = NotaModelo(self._db)
-        pm = ParteModelo(self._db)
-        sm = ServicioModelo(self._db)
-        cm = ClienteModelo(self._db)
-        catm = CatalogosModelo(self._db)
+        # mapeos de CLIENTE/COLONIA/ORDEN_PARTE: se descubren una vez por sesión
+        self._schema = SchemaIntrospector(self._db, schema_cache)
+        # llaves nuevas por secuencia/IDENTITY (MAX+1 sólo si no hay secuencia)
+        self._keys = KeyAllocator(self._db)
+        # CP -> colonias en memoria, compartido por las sesiones del mismo esquema
+        # (se liga al primer uso, ver _direcciones())
+        self._address_index: AddressIndex | None = None
+        # CP/colonias insertados por esta sesión y aún sin COMMIT; pasan al
+        # índice compartido en commit() y se descartan en rollback()
+        self._dir_pendientes: dict = {"cps": {}, "colonias": []}
+        self._async: AsyncDBFacade | None = None
+        # índice invertido de notas (búsqueda de texto), se liga al primer uso
+        self._notas_index: NotasIndex | None = None
+
+        om = OrdenModelo(self._db, keys=self._keys, schema=self._schema)
+        nm = NotaModelo(self._db, schema=self._schema)
+        pm = ParteModelo(self._db, schema=self._schema, keys=self._keys)
+        sm = ServicioModelo(self._db, keys=self._keys)
+        cm = ClienteModelo(self._db, schema=self._schema, keys=self._keys)
+        catm = CatalogosModelo(self._db, keys=self._keys)
 
         self._orden = OrdenControlador(om)
         self._nota = NotaControlador(nm)
@@ -44,6 +111,19 @@ class DBFacade:
         self._servicio = ServicioControlador(sm)
         self._cliente = ClienteControlador(cm)
         self._catalogos = CatalogosControlador(catm)
+        # rollups diarios de KPIs (no-op si no se han creado las tablas)
+        self._kpi = KpiControlador(KpiModelo(self._db, schema=self._schema))
+        # importes exactos (Decimal) de una o muchas órdenes
+        self._precios = PreciosModelo(self._db, schema=self._schema)
+        # kits predefinidos de partes/servicios (se agregan en un solo lote)
+        self._kit = KitControlador(KitModelo(self._db, keys=self._keys))
+        # notas encoladas por la vista; se escriben en lote (executemany + 1 commit)
+        self._notas_pendientes = NotasPendientes(self._escribir_notas)
+
+        self._catalog_cache = CatalogCache(
+            ttl=self.CATALOG_TTL, max_entries=self.CATALOG_MAX_ENTRIES
+        )
+        catm.on_change.append(self._on_catalog_table_change)
 
     # ==================== Helpers de normalización =====================
     @staticmethod
@@ -212,37 +292,241 @@ class DBFacade:
     def get_connection(self):
         return self._db.get_connection()
 
+    def commit(self) -> None:
+        """COMMIT de la sesión y publica las altas de direcciones pendientes."""
+        self._db.commit()
+        self._publicar_direcciones()
+
+    def _publicar_direcciones(self) -> None:
+        pend, self._dir_pendientes = self._dir_pendientes, {"cps": {}, "colonias": []}
+        if self._address_index is not None and (pend["cps"] or pend["colonias"]):
+            for cp, (cve_cp, cve_mun) in pend["cps"].items():
+                self._address_index.agregar_cp(cp, cve_cp, cve_mun)
+            for cve_col, nombre, cve_cp in pend["colonias"]:
+                self._address_index.agregar_colonia(cve_col, nombre, cve_cp)
+
+    def rollback(self) -> None:
+        self._dir_pendientes = {"cps": {}, "colonias": []}
+        self._db.rollback()
+
     def close_connection(self):
+        if self._async is not None:
+            self._async.cancelar()
+        try:
+            self._notas_pendientes.vaciar()
+        except Exception:
+            pass
+        if self._notas_index is not None:
+            self._notas_index.guardar()
         return self._db.close_connection()
 
+    def asincrono(self) -> AsyncDBFacade:
+        """Fachada awaitable para handlers async de Flet (una por sesión)."""
+        if self._async is None:
+            self._async = AsyncDBFacade(self)
+        return self._async
+
     # ============================ Órdenes ==============================
     def ordenes(self):
         return self._orden.listar()
 
+    def ordenes_pagina(self, page_size: int = 50, after_cve_orden: int | None = None,
+                       status=None, taller: int | None = None, direction: str = "desc"):
+        """
+        Una página de órdenes (keyset sobre cve_orden) con filtros en SQL.
+        Devuelve (ordenes, cursor_siguiente); cursor_siguiente es None al final.
+        """
+        filas = self._orden.listar(
+            page_size=int(page_size), after_cve_orden=after_cve_orden,
+            status=status, taller=taller, direction=direction,
+        )
+        siguiente = filas[-1].cve_orden if len(filas) >= int(page_size) else None
+        return filas, siguiente
+
+    def ordenes_por_id(self, ids) -> list:
+        """OrdenResumen de esas órdenes (las que ya no existen no vienen)."""
+        return self._orden.listar(ordenes=[int(i) for i in ids])
+
+    def orden_detalle(self, cve_orden: int):
+        """OrdenDetalle (encabezado, partes, servicios, técnicos/horas y notas) o None."""
+        self.vaciar_notas()
+        return self._orden.detalle(cve_orden)
+
     def insertar_orden(self, *args, **kwargs):
-        return self._orden.insertar(*args, **kwargs)
+        res = self._orden.insertar(*args, **kwargs)
+        self._catalog_cache.invalidate("conteos")
+        self.kpi_marcar(res, kwargs.get("cve_status", args[0] if args else None))
+        return res
 
     def tecnicos_orden(self, cve_orden, horas: bool = False):
         return self._orden.tecnicos_orden(cve_orden, horas)
 
     def actualizar_orden(self, cve_orden: int, **kwargs):
-        return self._orden.m.actualizar(
+        res = self._orden.m.actualizar(
             int(cve_orden),
             marca=str(kwargs.get("eq_marca", "") or ""),
             modelo=str(kwargs.get("eq_modelo", "") or ""),
             cve_tipo_equipo=int(kwargs.get("cve_tipo_equipo")),
             cve_status=int(kwargs.get("cve_status")),
         )
+        self._catalog_cache.invalidate("conteos")
+        self.kpi_marcar(cve_orden, kwargs.get("cve_status"))
+        return res
+
+    # ---- agregados (GROUP BY en la base, cacheados poco tiempo) ----
+    def _conteo(self, agrupar: tuple, taller, desde, hasta) -> list[dict]:
+        key = (agrupar, None if taller is None else int(taller), desde, hasta)
+        return self._catalog_cache.get(
+            "conteos",
+            lambda: self._orden.conteo(agrupar, taller=taller, desde=desde, hasta=hasta),
+            key=key,
+        )
+
+    def conteo_por_status(self, taller: int | None = None, desde=None, hasta=None) -> dict[int, int]:
+        """{cve_status: n} sin traer las órdenes (GROUP BY cve_status)."""
+        return {
+            int(r["cve_status"]): int(r["n"])
+            for r in self._conteo(("status",), taller, desde, hasta)
+        }
+
+    def conteo_por_taller(self, desde=None, hasta=None) -> dict[int, dict[int, int]]:
+        """{cve_taller: {cve_status: n}}."""
+        out: dict[int, dict[int, int]] = {}
+        for r in self._conteo(("taller", "status"), None, desde, hasta):
+            if r.get("cve_taller") is not None:
+                out.setdefault(int(r["cve_taller"]), {})[int(r["cve_status"])] = int(r["n"])
+        return out
+
+    def conteo_por_mes(self, taller: int | None = None, desde=None, hasta=None) -> dict[str, dict[int, int]]:
+        """{'YYYY-MM': {cve_status: n}} ordenado por mes (órdenes sin fecha se omiten)."""
+        out: dict[str, dict[int, int]] = {}
+        for r in self._conteo(("mes", "status"), taller, desde, hasta):
+            if r.get("mes"):
+                out.setdefault(str(r["mes"]), {})[int(r["cve_status"])] = int(r["n"])
+        return dict(sorted(out.items()))
+
+    # ---- importes (Decimal) ----
+    def total_orden(self, cve_orden: int) -> TotalOrden | None:
+        """partes, servicios, horas, tarifa, mano_obra y total de una orden."""
+        return self._precios.total(cve_orden)
+
+    def totales_de(self, ordenes) -> dict[int, TotalOrden]:
+        """{cve_orden: TotalOrden} para muchas órdenes (una consulta por cada 1000)."""
+        return self._precios.totales(ordenes)
+
+    # ---- reportes por lote ----
+    def totales_ordenes(self, after_cve_orden: int | None = None, page_size: int = 500,
+                        taller: int | None = None, desde=None, hasta=None) -> list[dict]:
+        """Una página (keyset ascendente) de totales por orden, sumados en SQL."""
+        return self._orden.totales(after_cve_orden, page_size, taller=taller, desde=desde, hasta=hasta)
+
+    def reporte_lote(self, path: str, formato: str = "csv", taller: int | None = None,
+                     desde=None, hasta=None) -> TrabajoReporte:
+        """
+        Inicia el reporte de totales de todas las órdenes del filtro (CSV o PDF)
+        en un proceso aparte. Ver controller/reporte_lote.py.
+        """
+        return TrabajoReporte(self._conexion, path, formato,
+                              taller=taller, desde=desde, hasta=hasta).iniciar()
 
     # ============================== Notas =============================
     def notas(self, cve_orden):
+        self.vaciar_notas()
         return self._nota.listar(cve_orden)
 
     def insertar_nota(self, cve_orden, nota):
-        return self._nota.insertar(cve_orden, nota)
+        res = self._nota.insertar(cve_orden, nota)
+        self._indexar_notas([(cve_orden, nota)])
+        return res
+
+    def encolar_nota(self, cve_orden, nota) -> int:
+        """Agrega la nota al lote sin ir a la base. Devuelve cuántas hay pendientes."""
+        return self._notas_pendientes.agregar(cve_orden, nota)
+
+    def vaciar_notas(self) -> int:
+        """Escribe las notas encoladas (un executemany + un COMMIT). Devuelve cuántas."""
+        return self._notas_pendientes.vaciar()
+
+    def notas_pendientes(self) -> dict[int, int]:
+        return self._notas_pendientes.por_orden()
+
+    def _escribir_notas(self, lote) -> None:
+        # si el lote falla sólo se deshace el lote (SAVEPOINT), no lo demás
+        # que la sesión tenga pendiente en la conexión compartida
+        conn = self._db.get_connection()
+        with conn.cursor() as cur:
+            cur.execute("SAVEPOINT notas_lote")
+        try:
+            self._nota.insertar_lote(lote)
+            self.commit()  # publica también las direcciones pendientes
+        except Exception:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("ROLLBACK TO SAVEPOINT notas_lote")
+            except Exception:
+                pass
+            raise
+        self._indexar_notas(lote)
 
     def eliminar_nota(self, cve_nota):
-        return self._nota.eliminar(cve_nota)
+        res = self._nota.eliminar(cve_nota)
+        if self._notas_index is not None:
+            self._notas_index.olvidar()  # las bajas no son incrementales
+        return res
+
+    # ---- búsqueda de texto en notas ----
+    def _indice_notas(self) -> NotasIndex:
+        if self._notas_index is None:
+            self._notas_index = NotasIndex.compartido(self._schema.cache_key())
+        con_llave = self._nota.m._has_col("ORDEN_NOTA", "CVE_ORDEN_NOTA")
+        return self._notas_index.asegurar(self._db.get_connection(), con_llave)
+
+    def _indexar_notas(self, notas) -> None:
+        idx = self._notas_index
+        if idx is None or not idx.cargado:
+            return
+        try:
+            if idx.con_llave:
+                idx.refrescar(self._db.get_connection())
+            else:
+                idx.agregar(notas)
+        except Exception:
+            pass
+
+    def buscar_notas(self, texto: str, limite: int = 50) -> list[tuple[int, float]]:
+        """
+        [(cve_orden, puntaje)] de las órdenes cuyas notas contienen las
+        palabras (sin acentos, singular/plural indistinto), más relevantes
+        primero. Sólo lee de la base las notas nuevas desde la última búsqueda.
+        """
+        self.vaciar_notas()
+        idx = self._indice_notas()
+        try:
+            idx.refrescar(self._db.get_connection())
+        except Exception:
+            pass
+        return idx.buscar(texto, limite)
+
+    # ---- búsqueda mientras escribes (partes / servicios) ----
+    def _typeahead(self, nombre: str) -> CatalogoIndex:
+        _tabla, id_col, codigo_col = self.TYPEAHEAD[nombre]
+        idx = CatalogoIndex.compartido(f"{self._schema.cache_key()}|{nombre}", id_col, codigo_col,
+                                       ttl=self.CATALOG_TTL.get(nombre, 600.0))
+        leer = self._parte.catalogo if nombre == "partes" else self._servicio.catalogo
+        return idx.asegurar(leer)
+
+    def buscar_partes(self, texto: str, k: int = 20) -> list[dict]:
+        """Las k partes que mejor coinciden (número de parte o descripción), sin ir a la base."""
+        return self._typeahead("partes").buscar(texto, k)
+
+    def buscar_servicios(self, texto: str, k: int = 20) -> list[dict]:
+        """Los k servicios que mejor coinciden con la descripción, sin ir a la base."""
+        return self._typeahead("servicios").buscar(texto, k)
+
+    def precargar_typeahead(self) -> None:
+        """Arma los índices de partes y servicios (p. ej. en segundo plano al abrir el diálogo)."""
+        for nombre in self.TYPEAHEAD:
+            self._typeahead(nombre)
 
     # ============================== Partes ============================
     def partes(self):
@@ -252,10 +536,27 @@ class DBFacade:
         return self._parte.listar(cve_orden)
 
     def parte_orden(self, *args, **kwargs):
-        return self._parte.insertar(*args, **kwargs)
+        res = self._parte.insertar(*args, **kwargs)
+        self.kpi_marcar(args[0] if args else kwargs.get("cve_orden"))
+        return res
 
     def eliminar_parte(self, cve_orden_parte):
-        return self._parte.eliminar(cve_orden_parte)
+        cve_orden = self._kpi_orden_de_parte(cve_orden_parte)
+        res = self._parte.eliminar(cve_orden_parte)
+        self.kpi_marcar(cve_orden)
+        return res
+
+    def agregar_partes(self, cve_orden: int, partes) -> int:
+        """Varias partes (se pueden repetir) a la orden: un executemany y un COMMIT."""
+        return self._en_transaccion(lambda: self._parte.insertar_lote(cve_orden, partes), [cve_orden])
+
+    def eliminar_partes(self, ids) -> int:
+        """Quita varios renglones de ORDEN_PARTE: un executemany y un COMMIT."""
+        ids = list(ids)
+        if not ids:
+            return 0
+        ordenes = self._parte.ordenes_de(ids)
+        return self._en_transaccion(lambda: self._parte.eliminar_lote(ids), ordenes)
 
     # ============================= Servicios ==========================
     def servicios(self):
@@ -265,79 +566,149 @@ class DBFacade:
         return self._servicio.listar(cve_orden)
 
     def servicio_orden(self, *args, **kwargs):
-        return self._servicio.insertar(*args, **kwargs)
+        res = self._servicio.insertar(*args, **kwargs)
+        self.kpi_marcar(args[0] if args else kwargs.get("cve_orden"))
+        return res
 
     def eliminar_servicio(self, cve_orden_servicio):
-        return self._servicio.eliminar(cve_orden_servicio)
+        cve_orden = self._kpi_orden_de("orden_servicio", "cve_orden_servicio", cve_orden_servicio)
+        res = self._servicio.eliminar(cve_orden_servicio)
+        self.kpi_marcar(cve_orden)
+        return res
+
+    def agregar_servicios(self, cve_orden: int, servicios) -> int:
+        """Varios servicios a la orden: un executemany y un COMMIT."""
+        return self._en_transaccion(lambda: self._servicio.insertar_lote(cve_orden, servicios), [cve_orden])
+
+    def eliminar_servicios(self, ids) -> int:
+        """Quita varios renglones de ORDEN_SERVICIO: un executemany y un COMMIT."""
+        ids = list(ids)
+        if not ids:
+            return 0
+        ordenes = self._servicio.ordenes_de(ids)
+        return self._en_transaccion(lambda: self._servicio.eliminar_lote(ids), ordenes)
 
-    # ============================== Cliente ===========================
+    # =============================== Kits =============================
+    def kits(self) -> list[dict]:
+        """[{cve_kit, nombre, partes, servicios}]; [] si aún no hay tablas de kits."""
+        try:
+            return self._kit.listar()
+        except Exception:
+            return []
 
-    # ---- detección flexible de tabla CLIENTE ----
-    def _cliente_colmap(self) -> dict:
+    def kit_elementos(self, cve_kit: int) -> dict[str, list[int]]:
+        return self._kit.elementos(cve_kit)
+
+    def guardar_kit(self, nombre: str, partes=None, servicios=None) -> int:
+        """Crea el kit `nombre` o reemplaza sus partes/servicios (None = los deja). Devuelve cve_kit."""
+        return self._en_transaccion(lambda: self._kit.guardar(nombre, partes, servicios), [])
+
+    def eliminar_kit(self, cve_kit: int) -> int:
+        return self._en_transaccion(lambda: self._kit.eliminar(cve_kit), [])
+
+    def aplicar_kit(self, cve_orden: int, cve_kit: int) -> dict[str, int]:
+        """Agrega todo el kit a la orden en una sola transacción (un lote de partes y uno de servicios)."""
+        el = self._kit.elementos(cve_kit)
+
+        def _todo():
+            return {"partes": self._parte.insertar_lote(cve_orden, el["partes"]),
+                    "servicios": self._servicio.insertar_lote(cve_orden, el["servicios"])}
+
+        return self._en_transaccion(_todo, [cve_orden])
+
+    def _en_transaccion(self, fn, ordenes):
         """
-        Detecta la tabla que contiene a CLIENTE (CLIENTE / CLIENTES / CUSTOMER ...),
-        y mapea columnas canónicas -> reales. Devuelve, además:
-           {'_table': 'CLIENTE', 'pk':'CVE_CLIENTE', 'nombre':'NOMBRE', ...}
+        fn() + marcas de KPIs de `ordenes` + COMMIT (self.commit: publica las
+        direcciones pendientes). Si algo falla se deshace sólo este paso
+        (SAVEPOINT), no lo demás que la sesión tenga pendiente.
         """
         conn = self._db.get_connection()
-        cur = conn.cursor()
+        with conn.cursor() as cur:
+            cur.execute("SAVEPOINT en_transaccion")
         try:
-            cur.execute(
-                "SELECT UPPER(table_name), UPPER(column_name) "
-                "FROM user_tab_columns"
-            )
-            rows = cur.fetchall() or []
-        finally:
+            res = fn()
+            for cve_orden in ordenes:
+                self.kpi_marcar(cve_orden)
+            self.commit()
+        except Exception:
             try:
-                cur.close()
+                with conn.cursor() as cur:
+                    cur.execute("ROLLBACK TO SAVEPOINT en_transaccion")
             except Exception:
                 pass
+            raise
+        return res
+
+    # =============================== KPIs =============================
+    def kpi_marcar(self, cve_orden, cve_status=None) -> None:
+        """
+        Deja la orden pendiente de rollup (en la transacción actual). Llamar
+        también desde la vista cuando se cambian horas con SQL directo.
+        Nunca tumba el guardado: si las tablas de KPIs no existen no hace nada.
+        """
+        if cve_orden is None:
+            return
+        try:
+            self._kpi.marcar(cve_orden, cve_status)
+        except Exception:
+            pass
+
+    def _kpi_orden_de(self, table: str, pk_col: str, pk) -> int | None:
+        try:
+            return self._kpi.orden_de(table, pk_col, pk)
+        except Exception:
+            return None
 
-        # Agrupa columnas por tabla
-        by_table: dict[str, set[str]] = {}
-        for t, c in rows:
-            by_table.setdefault(t, set()).add(c)
-
-        # Candidatas por nombre
-        candidates = []
-        for tname, cols in by_table.items():
-            if any(x in tname for x in ("CLIENT", "CUSTOMER", "PERSONA", "USUARIO")):
-                candidates.append((tname, cols))
-
-        # Si no detectamos por nombre, toma la tabla con más "pistas"
-        score_keys = {"NOMBRE", "PATERNO", "MATERNO", "EMAIL", "CORREO", "TELEFONO", "CALLE", "NUM", "NO_CALLE"}
-        if not candidates:
-            for tname, cols in by_table.items():
-                score = sum(1 for k in score_keys if any(col.startswith(k) or k in col for col in cols))
-                if score >= 3:
-                    candidates.append((tname, cols))
-
-        # Elige la mejor
-        table_name = "CLIENTE"
-        table_cols: set[str] = by_table.get("CLIENTE", set())
-        if candidates:
-            # prioriza tablas con más columnas relevantes
-            candidates.sort(key=lambda x: -len(x[1] & score_keys))
-            table_name, table_cols = candidates[0]
-
-        def pick(cols: set[str], *cands) -> Optional[str]:
-            for c in cands:
-                uc = c.upper()
-                if uc in cols:
-                    return uc
+    def _kpi_orden_de_parte(self, cve_orden_parte) -> int | None:
+        m = self._schema.orden_parte()
+        if not m.get("_table") or not m.get("pk"):
             return None
+        return self._kpi_orden_de(m["_table"], m["pk"], cve_orden_parte)
 
-        return {
-            "_table":   table_name,
-            "pk":        pick(table_cols, "CVE_CLIENTE", "ID", "CLIENTE_ID"),
-            "nombre":    pick(table_cols, "NOMBRE", "NOM_CLIENTE", "NOMBRE_CLIENTE"),
-            "paterno":   pick(table_cols, "PATERNO", "APELLIDO_PATERNO", "APE_PAT", "AP_PATERNO"),
-            "materno":   pick(table_cols, "MATERNO", "APELLIDO_MATERNO", "APE_MAT", "AP_MATERNO"),
-            "correo":    pick(table_cols, "CORREO", "EMAIL", "E_MAIL"),
-            "telefono":  pick(table_cols, "TELEFONO", "TEL", "PHONE"),
-            "calle":     pick(table_cols, "CALLE", "DIRECCION", "DOMICILIO", "DIRECCION1"),
-            "num_calle": pick(table_cols, "NUM_CALLE", "NO_CALLE", "NUMERO", "NUMERO_CALLE", "NRO_CALLE"),
-        }
+    def kpi_disponible(self) -> bool:
+        return self._kpi.disponible()
+
+    def kpi_refrescar(self) -> int:
+        """
+        Aplica a los rollups los cambios ya confirmados. Devuelve cuántas marcas
+        (0 si otra sesión está refrescando). Los errores se propagan.
+        """
+        return self._kpi.refrescar()
+
+    def kpi_resumen(self, desde=None, hasta=None, taller: int | None = None) -> list[dict]:
+        """Por taller: ordenes, partes, servicios, mano_obra (tarifa×horas), ingreso, horas."""
+        return self._kpi.resumen(desde, hasta, taller)
+
+    def kpi_por_dia(self, desde=None, hasta=None, taller: int | None = None) -> list[dict]:
+        return self._kpi.por_dia(desde, hasta, taller)
+
+    def kpi_horas_tecnico(self, desde=None, hasta=None, taller: int | None = None) -> list[dict]:
+        return self._kpi.horas_por_tecnico(desde, hasta, taller)
+
+    def kpi_turnaround(self, desde=None, hasta=None, taller: int | None = None) -> list[dict]:
+        """Horas promedio que pasan las órdenes en cada status, por taller."""
+        return self._kpi.turnaround(desde, hasta, taller)
+
+    # ============================== Cliente ===========================
+
+    # ---- detección flexible de tabla CLIENTE ----
+    def _cliente_colmap(self) -> dict:
+        """
+        Tabla que contiene a CLIENTE (CLIENTE / CLIENTES / CUSTOMER ...) y el
+        mapeo de columnas canónicas -> reales:
+           {'_table': 'CLIENTE', 'pk':'CVE_CLIENTE', 'nombre':'NOMBRE', ...}
+        Se descubre una vez por sesión (ver model/db/schema.py).
+        """
+        return self._schema.cliente()
+
+    def refrescar_esquema(self) -> dict:
+        """Vuelve a descubrir los mapeos de tablas (p. ej. tras un cambio de DDL)."""
+        self._catalogos.m.reset_columnas()
+        self._keys.olvidar()
+        REGISTRO.limpiar()
+        self._parte.m.olvidar()
+        NotaModelo.olvidar_columnas()
+        return self._schema.refresh()
 
     def insertar_cliente_y_verificar_datos(self, *args, **kwargs):
         return self._cliente.insertar_y_verificar(*args, **kwargs)
@@ -434,20 +805,80 @@ class DBFacade:
                 pass
 
     # ======= Catálogos (normalizados) y directos a tablas =========
+    def _on_catalog_table_change(self, table: str) -> None:
+        table = str(table).lower()
+        name = self._TABLE_TO_CATALOG.get(table)
+        if name:
+            self._catalog_cache.invalidate(name)
+        if table in ("colonia", "cp") and self._address_index is not None and self._address_index.cargado:
+            # las colonias no están en el caché de catálogos sino en el índice de
+            # direcciones; el repositorio ya hizo COMMIT (también de lo pendiente)
+            try:
+                self._publicar_direcciones()
+                self._address_index.refrescar(self._db.get_connection())
+            except Exception:
+                pass
+
+    def _invalidar_typeahead(self, nombre: str | None = None) -> None:
+        for n in ([nombre] if nombre else list(self.TYPEAHEAD)):
+            if n in self.TYPEAHEAD:
+                CatalogoIndex.compartido(f"{self._schema.cache_key()}|{n}", *self.TYPEAHEAD[n][1:]).invalidar()
+
+    def invalidar_catalogos(self, nombre: str | None = None) -> None:
+        """Invalida un catálogo cacheado ('tipos', 'estados', 'partes', ...) o todos."""
+        self._catalog_cache.invalidate(nombre)
+        if nombre is None or nombre in self.TYPEAHEAD:
+            self._invalidar_typeahead(nombre)
+
+    def catalog_cache_stats(self) -> dict:
+        """{catalogo: {'hits', 'misses', 'version', 'entries'}}"""
+        return self._catalog_cache.stats()
+
     def tipos(self) -> dict[int, tuple[float, str]]:
-        raw = self._catalogos.tipos()
-        return self._normalize_tipos(raw)
+        return self._catalog_cache.get(
+            "tipos", lambda: self._normalize_tipos(self._catalogos.tipos())
+        )
 
     def talleres(self) -> dict[int, str]:
-        return self._normalize_catalog(self._catalogos.talleres())
+        return self._catalog_cache.get(
+            "talleres", lambda: self._normalize_catalog(self._catalogos.talleres())
+        )
 
     def tecnicos_taller(self, cve_taller):
-        return self._catalogos.tecnicos_taller(cve_taller)
+        """Plantilla de técnicos del taller (una consulta; cacheada por taller)."""
+        try:
+            tid = int(str(cve_taller).strip())
+        except Exception:
+            return self._catalogos.tecnicos_taller(cve_taller)
+        return self._catalog_cache.get(
+            "tecnicos", lambda: self._catalogos.tecnicos_taller(tid), key=tid
+        )
+
+    def invalidar_tecnicos(self, cve_taller: int | None = None) -> None:
+        """Tras dar de alta/reasignar técnicos: invalida un taller o todos."""
+        if cve_taller is None:
+            self._catalog_cache.invalidate("tecnicos")
+        else:
+            self._catalog_cache.invalidate("tecnicos", int(cve_taller))
 
     def statuses(self) -> dict[int, str]:
-        return self._normalize_catalog(self._catalogos.statuses())
+        return self._catalog_cache.get(
+            "statuses", lambda: self._normalize_catalog(self._catalogos.statuses())
+        )
+
+    def catalogos_snapshot(self) -> CatalogosSnapshot:
+        """Lee tipos/talleres/statuses/paises una sola vez para un repintado completo."""
+        return CatalogosSnapshot(
+            tipos=self.tipos(),
+            talleres=self.talleres(),
+            statuses=self.statuses(),
+            paises=self.paises(),
+        )
 
     def paises(self) -> dict[int, str]:
+        return self._catalog_cache.get("paises", self._load_paises)
+
+    def _load_paises(self) -> dict[int, str]:
         conn = self._db.get_connection()
         cur = conn.cursor()
         try:
@@ -465,6 +896,9 @@ class DBFacade:
             pid = int(str(pais).strip())
         except Exception:
             return {}
+        return self._catalog_cache.get("estados", lambda: self._load_estados(pid), key=pid)
+
+    def _load_estados(self, pid: int) -> dict[int, str]:
         conn = self._db.get_connection()
         cur = conn.cursor()
         try:
@@ -513,7 +947,9 @@ class DBFacade:
                     {"p": pais_id, "n": nombre_clean},
                 )
                 cur.execute("SELECT estado_cve_estado_seq.CURRVAL FROM dual")
-                return int(cur.fetchone()[0])
+                new_id = int(cur.fetchone()[0])
+                self._catalog_cache.invalidate("estados", pais_id)
+                return new_id
             except Exception:
                 cur.execute(
                     "INSERT INTO estado (cve_pais, estado) VALUES (:p, :n)",
@@ -526,6 +962,7 @@ class DBFacade:
                     {"p": pais_id, "n": nombre_key},
                 )
                 r2 = cur.fetchone()
+                self._catalog_cache.invalidate("estados", pais_id)
                 return int(r2[0]) if r2 else None
         finally:
             try:
@@ -544,73 +981,120 @@ class DBFacade:
         if not nombre or not str(nombre).strip():
             return None
 
-        conn = self._db.get_connection()
-        cur = conn.cursor()
-
         cp_clean = "".join(ch for ch in (cp or "") if str(ch).isdigit())[:5]
         nombre_clean = str(nombre).strip()
-        nombre_key = nombre_clean.lower()
-
         if not cp_clean:
-            try:
-                cur.close()
-            except Exception:
-                pass
             return None
 
-        try:
-            cur.execute(
-                "SELECT cve_cp FROM cp WHERE cp = :cp FETCH FIRST 1 ROWS ONLY",
-                {"cp": cp_clean},
-            )
-            row = cur.fetchone()
-            if row:
-                cve_cp = int(row[0])
-            else:
-                cve_municipio = None
-                if municipio and estado:
-                    cur.execute(
-                        "SELECT cve_municipio FROM municipio "
-                        "WHERE cve_estado = :e AND LOWER(TRIM(municipio)) = :m "
-                        "FETCH FIRST 1 ROWS ONLY",
-                        {"e": int(estado), "m": str(municipio).strip().lower()},
-                    )
-                    r2 = cur.fetchone()
-                    if r2:
-                        cve_municipio = int(r2[0])
-
+        # Todo se resuelve en el índice en memoria (más lo insertado por esta
+        # sesión sin COMMIT); a la base sólo van los INSERT y, si algo no
+        # aparece, una relectura de ese CP.
+        conn = self._db.get_connection()
+        idx = self._direcciones()
+        pend = self._pendientes_direcciones(conn)
+        releido = False
+
+        info = pend["cps"].get(cp_clean) or idx.cp(cp_clean)
+        if info is None:
+            self._releer_cp(conn, idx, cp_clean)
+            releido = True
+            info = idx.cp(cp_clean)
+        if info is not None:
+            cve_cp = info[0]
+        else:
+            cve_municipio = None
+            if municipio and estado:
+                cve_municipio = idx.municipio_id(int(estado), municipio)
                 if cve_municipio is None:
-                    return None
+                    cve_municipio = self._municipio_id_db(int(estado), municipio)
+            if cve_municipio is None:
+                return None
 
-                cur.execute(
-                    "INSERT INTO cp (cve_cp, cp, cve_municipio) "
-                    "VALUES (cp_cve_cp_seq.NEXTVAL, :cp, :mun)",
+            with conn.cursor() as cur:
+                cve_cp = self._keys.insertar(
+                    cur, "cp", "cve_cp", ["cp", "cve_municipio"], [":cp", ":mun"],
                     {"cp": cp_clean, "mun": cve_municipio},
+                    self._keys.next_id("cp", "cve_cp", conn),
                 )
-                cur.execute("SELECT cp_cve_cp_seq.CURRVAL FROM dual")
-                cve_cp = int(cur.fetchone()[0])
-
-            cur.execute(
-                "SELECT cve_colonia FROM colonia "
-                "WHERE cve_cp = :cp AND LOWER(TRIM(colonia)) = :n FETCH FIRST 1 ROWS ONLY",
-                {"cp": cve_cp, "n": nombre_key},
+            pend["cps"][cp_clean] = (int(cve_cp), cve_municipio)
+
+        llave = plegar(nombre_clean)
+        cve_col = next((c for c, n, k in pend["colonias"] if k == cve_cp and plegar(n) == llave), None)
+        if cve_col is None:
+            cve_col = idx.colonia_id(cp_clean, nombre_clean)
+        if cve_col is None and not releido and cp_clean not in pend["cps"]:
+            self._releer_cp(conn, idx, cp_clean)
+            cve_col = idx.colonia_id(cp_clean, nombre_clean)
+        if cve_col is not None:
+            return cve_col
+
+        with conn.cursor() as cur:
+            new_id = self._keys.insertar(
+                cur, "colonia", "cve_colonia", ["colonia", "cve_cp"], [":n", ":cp"],
+                {"n": nombre_clean, "cp": cve_cp},
+                self._keys.next_id("colonia", "cve_colonia", conn),
             )
-            r3 = cur.fetchone()
-            if r3:
-                return int(r3[0])
-
+        pend["colonias"].append((int(new_id), nombre_clean, int(cve_cp)))
+        return new_id
+
+    def _pendientes_direcciones(self, conn) -> dict:
+        # si la transacción ya terminó por fuera (connection.commit()/rollback()
+        # directos) no se sabe en qué acabó: se descartan y la base manda
+        if not getattr(conn, "transaction_in_progress", True):
+            self._dir_pendientes = {"cps": {}, "colonias": []}
+        return self._dir_pendientes
+
+    def _releer_cp(self, conn, idx: AddressIndex, cp: str) -> None:
+        # la conexión ve lo que esta sesión no ha confirmado: eso no entra al
+        # índice compartido
+        pend = self._dir_pendientes
+        idx.cargar_cp(conn, cp,
+                      omitir_cps={c for c, _m in pend["cps"].values()},
+                      omitir_colonias={c for c, _n, _k in pend["colonias"]})
+
+    def _municipio_id_db(self, cve_estado: int, municipio: str) -> int | None:
+        # municipios sin ningún CP todavía no están en el índice
+        conn = self._db.get_connection()
+        with conn.cursor() as cur:
             cur.execute(
-                "INSERT INTO colonia (cve_colonia, colonia, cve_cp) "
-                "VALUES (colonia_cve_colonia_seq.NEXTVAL, :n, :cp)",
-                {"n": nombre_clean, "cp": cve_cp},
+                "SELECT cve_municipio, municipio FROM municipio "
+                "WHERE cve_estado = :e AND LOWER(TRIM(municipio)) = :m "
+                "FETCH FIRST 1 ROWS ONLY",
+                {"e": int(cve_estado), "m": str(municipio).strip().lower()},
             )
-            cur.execute("SELECT colonia_cve_colonia_seq.CURRVAL FROM dual")
-            return int(cur.fetchone()[0])
-        finally:
-            try:
-                cur.close()
-            except Exception:
-                pass
+            row = cur.fetchone()
+        if not row:
+            return None
+        self._direcciones().agregar_municipio(int(row[0]), row[1], cve_estado)
+        return int(row[0])
+
+    # ---- índice de direcciones (CP -> colonias) ----
+    def _direcciones(self) -> AddressIndex:
+        if self._address_index is None:
+            self._address_index = AddressIndex.compartido(self._schema.cache_key())
+        return self._address_index.asegurar(self._db.get_connection())
+
+    def colonias_por_cp(self, cp: str) -> list[tuple[int, str]]:
+        """[(cve_colonia, nombre)] del CP, sin ir a la base."""
+        cp_clean = "".join(ch for ch in str(cp or "") if ch.isdigit())[:5]
+        return self._direcciones().colonias(cp_clean) if len(cp_clean) == 5 else []
+
+    def sugerir_colonias(self, cp: str, texto: str = "", limite: int = 20) -> list[tuple[int, str]]:
+        cp_clean = "".join(ch for ch in str(cp or "") if ch.isdigit())[:5]
+        return self._direcciones().sugerir(cp_clean, texto, limite) if len(cp_clean) == 5 else []
+
+    def cp_info(self, cp: str) -> dict | None:
+        """{'cve_cp', 'cve_municipio', 'municipio', 'cve_estado'} del CP o None."""
+        idx = self._direcciones()
+        info = idx.cp(str(cp or "").strip())
+        if not info:
+            return None
+        mun = idx.municipio(info[1]) or ("", None)
+        return {"cve_cp": info[0], "cve_municipio": info[1], "municipio": mun[0], "cve_estado": mun[1]}
+
+    def refrescar_direcciones(self) -> int:
+        """Relee todo el índice (colonias/CP que otras sesiones hayan dado de alta)."""
+        return self._direcciones().refrescar(self._db.get_connection())
 
     # ================ Cliente: helpers y operaciones UI ================
     def cliente_detalle(self, cve_cliente: int) -> dict | None:
@@ -628,7 +1112,10 @@ class DBFacade:
         if not select_cols:
             return None
 
-        sql = f"SELECT {', '.join(select_cols)} FROM {table} WHERE {cmap['pk']} = :IDVAL"
+        sql = REGISTRO.sql(
+            ("cliente.detalle", table, cmap["pk"], tuple(select_cols)),
+            lambda: f"SELECT {', '.join(select_cols)} FROM {table} WHERE {cmap['pk']} = :IDVAL",
+        )
         conn = self._db.get_connection()
         cur = conn.cursor()
         try:
@@ -678,8 +1165,9 @@ class DBFacade:
         if estado:
             cve_estado = self.upsert_estado(pais or 1, estado)
 
+        cve_col = None
         if cp5 and colonia:
-            _ = self.resolve_or_create_colonia(cp5, colonia, municipio, cve_estado, pais)
+            cve_col = self.resolve_or_create_colonia(cp5, colonia, municipio, cve_estado, pais)
 
         if cve_cliente:
             self.actualizar_cliente(
@@ -692,7 +1180,7 @@ class DBFacade:
 
         new_id = self.insertar_cliente_y_verificar_datos(
             nombre, paterno, materno, correo, telefono,
-            calle, num_calle, cp5, colonia, municipio, estado, pais
+            calle, num_calle, cp5, cve_col or colonia, municipio, estado, pais
         )
         conn = self._db.get_connection()
         cur = conn.cursor()
@@ -708,7 +1196,41 @@ class DBFacade:
                 pass
         return int(new_id)
 
+    # ========================= Importación masiva ======================
+    def importar_clientes(self, path: str, chunk_size: int = 1000,
+                          on_progress=None) -> ResumenImportacion:
+        """
+        Importa clientes (y órdenes, si la fila trae equipo) desde CSV/JSONL.
+        Ver controller/importador.py para las columnas aceptadas.
+        """
+        imp = ImportadorClientes(self._db, schema=self._schema, keys=self._keys,
+                                 chunk_size=chunk_size)
+        try:
+            return imp.importar_archivo(path, on_progress=on_progress)
+        finally:
+            # pudo haber estados/colonias nuevos
+            self._catalog_cache.invalidate("estados")
+            self._catalog_cache.invalidate("conteos")
+            if self._address_index is not None and self._address_index.cargado:
+                self._address_index.refrescar(self._db.get_connection())
+            try:
+                self._kpi.reconstruir()
+            except Exception:
+                pass
+
     # ============================== Misc ==============================
+    def estadisticas_sql(self) -> dict:
+        """
+        Para verificar el soft parse: sentencias del registro (y sus usos) y
+        contadores de parse de la sesión en Oracle. Si 'parse count (hard)'
+        deja de crecer al repetir una pantalla, el caché está funcionando.
+        """
+        return {
+            "registro": REGISTRO.stats(),
+            "sesion": self._db.estadisticas_parse(),
+            "partes": self._parte.m.stats(),
+        }
+
     @property
     def _connection(self):
         return self._db.get_connection()
\ No newline at end of file
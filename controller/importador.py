@@ -0,0 +1,429 @@
+# controller/importador.py
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import csv
+import json
+import os
+
+from model.db.keys import KeyAllocator
+from model.db.schema import SchemaIntrospector
+from model.db.sentencias import lista_in
+
+
+# Columnas aceptadas en el archivo (CSV con encabezado o JSONL)
+CAMPOS_CLIENTE = ("nombre", "paterno", "materno", "correo", "telefono", "calle",
+                  "num_calle", "cp", "colonia", "municipio", "estado", "pais")
+CAMPOS_ORDEN = ("eq_marca", "eq_modelo", "cve_tipo_equipo", "cve_status",
+                "cve_taller", "cve_tecnico", "notas_cliente")
+# alias -> nombre canónico
+_ALIAS = {"numero": "num_calle", "num": "num_calle", "dir_num": "num_calle",
+          "dir_calle": "calle", "cp5": "cp", "email": "correo", "marca": "eq_marca",
+          "modelo": "eq_modelo", "tipo": "cve_tipo_equipo", "status": "cve_status",
+          "taller": "cve_taller", "tecnico": "cve_tecnico", "notas": "notas_cliente"}
+
+_IN_MAX = 1000  # expresiones máximas en un IN de Oracle
+
+
+@dataclass(slots=True)
+class ErrorFila:
+    linea: int
+    mensaje: str
+
+
+@dataclass(slots=True)
+class ResumenImportacion:
+    leidas: int = 0
+    clientes_nuevos: int = 0
+    clientes_existentes: int = 0
+    ordenes: int = 0
+    errores: List[ErrorFila] = field(default_factory=list)
+
+
+def _key(v: Any) -> str:
+    return str(v or "").strip().lower()
+
+
+def _int_or_none(v: Any) -> Optional[int]:
+    try:
+        return int(str(v).strip())
+    except Exception:
+        return None
+
+
+def _chunks(seq: List[Any], n: int) -> Iterator[List[Any]]:
+    for i in range(0, len(seq), n):
+        yield seq[i:i + n]
+
+
+def leer_filas(path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Lee el archivo en streaming: (numero_de_linea, fila_normalizada).
+    .jsonl/.json -> un objeto por línea; cualquier otro -> CSV con encabezado.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if ext in (".jsonl", ".json", ".ndjson"):
+            for n, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    obj = json.loads(line)
+                except ValueError as ex:
+                    yield n, {"_error": f"JSON inválido: {ex}"}
+                    continue
+                yield n, _normalizar(obj if isinstance(obj, dict) else {})
+        else:
+            # línea 1 = encabezado
+            for n, row in enumerate(csv.DictReader(f), start=2):
+                yield n, _normalizar(row)
+
+
+def _normalizar(row: Dict[str, Any]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for k, v in row.items():
+        if k is None:
+            continue
+        kk = str(k).strip().lower()
+        kk = _ALIAS.get(kk, kk)
+        out[kk] = v.strip() if isinstance(v, str) else v
+    return out
+
+
+class ImportadorClientes:
+    """
+    Importa clientes (y opcionalmente una orden por fila) por bloques:
+    - Resuelve país/estado/municipio/CP/colonia con consultas IN (...) por bloque
+      y recuerda lo resuelto entre bloques; lo que falta se crea con executemany.
+    - Reserva llaves en bloque (KeyAllocator.reservar) e inserta CLIENTE, ORDEN
+      y ORDEN_TECNICOS con executemany(batcherrors=True): una fila mala se
+      reporta en el resumen y no detiene la carga.
+    - COMMIT por bloque.
+    """
+
+    def __init__(self, db, schema: SchemaIntrospector | None = None,
+                 keys: KeyAllocator | None = None, chunk_size: int = 1000) -> None:
+        self.db = db  # OracleDB con .get_connection()
+        self.schema = schema or SchemaIntrospector(db)
+        self.keys = keys or KeyAllocator(db)
+        self.chunk_size = max(1, int(chunk_size))
+        # cachés de direcciones (llaves normalizadas con _key)
+        self._paises: Optional[Dict[str, int]] = None
+        self._estados: Dict[Tuple[int, str], int] = {}
+        self._municipios: Dict[Tuple[int, str], int] = {}
+        self._cps: Dict[str, int] = {}
+        self._colonias: Dict[Tuple[int, str], int] = {}
+
+    # ============================ API ============================
+    def importar(self, filas: Iterable[Tuple[int, Dict[str, Any]]],
+                 on_progress: Callable[[ResumenImportacion], None] | None = None) -> ResumenImportacion:
+        res = ResumenImportacion()
+        bloque: List[Tuple[int, Dict[str, Any]]] = []
+        for linea, row in filas:
+            res.leidas += 1
+            if "_error" in row:
+                res.errores.append(ErrorFila(linea, row["_error"]))
+                continue
+            bloque.append((linea, row))
+            if len(bloque) >= self.chunk_size:
+                self._procesar_bloque(bloque, res)
+                bloque = []
+                if on_progress:
+                    on_progress(res)
+        if bloque:
+            self._procesar_bloque(bloque, res)
+            if on_progress:
+                on_progress(res)
+        return res
+
+    def importar_archivo(self, path: str,
+                         on_progress: Callable[[ResumenImportacion], None] | None = None) -> ResumenImportacion:
+        return self.importar(leer_filas(path), on_progress=on_progress)
+
+    # ========================= un bloque =========================
+    def _procesar_bloque(self, bloque: List[Tuple[int, Dict[str, Any]]], res: ResumenImportacion) -> None:
+        conn = self.db.get_connection()
+        validas: List[Tuple[int, Dict[str, Any]]] = []
+        for linea, r in bloque:
+            falta = [c for c in ("nombre", "paterno", "cp", "colonia") if not r.get(c)]
+            if falta:
+                res.errores.append(ErrorFila(linea, f"faltan campos: {', '.join(falta)}"))
+                continue
+            validas.append((linea, r))
+        if not validas:
+            return
+
+        antes = (res.clientes_nuevos, res.clientes_existentes, res.ordenes, len(res.errores))
+        try:
+            colonias = self._resolver_direcciones(conn, validas, res)
+            clientes = self._insertar_clientes(conn, validas, colonias, res)
+            self._insertar_ordenes(conn, validas, clientes, res)
+            conn.commit()
+        except Exception as ex:
+            # error de bloque (no de fila): se descarta el bloque y se sigue
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            self._olvidar_direcciones()
+            res.clientes_nuevos, res.clientes_existentes, res.ordenes, n_err = antes
+            del res.errores[n_err:]
+            for linea, _ in validas:
+                res.errores.append(ErrorFila(linea, f"bloque descartado: {ex}"))
+
+    def _olvidar_direcciones(self) -> None:
+        # tras un rollback, lo que creamos en el bloque ya no existe
+        self._paises = None
+        self._estados.clear()
+        self._municipios.clear()
+        self._cps.clear()
+        self._colonias.clear()
+
+    # ---------------------- direcciones ----------------------
+    def _select_in(self, conn, sql: str, col: str, values: List[Any]) -> List[tuple]:
+        """Ejecuta `sql` reemplazando {cond} por `col IN (...)`, en pedazos de 1000."""
+        out: List[tuple] = []
+        with conn.cursor() as cur:
+            for part in _chunks(values, _IN_MAX):
+                ph, binds = lista_in("v", part)
+                cur.execute(sql.format(cond=f"{col} IN ({ph})"), binds)
+                out.extend(cur.fetchall())
+        return out
+
+    def _crear(self, conn, table: str, id_col: str, cols: List[str], rows: List[tuple]) -> List[int]:
+        """Inserta `rows` con ids reservados en bloque; devuelve los ids."""
+        ids = self.keys.reservar(table, id_col, len(rows), conn=conn)
+        if len(ids) != len(rows):
+            raise RuntimeError(f"{table}.{id_col} es IDENTITY ALWAYS: no se pueden reservar llaves")
+        ph = ", ".join(f":{i + 1}" for i in range(len(cols) + 1))
+        with conn.cursor() as cur:
+            cur.executemany(
+                f"INSERT INTO {table} ({id_col}, {', '.join(cols)}) VALUES ({ph})",
+                [(i, *r) for i, r in zip(ids, rows)],
+            )
+        return ids
+
+    def _resolver_direcciones(self, conn, filas, res: ResumenImportacion) -> Dict[int, int]:
+        """linea -> cve_colonia para cada fila resoluble."""
+        # países: catálogo chico, se lee completo una vez
+        if self._paises is None:
+            with conn.cursor() as cur:
+                cur.execute("SELECT cve_pais, pais FROM pais")
+                self._paises = {_key(n): int(i) for i, n in cur.fetchall()}
+
+        def pais_id(r) -> Optional[int]:
+            v = r.get("pais")
+            if v in (None, ""):
+                return 1
+            return _int_or_none(v) or self._paises.get(_key(v))
+
+        # estados
+        faltan_est = {(pais_id(r), _key(r.get("estado"))) for _, r in filas
+                      if r.get("estado") and _int_or_none(r.get("estado")) is None}
+        faltan_est = {k for k in faltan_est if k[0] is not None and k not in self._estados}
+        if faltan_est:
+            for i, p, n in self._select_in(
+                conn, "SELECT cve_estado, cve_pais, LOWER(TRIM(estado)) FROM estado WHERE {cond}",
+                "LOWER(TRIM(estado))", sorted({n for _, n in faltan_est}),
+            ):
+                self._estados[(int(p), n)] = int(i)
+            nuevos = sorted(k for k in faltan_est if k not in self._estados)
+            if nuevos:
+                nombres = {(pais_id(r), _key(r.get("estado"))): str(r.get("estado")).strip() for _, r in filas if r.get("estado")}
+                ids = self._crear(conn, "estado", "cve_estado", ["cve_pais", "estado"],
+                                  [(p, nombres[(p, n)]) for p, n in nuevos])
+                self._estados.update(zip(nuevos, ids))
+
+        def estado_id(r) -> Optional[int]:
+            v = r.get("estado")
+            if v in (None, ""):
+                return None
+            return _int_or_none(v) or self._estados.get((pais_id(r), _key(v)))
+
+        # municipios (necesitan estado)
+        faltan_mun = {(estado_id(r), _key(r.get("municipio"))) for _, r in filas if r.get("municipio")}
+        faltan_mun = {k for k in faltan_mun if k[0] is not None and k not in self._municipios}
+        if faltan_mun:
+            for i, e, n in self._select_in(
+                conn, "SELECT cve_municipio, cve_estado, LOWER(TRIM(municipio)) FROM municipio WHERE {cond}",
+                "LOWER(TRIM(municipio))", sorted({n for _, n in faltan_mun}),
+            ):
+                self._municipios[(int(e), n)] = int(i)
+            nuevos = sorted(k for k in faltan_mun if k not in self._municipios)
+            if nuevos:
+                nombres = {(estado_id(r), _key(r.get("municipio"))): str(r.get("municipio")).strip()
+                           for _, r in filas if r.get("municipio")}
+                ids = self._crear(conn, "municipio", "cve_municipio", ["cve_estado", "municipio"],
+                                  [(e, nombres[(e, n)]) for e, n in nuevos])
+                self._municipios.update(zip(nuevos, ids))
+
+        def municipio_id(r) -> Optional[int]:
+            return self._municipios.get((estado_id(r), _key(r.get("municipio"))))
+
+        # códigos postales
+        def cp5(r) -> str:
+            return "".join(ch for ch in str(r.get("cp") or "") if ch.isdigit())[:5]
+
+        faltan_cp = sorted({cp5(r) for _, r in filas if cp5(r)} - set(self._cps))
+        if faltan_cp:
+            for i, cp in self._select_in(conn, "SELECT cve_cp, cp FROM cp WHERE {cond}", "cp", faltan_cp):
+                self._cps[str(cp)] = int(i)
+            nuevos_cp: Dict[str, int] = {}
+            for _, r in filas:
+                c = cp5(r)
+                if c and c not in self._cps and c not in nuevos_cp and municipio_id(r) is not None:
+                    nuevos_cp[c] = municipio_id(r)
+            if nuevos_cp:
+                cps = sorted(nuevos_cp)
+                ids = self._crear(conn, "cp", "cve_cp", ["cp", "cve_municipio"],
+                                  [(c, nuevos_cp[c]) for c in cps])
+                self._cps.update(zip(cps, ids))
+
+        # colonias (por CP)
+        faltan_col = {(self._cps.get(cp5(r)), _key(r.get("colonia"))) for _, r in filas}
+        faltan_col = {k for k in faltan_col if k[0] is not None and k not in self._colonias}
+        if faltan_col:
+            for i, c, n in self._select_in(
+                conn, "SELECT cve_colonia, cve_cp, LOWER(TRIM(colonia)) FROM colonia WHERE {cond}",
+                "cve_cp", sorted({c for c, _ in faltan_col}),
+            ):
+                self._colonias.setdefault((int(c), n), int(i))
+            nuevos = sorted(k for k in faltan_col if k not in self._colonias)
+            if nuevos:
+                nombres = {(self._cps.get(cp5(r)), _key(r.get("colonia"))): str(r.get("colonia")).strip()
+                           for _, r in filas}
+                ids = self._crear(conn, "colonia", "cve_colonia", ["colonia", "cve_cp"],
+                                  [(nombres[(c, n)], c) for c, n in nuevos])
+                self._colonias.update(zip(nuevos, ids))
+
+        out: Dict[int, int] = {}
+        for linea, r in filas:
+            cve_col = self._colonias.get((self._cps.get(cp5(r)), _key(r.get("colonia"))))
+            if cve_col is None:
+                res.errores.append(ErrorFila(linea, "no se pudo resolver la colonia (CP sin municipio/estado)"))
+            else:
+                out[linea] = cve_col
+        return out
+
+    # ------------------------ clientes ------------------------
+    def _insertar_clientes(self, conn, filas, colonias: Dict[int, int], res: ResumenImportacion) -> Dict[int, int]:
+        """linea -> cve_cliente (nuevo o existente por correo)."""
+        cmap = self.schema.cliente()
+        table = cmap.get("_table") or "CLIENTE"
+        pk = cmap.get("pk") or "CVE_CLIENTE"
+        correo_col = cmap.get("correo")
+
+        filas = [(l, r) for l, r in filas if l in colonias]
+        out: Dict[int, int] = {}
+
+        # existentes por correo (incluye repetidos dentro del mismo archivo)
+        por_correo: Dict[str, int] = {}
+        if correo_col:
+            correos = sorted({_key(r.get("correo")) for _, r in filas if r.get("correo")})
+            if correos:
+                for i, c in self._select_in(
+                    conn, f"SELECT {pk}, LOWER(TRIM({correo_col})) FROM {table} WHERE {{cond}}",
+                    f"LOWER(TRIM({correo_col}))", correos,
+                ):
+                    por_correo.setdefault(c, int(i))
+
+        campos = [(k, cmap.get(k)) for k in ("nombre", "paterno", "materno", "correo",
+                                             "telefono", "calle", "num_calle")]
+        campos = [(k, c) for k, c in campos if c]
+        cols = [c for _, c in campos] + ["CVE_COLONIA"]
+
+        nuevas: List[Tuple[int, tuple]] = []
+        vistos: Dict[str, int] = {}  # correo -> linea que lo inserta
+        for linea, r in filas:
+            c = _key(r.get("correo"))
+            if c and c in por_correo:
+                out[linea] = por_correo[c]
+                res.clientes_existentes += 1
+                continue
+            if c and c in vistos:
+                continue  # se resuelve tras insertar la primera aparición
+            if c:
+                vistos[c] = linea
+            nuevas.append((linea, tuple(r.get(k) for k, _ in campos) + (colonias[linea],)))
+
+        if nuevas:
+            ids = self.keys.reservar(table, pk, len(nuevas), conn=conn)
+            if len(ids) != len(nuevas):
+                raise RuntimeError(f"{table}.{pk} es IDENTITY ALWAYS: no se pueden reservar llaves")
+            data = [(i, *vals) for i, (_, vals) in zip(ids, nuevas)]
+            ph = ", ".join(f":{i + 1}" for i in range(len(cols) + 1))
+            with conn.cursor() as cur:
+                cur.executemany(f"INSERT INTO {table} ({pk}, {', '.join(cols)}) VALUES ({ph})",
+                                data, batcherrors=True)
+                fallidas = {e.offset: e.message for e in cur.getbatcherrors()}
+            for idx, ((linea, _), new_id) in enumerate(zip(nuevas, ids)):
+                if idx in fallidas:
+                    res.errores.append(ErrorFila(linea, f"cliente: {fallidas[idx]}"))
+                    continue
+                out[linea] = new_id
+                res.clientes_nuevos += 1
+
+        # repetidos dentro del archivo: mismo cliente que su primera aparición
+        for linea, r in filas:
+            c = _key(r.get("correo"))
+            if linea in out or c not in vistos or vistos[c] == linea:
+                continue
+            if vistos[c] in out:
+                out[linea] = out[vistos[c]]
+                res.clientes_existentes += 1
+            else:
+                res.errores.append(ErrorFila(linea, f"cliente: mismo correo que la línea {vistos[c]}, que falló"))
+        return out
+
+    # ------------------------- órdenes -------------------------
+    def _insertar_ordenes(self, conn, filas, clientes: Dict[int, int], res: ResumenImportacion) -> None:
+        con_orden: List[Tuple[int, Dict[str, Any]]] = []
+        for linea, r in filas:
+            if linea not in clientes or not (r.get("eq_marca") or r.get("eq_modelo")):
+                continue
+            if _int_or_none(r.get("cve_tipo_equipo")) is None or _int_or_none(r.get("cve_taller")) is None:
+                res.errores.append(ErrorFila(linea, "orden: cve_tipo_equipo y cve_taller deben ser numéricos"))
+                continue
+            con_orden.append((linea, r))
+        if not con_orden:
+            return
+
+        ids = self.keys.reservar("orden", "cve_orden", len(con_orden), conn=conn)
+        if len(ids) != len(con_orden):
+            raise RuntimeError("orden.cve_orden es IDENTITY ALWAYS: no se pueden reservar llaves")
+        data = [
+            (oid, _int_or_none(r.get("cve_status")) or 1, r.get("eq_marca") or "", r.get("eq_modelo") or "",
+             _int_or_none(r.get("cve_tipo_equipo")), r.get("notas_cliente") or "",
+             clientes[linea], _int_or_none(r.get("cve_taller")))
+            for oid, (linea, r) in zip(ids, con_orden)
+        ]
+        with conn.cursor() as cur:
+            cur.executemany("""
+                INSERT INTO orden (cve_orden, cve_status, eq_marca, eq_modelo,
+                                   cve_tipo_equipo, notas_cliente, cve_cliente, cve_taller)
+                VALUES (:1, :2, :3, :4, :5, :6, :7, :8)
+            """, data, batcherrors=True)
+            fallidas = {e.offset: e.message for e in cur.getbatcherrors()}
+
+            tecs: List[Tuple[int, int]] = []
+            tec_lineas: List[int] = []
+            for idx, (oid, (linea, r)) in enumerate(zip(ids, con_orden)):
+                if idx in fallidas:
+                    res.errores.append(ErrorFila(linea, f"orden: {fallidas[idx]}"))
+                    continue
+                res.ordenes += 1
+                tec = _int_or_none(r.get("cve_tecnico"))
+                if tec:
+                    tecs.append((oid, tec))
+                    tec_lineas.append(linea)
+
+            if tecs:
+                cur.executemany(
+                    "INSERT INTO orden_tecnicos (cve_orden, cve_empleado, horas) VALUES (:1, :2, 0)",
+                    tecs, batcherrors=True,
+                )
+                for e in cur.getbatcherrors():
+                    res.errores.append(ErrorFila(tec_lineas[e.offset], f"técnico: {e.message}"))
+
+
+__all__ = ["ImportadorClientes", "ResumenImportacion", "ErrorFila", "leer_filas"]
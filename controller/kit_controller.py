@@ -0,0 +1,26 @@
+# controller/kit_controller.py
+from __future__ import annotations
+from typing import Dict, Iterable, List
+
+
+class KitControlador:
+    """
+    Envuelve KitModelo (kits predefinidos de partes y servicios) para la fachada.
+    """
+    def __init__(self, modelo) -> None:
+        self.m = modelo
+
+    def listar(self) -> List[dict]:
+        return self.m.listar()
+
+    def elementos(self, cve_kit: int) -> Dict[str, List[int]]:
+        return self.m.elementos(int(cve_kit))
+
+    def guardar(self, nombre: str, partes: Iterable[int] | None = None,
+                servicios: Iterable[int] | None = None) -> int:
+        return self.m.guardar(nombre,
+                              None if partes is None else [int(p) for p in partes],
+                              None if servicios is None else [int(s) for s in servicios])
+
+    def eliminar(self, cve_kit: int) -> int:
+        return self.m.eliminar(int(cve_kit))
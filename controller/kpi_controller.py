@@ -0,0 +1,38 @@
+# controller/kpi_controller.py
+from __future__ import annotations
+from typing import Any, List
+
+
+class KpiControlador:
+    """
+    Envuelve KpiModelo con una API simple para la fachada.
+    """
+    def __init__(self, modelo) -> None:
+        self.m = modelo
+
+    def disponible(self) -> bool:
+        return self.m.disponible()
+
+    def marcar(self, cve_orden: int, cve_status: int | None = None) -> None:
+        self.m.marcar(int(cve_orden), None if cve_status is None else int(cve_status))
+
+    def orden_de(self, table: str, pk_col: str, pk: int) -> int | None:
+        return self.m.orden_de(table, pk_col, int(pk))
+
+    def refrescar(self) -> int:
+        return self.m.refrescar()
+
+    def reconstruir(self) -> None:
+        self.m.reconstruir()
+
+    def resumen(self, desde=None, hasta=None, taller: int | None = None) -> List[dict]:
+        return self.m.resumen(desde, hasta, taller)
+
+    def por_dia(self, desde=None, hasta=None, taller: int | None = None) -> List[dict]:
+        return self.m.por_dia(desde, hasta, taller)
+
+    def horas_por_tecnico(self, desde=None, hasta=None, taller: int | None = None) -> List[dict]:
+        return self.m.horas_por_tecnico(desde, hasta, taller)
+
+    def turnaround(self, desde=None, hasta=None, taller: int | None = None) -> List[Any]:
+        return self.m.turnaround(desde, hasta, taller)
@@ -14,4 +14,7 @@ class NotaControlador:
         return self.m.insertar(int(cve_orden), nota)
 
     def eliminar(self, cve_nota: int) -> Any:
-        return self.m.eliminar(int(cve_nota))
\ No newline at end of file
+        return self.m.eliminar(int(cve_nota))
+
+    def insertar_lote(self, notas) -> int:
+        return self.m.insertar_lote([(int(o), n) for o, n in notas])
@@ -0,0 +1,278 @@
+# controller/notas_index.py
+from __future__ import annotations
+from collections import Counter
+from typing import Dict, Iterable, List, Set, Tuple
+import json
+import math
+import os
+import threading
+import time
+
+from model.db.sentencias import lista_in
+from utils.texto import terminos
+
+DEFAULT_INDEX_FILE = "notas_index.json"
+_VERSION = 2
+
+# Llaves de nota que se vuelven a revisar por debajo de la mayor vista: otra
+# sesión puede confirmar una llave menor después (caché de la secuencia).
+VENTANA = 500
+# El archivo se reescribe tras GUARDAR_CADA notas nuevas o GUARDAR_SEG
+# segundos con cambios (en un hilo aparte), y al cerrar la sesión.
+GUARDAR_CADA = 200
+GUARDAR_SEG = 300.0
+
+# BM25 (los valores habituales)
+_K1 = 1.2
+_B = 0.75
+
+
+class NotasIndex:
+    """
+    Índice invertido de las notas (ORDEN_NOTA), por orden:
+      raíz -> {cve_orden: frecuencia}
+    - Las raíces salen de utils.texto.terminos (sin acentos, sin palabras
+      vacías, plural/género recortados).
+    - buscar() rankea órdenes con BM25 tomando todas las notas de la orden
+      como un documento; no va a la base.
+    - Incremental: refrescar() revisa las llaves CVE_ORDEN_NOTA desde
+      VENTANA por debajo de la mayor vista y lee sólo las que no ha indexado
+      (así no se pierden las que otra sesión confirma fuera de orden);
+      agregar() para notas propias cuando la tabla no tiene esa llave (en ese
+      caso no se guarda en disco y se recarga al arrancar).
+    - Se guarda en un JSON local con llave DSN|ESQUEMA, como el caché de
+      esquema, así el siguiente arranque sólo lee las notas nuevas. No en
+      cada refresco: cada GUARDAR_CADA notas / GUARDAR_SEG segundos, en otro
+      hilo, y con guardar() al cerrar.
+    - Un índice por esquema compartido por todas las sesiones (compartido()).
+    """
+
+    _shared: Dict[str, "NotasIndex"] = {}
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def compartido(cls, key: str, path: str | None = DEFAULT_INDEX_FILE) -> "NotasIndex":
+        with cls._shared_lock:
+            idx = cls._shared.get(key)
+            if idx is None:
+                idx = cls._shared[key] = cls(key, path)
+            return idx
+
+    def __init__(self, key: str = "", path: str | None = DEFAULT_INDEX_FILE) -> None:
+        self.key = key
+        self.path = path
+        self._lock = threading.RLock()
+        self.cargado = False
+        self.con_llave = True  # ORDEN_NOTA tiene CVE_ORDEN_NOTA (permite refrescar por llave)
+        self._terminos: Dict[str, Dict[int, int]] = {}
+        self._largo: Dict[int, int] = {}  # cve_orden -> raíces indexadas
+        self._total = 0                   # suma de _largo (para el largo promedio)
+        self._max_nota = 0
+        self._recientes: Set[int] = set()  # llaves indexadas dentro de la ventana
+        self._sin_guardar = 0
+        self._guardado_en = time.monotonic()
+        self._guardando = threading.Lock()
+
+    # ====================== carga ======================
+    def _sql(self) -> str:
+        if not self.con_llave:
+            return "SELECT 0, cve_orden, nota FROM orden_nota"
+        return "SELECT cve_orden_nota, cve_orden, nota FROM orden_nota"
+
+    def cargar(self, conn) -> None:
+        """Reconstruye todo desde ORDEN_NOTA (una lectura en bloques)."""
+        with conn.cursor() as cur:
+            cur.arraysize = 1000
+            cur.execute(self._sql())
+            with self._lock:
+                self._limpiar()
+                while True:
+                    rows = cur.fetchmany()
+                    if not rows:
+                        break
+                    self._ingerir(rows)
+                self._podar()
+                self.cargado = True
+        self._sin_guardar = GUARDAR_CADA  # el archivo no existe o no sirve
+        self._quizas_guardar()
+
+    def asegurar(self, conn, con_llave: bool = True) -> "NotasIndex":
+        """Carga al primer uso: del archivo + notas nuevas, o completo si no hay archivo."""
+        if not self.cargado:
+            with self._lock:
+                if not self.cargado:
+                    self.con_llave = con_llave
+                    if con_llave and self._leer():
+                        self.cargado = True
+                        self.refrescar(conn)
+                    else:
+                        self.cargar(conn)
+        return self
+
+    def refrescar(self, conn) -> int:
+        """Indexa las notas que aún no ha visto. Devuelve cuántas."""
+        if not self.cargado:
+            self.cargar(conn)
+            return 0
+        if not self.con_llave:
+            return 0
+        with conn.cursor() as cur:
+            # sólo llaves (baratas); el texto sólo de las que faltan
+            cur.execute("SELECT cve_orden_nota FROM orden_nota WHERE cve_orden_nota > :k",
+                        {"k": self._max_nota - VENTANA})
+            with self._lock:
+                nuevas = sorted({int(r[0]) for r in cur.fetchall()} - self._recientes)
+            rows = []
+            for i in range(0, len(nuevas), 1000):
+                ph, binds = lista_in("n", nuevas[i:i + 1000])
+                cur.execute(f"{self._sql()} WHERE cve_orden_nota IN ({ph})", binds)
+                rows.extend(cur.fetchall())
+        if rows:
+            with self._lock:
+                rows = [r for r in rows if int(r[0]) not in self._recientes]
+                self._ingerir(rows)
+                self._podar()
+            self._sin_guardar += len(rows)
+        self._quizas_guardar()
+        return len(rows)
+
+    def agregar(self, notas: Iterable[Tuple[int, str]]) -> None:
+        """[(cve_orden, nota)] escritas por esta sesión (tabla sin llave de nota)."""
+        with self._lock:
+            self._ingerir((0, o, n) for o, n in notas)
+
+    def _limpiar(self) -> None:
+        self.cargado = False
+        self._terminos.clear()
+        self._largo.clear()
+        self._total = 0
+        self._max_nota = 0
+        self._recientes.clear()
+
+    def _ingerir(self, rows) -> None:
+        for cve_nota, cve_orden, nota in rows:
+            if hasattr(nota, "read"):  # CLOB
+                nota = nota.read()
+            cve = int(cve_orden)
+            raices = terminos(nota)
+            for t, n in Counter(raices).items():
+                por_orden = self._terminos.setdefault(t, {})
+                por_orden[cve] = por_orden.get(cve, 0) + n
+            self._largo[cve] = self._largo.get(cve, 0) + len(raices)
+            self._total += len(raices)
+            if cve_nota is not None:
+                self._max_nota = max(self._max_nota, int(cve_nota))
+                self._recientes.add(int(cve_nota))
+
+    def _podar(self) -> None:
+        piso = self._max_nota - VENTANA
+        self._recientes = {k for k in self._recientes if k > piso}
+
+    # ====================== archivo ======================
+    def _leer_archivo(self) -> dict:
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
+
+    def _leer(self) -> bool:
+        d = self._leer_archivo().get(self.key)
+        if not isinstance(d, dict) or d.get("version") != _VERSION:
+            return False
+        try:
+            terms = {t: {int(o): int(n) for o, n in po.items()} for t, po in d["terminos"].items()}
+            largo = {int(o): int(n) for o, n in d["largo"].items()}
+            max_nota = int(d["max_nota"])
+            recientes = {int(k) for k in d["recientes"]}
+        except Exception:
+            return False
+        self._terminos, self._largo, self._max_nota = terms, largo, max_nota
+        self._recientes = recientes
+        self._total = sum(largo.values())
+        return True
+
+    def _quizas_guardar(self) -> None:
+        """Guarda en otro hilo si ya tocaba (GUARDAR_CADA / GUARDAR_SEG)."""
+        if not self._sin_guardar:
+            return
+        if self._sin_guardar < GUARDAR_CADA and time.monotonic() - self._guardado_en < GUARDAR_SEG:
+            return
+        threading.Thread(target=self.guardar, daemon=True).start()
+
+    def guardar(self) -> None:
+        """Escribe el archivo si hay cambios (también al cerrar la sesión)."""
+        if not self.path or not self.con_llave or not self.cargado:
+            return
+        if not self._guardando.acquire(blocking=False):
+            return  # ya hay otro hilo escribiendo
+        try:
+            # bajo el candado sólo la copia; serializar y escribir, fuera
+            with self._lock:
+                if not self._sin_guardar:
+                    return
+                payload = {"version": _VERSION, "max_nota": self._max_nota,
+                           "recientes": sorted(self._recientes), "largo": dict(self._largo),
+                           "terminos": {t: dict(po) for t, po in self._terminos.items()}}
+                pendientes, self._sin_guardar = self._sin_guardar, 0
+                self._guardado_en = time.monotonic()
+            data = self._leer_archivo()
+            data[self.key] = payload
+            tmp = self.path + ".tmp"
+            try:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(data, f, separators=(",", ":"))
+                os.replace(tmp, self.path)
+            except Exception as ex:
+                with self._lock:
+                    self._sin_guardar += pendientes
+                print("WARN índice de notas:", ex)
+        finally:
+            self._guardando.release()
+
+    def olvidar(self) -> None:
+        """Descarta memoria y archivo; se reconstruye en el siguiente uso."""
+        with self._lock:
+            self._limpiar()
+            self._sin_guardar = 0
+            data = self._leer_archivo()
+            if self.path and data.pop(self.key, None) is not None:
+                try:
+                    with open(self.path, "w", encoding="utf-8") as f:
+                        json.dump(data, f, separators=(",", ":"))
+                except Exception:
+                    pass
+
+    # ======================== consultas ========================
+    def buscar(self, texto: str, limite: int = 50) -> List[Tuple[int, float]]:
+        """[(cve_orden, puntaje)] de mayor a menor relevancia."""
+        consulta = set(terminos(texto))
+        if not consulta:
+            return []
+        with self._lock:
+            n_docs = len(self._largo)
+            if not n_docs:
+                return []
+            promedio = self._total / n_docs or 1.0
+            puntos: Dict[int, float] = {}
+            for t in consulta:
+                por_orden = self._terminos.get(t)
+                if not por_orden:
+                    continue
+                idf = math.log(1 + (n_docs - len(por_orden) + 0.5) / (len(por_orden) + 0.5))
+                for cve, tf in por_orden.items():
+                    norm = _K1 * (1 - _B + _B * self._largo.get(cve, 0) / promedio)
+                    puntos[cve] = puntos.get(cve, 0.0) + idf * tf * (_K1 + 1) / (tf + norm)
+        res = sorted(puntos.items(), key=lambda p: (-p[1], -p[0]))
+        return res[:limite] if limite else res
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"ordenes": len(self._largo), "terminos": len(self._terminos),
+                    "max_nota": self._max_nota}
+
+
+__all__ = ["NotasIndex", "DEFAULT_INDEX_FILE"]
@@ -0,0 +1,65 @@
+# controller/notas_pendientes.py
+from __future__ import annotations
+from typing import Callable, Dict, List, Tuple
+import threading
+
+
+class NotasPendientes:
+    """
+    Lote de notas por escribir (de una o varias órdenes).
+      agregar(cve_orden, nota)  -> sólo encola, sin ir a la base
+      vaciar()                  -> un executemany + un COMMIT para todo el lote
+    Se vacía solo al llegar a MAX_PENDIENTES y explícitamente al cerrar el
+    diálogo de notas, antes de listar notas y al cerrar la sesión.
+    Si la escritura falla las notas siguen en el lote (se puede reintentar).
+    """
+
+    MAX_PENDIENTES = 50
+
+    def __init__(self, escribir: Callable[[List[Tuple[int, str]]], None]) -> None:
+        # escribir(lote): inserta y confirma; lo provee la fachada
+        self._escribir = escribir
+        self._lock = threading.Lock()
+        self._notas: List[Tuple[int, str]] = []
+
+    def agregar(self, cve_orden: int, nota: str) -> int:
+        """Encola la nota; devuelve cuántas hay pendientes."""
+        nota = str(nota or "").strip()
+        if not nota:
+            return len(self)
+        with self._lock:
+            self._notas.append((int(cve_orden), nota))
+            n = len(self._notas)
+        if n >= self.MAX_PENDIENTES:
+            self.vaciar()
+            return len(self)
+        return n
+
+    def vaciar(self) -> int:
+        """Escribe todo lo pendiente. Devuelve cuántas notas se guardaron."""
+        with self._lock:
+            lote, self._notas = self._notas, []
+        if not lote:
+            return 0
+        try:
+            self._escribir(lote)
+        except Exception:
+            with self._lock:
+                self._notas[:0] = lote  # conserva el orden para el reintento
+            raise
+        return len(lote)
+
+    def por_orden(self) -> Dict[int, int]:
+        """{cve_orden: notas pendientes}"""
+        out: Dict[int, int] = {}
+        with self._lock:
+            for o, _n in self._notas:
+                out[o] = out.get(o, 0) + 1
+        return out
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._notas)
+
+
+__all__ = ["NotasPendientes"]
@@ -10,8 +10,8 @@ class OrdenControlador:
     def __init__(self, modelo) -> None:
         self.m = modelo
 
-    def listar(self) -> List[Any]:
-        return self.m.listar()
+    def listar(self, **filtros) -> List[Any]:
+        return self.m.listar(**filtros)
 
     def insertar(
         self,
@@ -33,10 +33,20 @@ class OrdenControlador:
         # m.tecnicos_orden usa incluir_horas
         return self.m.tecnicos_orden(int(cve_orden), incluir_horas=horas)
 
+    def detalle(self, cve_orden: int) -> Any:
+        return self.m.detalle(int(cve_orden))
+
+    def conteo(self, agrupar=("status",), taller: int | None = None, desde=None, hasta=None) -> List[dict]:
+        return self.m.conteo(agrupar, taller=taller, desde=desde, hasta=hasta)
+
     # === NUEVO: requerido por DBFacade.guardar_cliente_de_orden() ===
     def cliente_id_por_orden(self, cve_orden: int) -> int | None:
         return self.m.cliente_id_por_orden(int(cve_orden))
 
     # === NUEVO: requerido por DBFacade.actualizar_orden() ===
     def actualizar(self, cve_orden: int, **kwargs) -> int:
-        return self.m.actualizar(int(cve_orden), **kwargs)
\ No newline at end of file
+        return self.m.actualizar(int(cve_orden), **kwargs)
+
+    def totales(self, after_cve_orden: int | None = None, page_size: int = 500,
+                taller: int | None = None, desde=None, hasta=None) -> List[dict]:
+        return self.m.totales(after_cve_orden, page_size, taller=taller, desde=desde, hasta=hasta)
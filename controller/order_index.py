@@ -0,0 +1,189 @@
+# controller/order_index.py
+from __future__ import annotations
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+import threading
+
+from utils.texto import plegar
+
+
+def _ids(val) -> Optional[List[int]]:
+    if val is None:
+        return None
+    if isinstance(val, (int, str)):
+        return [int(val)]
+    return [int(v) for v in val]
+
+
+class OrderIndex:
+    """
+    Índice en memoria sobre las órdenes ya cargadas (OrdenResumen).
+    - Por orden se guarda status, taller, tipo y los tokens plegados de
+      marca/modelo/cliente (sin acentos ni mayúsculas, utils.texto.plegar).
+    - filtrar(): los filtros combinados son intersecciones de conjuntos de
+      cve_orden; el texto libre busca cada palabra como prefijo de algún
+      token (todas las palabras deben aparecer).
+    - Vistas ordenadas por cve_orden / status / cliente: se calculan una vez
+      y sólo se rehacen cuando cambian las órdenes.
+    Cambiar filtros, dirección o búsqueda no va a la base.
+    """
+
+    ORDENES = ("cve_orden", "status", "cliente")
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self.completo = False  # True cuando tiene todas las órdenes (no sólo una página)
+        self._ordenes: Dict[int, Any] = {}
+        self._por_status: Dict[int, Set[int]] = {}
+        self._por_taller: Dict[int, Set[int]] = {}
+        self._por_tipo: Dict[int, Set[int]] = {}
+        self._por_token: Dict[str, Set[int]] = {}
+        self._tokens_de: Dict[int, Set[str]] = {}
+        self._cliente_key: Dict[int, str] = {}
+        self._tokens_ordenados: Optional[List[str]] = None
+        self._vistas: Dict[str, List[int]] = {}
+
+    # ====================== carga ======================
+    def cargar(self, ordenes: Iterable[Any], completo: bool = True) -> None:
+        with self._lock:
+            self._limpiar()
+            for o in ordenes:
+                self._poner(o)
+            self.completo = completo
+
+    def invalidar(self) -> None:
+        """Descarta todo: hasta la siguiente carga no está completo."""
+        with self._lock:
+            self._limpiar()
+
+    def _limpiar(self) -> None:
+        self.completo = False
+        for d in (self._ordenes, self._por_status, self._por_taller, self._por_tipo,
+                  self._por_token, self._tokens_de, self._cliente_key, self._vistas):
+            d.clear()
+        self._tokens_ordenados = None
+
+    # ================ actualización incremental ================
+    def poner(self, o) -> None:
+        """Agrega o reemplaza una orden (p. ej. después de editarla)."""
+        with self._lock:
+            self._quitar(int(o.cve_orden))
+            self._poner(o)
+
+    def quitar(self, cve_orden: int) -> None:
+        with self._lock:
+            self._quitar(int(cve_orden))
+
+    def _poner(self, o) -> None:
+        cve = int(o.cve_orden)
+        self._ordenes[cve] = o
+        self._por_status.setdefault(int(o.cve_status), set()).add(cve)
+        if getattr(o, "cve_taller", None) is not None:
+            self._por_taller.setdefault(int(o.cve_taller), set()).add(cve)
+        if getattr(o, "cve_tipo_equipo", None) is not None:
+            self._por_tipo.setdefault(int(o.cve_tipo_equipo), set()).add(cve)
+
+        cliente = plegar(getattr(o, "cliente", ""))
+        self._cliente_key[cve] = cliente
+        toks = set(f"{plegar(getattr(o, 'eq_marca', ''))} {plegar(getattr(o, 'eq_modelo', ''))} {cliente}".split())
+        toks.add(str(cve))
+        self._tokens_de[cve] = toks
+        for t in toks:
+            if t not in self._por_token:
+                self._tokens_ordenados = None
+            self._por_token.setdefault(t, set()).add(cve)
+        self._vistas.clear()
+
+    def _quitar(self, cve: int) -> None:
+        o = self._ordenes.pop(cve, None)
+        if o is None:
+            return
+        for d, k in ((self._por_status, o.cve_status),
+                     (self._por_taller, getattr(o, "cve_taller", None)),
+                     (self._por_tipo, getattr(o, "cve_tipo_equipo", None))):
+            if k is not None:
+                d.get(int(k), set()).discard(cve)
+        for t in self._tokens_de.pop(cve, ()):
+            s = self._por_token.get(t)
+            if s is not None:
+                s.discard(cve)
+                if not s:
+                    del self._por_token[t]
+                    self._tokens_ordenados = None
+        self._cliente_key.pop(cve, None)
+        self._vistas.clear()
+
+    # ======================== consultas ========================
+    def __len__(self) -> int:
+        return len(self._ordenes)
+
+    def ultima(self) -> Optional[int]:
+        """cve_orden más alta cargada (para traer sólo las órdenes nuevas)."""
+        with self._lock:
+            return max(self._ordenes) if self._ordenes else None
+
+    def orden(self, cve_orden: int):
+        return self._ordenes.get(int(cve_orden))
+
+    def ordenes(self, ids: Iterable[int]) -> List[Any]:
+        return [self._ordenes[i] for i in ids if i in self._ordenes]
+
+    def filtrar(self, status=None, taller=None, tipo=None, texto: str = "",
+                orden: str = "cve_orden", desc: bool = True) -> List[int]:
+        """
+        cve_orden que cumplen todos los filtros, en el orden pedido.
+        status/taller/tipo: id o ids (None = sin filtro).
+        """
+        with self._lock:
+            conjuntos: List[Set[int]] = []
+            for valor, por in ((status, self._por_status), (taller, self._por_taller), (tipo, self._por_tipo)):
+                ids = _ids(valor)
+                if ids is None:
+                    continue
+                conjuntos.append(set().union(*(por.get(i, set()) for i in ids)))
+            for palabra in plegar(texto).split():
+                conjuntos.append(self._con_prefijo(palabra))
+
+            vista = self._vista(orden)
+            if conjuntos:
+                conjuntos.sort(key=len)
+                sel = conjuntos[0].intersection(*conjuntos[1:])
+                res = [i for i in vista if i in sel]
+            else:
+                res = list(vista)
+        if desc:
+            res.reverse()
+        return res
+
+    def _con_prefijo(self, prefijo: str) -> Set[int]:
+        if self._tokens_ordenados is None:
+            self._tokens_ordenados = sorted(self._por_token)
+        toks = self._tokens_ordenados
+        out: Set[int] = set()
+        i = bisect_left(toks, prefijo)
+        while i < len(toks) and toks[i].startswith(prefijo):
+            out |= self._por_token[toks[i]]
+            i += 1
+        return out
+
+    def _vista(self, orden: str) -> List[int]:
+        if orden not in self.ORDENES:
+            orden = "cve_orden"
+        vista = self._vistas.get(orden)
+        if vista is None:
+            llave: Callable[[int], Any]
+            if orden == "status":
+                llave = lambda i: (int(self._ordenes[i].cve_status), i)
+            elif orden == "cliente":
+                llave = lambda i: (self._cliente_key.get(i, ""), i)
+            else:
+                llave = lambda i: i
+            vista = self._vistas[orden] = sorted(self._ordenes, key=llave)
+        return vista
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"ordenes": len(self._ordenes), "tokens": len(self._por_token)}
+
+
+__all__ = ["OrderIndex"]
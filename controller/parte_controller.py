@@ -19,4 +19,14 @@ class ParteControlador:
         return self.m.insertar(int(cve_orden), int(cve_parte))
 
     def eliminar(self, cve_orden_parte: int) -> Any:
-        return self.m.eliminar(int(cve_orden_parte))
\ No newline at end of file
+        return self.m.eliminar(int(cve_orden_parte))
+
+    # En lote (un executemany; el commit lo hace la fachada)
+    def insertar_lote(self, cve_orden: int, ids: List[int]) -> int:
+        return self.m.insertar_lote(int(cve_orden), [int(i) for i in ids])
+
+    def eliminar_lote(self, ids: List[int]) -> int:
+        return self.m.eliminar_lote([int(i) for i in ids])
+
+    def ordenes_de(self, ids: List[int]) -> set:
+        return self.m.ordenes_de([int(i) for i in ids])
@@ -0,0 +1,258 @@
+# controller/reporte_lote.py
+from __future__ import annotations
+from dataclasses import asdict, dataclass
+from decimal import Decimal
+from typing import Callable, Dict, Optional
+import csv
+import multiprocessing as mp
+import os
+import queue
+
+from model.repositories import OrdenModelo, CatalogosModelo
+from model.repositories.precios_repo import total_de
+from utils.dinero import CERO
+from utils.pdf import PdfTabla
+
+
+FORMATOS = ("csv", "pdf")
+PAGINA = 500  # órdenes por consulta (y por bloque escrito al archivo)
+
+# (llave, título, ancho en el PDF, alineación)
+COLUMNAS = (
+    ("cve_orden", "Orden", 45, "i"),
+    ("fecha", "Fecha", 55, "i"),
+    ("taller", "Taller", 60, "i"),
+    ("status", "Estatus", 55, "i"),
+    ("cliente", "Cliente", 90, "i"),
+    ("equipo", "Equipo", 85, "i"),
+    ("n_partes", "Piezas", 35, "d"),
+    ("partes", "Partes", 55, "d"),
+    ("n_servicios", "Serv.", 30, "d"),
+    ("servicios", "Servicios", 55, "d"),
+    ("horas", "Horas", 35, "d"),
+    ("mano_obra", "Mano obra", 55, "d"),
+    ("total", "Total", 65, "d"),
+)
+_DINERO = ("partes", "servicios", "mano_obra", "total")
+
+
+class ReporteCancelado(Exception):
+    pass
+
+
+@dataclass(slots=True)
+class ResumenReporte:
+    path: str = ""
+    ordenes: int = 0
+    partes: Decimal = CERO
+    servicios: Decimal = CERO
+    mano_obra: Decimal = CERO
+    total: Decimal = CERO
+
+
+def _nombres(db) -> Dict[str, Dict[int, str]]:
+    """Catálogos para mostrar nombres en lugar de claves (vacíos si fallan)."""
+    cat = CatalogosModelo(db)
+    out: Dict[str, Dict[int, str]] = {"talleres": {}, "statuses": {}, "tipos": {}}
+    for k, fn in (("talleres", cat.talleres), ("statuses", cat.statuses)):
+        try:
+            out[k] = fn() or {}
+        except Exception:
+            pass
+    try:
+        out["tipos"] = {i: nombre for i, (_t, nombre) in (cat.tipos() or {}).items()}
+    except Exception:
+        pass
+    return out
+
+
+def _fila(r: dict, nombres: Dict[str, Dict[int, str]]) -> dict:
+    fecha = r.get("fecha")
+    tipo = nombres["tipos"].get(r.get("cve_tipo_equipo"), "")
+    t = total_de(r)
+    return {
+        "cve_orden": int(r["cve_orden"]),
+        "fecha": fecha.strftime("%Y-%m-%d") if hasattr(fecha, "strftime") else "",
+        "taller": nombres["talleres"].get(r.get("cve_taller"), r.get("cve_taller") or ""),
+        "status": nombres["statuses"].get(r.get("cve_status"), r.get("cve_status") or ""),
+        "cliente": str(r.get("cliente") or "").strip(),
+        "equipo": " ".join(x for x in (tipo, r.get("eq_marca"), r.get("eq_modelo")) if x),
+        "n_partes": t.n_partes,
+        "partes": t.partes,
+        "n_servicios": t.n_servicios,
+        "servicios": t.servicios,
+        "horas": t.horas,
+        "mano_obra": t.mano_obra,
+        "total": t.total,
+    }
+
+
+def escribir_reporte(db, path: str, formato: str = "csv", *, taller: int | None = None,
+                     desde=None, hasta=None, schema=None, page_size: int = PAGINA,
+                     on_progress: Optional[Callable[[int], None]] = None,
+                     cancelado: Optional[Callable[[], bool]] = None) -> ResumenReporte:
+    """
+    Reporte de totales de todas las órdenes del filtro, a CSV o PDF.
+    Lee una página (OrdenModelo.totales, agregados en SQL), la escribe y
+    sigue con la siguiente: en memoria sólo vive una página a la vez.
+    Si se cancela, borra el archivo a medias y lanza ReporteCancelado.
+    """
+    formato = str(formato).lower()
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato no soportado: {formato}")
+    om = OrdenModelo(db, schema=schema)
+    nombres = _nombres(db)
+    res = ResumenReporte(path=path)
+
+    if formato == "csv":
+        f = open(path, "w", newline="", encoding="utf-8-sig")  # utf-8-sig: Excel respeta acentos
+        w = csv.writer(f)
+        w.writerow([c[1] for c in COLUMNAS])
+        escribir = lambda d: w.writerow([f"{d[k]:.2f}" if k in _DINERO else d[k] for k, *_ in COLUMNAS])
+    else:
+        titulo = "Reporte de órdenes"
+        if desde is not None or hasta is not None:
+            titulo += f" ({desde or '…'} a {hasta or '…'})"
+        f = PdfTabla(path, [(t, ancho, al) for _k, t, ancho, al in COLUMNAS], titulo)
+        escribir = lambda d: f.fila([f"${d[k]:,.2f}" if k in _DINERO else d[k] for k, *_ in COLUMNAS])
+
+    ok = False
+    try:
+        after = None
+        while True:
+            if cancelado and cancelado():
+                raise ReporteCancelado()
+            filas = om.totales(after, page_size, taller=taller, desde=desde, hasta=hasta)
+            for r in filas:
+                d = _fila(r, nombres)
+                escribir(d)
+                res.ordenes += 1
+                res.partes += d["partes"]
+                res.servicios += d["servicios"]
+                res.mano_obra += d["mano_obra"]
+                res.total += d["total"]
+            if on_progress:
+                on_progress(res.ordenes)
+            if len(filas) < page_size:
+                break
+            after = filas[-1]["cve_orden"]
+
+        if formato == "pdf":
+            f.pie([
+                f"Órdenes: {res.ordenes}",
+                f"Partes: ${res.partes:,.2f}   Servicios: ${res.servicios:,.2f}   "
+                f"Mano de obra: ${res.mano_obra:,.2f}",
+                f"Total: ${res.total:,.2f}",
+            ])
+        ok = True
+        return res
+    finally:
+        (f.close if formato == "csv" else f.cerrar)()
+        if not ok:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+# ========================= proceso de trabajo =========================
+def _proceso(conexion: dict, path: str, formato: str, filtros: dict, page_size: int,
+             cola, cancelar) -> None:
+    """Punto de entrada del proceso hijo: conexión propia (sin pool) y avisos por la cola."""
+    from model.db.oracle import OracleDB
+    from model.db.schema import SchemaIntrospector
+
+    db = None
+    try:
+        db = OracleDB(**conexion)
+        res = escribir_reporte(
+            db, path, formato, schema=SchemaIntrospector(db), page_size=page_size,
+            on_progress=lambda n: cola.put(("progreso", n)),
+            cancelado=cancelar.is_set, **filtros,
+        )
+        cola.put(("fin", {k: (str(v) if isinstance(v, Decimal) else v) for k, v in asdict(res).items()}))
+    except ReporteCancelado:
+        cola.put(("cancelado", None))
+    except Exception as ex:
+        cola.put(("error", str(ex)))
+    finally:
+        if db is not None:
+            try:
+                db.close_connection()
+            except Exception:
+                pass
+
+
+class TrabajoReporte:
+    """
+    Reporte por lote corriendo en otro proceso (la UI no se congela ni
+    compite por el GIL). La vista llama sondear() periódicamente:
+      t = db.reporte_lote("ordenes.pdf", "pdf", taller=1)
+      while not t.terminado: t.sondear(); await asyncio.sleep(0.5)
+    """
+
+    def __init__(self, conexion: dict, path: str, formato: str = "csv", *,
+                 taller: int | None = None, desde=None, hasta=None, page_size: int = PAGINA) -> None:
+        ctx = mp.get_context("spawn")  # sin fork: el proceso de Flet tiene hilos y sockets abiertos
+        self.path = path
+        self.filas = 0
+        self.resumen: dict | None = None
+        self.error: str | None = None
+        self.cancelado = False
+        self._cola = ctx.Queue()
+        self._cancelar = ctx.Event()
+        self._p = ctx.Process(
+            target=_proceso,
+            args=(dict(conexion), path, formato,
+                  {"taller": taller, "desde": desde, "hasta": hasta}, int(page_size),
+                  self._cola, self._cancelar),
+            daemon=True,
+        )
+        self._fin = False
+
+    def iniciar(self) -> "TrabajoReporte":
+        self._p.start()
+        return self
+
+    @property
+    def terminado(self) -> bool:
+        return self._fin
+
+    def sondear(self) -> int:
+        """Lee los avisos del proceso. Devuelve las órdenes escritas hasta ahora."""
+        self._leer_cola()
+        if not self._fin and not self._p.is_alive():
+            # pudo avisar "fin" y salir entre la lectura y is_alive(): se vuelve
+            # a leer (con espera breve, lo último puede venir aún en el tubo)
+            self._leer_cola(espera=0.2)
+            if not self._fin:
+                self.error = self.error or f"El proceso terminó inesperadamente (código {self._p.exitcode})"
+                self._fin = True
+        if self._fin:
+            self._p.join(timeout=1)
+        return self.filas
+
+    def _leer_cola(self, espera: float = 0.0) -> None:
+        while True:
+            try:
+                tipo, dato = self._cola.get(timeout=espera) if espera else self._cola.get_nowait()
+            except queue.Empty:
+                break
+            if tipo == "progreso":
+                self.filas = int(dato)
+            elif tipo == "fin":
+                self.resumen = dato
+                self.filas = int(dato.get("ordenes", self.filas))
+                self._fin = True
+            elif tipo == "cancelado":
+                self.cancelado = self._fin = True
+            elif tipo == "error":
+                self.error = dato
+                self._fin = True
+
+    def cancelar(self) -> None:
+        """Pide al proceso que pare al terminar la página actual."""
+        self._cancelar.set()
+
+
+__all__ = ["TrabajoReporte", "ResumenReporte", "ReporteCancelado", "escribir_reporte", "FORMATOS"]
@@ -0,0 +1,54 @@
+# importar_clientes.py
+# Carga masiva de clientes (y órdenes) desde CSV o JSONL:
+#   export ORA_PWD='TU_PASSWORD'
+#   python importar_clientes.py sucursal.csv [--chunk 1000]
+import argparse
+import os
+import time
+
+from model.db.oracle import OracleDB
+from controller.importador import ImportadorClientes
+
+HOST = "200.13.89.10"
+PORT = 1521
+SERVICE_NAME = "pdbcib.lci.ulsa.mx"
+USER = os.environ.get("ORA_USER", "cib700_01")
+
+parser = argparse.ArgumentParser(description="Importa clientes/órdenes desde CSV o JSONL")
+parser.add_argument("archivo")
+parser.add_argument("--chunk", type=int, default=1000, help="filas por bloque (COMMIT por bloque)")
+parser.add_argument("--errores", default=None, help="guarda los errores por fila en este CSV")
+args = parser.parse_args()
+
+pwd = os.environ.get("ORA_PWD")
+if not pwd:
+    raise SystemExit("Define ORA_PWD primero: export ORA_PWD='TU_PASSWORD'")
+
+db = OracleDB(HOST, PORT, SERVICE_NAME, USER, pwd)
+inicio = time.monotonic()
+
+
+def progreso(res):
+    print(f"  {res.leidas} filas | {res.clientes_nuevos} clientes nuevos | "
+          f"{res.ordenes} órdenes | {len(res.errores)} errores "
+          f"({time.monotonic() - inicio:.1f}s)")
+
+
+try:
+    res = ImportadorClientes(db, chunk_size=args.chunk).importar_archivo(args.archivo, on_progress=progreso)
+finally:
+    db.close_connection()
+
+print(f"Listo: {res.leidas} filas, {res.clientes_nuevos} clientes nuevos, "
+      f"{res.clientes_existentes} existentes, {res.ordenes} órdenes, {len(res.errores)} errores.")
+if res.errores:
+    if args.errores:
+        import csv
+        with open(args.errores, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["linea", "error"])
+            w.writerows((e.linea, e.mensaje) for e in res.errores)
+        print("Errores guardados en", args.errores)
+    else:
+        for e in res.errores[:20]:
+            print(f"  línea {e.linea}: {e.mensaje}")
@@ -0,0 +1,24 @@
+# kit_tablas.py
+# Tablas de kits de partes/servicios (KIT, KIT_ELEMENTO):
+#   python kit_tablas.py        crea las que falten
+# La aplicación no ejecuta DDL (COMMIT implícito y requiere CREATE TABLE);
+# se corre una vez con un usuario que tenga ese privilegio.
+import os
+
+from model.db.oracle import OracleDB
+from model.repositories import KitModelo
+
+HOST = "200.13.89.10"
+PORT = 1521
+SERVICE_NAME = "pdbcib.lci.ulsa.mx"
+USER = os.environ.get("ORA_USER", "cib700_01")
+
+pwd = os.environ.get("ORA_PWD")
+if not pwd:
+    raise SystemExit("Define ORA_PWD primero: export ORA_PWD='TU_PASSWORD'")
+
+db = OracleDB(HOST, PORT, SERVICE_NAME, USER, pwd)
+try:
+    print("Tablas creadas:", ", ".join(KitModelo(db).crear_tablas()) or "(ya existían)")
+finally:
+    db.close_connection()
@@ -0,0 +1,33 @@
+# kpi_rollup.py
+# Tablas de KPIs (rollups diarios):
+#   python kpi_rollup.py --crear        crea las tablas que falten y reconstruye todo
+#   python kpi_rollup.py --reconstruir  recalcula todos los rollups desde cero
+#   python kpi_rollup.py                aplica sólo los cambios pendientes (para cron)
+import os
+import sys
+
+from model.db.oracle import OracleDB
+from model.db.schema import SchemaIntrospector
+from model.repositories import KpiModelo
+
+HOST = "200.13.89.10"
+PORT = 1521
+SERVICE_NAME = "pdbcib.lci.ulsa.mx"
+USER = os.environ.get("ORA_USER", "cib700_01")
+
+pwd = os.environ.get("ORA_PWD")
+if not pwd:
+    raise SystemExit("Define ORA_PWD primero: export ORA_PWD='TU_PASSWORD'")
+
+db = OracleDB(HOST, PORT, SERVICE_NAME, USER, pwd)
+try:
+    kpi = KpiModelo(db, schema=SchemaIntrospector(db))
+    if "--crear" in sys.argv:
+        print("Tablas creadas:", ", ".join(kpi.crear_tablas()) or "(ya existían)")
+    if "--crear" in sys.argv or "--reconstruir" in sys.argv:
+        kpi.reconstruir()
+        print("Rollups reconstruidos.")
+    else:
+        print("Marcas aplicadas:", kpi.refrescar())
+finally:
+    db.close_connection()
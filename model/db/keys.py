@@ -0,0 +1,181 @@
+# model/db/keys.py
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import threading
+import oracledb
+
+
+# Último id entregado por el respaldo MAX+1, compartido por todas las sesiones
+# del proceso: dos mostradores no reciben el mismo número aunque ninguno haya
+# hecho COMMIT todavía.
+_HIGH_WATER: Dict[Tuple[str, str], int] = {}
+_HIGH_WATER_LOCK = threading.Lock()
+
+# La columna es IDENTITY GENERATED ALWAYS: no se le puede mandar valor
+ALWAYS = "ALWAYS"
+
+
+class KeyAllocator:
+    """
+    Asigna llaves primarias sin SELECT MAX(...)+1 cuando se puede.
+    Orden de preferencia por (tabla, columna):
+      1) columna IDENTITY (12c+): BY DEFAULT usa su secuencia interna;
+         ALWAYS se inserta sin id y se recupera con RETURNING INTO.
+      2) secuencia por convención: TABLA_COLUMNA_SEQ (como colonia_cve_colonia_seq),
+         TABLA_SEQ, SEQ_TABLA, COLUMNA_SEQ...
+      3) MAX+1 con marca alta en memoria (sólo si no hay secuencia).
+    La resolución se hace una vez por (tabla, columna).
+    reservar(n) pre-asigna bloques para importaciones masivas.
+    """
+
+    def __init__(self, db) -> None:
+        self.db = db  # OracleDB con .get_connection()
+        self._lock = threading.RLock()
+        # (TABLA, COLUMNA) -> nombre de secuencia | ALWAYS | None (sin secuencia)
+        self._resolved: Dict[Tuple[str, str], Optional[str]] = {}
+
+    # ====================== resolución ======================
+    @staticmethod
+    def _key(table: str, col: str) -> Tuple[str, str]:
+        return str(table).upper(), str(col).upper()
+
+    def _resolve(self, table: str, col: str, conn) -> Optional[str]:
+        key = self._key(table, col)
+        with self._lock:
+            if key in self._resolved:
+                return self._resolved[key]
+
+        t, c = key
+        found: Optional[str] = None
+        with conn.cursor() as cur:
+            try:
+                cur.execute(
+                    "SELECT generation_type, sequence_name FROM user_tab_identity_cols "
+                    "WHERE table_name = :t AND column_name = :c",
+                    {"t": t, "c": c},
+                )
+                row = cur.fetchone()
+                if row:
+                    found = ALWAYS if str(row[0]).upper() == "ALWAYS" else str(row[1])
+            except oracledb.DatabaseError:
+                pass  # versión sin IDENTITY
+
+            if found is None:
+                cands = [f"{t}_{c}_SEQ", f"{t}_SEQ", f"SEQ_{t}", f"{c}_SEQ", f"SEQ_{c}", f"S_{t}"]
+                binds = {f"s{i}": n for i, n in enumerate(cands)}
+                cur.execute(
+                    "SELECT sequence_name FROM user_sequences "
+                    f"WHERE sequence_name IN ({', '.join(':' + b for b in binds)})",
+                    binds,
+                )
+                existing = {str(r[0]).upper() for r in cur.fetchall()}
+                found = next((n for n in cands if n in existing), None)
+
+        with self._lock:
+            self._resolved[key] = found
+        return found
+
+    def secuencia(self, table: str, col: str, conn=None) -> Optional[str]:
+        """Secuencia que respalda la columna, ALWAYS si es IDENTITY ALWAYS, o None."""
+        return self._resolve(table, col, conn or self.db.get_connection())
+
+    def olvidar(self) -> None:
+        """Olvida la resolución (p. ej. tras crear una secuencia)."""
+        with self._lock:
+            self._resolved.clear()
+
+    # ====================== asignación ======================
+    def next_id(self, table: str, col: str, conn=None) -> Optional[int]:
+        """
+        Siguiente id para table.col. Devuelve None si la columna es
+        IDENTITY ALWAYS (insertar sin id y usar RETURNING, ver insertar()).
+        """
+        ids = self.reservar(table, col, 1, conn=conn)
+        return ids[0] if ids else None
+
+    def reservar(self, table: str, col: str, n: int, conn=None) -> List[int]:
+        """Pre-asigna `n` ids en una sola ida a la base (para cargas masivas)."""
+        n = int(n)
+        if n <= 0:
+            return []
+        conn = conn or self.db.get_connection()
+        seq = self._resolve(table, col, conn)
+        if seq == ALWAYS:
+            return []
+        if seq:
+            with conn.cursor() as cur:
+                if n == 1:
+                    cur.execute(f"SELECT {seq}.NEXTVAL FROM dual")
+                else:
+                    cur.execute(
+                        f"SELECT {seq}.NEXTVAL FROM dual CONNECT BY LEVEL <= :n", {"n": n}
+                    )
+                return [int(r[0]) for r in cur.fetchall()]
+        return self._reservar_max(table, col, n, conn)
+
+    def _reservar_max(self, table: str, col: str, n: int, conn) -> List[int]:
+        key = self._key(table, col)
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT NVL(MAX({col}), 0) FROM {table}")
+            db_max = int(cur.fetchone()[0] or 0)
+        with _HIGH_WATER_LOCK:
+            start = max(db_max, _HIGH_WATER.get(key, 0)) + 1
+            _HIGH_WATER[key] = start + n - 1
+        return list(range(start, start + n))
+
+    # ====================== inserción ======================
+    def insertar(self, cur, table: str, id_col: str,
+                 cols: Sequence[str], placeholders: Sequence[str], binds: Dict[str, Any],
+                 new_id: Optional[int]) -> int:
+        """
+        Ejecuta INSERT INTO table (id_col, *cols) con el id ya asignado, o, si
+        new_id es None (IDENTITY ALWAYS), sin id y con RETURNING id_col INTO.
+        Devuelve el id insertado.
+        """
+        binds = dict(binds)
+        if new_id is not None:
+            binds["p_new_id"] = new_id
+            sql = (
+                f"INSERT INTO {table} ({', '.join([id_col, *cols])}) "
+                f"VALUES ({', '.join([':p_new_id', *placeholders])})"
+            )
+            cur.execute(sql, binds)
+            return int(new_id)
+
+        out = cur.var(oracledb.NUMBER)
+        binds["p_new_id"] = out
+        sql = (
+            f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join(placeholders)}) "
+            f"RETURNING {id_col} INTO :p_new_id"
+        )
+        cur.execute(sql, binds)
+        val = out.getvalue()
+        if isinstance(val, list):
+            val = val[0] if val else None
+        return int(val)
+
+    def insertar_lote(self, cur, table: str, id_col: str,
+                      cols: Sequence[str], placeholders: Sequence[str],
+                      filas: Sequence[Dict[str, Any]], ids: Sequence[int]) -> int:
+        """
+        Igual que insertar() para muchos renglones, en un solo executemany.
+        `ids` viene de reservar(len(filas)); vacío si la columna es IDENTITY
+        ALWAYS (entonces se inserta sin id). Devuelve cuántos renglones.
+        """
+        if not filas:
+            return 0
+        if ids:
+            if len(ids) != len(filas):
+                raise ValueError("insertar_lote(): un id por renglón")
+            filas = [dict(f, p_new_id=i) for f, i in zip(filas, ids)]
+            sql = (
+                f"INSERT INTO {table} ({', '.join([id_col, *cols])}) "
+                f"VALUES ({', '.join([':p_new_id', *placeholders])})"
+            )
+        else:
+            sql = f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join(placeholders)})"
+        cur.executemany(sql, list(filas))
+        return len(filas)
+
+
+__all__ = ["KeyAllocator", "ALWAYS"]
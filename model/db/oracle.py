@@ -1,8 +1,68 @@
 # model/db/oracle.py
 from __future__ import annotations
-from typing import Any, Iterable, Sequence, Tuple, List
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, Sequence, Tuple, List
+import decimal
+import threading
 import oracledb  # pip install oracledb
 
+from .sentencias import STMT_CACHE
+
+
+# Pools compartidos por (dsn, usuario): cada OracleDB (una sesión de Flet)
+# toma su propia conexión del mismo pool en lugar de abrir un socket nuevo.
+_POOLS: dict[tuple[str, str], Any] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _get_pool(dsn: str, username: str, password: str, *, pool_min: int, pool_max: int,
+              pool_increment: int, acquire_timeout: float, ping_on_acquire: bool,
+              stmtcachesize: int = STMT_CACHE):
+    key = (dsn, username.upper())
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = oracledb.create_pool(
+                user=username,
+                password=password,
+                dsn=dsn,
+                min=int(pool_min),
+                max=int(pool_max),
+                increment=int(pool_increment),
+                getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+                wait_timeout=int(float(acquire_timeout) * 1000),
+                # 0 = hace ping en cada acquire; <0 = nunca
+                ping_interval=0 if ping_on_acquire else -1,
+                stmtcachesize=int(stmtcachesize),
+            )
+            _POOLS[key] = pool
+        return pool
+
+
+def close_pools() -> None:
+    """Cierra todos los pools abiertos (al salir de la aplicación)."""
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        try:
+            pool.close(force=True)
+        except Exception:
+            pass
+
+
+def decimal_output_handler(cursor, metadata):
+    """
+    outputtypehandler para cursores de dinero: NUMBER con decimales (o sin
+    escala declarada) llega como Decimal exacto en lugar de float.
+      cur.outputtypehandler = decimal_output_handler
+    Los enteros (escala 0) se dejan como int.
+    """
+    if metadata.type_code is oracledb.DB_TYPE_NUMBER and metadata.scale != 0:
+        return cursor.var(decimal.Decimal, arraysize=cursor.arraysize)
+    return None
+
+
 class OracleDB:
     """
     Wrapper simple para python-oracledb (modo thin).
@@ -11,47 +71,134 @@ class OracleDB:
       - query(sql, params)
       - execute(sql, params), executemany(sql, seq_params)
       - commit(), rollback()
+
+    Con pooled=True la instancia representa una sesión: toma una conexión
+    del pool compartido (min/max/increment, timeout de espera y ping al
+    tomarla) y la devuelve en close_connection(). checkout() presta una
+    conexión aparte para trabajos en segundo plano.
+    stmtcachesize: sentencias que el driver deja preparadas por conexión
+    (ver model/db/sentencias.py); estadisticas_parse() permite verificarlo.
     """
 
     def __init__(self, hostname: str, port: int | str, service_name: str,
-                 username: str, password: str):
+                 username: str, password: str, *,
+                 pooled: bool = False,
+                 pool_min: int = 1,
+                 pool_max: int = 8,
+                 pool_increment: int = 1,
+                 acquire_timeout: float = 10.0,
+                 ping_on_acquire: bool = True,
+                 stmtcachesize: int = STMT_CACHE):
         dsn = f"{hostname}:{int(port)}/{service_name}"
-        self._conn = oracledb.connect(
-            user=username,
-            password=password,
-            dsn=dsn,
-            encoding="UTF-8",
-        )
+        self._pool = None
+        self._conn = None
+        if pooled:
+            self._pool = _get_pool(
+                dsn, username, password,
+                pool_min=pool_min, pool_max=pool_max, pool_increment=pool_increment,
+                acquire_timeout=acquire_timeout, ping_on_acquire=ping_on_acquire,
+                stmtcachesize=stmtcachesize,
+            )
+            self._conn = self._pool.acquire()
+        else:
+            self._conn = oracledb.connect(
+                user=username,
+                password=password,
+                dsn=dsn,
+                encoding="UTF-8",
+                stmtcachesize=int(stmtcachesize),
+            )
 
     # --- conexión ---
+    @property
+    def pooled(self) -> bool:
+        return self._pool is not None
+
     def get_connection(self):
+        if self._conn is None and self._pool is not None:
+            self._conn = self._pool.acquire()
         return self._conn
 
     def close_connection(self):
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
         try:
-            self._conn.close()
+            if self._pool is not None:
+                # release() hace rollback de lo no confirmado
+                self._pool.release(conn)
+            else:
+                conn.close()
         except Exception:
             pass
 
+    @contextmanager
+    def checkout(self) -> Iterator[Any]:
+        """
+        Conexión independiente de la de la sesión (p. ej. refrescos en segundo
+        plano). Sin pool devuelve la conexión de la sesión.
+        """
+        if self._pool is None:
+            yield self.get_connection()
+            return
+        conn = self._pool.acquire()
+        try:
+            yield conn
+        finally:
+            try:
+                self._pool.release(conn)
+            except Exception:
+                pass
+
+    def pool_stats(self) -> dict:
+        if self._pool is None:
+            return {}
+        return {
+            "opened": self._pool.opened,
+            "busy": self._pool.busy,
+            "max": self._pool.max,
+        }
+
+    def estadisticas_parse(self) -> dict:
+        """
+        Contadores de la sesión en Oracle (v$mystat): parse total/duro, hits
+        del caché de cursores y ejecuciones. Vacío si el usuario no tiene
+        acceso a las vistas v$.
+        """
+        conn = self.get_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT n.name, s.value
+                    FROM v$mystat s JOIN v$statname n ON n.statistic# = s.statistic#
+                    WHERE n.name IN ('parse count (total)', 'parse count (hard)',
+                                     'session cursor cache hits', 'execute count')
+                """)
+                out = {str(k): int(v) for k, v in cur.fetchall()}
+        except Exception:
+            return {}
+        out["stmtcachesize"] = getattr(conn, "stmtcachesize", None)
+        return out
+
     # --- helpers de ejecución ---
     def query(self, sql: str, params: Sequence[Any] | dict | None = None) -> Tuple[List[tuple], List[str]]:
-        with self._conn.cursor() as cur:
+        with self.get_connection().cursor() as cur:
             cur.execute(sql, params or {})
             rows = cur.fetchall()
             cols = [d[0].lower() for d in (cur.description or [])]
         return rows, cols
 
     def execute(self, sql: str, params: Sequence[Any] | dict | None = None) -> int:
-        with self._conn.cursor() as cur:
+        with self.get_connection().cursor() as cur:
             cur.execute(sql, params or {})
             return cur.rowcount
 
     def executemany(self, sql: str, params_iter: Iterable[Sequence[Any] | dict]) -> None:
-        with self._conn.cursor() as cur:
+        with self.get_connection().cursor() as cur:
             cur.executemany(sql, params_iter)
 
     def commit(self) -> None:
-        self._conn.commit()
+        self.get_connection().commit()
 
     def rollback(self) -> None:
-        self._conn.rollback()
\ No newline at end of file
+        self.get_connection().rollback()
@@ -0,0 +1,217 @@
+# model/db/schema.py
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, Optional
+import json
+import os
+import threading
+
+
+# Nombres probables para cada tabla que se detecta de forma flexible
+CLIENTE_TABLES = ("CLIENTE", "CLIENTES", "CUSTOMER", "CUSTOMERS", "PERSONA", "PERSONAS")
+CLIENTE_NAME_HINTS = ("CLIENT", "CUSTOMER", "PERSONA", "USUARIO")
+COLONIA_TABLES = ("COLONIA", "COLONIAS")
+ORDEN_PARTE_TABLES = ("ORDEN_PARTE", "ORDEN_PARTES", "ORDEN_PIEZA", "ORDEN_PIEZAS")
+ORDEN_TABLE = "ORDEN"
+ORDEN_FECHA_COLS = ("FECHA", "FECHA_ALTA", "FECHA_INGRESO", "FECHA_RECEPCION", "FECHA_ORDEN", "CREATED_AT")
+
+DEFAULT_CACHE_FILE = "schema_cache.json"
+
+
+def _pick(cols: Iterable[str], *cands: str) -> Optional[str]:
+    cols = set(cols)
+    for c in cands:
+        uc = c.upper()
+        if uc in cols:
+            return uc
+    return None
+
+
+class SchemaIntrospector:
+    """
+    Descubre una sola vez (por conexión) cómo se llaman las tablas/columnas
+    de CLIENTE, COLONIA, ORDEN_PARTE y la fecha de ORDEN en el esquema actual.
+    - Consulta USER_TAB_COLUMNS sólo para las tablas candidatas.
+    - Guarda los mapeos en un archivo JSON local con llave DSN|ESQUEMA,
+      así el siguiente arranque no toca el diccionario de datos.
+    - refresh() descarta lo guardado y vuelve a descubrir.
+    """
+
+    def __init__(self, db, cache_path: str | None = DEFAULT_CACHE_FILE) -> None:
+        self.db = db  # OracleDB con .get_connection()
+        self.cache_path = cache_path
+        self._lock = threading.RLock()
+        self._maps: Optional[Dict[str, Any]] = None
+        self._key: Optional[str] = None
+
+    # ====================== llave y archivo ======================
+    def cache_key(self) -> str:
+        if self._key is None:
+            conn = self.db.get_connection()
+            dsn = str(getattr(conn, "dsn", "") or "")
+            schema = ""
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT SYS_CONTEXT('USERENV', 'CURRENT_SCHEMA') FROM dual")
+                    schema = str(cur.fetchone()[0] or "")
+            except Exception:
+                schema = str(getattr(conn, "username", "") or "")
+            self._key = f"{dsn}|{schema.upper()}"
+        return self._key
+
+    def _read_file(self) -> Dict[str, Any]:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
+
+    def _write_file(self, key: str, maps: Optional[Dict[str, Any]]) -> None:
+        if not self.cache_path:
+            return
+        data = self._read_file()
+        if maps is None:
+            data.pop(key, None)
+        else:
+            data[key] = maps
+        tmp = self.cache_path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, sort_keys=True)
+            os.replace(tmp, self.cache_path)
+        except Exception as ex:
+            print("WARN schema cache:", ex)
+
+    # ====================== API pública ======================
+    def maps(self) -> Dict[str, Any]:
+        """Todos los mapeos: {'cliente': {...}, 'colonia': {...}, 'orden_parte': {...}, 'orden': {...}}"""
+        with self._lock:
+            if self._maps is None:
+                key = self.cache_key()
+                stored = self._read_file().get(key)
+                if isinstance(stored, dict) and {"cliente", "colonia", "orden_parte", "orden"} <= set(stored):
+                    self._maps = stored
+                else:
+                    self._maps = self._discover()
+                    self._write_file(key, self._maps)
+            return self._maps
+
+    def cliente(self) -> Dict[str, Optional[str]]:
+        return dict(self.maps()["cliente"])
+
+    def colonia(self) -> Dict[str, Optional[str]]:
+        return dict(self.maps()["colonia"])
+
+    def orden_parte(self) -> Dict[str, Optional[str]]:
+        return dict(self.maps()["orden_parte"])
+
+    def orden(self) -> Dict[str, Optional[str]]:
+        return dict(self.maps()["orden"])
+
+    def refresh(self) -> Dict[str, Any]:
+        """Olvida lo descubierto (memoria y archivo) y vuelve a consultar el esquema."""
+        with self._lock:
+            key = self.cache_key()
+            self._maps = None
+            self._write_file(key, None)
+            return self.maps()
+
+    # ====================== descubrimiento ======================
+    def _columns_of(self, tables: Iterable[str]) -> Dict[str, set]:
+        names = [str(t).upper() for t in tables]
+        if not names:
+            return {}
+        binds = {f"t{i}": n for i, n in enumerate(names)}
+        sql = (
+            "SELECT UPPER(table_name), UPPER(column_name) FROM user_tab_columns "
+            f"WHERE UPPER(table_name) IN ({', '.join(':' + b for b in binds)})"
+        )
+        return self._group(sql, binds)
+
+    def _columns_like(self, hints: Iterable[str]) -> Dict[str, set]:
+        hints = list(hints)
+        binds = {f"h{i}": f"%{h.upper()}%" for i, h in enumerate(hints)}
+        cond = " OR ".join(f"UPPER(table_name) LIKE :{b}" for b in binds)
+        sql = f"SELECT UPPER(table_name), UPPER(column_name) FROM user_tab_columns WHERE {cond}"
+        return self._group(sql, binds)
+
+    def _group(self, sql: str, binds: dict) -> Dict[str, set]:
+        conn = self.db.get_connection()
+        with conn.cursor() as cur:
+            cur.execute(sql, binds)
+            rows = cur.fetchall() or []
+        by_table: Dict[str, set] = {}
+        for t, c in rows:
+            by_table.setdefault(t, set()).add(c)
+        return by_table
+
+    def _discover(self) -> Dict[str, Any]:
+        by_table = self._columns_of(CLIENTE_TABLES + COLONIA_TABLES + ORDEN_PARTE_TABLES + (ORDEN_TABLE,))
+        return {
+            "cliente": self._discover_cliente(by_table),
+            "colonia": self._discover_colonia(by_table),
+            "orden_parte": self._discover_orden_parte(by_table),
+            "orden": {"_table": ORDEN_TABLE, "fecha": _pick(by_table.get(ORDEN_TABLE, ()), *ORDEN_FECHA_COLS)},
+        }
+
+    def _discover_cliente(self, by_table: Dict[str, set]) -> Dict[str, Optional[str]]:
+        score_keys = {"NOMBRE", "PATERNO", "MATERNO", "EMAIL", "CORREO", "TELEFONO", "CALLE", "NUM", "NO_CALLE"}
+        candidates = [(t, by_table[t]) for t in CLIENTE_TABLES if t in by_table]
+        if not candidates:
+            # nombres menos comunes: sólo tablas cuyo nombre sugiere un cliente
+            candidates = list(self._columns_like(CLIENTE_NAME_HINTS).items())
+
+        table_name, table_cols = "CLIENTE", set()
+        if candidates:
+            # prioriza tablas con más columnas relevantes
+            candidates.sort(key=lambda x: -len(x[1] & score_keys))
+            table_name, table_cols = candidates[0]
+
+        return {
+            "_table":    table_name,
+            "pk":        _pick(table_cols, "CVE_CLIENTE", "ID", "CLIENTE_ID"),
+            "nombre":    _pick(table_cols, "NOMBRE", "NOM_CLIENTE", "NOMBRE_CLIENTE"),
+            "paterno":   _pick(table_cols, "PATERNO", "APELLIDO_PATERNO", "APE_PAT", "AP_PATERNO"),
+            "materno":   _pick(table_cols, "MATERNO", "APELLIDO_MATERNO", "APE_MAT", "AP_MATERNO"),
+            "correo":    _pick(table_cols, "CORREO", "EMAIL", "E_MAIL"),
+            "telefono":  _pick(table_cols, "TELEFONO", "TEL", "PHONE"),
+            "calle":     _pick(table_cols, "CALLE", "DIRECCION", "DOMICILIO", "DIRECCION1"),
+            "num_calle": _pick(table_cols, "NUM_CALLE", "NO_CALLE", "NUMERO", "NUMERO_CALLE", "NRO_CALLE"),
+        }
+
+    def _discover_colonia(self, by_table: Dict[str, set]) -> Dict[str, Optional[str]]:
+        for t in COLONIA_TABLES:
+            cols = by_table.get(t)
+            if not cols:
+                continue
+            id_col = _pick(cols, "CVE_COLONIA", "ID", "CVE")
+            name_col = _pick(cols, "NOMBRE", "DESCRIPCION", "COLONIA")
+            if id_col and name_col:
+                return {
+                    "_table": t,
+                    "id": id_col,
+                    "name": name_col,
+                    "cp": _pick(cols, "CP", "CODIGO_POSTAL", "COD_POSTAL", "CPOSTAL"),
+                }
+        return {"_table": None, "id": None, "name": None, "cp": None}
+
+    def _discover_orden_parte(self, by_table: Dict[str, set]) -> Dict[str, Optional[str]]:
+        for t in ORDEN_PARTE_TABLES:
+            cols = by_table.get(t)
+            if not cols:
+                continue
+            pk = _pick(cols, "CVE_ORDEN_PARTE", "CVE_ORDEN_PIEZA", "ID")
+            fk = _pick(cols, "CVE_PARTE", "CVE_PIEZA")
+            if pk and fk and "CVE_ORDEN" in cols:
+                return {"_table": t, "pk": pk, "fk": fk, "orden": "CVE_ORDEN"}
+        return {"_table": None, "pk": None, "fk": None, "orden": None}
+
+
+def refresh_all(db, cache_path: str | None = DEFAULT_CACHE_FILE) -> Dict[str, Any]:
+    """Atajo para scripts: vuelve a descubrir y guarda el esquema de `db`."""
+    return SchemaIntrospector(db, cache_path).refresh()
+
+
+__all__: List[str] = ["SchemaIntrospector", "refresh_all", "DEFAULT_CACHE_FILE"]
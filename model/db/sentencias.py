@@ -0,0 +1,94 @@
+# model/db/sentencias.py
+from __future__ import annotations
+from collections import Counter
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Tuple
+import re
+import threading
+
+
+_ESPACIOS = re.compile(r"\s+")
+
+# Tamaño del caché de sentencias del driver por conexión (oracledb: 20 por omisión).
+# Con las variantes de IN normalizadas la aplicación usa unas decenas de textos.
+STMT_CACHE = 60
+
+# Los IN se rellenan hasta el siguiente de estos tamaños (repitiendo el último
+# valor), así una lista de 37 ids y una de 50 usan el mismo texto SQL.
+TAMANOS_IN = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1000)
+
+
+def _canonico(sql: str) -> str:
+    """Colapsa espacios fuera de las comillas: mismo texto, misma sentencia en Oracle."""
+    partes = sql.split("'")
+    for i in range(0, len(partes), 2):
+        partes[i] = _ESPACIOS.sub(" ", partes[i])
+    return "'".join(partes).strip()
+
+
+def tamano_in(n: int) -> int:
+    for t in TAMANOS_IN:
+        if n <= t:
+            return t
+    raise ValueError(f"IN de {n} valores: partir en pedazos de {TAMANOS_IN[-1]}")
+
+
+def lista_in(prefijo: str, valores: Iterable[Any]) -> Tuple[str, Dict[str, Any]]:
+    """
+    (':p0, :p1, …', binds) para `col IN (...)` con forma normalizada.
+      ph, binds = lista_in("o", ids)
+      cur.execute(f"... WHERE cve_orden IN ({ph})", binds)
+    Repetir un valor no cambia el resultado de un IN.
+    """
+    vals: List[Any] = list(valores)
+    if not vals:
+        raise ValueError("lista_in() sin valores")
+    vals += [vals[-1]] * (tamano_in(len(vals)) - len(vals))
+    names = [f"{prefijo}{i}" for i in range(len(vals))]
+    return ", ".join(":" + n for n in names), dict(zip(names, vals))
+
+
+class RegistroSentencias:
+    """
+    SQL construido dinámicamente (tablas/columnas descubiertas del esquema),
+    armado una sola vez por clave y con texto canónico:
+      sql = REGISTRO.sql(("lookup", table, id_col), lambda: f"SELECT ... FROM {table} ...")
+    - Misma clave -> exactamente el mismo texto, así que Oracle hace soft
+      parse y el caché de sentencias del driver reutiliza el cursor.
+    - Cuenta usos por clave (stats()) para ver qué sentencias se repiten.
+    - limpiar() al redescubrir el esquema.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._sql: Dict[Hashable, str] = {}
+        self._usos: Counter = Counter()
+
+    def sql(self, clave: Hashable, construir: Callable[[], str]) -> str:
+        with self._lock:
+            self._usos[clave] += 1
+            txt = self._sql.get(clave)
+        if txt is None:
+            txt = _canonico(construir())
+            with self._lock:
+                txt = self._sql.setdefault(clave, txt)
+        return txt
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._sql.clear()
+            self._usos.clear()
+
+    def stats(self, top: int = 10) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sentencias": len(self._sql),
+                "usos": sum(self._usos.values()),
+                "mas_usadas": [(str(k), n) for k, n in self._usos.most_common(top)],
+            }
+
+
+# Uno por proceso: las claves incluyen los nombres de tabla/columna
+REGISTRO = RegistroSentencias()
+
+
+__all__ = ["REGISTRO", "RegistroSentencias", "lista_in", "tamano_in", "STMT_CACHE"]
@@ -3,12 +3,12 @@ from .cliente import Cliente
 from .nota import Nota
 from .parte import Parte, OrdenParte
 from .servicio import Servicio, OrdenServicio
-from .catalogos import TipoEquipo, Taller, Tecnico, Pais, Estado
+from .catalogos import TipoEquipo, Taller, Tecnico, Pais, Estado, CatalogosSnapshot
 
 __all__ = [
     "Cliente",
     "Nota",
     "Parte", "OrdenParte",
     "Servicio", "OrdenServicio",
-    "TipoEquipo", "Taller", "Tecnico", "Pais", "Estado",
+    "TipoEquipo", "Taller", "Tecnico", "Pais", "Estado", "CatalogosSnapshot",
 ]
\ No newline at end of file
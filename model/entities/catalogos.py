@@ -155,4 +155,40 @@ class Estado:
         return {"cve_estado": self.cve_estado, "nombre": self.nombre, "cve_pais": self.cve_pais}
 
     def __str__(self) -> str:
-        return self.nombre
\ No newline at end of file
+        return self.nombre
+
+# --------- Snapshot de catálogos (una lectura por repintado) ---------
+@dataclass(slots=True)
+class CatalogosSnapshot:
+    """
+    Catálogos ya normalizados que se cargan una vez por repintado y se
+    pasan a los constructores de filas (en lugar de consultar por fila).
+    """
+    tipos: dict[int, tuple[float, str]]
+    talleres: dict[int, str]
+    statuses: dict[int, str]
+    paises: dict[int, str]
+
+    def tipo_nombre(self, cve_tipo_equipo: Any) -> str:
+        try:
+            return self.tipos.get(int(cve_tipo_equipo), (0.0, ""))[1]
+        except Exception:
+            return ""
+
+    def tarifa(self, cve_tipo_equipo: Any) -> float:
+        try:
+            return float(self.tipos.get(int(cve_tipo_equipo), (0.0, ""))[0])
+        except Exception:
+            return 0.0
+
+    def taller_nombre(self, cve_taller: Any) -> str:
+        try:
+            return self.talleres.get(int(cve_taller), "")
+        except Exception:
+            return ""
+
+    def status_nombre(self, cve_status: Any) -> str:
+        try:
+            return self.statuses.get(int(cve_status), "")
+        except Exception:
+            return ""
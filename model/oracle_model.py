@@ -1,8 +1,68 @@
 import oracledb
+import time
 from datetime import datetime
 
+_SIN_CARGAR = object()
+
+# Segundos que se conserva la plantilla de técnicos de un taller; EMPLEADO y
+# EMPLEADO_TALLER no se modifican desde la aplicación.
+_TECNICOS_TTL = 300.0
+
+
+class _LoteTecnicos:
+    """
+    Técnicos/horas de un grupo de órdenes (p. ej. las de ordenes()).
+    Se cargan todos juntos con un IN (...) la primera vez que alguna orden
+    del grupo pide sus técnicos u horas.
+    """
+    __slots__ = ("db_instance", "ids", "datos")
+
+    def __init__(self, db_instance):
+        self.db_instance = db_instance
+        self.ids = []
+        self.datos = None  # {cve_orden: ([nombres], horas)}
+
+    def agregar(self, cve_orden):
+        self.ids.append(cve_orden)
+        self.datos = None
+
+    def obtener(self, cve_orden):
+        if self.datos is None:
+            self.datos = self._cargar()
+        return self.datos.get(cve_orden, ([], None))
+
+    def _cargar(self):
+        datos = {}
+        conn = self.db_instance.get_connection()
+        if not conn or not self.ids:
+            return datos
+        cursor = conn.cursor()
+        try:
+            # Oracle admite hasta 1000 expresiones en un IN
+            for i in range(0, len(self.ids), 1000):
+                chunk = self.ids[i:i + 1000]
+                binds = ", ".join(f":{j + 1}" for j in range(len(chunk)))
+                cursor.execute(f"""SELECT aux.cve_orden, empleado.nombre, empleado.paterno, aux.horas
+                FROM cib700_01.empleado empleado, cib700_01.orden_tecnicos aux
+                WHERE aux.cve_empleado = empleado.cve_empleado AND aux.cve_orden IN ({binds})""", chunk)
+                for cve_orden, nombre, paterno, horas in cursor:
+                    nombres, h = datos.get(cve_orden, ([], None))
+                    nombres.append(nombre + ' ' + paterno)
+                    # como tecnicos_orden(..., True): las horas del primer técnico
+                    datos[cve_orden] = (nombres, horas if h is None else h)
+        except oracledb.DatabaseError as e:
+            print("Error al cargar técnicos:", e)
+        finally:
+            cursor.close()
+        return datos
+
+
 class Orden:
-    def __init__(self, cve_orden, cve_status, eq_marca, eq_modelo, cve_tipo_equipo, notas_cliente, cliente, cve_taller, db_instance):
+    __slots__ = ("cve_orden", "cve_status", "eq_marca", "eq_modelo", "cve_tipo_equipo",
+                 "notas_cliente", "cliente", "cve_taller", "_lote", "_tecnicos", "_horas")
+
+    def __init__(self, cve_orden, cve_status, eq_marca, eq_modelo, cve_tipo_equipo, notas_cliente, cliente, cve_taller, db_instance,
+                 lote=None):
         self.cve_orden = cve_orden
         self.cve_status = cve_status
         self.eq_marca = eq_marca
@@ -11,8 +71,31 @@ class Orden:
         self.notas_cliente = notas_cliente
         self.cliente = cliente  # Cliente es un objeto de la clase Cliente
         self.cve_taller = cve_taller
-        self.tecnicos = db_instance.tecnicos_orden(cve_orden)
-        self.horas = db_instance.tecnicos_orden(cve_orden, True)
+        # tecnicos/horas se leen al primer acceso, junto con el resto del lote
+        self._lote = lote if lote is not None else _LoteTecnicos(db_instance)
+        self._lote.agregar(cve_orden)
+        self._tecnicos = _SIN_CARGAR
+        self._horas = _SIN_CARGAR
+
+    @property
+    def tecnicos(self):
+        if self._tecnicos is _SIN_CARGAR:
+            self._tecnicos = list(self._lote.obtener(self.cve_orden)[0])
+        return self._tecnicos
+
+    @tecnicos.setter
+    def tecnicos(self, valor):
+        self._tecnicos = valor
+
+    @property
+    def horas(self):
+        if self._horas is _SIN_CARGAR:
+            self._horas = self._lote.obtener(self.cve_orden)[1]
+        return self._horas
+
+    @horas.setter
+    def horas(self, valor):
+        self._horas = valor
 
     def __str__(self):
         return (f"Orden(cve_orden={self.cve_orden}, cve_status={self.cve_status}, "
@@ -320,30 +403,41 @@ class OracleDB:
         finally:
             cursor.close()
 
+    def invalidar_tecnicos(self, cve_taller=None):
+        """Olvida la plantilla cacheada de un taller (o de todos)."""
+        cache = getattr(self, "_tecnicos_cache", None)
+        if cache is None:
+            return
+        if cve_taller is None:
+            cache.clear()
+        else:
+            cache.pop(cve_taller, None)
+
     def tecnicos_taller(self, cve_taller):
         if not self._connection:
             print("No hay conexión activa con la base de datos.")
             return
 
+        # Plantilla por taller cacheada (vence con _TECNICOS_TTL o con invalidar_tecnicos)
+        if not hasattr(self, "_tecnicos_cache"):
+            self._tecnicos_cache = {}
+        cacheado = self._tecnicos_cache.get(cve_taller)
+        if cacheado and time.monotonic() - cacheado[0] < _TECNICOS_TTL:
+            return [dict(e) for e in cacheado[1]]
+
         cursor = self._connection.cursor()
         try:
             columnas = ['cve_empleado','nombre', 'paterno', 'materno', 'cve_rol', 'dir_calle', 'dir_num']
-            cursor.execute("""SELECT empleado.cve_empleado, empleado.nombre, empleado.paterno, 
-            empleado.materno, empleado.cve_rol, empleado.dir_calle, empleado.dir_num
-            FROM cib700_01.empleado empleado, (SELECT cve_empleado FROM cib700_01.empleado_taller WHERE
-            cve_taller = :1) aux WHERE aux.cve_empleado = empleado.cve_empleado""", (cve_taller,))
-            cursor2 = self._connection.cursor()
-            empleados = []
-            for row in cursor:
-                empleado = dict(zip(columnas, row))
-                cursor2.execute("SELECT rol FROM cib700_01.rol WHERE cve_rol = :1", (empleado['cve_rol'],))
-                rol = cursor2.fetchone()
-                if rol:
-                    empleado['cve_rol'] = rol[0]
-                empleados.append(empleado)
-            # Confirmar la transacción
-            cursor2.close()
-            return empleados
+            # Empleado + rol en una sola consulta (antes: una consulta de rol por técnico)
+            cursor.execute("""SELECT empleado.cve_empleado, empleado.nombre, empleado.paterno,
+            empleado.materno, NVL(rol.rol, TO_CHAR(empleado.cve_rol)), empleado.dir_calle, empleado.dir_num
+            FROM cib700_01.empleado empleado
+            JOIN cib700_01.empleado_taller et ON et.cve_empleado = empleado.cve_empleado
+            LEFT JOIN cib700_01.rol rol ON rol.cve_rol = empleado.cve_rol
+            WHERE et.cve_taller = :1""", (cve_taller,))
+            empleados = [dict(zip(columnas, row)) for row in cursor]
+            self._tecnicos_cache[cve_taller] = (time.monotonic(), empleados)
+            return [dict(e) for e in empleados]
 
         except oracledb.DatabaseError as e:
             print("Error al insertar la orden:", e)
@@ -407,11 +501,13 @@ class OracleDB:
             cursor.execute("""SELECT cve_orden, cve_status, eq_marca, eq_modelo, cve_tipo_equipo, notas_cliente, cve_cliente,
             cve_taller FROM cib700_01.orden""")
             ordenes = []
-            for row in cursor:
+            lote = _LoteTecnicos(self)  # un solo IN (...) para los técnicos de todas
+            for row in cursor.fetchall():
                 orden = dict(zip(columnas, row))
                 aux = Orden(cve_orden=orden['cve_orden'], cve_status=orden['status'], eq_marca=orden['marca'], eq_modelo=orden['modelo'],
                             cve_tipo_equipo=orden['tipo'], notas_cliente=orden['nota'],
-                            cliente=self.cliente(cve_cliente=orden['cliente']), cve_taller=orden['taller'], db_instance=self)
+                            cliente=self.cliente(cve_cliente=orden['cliente']), cve_taller=orden['taller'], db_instance=self,
+                            lote=lote)
                 ordenes.append(aux)
             ordenes.sort(key=lambda a: a.cve_orden)
             return ordenes
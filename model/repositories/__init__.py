@@ -8,6 +8,9 @@ from .parte_repo import ParteModelo
 from .servicio_repo import ServicioModelo
 from .cliente_repo import ClienteModelo
 from .catalogos_repo import CatalogosModelo
+from .kpi_repo import KpiModelo
+from .precios_repo import PreciosModelo, TotalOrden
+from .kit_repo import KitModelo
 
 __all__ = [
     "OrdenModelo",
@@ -16,4 +19,8 @@ __all__ = [
     "ServicioModelo",
     "ClienteModelo",
     "CatalogosModelo",
+    "KpiModelo",
+    "PreciosModelo",
+    "TotalOrden",
+    "KitModelo",
 ]
\ No newline at end of file
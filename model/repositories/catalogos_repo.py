@@ -1,33 +1,64 @@
 # model/repositories/catalogos_repo.py
 from __future__ import annotations
-from typing import Any, Dict, List, Tuple, Optional
+from typing import Any, Callable, Dict, List, Tuple, Optional
 import oracledb
 
+from model.db.keys import KeyAllocator
+from model.db.sentencias import REGISTRO
+
 
 class CatalogosModelo:
-    def __init__(self, db) -> None:
+    def __init__(self, db, keys: KeyAllocator | None = None) -> None:
         self.db = db  # OracleDB con .get_connection()
+        self.keys = keys or KeyAllocator(db)
+        # Callbacks (nombre_tabla) que se llaman al insertar en un catálogo;
+        # la fachada los usa para invalidar su caché.
+        self.on_change: List[Callable[[str], None]] = []
+        # (candidatas...) -> (tabla, columnas_en_lower); sólo metadata, sin filas
+        self._cols_memo: Dict[Tuple[str, ...], Tuple[str, List[str]]] = {}
+
+    def _notify_change(self, table: str) -> None:
+        for cb in list(self.on_change):
+            try:
+                cb(str(table).lower())
+            except Exception:
+                pass
 
     # ============== helpers internos ==============
 
     def _fetch_all(self, table_candidates: List[str]) -> Tuple[str, List[str], List[Tuple[Any, ...]]]:
         """
         Devuelve (tabla_encontrada, columnas_en_lower, filas) probando nombres alternos.
+        Sólo para catálogos chicos que sí se leen completos.
+        """
+        table, _ = self._table_cols(table_candidates)
+        conn = self.db.get_connection()
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT * FROM {table}")
+            cols = [d[0].lower() for d in cur.description]
+            return table, cols, cur.fetchall()
+
+    def _discover_cols(self, table_candidates: List[str]) -> Tuple[str, List[str]]:
+        """
+        Primera tabla existente entre las candidatas y sus columnas (lower),
+        usando WHERE 1=0: Oracle sólo describe la consulta, no lee filas.
         """
         conn = self.db.get_connection()
         with conn.cursor() as cur:
             for t in table_candidates:
                 try:
-                    cur.execute(f"SELECT * FROM {t}")
-                    cols = [d[0].lower() for d in cur.description]
-                    rows = cur.fetchall()
-                    return t, cols, rows
+                    cur.execute(f"SELECT * FROM {t} WHERE 1=0")
+                    return t, [d[0].lower() for d in cur.description]
                 except oracledb.DatabaseError as e:
                     if "ORA-00942" in str(e):  # table or view does not exist
                         continue
                     raise
         raise RuntimeError(f"No se encontró ninguna tabla válida entre: {table_candidates}")
 
+    def reset_columnas(self) -> None:
+        """Olvida las columnas descubiertas (p. ej. tras un cambio de DDL)."""
+        self._cols_memo.clear()
+
     @staticmethod
     def _pick_first(candidates: List[str], cols: List[str]) -> Optional[str]:
         for c in candidates:
@@ -35,10 +66,14 @@ class CatalogosModelo:
                 return c.lower()
         return None
 
-    # Azúcar
+    # Memoizado por lista de candidatas: una consulta de metadata por sesión
     def _table_cols(self, table_candidates: List[str]) -> Tuple[str, List[str]]:
-        t, cols, _ = self._fetch_all(table_candidates)
-        return t, cols
+        key = tuple(str(t).lower() for t in table_candidates)
+        hit = self._cols_memo.get(key)
+        if hit is None:
+            hit = self._discover_cols(table_candidates)
+            self._cols_memo[key] = hit
+        return hit[0], list(hit[1])
 
     # Busca un ID por nombre (o devuelve el entero si ya lo es)
     def _lookup_id(
@@ -61,13 +96,17 @@ class CatalogosModelo:
         if not id_col or not name_col or value in (None, ""):
             return None
 
-        sql = f"SELECT {id_col} FROM {table} WHERE UPPER(TRIM({name_col})) = UPPER(TRIM(:nom))"
         binds = {"nom": str(value)}
         if extra_filters:
-            for k, v in extra_filters.items():
+            for k, v in sorted(extra_filters.items()):
                 if k in cols and v is not None:
-                    sql += f" AND {k} = :{k}"
                     binds[k] = v
+        filtros = tuple(k for k in binds if k != "nom")
+        sql = REGISTRO.sql(
+            ("catalogos.lookup", table, id_col, name_col, filtros),
+            lambda: f"SELECT {id_col} FROM {table} WHERE UPPER(TRIM({name_col})) = UPPER(TRIM(:nom))"
+                    + "".join(f" AND {k} = :{k}" for k in filtros),
+        )
 
         local_conn = conn or self.db.get_connection()
         with local_conn.cursor() as cur:
@@ -103,11 +142,10 @@ class CatalogosModelo:
             return found
 
         with local_conn.cursor() as cur:
-            cur.execute(f"SELECT NVL(MAX({id_col}), 0) + 1 FROM {table}")
-            new_id = int(cur.fetchone()[0])
+            new_id = self.keys.next_id(table, id_col, local_conn)
 
-            cols_ins = [id_col, name_col]
-            vals_ins = [new_id, str(value) if value not in (None, "") else f"{table} {new_id}"]
+            cols_ins = [name_col]
+            vals_ins = [str(value) if value not in (None, "") else f"{table} {new_id or ''}".strip()]
 
             if extra_filters:
                 for k, v in extra_filters.items():
@@ -115,13 +153,13 @@ class CatalogosModelo:
                         cols_ins.append(k)
                         vals_ins.append(v)
 
-            ph = ", ".join([f":p{i}" for i in range(1, len(cols_ins) + 1)])
-            sql = f"INSERT INTO {table} ({', '.join(cols_ins)}) VALUES ({ph})"
+            ph = [f":p{i}" for i in range(1, len(cols_ins) + 1)]
             binds = {f"p{i}": vals_ins[i-1] for i in range(1, len(vals_ins) + 1)}
 
-            cur.execute(sql, binds)
+            new_id = self.keys.insertar(cur, table, id_col, cols_ins, ph, binds, new_id)
             # muy importante: commit para que otras conexiones vean el registro
             local_conn.commit()
+            self._notify_change(table)
             return new_id
 
     # ============== catálogos públicos ==============
@@ -215,29 +253,36 @@ class CatalogosModelo:
             pais_id = int(str(pais).strip())
         except Exception:
             pais_id = None
-        table, cols, rows = self._fetch_all(["estado", "estados"])
+        table, cols = self._table_cols(["estado", "estados"])
         id_col   = self._pick_first(["cve_estado", "id", "cve"], cols)
         name_col = self._pick_first(["nombre", "descripcion", "estado"], cols)
         pais_col = self._pick_first(["cve_pais", "id_pais", "pais"], cols)
         if not id_col or not name_col:
             raise RuntimeError(f"No se encontraron columnas mínimas (id/nombre) en {table}")
+        binds: Dict[str, Any] = {}
         if pais_id is not None and pais_col:
-            i_pais = cols.index(pais_col)
-            rows = [r for r in rows if r[i_pais] == pais_id]
-        i_id = cols.index(id_col); i_nm = cols.index(name_col)
+            binds["p"] = pais_id
+        sql = REGISTRO.sql(
+            ("catalogos.estados", table, id_col, name_col, pais_col if binds else None),
+            lambda: f"SELECT {id_col}, {name_col} FROM {table}" + (f" WHERE {pais_col} = :p" if binds else ""),
+        )
+        conn = self.db.get_connection()
+        with conn.cursor() as cur:
+            cur.execute(sql, binds)
+            rows = cur.fetchall()
         out: Dict[str, int] = {}
         for r in rows:
             try:
-                _id = int(r[i_id])
+                _id = int(r[0])
             except Exception:
                 continue
-            nombre = f"Estado {_id}" if r[i_nm] is None else str(r[i_nm])
+            nombre = f"Estado {_id}" if r[1] is None else str(r[1])
             out[nombre] = _id
         return out
 
     def colonias_por_cp(self, cp) -> List[Tuple[int, str]]:
         try:
-            table, cols, _ = self._fetch_all(["colonia", "colonias"])
+            table, cols = self._table_cols(["colonia", "colonias"])
         except RuntimeError:
             return []
         id_col   = self._pick_first(["cve_colonia", "id", "cve"], cols)
@@ -246,7 +291,10 @@ class CatalogosModelo:
         if not id_col or not name_col or not cp_col:
             return []
 
-        sql = f"SELECT {id_col}, {name_col} FROM {table} WHERE {cp_col} = :cp ORDER BY {name_col}"
+        sql = REGISTRO.sql(
+            ("catalogos.colonias_por_cp", table, id_col, name_col, cp_col),
+            lambda: f"SELECT {id_col}, {name_col} FROM {table} WHERE {cp_col} = :cp ORDER BY {name_col}",
+        )
         conn = self.db.get_connection()
         with conn.cursor() as cur:
             cur.execute(sql, {"cp": str(cp)})
@@ -262,20 +310,20 @@ class CatalogosModelo:
         estado: str | int | None = None,
         pais: str | int | None = None,
     ) -> Optional[int]:
-        table, cols, _ = self._fetch_all(["colonia", "colonias"])
+        table, cols = self._table_cols(["colonia", "colonias"])
         id_col   = self._pick_first(["cve_colonia", "id", "cve"], cols)
         name_col = self._pick_first(["nombre", "descripcion", "colonia"], cols)
         cp_col   = self._pick_first(["cp", "codigo_postal", "cod_postal", "cpostal"], cols)
         if not id_col or not name_col or not cp_col:
             return None
 
-        sql = f"""
+        sql = REGISTRO.sql(("catalogos.buscar_colonia", table, id_col, name_col, cp_col), lambda: f"""
             SELECT {id_col}
               FROM {table}
              WHERE {cp_col} = :cp
                AND UPPER(TRIM({name_col})) = UPPER(TRIM(:nom))
              FETCH FIRST 1 ROWS ONLY
-        """
+        """)
         conn = self.db.get_connection()
         with conn.cursor() as cur:
             cur.execute(sql, {"cp": str(cp), "nom": nombre})
@@ -293,7 +341,7 @@ class CatalogosModelo:
         """
         Inserta colonia cumpliendo posibles FKs (pais/estado/municipio). Hace COMMIT.
         """
-        table, cols, _ = self._fetch_all(["colonia", "colonias"])
+        table, cols = self._table_cols(["colonia", "colonias"])
 
         id_col   = self._pick_first(["cve_colonia", "id", "cve"], cols)
         name_col = self._pick_first(["nombre", "descripcion", "colonia"], cols)
@@ -350,11 +398,10 @@ class CatalogosModelo:
 
             # Insertar colonia
             with conn.cursor() as cur:
-                cur.execute(f"SELECT NVL(MAX({id_col}), 0) + 1 FROM {table}")
-                new_id = int(cur.fetchone()[0])
+                new_id = self.keys.next_id(table, id_col, conn)
 
-                cols_to_insert = [id_col, name_col, cp_col]
-                vals_to_insert = [new_id, nombre, str(cp)]
+                cols_to_insert = [name_col, cp_col]
+                vals_to_insert = [nombre, str(cp)]
 
                 if pais_col and pais_id is not None:
                     cols_to_insert.append(pais_col); vals_to_insert.append(pais_id)
@@ -363,12 +410,12 @@ class CatalogosModelo:
                 if mun_col and mun_id is not None:
                     cols_to_insert.append(mun_col);  vals_to_insert.append(mun_id)
 
-                ph = ", ".join([f":p{i}" for i in range(1, len(cols_to_insert) + 1)])
-                sql = f"INSERT INTO {table} ({', '.join(cols_to_insert)}) VALUES ({ph})"
+                ph = [f":p{i}" for i in range(1, len(cols_to_insert) + 1)]
                 binds = {f"p{i}": vals_to_insert[i-1] for i in range(1, len(vals_to_insert) + 1)}
 
-                cur.execute(sql, binds)
+                new_id = self.keys.insertar(cur, table, id_col, cols_to_insert, ph, binds, new_id)
                 conn.commit()  # <-- CLAVE para que otras conexiones lo vean
+                self._notify_change(table)
                 return new_id
 
         except oracledb.DatabaseError as e:
@@ -401,6 +448,30 @@ class CatalogosModelo:
 
         conn = self.db.get_connection()
         with conn.cursor() as cur:
+            # Esquema del taller: EMPLEADO + EMPLEADO_TALLER + ROL en una sola consulta
+            if taller_id is not None:
+                try:
+                    cur.execute(
+                        """
+                        SELECT e.cve_empleado, e.nombre, e.paterno, e.materno,
+                               e.cve_rol, r.rol
+                        FROM empleado e
+                        JOIN empleado_taller et ON et.cve_empleado = e.cve_empleado
+                        LEFT JOIN rol r ON r.cve_rol = e.cve_rol
+                        WHERE et.cve_taller = :t
+                        ORDER BY e.nombre, e.paterno
+                        """,
+                        {"t": taller_id},
+                    )
+                    return [
+                        {"cve_empleado": r[0], "nombre": r[1], "paterno": r[2],
+                         "materno": r[3], "cve_rol": r[4], "rol": r[5]}
+                        for r in cur.fetchall()
+                    ]
+                except oracledb.DatabaseError as e:
+                    if "ORA-00942" not in str(e) and "ORA-00904" not in str(e):
+                        raise
+
             if taller_id is not None:
                 for t in ("empleado", "tecnicos", "tecnico"):
                     try:
@@ -2,6 +2,9 @@ from __future__ import annotations
 from typing import Any, Dict, List, Optional, Tuple
 import oracledb
 
+from model.db.keys import KeyAllocator
+from model.db.sentencias import REGISTRO
+
 
 class ClienteModelo:
     """
@@ -12,8 +15,10 @@ class ClienteModelo:
     - NO hace commit.
     """
 
-    def __init__(self, db) -> None:
+    def __init__(self, db, schema=None, keys: KeyAllocator | None = None) -> None:
         self.db = db  # OracleDB con .get_connection()
+        self.schema = schema  # SchemaIntrospector opcional (mapeos ya descubiertos)
+        self.keys = keys or KeyAllocator(db)
 
     # =================== helpers de metadata ===================
 
@@ -45,6 +50,13 @@ class ClienteModelo:
     # =================== helpers de COLONIA ===================
 
     def _detect_colonia_table(self) -> tuple[str, Dict[str, Optional[str]]]:
+        if self.schema is not None:
+            try:
+                m = self.schema.colonia()
+                if m.get("_table"):
+                    return m["_table"], {"id": m["id"], "name": m["name"], "cp": m["cp"]}
+            except Exception:
+                pass
         conn = self.db.get_connection()
         with conn.cursor() as cur:
             for t in ("COLONIA", "COLONIAS"):
@@ -80,6 +92,16 @@ class ClienteModelo:
             r = cur.fetchone()
             return r[0] if r else None
 
+    @staticmethod
+    def _sql_colonia(table: str, id_col: str, name_col: str, cp_col: Optional[str]) -> str:
+        """SELECT de colonia por nombre (y CP si hay columna), un texto por esquema."""
+        return REGISTRO.sql(
+            ("cliente.colonia", table, id_col, name_col, cp_col),
+            lambda: f"SELECT {id_col} FROM {table} WHERE UPPER(TRIM({name_col})) = UPPER(TRIM(:n))"
+                    + (f" AND {cp_col} = :cp" if cp_col else "")
+                    + " FETCH FIRST 1 ROWS ONLY",
+        )
+
     def _buscar_colonia_id(self, nombre_colonia: str, cp: Optional[str]) -> Optional[int]:
         try:
             table, basic = self._detect_colonia_table()
@@ -95,23 +117,12 @@ class ClienteModelo:
         with conn.cursor() as cur:
             if cpcol and cp is not None:
                 cur.execute(
-                    f"""
-                    SELECT {basic['id']}
-                    FROM {table}
-                    WHERE UPPER(TRIM({namecol})) = UPPER(TRIM(:n))
-                      AND {cpcol} = :cp
-                    FETCH FIRST 1 ROWS ONLY
-                    """,
+                    self._sql_colonia(table, basic['id'], namecol, cpcol),
                     {"n": nombre_colonia, "cp": str(cp)},
                 )
             else:
                 cur.execute(
-                    f"""
-                    SELECT {basic['id']}
-                    FROM {table}
-                    WHERE UPPER(TRIM({namecol})) = UPPER(TRIM(:n))
-                    FETCH FIRST 1 ROWS ONLY
-                    """,
+                    self._sql_colonia(table, basic['id'], namecol, None),
                     {"n": nombre_colonia},
                 )
             r = cur.fetchone()
@@ -133,8 +144,7 @@ class ClienteModelo:
 
         conn = self.db.get_connection()
         with conn.cursor() as cur:
-            cur.execute(f"SELECT NVL(MAX({basic['id']}),0)+1 FROM {table}")
-            new_id = int(cur.fetchone()[0])
+            new_id = self.keys.next_id(table, basic["id"], conn)
 
             insert_cols = [basic["id"], basic["name"]]
             insert_vals = [":p_id", ":p_name"]
@@ -174,32 +184,23 @@ class ClienteModelo:
                         insert_vals.append(f":p_{col_name.lower()}")
                         binds[f"p_{col_name.lower()}"] = dv
 
-            sql = f"INSERT INTO {table} ({', '.join(insert_cols)}) VALUES ({', '.join(insert_vals)})"
+            # el id va primero en insert_cols (así no se "rellena" como NOT NULL)
+            binds.pop("p_id", None)
             try:
-                cur.execute(sql, binds)
-                return new_id
+                return self.keys.insertar(
+                    cur, table, basic["id"], insert_cols[1:], insert_vals[1:], binds, new_id
+                )
             except oracledb.DatabaseError as e:
                 if "ORA-00001" in str(e):
                     try:
                         if basic["cp"] and basic["cp"] in cols_meta and cp is not None:
                             cur.execute(
-                                f"""
-                                SELECT {basic['id']}
-                                FROM {table}
-                                WHERE UPPER(TRIM({basic['name']})) = UPPER(TRIM(:n))
-                                  AND {basic['cp']} = :cp
-                                FETCH FIRST 1 ROWS ONLY
-                                """,
+                                self._sql_colonia(table, basic['id'], basic['name'], basic['cp']),
                                 {"n": nombre_colonia, "cp": str(cp)},
                             )
                         else:
                             cur.execute(
-                                f"""
-                                SELECT {basic['id']}
-                                FROM {table}
-                                WHERE UPPER(TRIM({basic['name']})) = UPPER(TRIM(:n))
-                                FETCH FIRST 1 ROWS ONLY
-                                """,
+                                self._sql_colonia(table, basic['id'], basic['name'], None),
                                 {"n": nombre_colonia},
                             )
                         r = cur.fetchone()
@@ -259,8 +260,7 @@ class ClienteModelo:
 
         conn = self.db.get_connection()
         with conn.cursor() as cur:
-            cur.execute(f"SELECT NVL(MAX({id_col}),0)+1 FROM {table}")
-            new_id = int(cur.fetchone()[0])
+            new_id = self.keys.next_id(table, id_col, conn)
 
             insert_cols: List[str] = [id_col]
             insert_vals: List[str] = [":p_id"]
@@ -349,6 +349,7 @@ class ClienteModelo:
                     # Si dv sigue None y la tabla no tiene valores previos,
                     # Oracle fallará — pero en la práctica suele haber registros.
 
-            sql = f"INSERT INTO {table} ({', '.join(insert_cols)}) VALUES ({', '.join(insert_vals)})"
-            cur.execute(sql, binds)
-            return new_id
\ No newline at end of file
+            binds.pop("p_id", None)
+            return self.keys.insertar(
+                cur, table, id_col, insert_cols[1:], insert_vals[1:], binds, new_id
+            )
\ No newline at end of file
@@ -0,0 +1,183 @@
+# model/repositories/kit_repo.py
+from __future__ import annotations
+from typing import Iterable, Protocol
+import oracledb
+from .base import DBLike, fetchall_dict
+from model.db.keys import KeyAllocator
+from model.db.sentencias import lista_in
+
+
+# Kits: combinaciones frecuentes de partes y servicios que se agregan juntas.
+# Las tablas se crean con `python kit_tablas.py` (no desde la aplicación).
+# CVE_ELEMENTO apunta a PARTE o a SERVICIO según TIPO, así que no lleva FK:
+# guardar() valida los ids y elementos() omite los que ya no existen.
+DDL = {
+    "KIT": """
+        CREATE TABLE kit (
+            cve_kit     NUMBER        NOT NULL,
+            nombre      VARCHAR2(100) NOT NULL,
+            CONSTRAINT kit_pk PRIMARY KEY (cve_kit),
+            CONSTRAINT kit_nombre_uk UNIQUE (nombre)
+        )""",
+    "KIT_ELEMENTO": """
+        CREATE TABLE kit_elemento (
+            cve_kit     NUMBER        NOT NULL,
+            tipo        CHAR(1)       NOT NULL,   -- 'P' parte, 'S' servicio
+            cve_elemento NUMBER       NOT NULL,
+            cantidad    NUMBER        DEFAULT 1 NOT NULL,
+            CONSTRAINT kit_elemento_pk PRIMARY KEY (cve_kit, tipo, cve_elemento),
+            CONSTRAINT kit_elemento_fk FOREIGN KEY (cve_kit) REFERENCES kit (cve_kit) ON DELETE CASCADE
+        )""",
+}
+
+
+# tipo -> (tabla, llave) del catálogo al que apunta cve_elemento
+CATALOGO = {"P": ("parte", "cve_parte"), "S": ("servicio", "cve_servicio")}
+
+SIN_TABLAS = "No existen las tablas de kits; ejecute primero: python kit_tablas.py"
+
+
+class IKitRepo(Protocol):
+    def disponible(self) -> bool: ...
+    def listar(self) -> list[dict]: ...
+    def elementos(self, cve_kit: int) -> dict[str, list[int]]: ...
+    def guardar(self, nombre: str, partes: Iterable[int] | None, servicios: Iterable[int] | None) -> int: ...
+    def eliminar(self, cve_kit: int) -> int: ...
+
+
+class KitModelo(IKitRepo):
+    """
+    Kits predefinidos (KIT / KIT_ELEMENTO). elementos() los expande a listas
+    de ids —una parte con cantidad 3 aparece 3 veces— para que la fachada
+    los inserte en un solo lote. Si las tablas no existen listar() devuelve
+    [] y guardar() falla con un mensaje claro (se crean con kit_tablas.py).
+    """
+
+    def __init__(self, db: DBLike, keys: KeyAllocator | None = None) -> None:
+        self.db = db
+        self.keys = keys or KeyAllocator(db)
+        self._disponible: bool | None = None
+
+    # ====================== tablas ======================
+    def disponible(self) -> bool:
+        if self._disponible is None:
+            try:
+                with self.db.get_connection().cursor() as cur:
+                    cur.execute("SELECT COUNT(*) FROM user_tables WHERE table_name IN ('KIT', 'KIT_ELEMENTO')")
+                    self._disponible = int(cur.fetchone()[0]) == len(DDL)
+            except Exception:
+                self._disponible = False
+        return self._disponible
+
+    def crear_tablas(self) -> list[str]:
+        """Crea las tablas que falten (DDL: hace COMMIT implícito). Devuelve las creadas."""
+        creadas: list[str] = []
+        with self.db.get_connection().cursor() as cur:
+            for name, ddl in DDL.items():
+                try:
+                    cur.execute(ddl)
+                    creadas.append(name)
+                except oracledb.DatabaseError as ex:
+                    if "ORA-00955" not in str(ex):  # ya existe
+                        raise
+        self._disponible = None
+        return creadas
+
+    # ====================== consultas ======================
+    def listar(self) -> list[dict]:
+        """[{cve_kit, nombre, partes, servicios}] (conteos con cantidad)."""
+        if not self.disponible():
+            return []
+        with self.db.get_connection().cursor() as cur:
+            cur.execute("""
+                SELECT k.cve_kit, k.nombre,
+                       NVL(SUM(CASE WHEN e.tipo = 'P' THEN e.cantidad END), 0) AS partes,
+                       NVL(SUM(CASE WHEN e.tipo = 'S' THEN e.cantidad END), 0) AS servicios
+                FROM kit k
+                LEFT JOIN kit_elemento e ON e.cve_kit = k.cve_kit
+                GROUP BY k.cve_kit, k.nombre
+                ORDER BY k.nombre
+            """)
+            return fetchall_dict(cur)
+
+    def elementos(self, cve_kit: int) -> dict[str, list[int]]:
+        """{'partes': [cve_parte, ...], 'servicios': [cve_servicio, ...]}"""
+        out: dict[str, list[int]] = {"partes": [], "servicios": []}
+        if not self.disponible():
+            return out
+        with self.db.get_connection().cursor() as cur:
+            # sólo partes/servicios que aún existen en su catálogo
+            cur.execute("""
+                SELECT e.tipo, e.cve_elemento, e.cantidad
+                FROM kit_elemento e
+                WHERE e.cve_kit = :k
+                  AND ((e.tipo = 'P' AND EXISTS (SELECT 1 FROM parte p WHERE p.cve_parte = e.cve_elemento))
+                    OR (e.tipo = 'S' AND EXISTS (SELECT 1 FROM servicio s WHERE s.cve_servicio = e.cve_elemento)))
+                ORDER BY e.tipo, e.cve_elemento
+            """, {"k": int(cve_kit)})
+            for tipo, cve, cant in cur.fetchall():
+                lista = out["partes"] if str(tipo).upper() == "P" else out["servicios"]
+                lista.extend([int(cve)] * max(1, int(cant or 1)))
+        return out
+
+    # ====================== cambios (sin commit) ======================
+    def guardar(self, nombre: str, partes: Iterable[int] | None = None,
+                servicios: Iterable[int] | None = None) -> int:
+        """
+        Crea el kit o, si ya hay uno con ese nombre, reemplaza sus partes y/o
+        servicios (None = deja los que tenía). Devuelve cve_kit.
+        """
+        nombre = str(nombre or "").strip()
+        if not nombre:
+            raise ValueError("El kit necesita nombre")
+        self._disponible = None  # pudieron crearse después de arrancar
+        if not self.disponible():
+            raise RuntimeError(SIN_TABLAS)
+        conn = self.db.get_connection()
+        cuenta: dict[tuple[str, int], int] = {}
+        tipos = [(t, ids) for t, ids in (("P", partes), ("S", servicios)) if ids is not None]
+        for tipo, ids in tipos:
+            for i in ids:
+                cuenta[(tipo, int(i))] = cuenta.get((tipo, int(i)), 0) + 1
+        with conn.cursor() as cur:
+            for tipo, _ids in tipos:
+                self._validar(cur, tipo, {e for (t, e) in cuenta if t == tipo})
+            cur.execute("SELECT cve_kit FROM kit WHERE nombre = :n", {"n": nombre})
+            row = cur.fetchone()
+            if row:
+                cve_kit = int(row[0])
+                for tipo, _ids in tipos:
+                    cur.execute("DELETE FROM kit_elemento WHERE cve_kit = :k AND tipo = :t",
+                                {"k": cve_kit, "t": tipo})
+            else:
+                cve_kit = self.keys.insertar(cur, "kit", "cve_kit", ["nombre"], [":n"], {"n": nombre},
+                                             self.keys.next_id("kit", "cve_kit", conn))
+            if cuenta:
+                cur.executemany(
+                    "INSERT INTO kit_elemento (cve_kit, tipo, cve_elemento, cantidad) VALUES (:k, :t, :e, :c)",
+                    [{"k": cve_kit, "t": t, "e": e, "c": c} for (t, e), c in cuenta.items()],
+                )
+        return cve_kit
+
+    @staticmethod
+    def _validar(cur, tipo: str, ids: set[int]) -> None:
+        """ValueError si algún id no existe en PARTE/SERVICIO."""
+        tabla, llave = CATALOGO[tipo]
+        faltan = set(ids)
+        orden = sorted(ids)
+        for i in range(0, len(orden), 1000):
+            ph, binds = lista_in("e", orden[i:i + 1000])
+            cur.execute(f"SELECT {llave} FROM {tabla} WHERE {llave} IN ({ph})", binds)
+            faltan -= {int(r[0]) for r in cur.fetchall()}
+        if faltan:
+            raise ValueError(f"No existen en {tabla.upper()}: {', '.join(map(str, sorted(faltan)))}")
+
+    def eliminar(self, cve_kit: int) -> int:
+        if not self.disponible():
+            return 0
+        with self.db.get_connection().cursor() as cur:
+            cur.execute("DELETE FROM kit WHERE cve_kit = :k", {"k": int(cve_kit)})
+            return cur.rowcount or 0
+
+
+__all__ = ["KitModelo", "DDL", "SIN_TABLAS"]
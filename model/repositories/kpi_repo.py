@@ -0,0 +1,444 @@
+# model/repositories/kpi_repo.py
+from __future__ import annotations
+from typing import Iterable, Protocol
+import oracledb
+from .base import DBLike, fetchall_dict
+from model.db.sentencias import lista_in
+
+
+# Bucket para órdenes sin ninguna fecha conocida (la llave del rollup no admite NULL)
+SIN_FECHA = "DATE '2000-01-01'"
+
+# Tablas de KPIs (ver kpi_rollup.py para crearlas y reconstruirlas)
+DDL = {
+    "ORDEN_STATUS_HIST": """
+        CREATE TABLE orden_status_hist (
+            cve_orden   NUMBER       NOT NULL,
+            cve_status  NUMBER       NOT NULL,
+            desde       TIMESTAMP    DEFAULT SYSTIMESTAMP NOT NULL
+        )""",
+    "KPI_PENDIENTE": """
+        CREATE TABLE kpi_pendiente (
+            cve_orden   NUMBER       NOT NULL,
+            dia         DATE         DEFAULT TRUNC(SYSDATE) NOT NULL
+        )""",
+    "KPI_ORDEN_DIA": """
+        CREATE TABLE kpi_orden_dia (
+            cve_orden   NUMBER       NOT NULL,
+            dia         DATE         NOT NULL,
+            CONSTRAINT kpi_orden_dia_pk PRIMARY KEY (cve_orden)
+        )""",
+    "KPI_DIARIO": """
+        CREATE TABLE kpi_diario (
+            dia         DATE         NOT NULL,
+            cve_taller  NUMBER       NOT NULL,
+            cve_status  NUMBER       NOT NULL,
+            ordenes     NUMBER       NOT NULL,
+            partes      NUMBER(14,2) NOT NULL,
+            servicios   NUMBER(14,2) NOT NULL,
+            mano_obra   NUMBER(14,2) NOT NULL,
+            horas       NUMBER(12,2) NOT NULL,
+            CONSTRAINT kpi_diario_pk PRIMARY KEY (dia, cve_taller, cve_status)
+        )""",
+    "KPI_TECNICO_DIARIO": """
+        CREATE TABLE kpi_tecnico_diario (
+            dia          DATE         NOT NULL,
+            cve_empleado NUMBER       NOT NULL,
+            cve_taller   NUMBER       NOT NULL,
+            horas        NUMBER(12,2) NOT NULL,
+            ordenes      NUMBER       NOT NULL,
+            CONSTRAINT kpi_tecnico_diario_pk PRIMARY KEY (dia, cve_empleado, cve_taller)
+        )""",
+    "KPI_TURNAROUND_DIARIO": """
+        CREATE TABLE kpi_turnaround_diario (
+            dia         DATE         NOT NULL,
+            cve_taller  NUMBER       NOT NULL,
+            cve_status  NUMBER       NOT NULL,
+            intervalos  NUMBER       NOT NULL,
+            horas       NUMBER(14,2) NOT NULL,
+            CONSTRAINT kpi_turnaround_diario_pk PRIMARY KEY (dia, cve_taller, cve_status)
+        )""",
+}
+INDICES = (
+    "CREATE INDEX orden_status_hist_ix ON orden_status_hist (cve_orden, desde)",
+)
+
+
+class IKpiRepo(Protocol):
+    def disponible(self) -> bool: ...
+    def marcar(self, cve_orden: int, cve_status: int | None = None) -> None: ...
+    def refrescar(self) -> int: ...
+    def reconstruir(self) -> None: ...
+    def resumen(self, desde=None, hasta=None, taller: int | None = None) -> list[dict]: ...
+    def horas_por_tecnico(self, desde=None, hasta=None, taller: int | None = None) -> list[dict]: ...
+    def turnaround(self, desde=None, hasta=None, taller: int | None = None) -> list[dict]: ...
+
+
+class KpiModelo(IKpiRepo):
+    """
+    KPIs operativos leídos de tablas de rollup diarias:
+      - KPI_DIARIO: por día/taller/status, órdenes e ingreso (partes,
+        servicios y tarifa×horas) y horas.
+      - KPI_TECNICO_DIARIO: horas por técnico por día/taller.
+      - KPI_TURNAROUND_DIARIO: tiempo en cada status (de ORDEN_STATUS_HIST),
+        por el día en que la orden salió de ese status.
+    Cada cambio de orden/parte/servicio/horas deja una marca en KPI_PENDIENTE
+    dentro de la misma transacción (marcar()); refrescar() recalcula sólo los
+    días de esas órdenes con INSERT ... SELECT por conjuntos y borra las marcas.
+    El día de una orden es su columna de fecha si ORDEN la tiene; si no, su
+    primer registro en ORDEN_STATUS_HIST (el alta). KPI_ORDEN_DIA guarda el
+    día con el que se contó cada orden: si cambia (p. ej. una orden anterior a
+    los KPIs recibe su primer status) se recalculan el día viejo y el nuevo.
+    Si las tablas no existen (kpi_rollup.py no se ha corrido) todo es no-op.
+    """
+
+    def __init__(self, db: DBLike, schema=None) -> None:
+        self.db = db
+        self.schema = schema  # SchemaIntrospector: tabla de partes y fecha de ORDEN
+        self._disponible: bool | None = None
+
+    # ====================== tablas ======================
+    def disponible(self) -> bool:
+        if self._disponible is None:
+            try:
+                with self.db.get_connection().cursor() as cur:
+                    names = list(DDL)
+                    binds = {f"t{i}": n for i, n in enumerate(names)}
+                    cur.execute(
+                        "SELECT COUNT(*) FROM user_tables "
+                        f"WHERE table_name IN ({', '.join(':' + b for b in binds)})",
+                        binds,
+                    )
+                    self._disponible = int(cur.fetchone()[0]) == len(names)
+            except Exception:
+                self._disponible = False
+        return self._disponible
+
+    def crear_tablas(self) -> list[str]:
+        """Crea las tablas que falten. Devuelve las creadas."""
+        creadas: list[str] = []
+        conn = self.db.get_connection()
+        with conn.cursor() as cur:
+            for name, ddl in list(DDL.items()) + [(None, ix) for ix in INDICES]:
+                try:
+                    cur.execute(ddl)
+                    if name:
+                        creadas.append(name)
+                except oracledb.DatabaseError as ex:
+                    # ORA-00955: ya existe / ORA-01408: índice ya existe
+                    if not any(c in str(ex) for c in ("ORA-00955", "ORA-01408")):
+                        raise
+        self._disponible = None
+        return creadas
+
+    # ====================== marcas ======================
+    def marcar(self, cve_orden: int, cve_status: int | None = None) -> None:
+        """
+        Anota la orden como pendiente de rollup (y su status en el historial si
+        cambió). No hace commit: viaja en la transacción del cambio.
+        """
+        if not self.disponible():
+            return
+        conn = self.db.get_connection()
+        with conn.cursor() as cur:
+            cur.execute("INSERT INTO kpi_pendiente (cve_orden) VALUES (:o)", {"o": int(cve_orden)})
+            if cve_status is not None:
+                cur.execute("""
+                    INSERT INTO orden_status_hist (cve_orden, cve_status)
+                    SELECT :o, :s FROM dual
+                    WHERE NVL((SELECT MAX(h.cve_status) KEEP (DENSE_RANK LAST ORDER BY h.desde)
+                               FROM orden_status_hist h WHERE h.cve_orden = :o), -1) <> :s
+                """, {"o": int(cve_orden), "s": int(cve_status)})
+
+    def orden_de(self, table: str, pk_col: str, pk: int) -> int | None:
+        """cve_orden de una fila de orden_parte/orden_servicio (antes de borrarla)."""
+        if not self.disponible():
+            return None
+        with self.db.get_connection().cursor() as cur:
+            cur.execute(f"SELECT cve_orden FROM {table} WHERE {pk_col} = :id", {"id": int(pk)})
+            row = cur.fetchone()
+        return int(row[0]) if row else None
+
+    # ====================== rollups ======================
+    def _partes_map(self) -> dict:
+        if self.schema is not None:
+            try:
+                m = self.schema.orden_parte()
+                if m.get("_table"):
+                    return m
+            except Exception:
+                pass
+        return {"_table": "orden_parte", "fk": "cve_parte"}
+
+    def _dia_expr(self) -> tuple[str, str]:
+        """(expresión del día de la orden, JOINs que necesita)."""
+        col = None
+        if self.schema is not None:
+            try:
+                col = self.schema.orden().get("fecha")
+            except Exception:
+                col = None
+        joins = (
+            " LEFT JOIN (SELECT cve_orden, MIN(desde) AS desde FROM orden_status_hist"
+            " GROUP BY cve_orden) hf ON hf.cve_orden = o.cve_orden"
+        )
+        first = f"o.{col}, " if col else ""
+        return f"TRUNC(COALESCE({first}CAST(hf.desde AS DATE), {SIN_FECHA}))", joins
+
+    def _base_cte(self) -> str:
+        dia, joins = self._dia_expr()
+        op = self._partes_map()
+        return f"""
+            WITH base AS (
+                SELECT o.cve_orden, o.cve_taller, o.cve_status, {dia} AS dia,
+                       NVL(te.tarifa, 0) AS tarifa
+                FROM orden o
+                LEFT JOIN tipo_equipo te ON te.cve_tipo_equipo = o.cve_tipo_equipo
+                {joins}
+            ),
+            pp AS (SELECT op.cve_orden, SUM(p.precio) AS partes
+                   FROM {op['_table']} op JOIN parte p ON p.cve_parte = op.{op['fk']}
+                   GROUP BY op.cve_orden),
+            ss AS (SELECT os.cve_orden, SUM(s.precio) AS servicios
+                   FROM orden_servicio os JOIN servicio s ON s.cve_servicio = os.cve_servicio
+                   GROUP BY os.cve_orden),
+            hh AS (SELECT cve_orden, SUM(horas) AS horas FROM orden_tecnicos GROUP BY cve_orden)
+        """
+
+    @staticmethod
+    def _in_dias(dias: list, prefijo: str) -> tuple[str, dict]:
+        return lista_in(prefijo, dias)
+
+    def _recalcular(self, cur, dias_orden: list | None, dias_cambio: list | None) -> None:
+        """dias_*=None: todo; lista: sólo esos días (borra y vuelve a insertar)."""
+        base = self._base_cte()
+
+        for tabla in ("kpi_diario", "kpi_tecnico_diario"):
+            filtro, binds = "", {}
+            if dias_orden is not None:
+                if not dias_orden:
+                    continue
+                ph, binds = self._in_dias(dias_orden, "d")
+                filtro = f" WHERE dia IN ({ph})"
+            cur.execute(f"DELETE FROM {tabla}{filtro}", binds)
+
+        filtro, binds = "", {}
+        if dias_orden is not None and dias_orden:
+            ph, binds = self._in_dias(dias_orden, "d")
+            filtro = f" WHERE b.dia IN ({ph})"
+        if dias_orden is None or dias_orden:
+            cur.execute(f"""
+                INSERT INTO kpi_diario (dia, cve_taller, cve_status, ordenes, partes, servicios, mano_obra, horas)
+                {base}
+                SELECT b.dia, b.cve_taller, b.cve_status, COUNT(*),
+                       SUM(NVL(pp.partes, 0)), SUM(NVL(ss.servicios, 0)),
+                       SUM(ROUND(b.tarifa * NVL(hh.horas, 0), 2)), SUM(NVL(hh.horas, 0))
+                FROM base b
+                LEFT JOIN pp ON pp.cve_orden = b.cve_orden
+                LEFT JOIN ss ON ss.cve_orden = b.cve_orden
+                LEFT JOIN hh ON hh.cve_orden = b.cve_orden
+                {filtro}
+                GROUP BY b.dia, b.cve_taller, b.cve_status
+            """, binds)
+            cur.execute(f"""
+                INSERT INTO kpi_tecnico_diario (dia, cve_empleado, cve_taller, horas, ordenes)
+                {base}
+                SELECT b.dia, ot.cve_empleado, b.cve_taller,
+                       SUM(NVL(ot.horas, 0)), COUNT(DISTINCT ot.cve_orden)
+                FROM base b
+                JOIN orden_tecnicos ot ON ot.cve_orden = b.cve_orden
+                {filtro}
+                GROUP BY b.dia, ot.cve_empleado, b.cve_taller
+            """, binds)
+
+        if dias_cambio is not None and not dias_cambio:
+            return
+        filtro, binds = "", {}
+        if dias_cambio is not None:
+            ph, binds = self._in_dias(dias_cambio, "c")
+            filtro = f" AND TRUNC(CAST(h.hasta AS DATE)) IN ({ph})"
+            cur.execute(f"DELETE FROM kpi_turnaround_diario WHERE dia IN ({ph})", binds)
+        else:
+            cur.execute("DELETE FROM kpi_turnaround_diario")
+        cur.execute(f"""
+            INSERT INTO kpi_turnaround_diario (dia, cve_taller, cve_status, intervalos, horas)
+            SELECT TRUNC(CAST(h.hasta AS DATE)), o.cve_taller, h.cve_status, COUNT(*),
+                   SUM((CAST(h.hasta AS DATE) - CAST(h.desde AS DATE)) * 24)
+            FROM (SELECT cve_orden, cve_status, desde,
+                         LEAD(desde) OVER (PARTITION BY cve_orden ORDER BY desde) AS hasta
+                  FROM orden_status_hist) h
+            JOIN orden o ON o.cve_orden = h.cve_orden
+            WHERE h.hasta IS NOT NULL{filtro}
+            GROUP BY TRUNC(CAST(h.hasta AS DATE)), o.cve_taller, h.cve_status
+        """, binds)
+
+    def _guardar_dias(self, cur, filtro: str, binds: dict) -> None:
+        """Anota en KPI_ORDEN_DIA el día con el que se cuenta cada orden (de `filtro`)."""
+        dia, joins = self._dia_expr()
+        cur.execute(f"""
+            MERGE INTO kpi_orden_dia d
+            USING (SELECT o.cve_orden, {dia} AS dia FROM orden o{joins}{filtro}) n
+            ON (d.cve_orden = n.cve_orden)
+            WHEN MATCHED THEN UPDATE SET d.dia = n.dia WHERE d.dia <> n.dia
+            WHEN NOT MATCHED THEN INSERT (cve_orden, dia) VALUES (n.cve_orden, n.dia)
+        """, binds)
+
+    def refrescar(self) -> int:
+        """
+        Aplica las marcas pendientes (de todas las sesiones) en una conexión
+        aparte y hace COMMIT. Devuelve cuántas marcas se procesaron; 0 si otra
+        sesión ya está refrescando (ella aplica las marcas).
+        """
+        if not self.disponible():
+            return 0
+        with self.db.checkout() as conn:
+            cur = conn.cursor()
+            try:
+                if not self._bloquear(cur, esperar=False):
+                    return 0
+                cur.execute("SELECT ROWIDTOCHAR(ROWID), cve_orden, dia FROM kpi_pendiente")
+                marcas = cur.fetchall()
+                if not marcas:
+                    conn.rollback()  # suelta el candado
+                    return 0
+                ids = sorted({int(r[1]) for r in marcas})
+                dias_cambio = sorted({r[2] for r in marcas})
+
+                # días de las órdenes marcadas: el que tienen ahora y con el que
+                # se contaron antes (KPI_ORDEN_DIA), en lotes de 1000 para el IN
+                dia, joins = self._dia_expr()
+                dias_orden: set = set()
+                for i in range(0, len(ids), 1000):
+                    chunk = ids[i:i + 1000]
+                    ph, binds = self._in_dias(chunk, "o")
+                    cur.execute(
+                        f"SELECT DISTINCT {dia} FROM orden o{joins} WHERE o.cve_orden IN ({ph})"
+                        f" UNION SELECT dia FROM kpi_orden_dia WHERE cve_orden IN ({ph})",
+                        binds,
+                    )
+                    dias_orden.update(r[0] for r in cur.fetchall())
+                    self._guardar_dias(cur, f" WHERE o.cve_orden IN ({ph})", binds)
+
+                # más de 1000 días no caben en un IN: se recalcula todo
+                self._recalcular(
+                    cur,
+                    sorted(dias_orden) if len(dias_orden) <= 1000 else None,
+                    dias_cambio if len(dias_cambio) <= 1000 else None,
+                )
+                cur.executemany(
+                    "DELETE FROM kpi_pendiente WHERE ROWID = CHARTOROWID(:r)",
+                    [{"r": r[0]} for r in marcas],
+                )
+                conn.commit()
+                return len(marcas)
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cur.close()
+
+    @staticmethod
+    def _bloquear(cur, esperar: bool) -> bool:
+        """
+        Un solo refresco a la vez: candado de KPI_ORDEN_DIA (sólo la escriben
+        refrescar/reconstruir, así que marcar() no se bloquea). Se suelta con
+        el COMMIT/ROLLBACK. Sin esperar: False si otra sesión lo tiene.
+        """
+        try:
+            cur.execute("LOCK TABLE kpi_orden_dia IN EXCLUSIVE MODE" + ("" if esperar else " NOWAIT"))
+            return True
+        except oracledb.DatabaseError as ex:
+            if not esperar and "ORA-00054" in str(ex):  # recurso ocupado
+                return False
+            raise
+
+    def reconstruir(self) -> None:
+        """Recalcula todos los rollups desde cero (primera carga o tras importar)."""
+        if not self.disponible():
+            return
+        with self.db.checkout() as conn:
+            cur = conn.cursor()
+            try:
+                self._bloquear(cur, esperar=True)
+                cur.execute("DELETE FROM kpi_pendiente")
+                cur.execute("DELETE FROM kpi_orden_dia")
+                self._guardar_dias(cur, "", {})
+                self._recalcular(cur, None, None)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cur.close()
+
+    # ====================== lecturas ======================
+    @staticmethod
+    def _rango(alias: str, desde, hasta, taller) -> tuple[str, dict]:
+        where, binds = [], {}
+        if desde is not None:
+            where.append(f"{alias}.dia >= TRUNC(:desde)")
+            binds["desde"] = desde
+        if hasta is not None:
+            where.append(f"{alias}.dia <= TRUNC(:hasta)")
+            binds["hasta"] = hasta
+        if taller is not None:
+            where.append(f"{alias}.cve_taller = :taller")
+            binds["taller"] = int(taller)
+        return (" WHERE " + " AND ".join(where)) if where else "", binds
+
+    def _leer(self, sql: str, binds: dict) -> list[dict]:
+        if not self.disponible():
+            return []
+        with self.db.get_connection().cursor() as cur:
+            cur.execute(sql, binds)
+            return fetchall_dict(cur)
+
+    def resumen(self, desde=None, hasta=None, taller: int | None = None) -> list[dict]:
+        """Por taller: ordenes, partes, servicios, mano_obra, ingreso y horas."""
+        where, binds = self._rango("k", desde, hasta, taller)
+        return self._leer(f"""
+            SELECT k.cve_taller, SUM(k.ordenes) AS ordenes,
+                   SUM(k.partes) AS partes, SUM(k.servicios) AS servicios,
+                   SUM(k.mano_obra) AS mano_obra,
+                   SUM(k.partes + k.servicios + k.mano_obra) AS ingreso,
+                   SUM(k.horas) AS horas
+            FROM kpi_diario k{where}
+            GROUP BY k.cve_taller
+            ORDER BY k.cve_taller
+        """, binds)
+
+    def por_dia(self, desde=None, hasta=None, taller: int | None = None) -> list[dict]:
+        """Serie diaria de ingreso y órdenes."""
+        where, binds = self._rango("k", desde, hasta, taller)
+        return self._leer(f"""
+            SELECT k.dia, SUM(k.ordenes) AS ordenes,
+                   SUM(k.partes + k.servicios + k.mano_obra) AS ingreso
+            FROM kpi_diario k{where}
+            GROUP BY k.dia
+            ORDER BY k.dia
+        """, binds)
+
+    def horas_por_tecnico(self, desde=None, hasta=None, taller: int | None = None) -> list[dict]:
+        where, binds = self._rango("k", desde, hasta, taller)
+        return self._leer(f"""
+            SELECT k.cve_empleado, e.nombre || ' ' || e.paterno AS tecnico,
+                   SUM(k.horas) AS horas, SUM(k.ordenes) AS ordenes
+            FROM kpi_tecnico_diario k
+            JOIN empleado e ON e.cve_empleado = k.cve_empleado{where}
+            GROUP BY k.cve_empleado, e.nombre, e.paterno
+            ORDER BY horas DESC
+        """, binds)
+
+    def turnaround(self, desde=None, hasta=None, taller: int | None = None) -> list[dict]:
+        """Horas promedio en cada status, por taller."""
+        where, binds = self._rango("k", desde, hasta, taller)
+        return self._leer(f"""
+            SELECT k.cve_taller, k.cve_status, SUM(k.intervalos) AS intervalos,
+                   ROUND(SUM(k.horas) / NULLIF(SUM(k.intervalos), 0), 2) AS horas_promedio
+            FROM kpi_turnaround_diario k{where}
+            GROUP BY k.cve_taller, k.cve_status
+            ORDER BY k.cve_taller, k.cve_status
+        """, binds)
+
+
+__all__: Iterable[str] = ["KpiModelo", "DDL"]
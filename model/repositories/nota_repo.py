@@ -1,17 +1,47 @@
 # model/repositories/nota_repo.py
+import threading
+
 from model.oracle_model import OracleDB
 
+# Columnas por (DSN|ESQUEMA, tabla), compartidas por todas las sesiones del
+# proceso que usan el mismo esquema (el DDL no cambia en caliente;
+# olvidar_columnas() para forzar la relectura)
+_COLUMNAS: dict = {}
+_COLUMNAS_LOCK = threading.Lock()
+
+
 class NotaModelo:
-    def __init__(self, db: OracleDB):
+    def __init__(self, db: OracleDB, schema=None):
         self.db = db
+        self.schema = schema  # SchemaIntrospector opcional (llave DSN|ESQUEMA del caché)
+
+    def _columnas(self, table: str) -> frozenset:
+        tabla = table.upper()
+        key = (self.schema.cache_key() if self.schema is not None else "", tabla)
+        cols = _COLUMNAS.get(key)
+        if cols is None:
+            cur = self.db.get_connection().cursor()
+            try:
+                cur.execute("SELECT COLUMN_NAME FROM USER_TAB_COLS WHERE TABLE_NAME=:t", {"t": tabla})
+                cols = frozenset(str(r[0]).upper() for r in cur.fetchall() or [])
+            finally:
+                cur.close()
+            with _COLUMNAS_LOCK:
+                _COLUMNAS[key] = cols
+        return cols
 
     def _has_col(self, table: str, col: str) -> bool:
-        cur = self.db.get_connection().cursor()
-        cur.execute(
-            "SELECT COUNT(*) FROM USER_TAB_COLS WHERE TABLE_NAME=:t AND COLUMN_NAME=:c",
-            {"t": table.upper(), "c": col.upper()},
-        )
-        return (cur.fetchone() or [0])[0] > 0
+        return col.upper() in self._columnas(table)
+
+    @staticmethod
+    def olvidar_columnas() -> None:
+        with _COLUMNAS_LOCK:
+            _COLUMNAS.clear()
+
+    def _sql_insert(self) -> str:
+        if self._has_col("ORDEN_NOTA", "FECHA"):
+            return "INSERT INTO orden_nota (cve_orden, nota, fecha) VALUES (:o, :n, SYSDATE)"
+        return "INSERT INTO orden_nota (cve_orden, nota) VALUES (:o, :n)"
 
     def listar(self, cve_orden: int):
         cur = self.db.get_connection().cursor()
@@ -23,10 +53,18 @@ class NotaModelo:
     def insertar(self, cve_orden: int, nota: str):
         conn = self.db.get_connection()
         cur = conn.cursor()
-        if self._has_col("ORDEN_NOTA", "FECHA"):
-            sql = "INSERT INTO orden_nota (cve_orden, nota, fecha) VALUES (:o, :n, SYSDATE)"
-        else:
-            sql = "INSERT INTO orden_nota (cve_orden, nota) VALUES (:o, :n)"
-        cur.execute(sql, {"o": int(cve_orden), "n": nota})
+        cur.execute(self._sql_insert(), {"o": int(cve_orden), "n": nota})
         conn.commit()
-        return 1
\ No newline at end of file
+        return 1
+
+    def insertar_lote(self, notas) -> int:
+        """
+        [(cve_orden, nota), ...] en un solo executemany. No hace commit: lo
+        hace quien vacía el lote (ver controller/notas_pendientes.py).
+        """
+        filas = [{"o": int(o), "n": n} for o, n in notas]
+        if not filas:
+            return 0
+        with self.db.get_connection().cursor() as cur:
+            cur.executemany(self._sql_insert(), filas)
+        return len(filas)
@@ -1,8 +1,12 @@
 # model/repositories/orden_repo.py
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Protocol
+from dataclasses import dataclass, field
+from typing import Iterable, Protocol
 from .base import DBLike, fetchall_dict
+from model.db.keys import KeyAllocator
+from model.db.oracle import decimal_output_handler
+from model.db.sentencias import REGISTRO, lista_in
+from .precios_repo import sql_agregados
 
 # Opcional: entidad usada por el dashboard
 @dataclass(slots=True)
@@ -17,24 +21,101 @@ class OrdenResumen:
     horas: int
     tecnicos: list[str]
 
+# Todo lo de una orden (reporte, edición, notas) cargado de una vez
+@dataclass(slots=True)
+class OrdenDetalle:
+    cve_orden: int
+    cve_status: int
+    eq_marca: str
+    eq_modelo: str
+    cve_tipo_equipo: int
+    cve_taller: int | None
+    cve_cliente: int | None
+    notas_cliente: str
+    cliente: str
+    partes: list[dict] = field(default_factory=list)     # cve_orden_parte, cve_parte, part_no, descripcion, precio
+    servicios: list[dict] = field(default_factory=list)  # cve_orden_servicio, cve_servicio, descripcion, precio
+    tecnicos: list[dict] = field(default_factory=list)   # cve_empleado, nombre, paterno, horas
+    notas: list[dict] = field(default_factory=list)      # nota, fecha
+
+    @property
+    def horas(self) -> float:
+        return float(sum((t.get("horas") or 0) for t in self.tecnicos))
+
+    @property
+    def cve_tecnico(self) -> int | None:
+        return self.tecnicos[0].get("cve_empleado") if self.tecnicos else None
+
 class IOrdenRepo(Protocol):
-    def listar(self) -> list[OrdenResumen]: ...
+    def listar(self, page_size: int | None = None, after_cve_orden: int | None = None,
+               status: int | Iterable[int] | None = None, taller: int | None = None,
+               direction: str = "desc", ordenes: Iterable[int] | None = None) -> list[OrdenResumen]: ...
     def actualizar(self, cve_orden: int, **kwargs) -> int: ...
     def insertar(self, cve_status: int, eq_marca: str, eq_modelo: str,
                  cve_tipo_equipo: int, notas_cliente: str,
                  cliente: int, cve_taller: int, cve_tecnico: int) -> int: ...
     def tecnicos_orden(self, cve_orden: int, incluir_horas: bool = False) -> list[str] | list[dict]: ...
     def cliente_id_por_orden(self, cve_orden: int) -> int | None: ...
+    def detalle(self, cve_orden: int) -> OrdenDetalle | None: ...
+    def conteo(self, agrupar: Iterable[str] = ("status",), taller: int | None = None,
+               desde=None, hasta=None) -> list[dict]: ...
+    def totales(self, after_cve_orden: int | None = None, page_size: int = 500,
+                taller: int | None = None, desde=None, hasta=None) -> list[dict]: ...
 
 class OrdenModelo(IOrdenRepo):
     """Implementación Oracle basada en OracleDB (db.get_connection())."""
-    def __init__(self, db: DBLike) -> None:
+    def __init__(self, db: DBLike, keys: KeyAllocator | None = None, schema=None) -> None:
         self.db = db
+        self.keys = keys or KeyAllocator(db)
+        self.schema = schema  # SchemaIntrospector opcional (tabla de partes por orden)
 
-    def listar(self) -> list[OrdenResumen]:
-        conn = self.db.get_connection()
-        cur = conn.cursor()
-        cur.execute("""
+    def listar(
+        self,
+        page_size: int | None = None,
+        after_cve_orden: int | None = None,
+        status: int | Iterable[int] | None = None,
+        taller: int | None = None,
+        direction: str = "desc",
+        ordenes: Iterable[int] | None = None,
+    ) -> list[OrdenResumen]:
+        """
+        Lista órdenes con filtros y orden resueltos en SQL.
+        - page_size=None: todas las filas (comportamiento original).
+        - after_cve_orden: cursor keyset (última cve_orden de la página anterior).
+        - status: id o ids de cve_status; taller: cve_taller.
+        - direction: "desc" (más recientes primero) o "asc".
+        - ordenes: sólo esas cve_orden (para refrescar filas editadas).
+        Los técnicos se leen sólo para las órdenes de la página.
+        """
+        asc = str(direction).lower() == "asc"
+        where: list[str] = []
+        binds: dict = {}
+
+        if after_cve_orden is not None:
+            where.append("o.cve_orden > :after" if asc else "o.cve_orden < :after")
+            binds["after"] = int(after_cve_orden)
+
+        if status is not None:
+            ids = [int(status)] if isinstance(status, (int, str)) else [int(x) for x in status]
+            if not ids:
+                return []
+            ph, st_binds = lista_in("st", sorted(set(ids)))
+            where.append(f"o.cve_status IN ({ph})")
+            binds.update(st_binds)
+
+        if taller is not None:
+            where.append("o.cve_taller = :taller")
+            binds["taller"] = int(taller)
+
+        if ordenes is not None:
+            ids = sorted({int(x) for x in ordenes})
+            if not ids:
+                return []
+            ph, ord_binds = lista_in("ord", ids)
+            where.append(f"o.cve_orden IN ({ph})")
+            binds.update(ord_binds)
+
+        base_sql = """
             SELECT  o.cve_orden,
                     o.cve_status,
                     o.eq_marca,
@@ -47,18 +128,49 @@ class OrdenModelo(IOrdenRepo):
                           WHERE ot.cve_orden = o.cve_orden), 0 ) AS horas_tot
             FROM orden o
             JOIN cliente c ON c.cve_cliente = o.cve_cliente
-            ORDER BY o.cve_orden DESC
-        """)
+        """
+
+        def _armar() -> str:
+            sql = base_sql
+            if where:
+                sql += " WHERE " + " AND ".join(where)
+            sql += " ORDER BY o.cve_orden " + ("ASC" if asc else "DESC")
+            if page_size is not None:
+                sql += " FETCH FIRST :n ROWS ONLY"
+            return sql
+
+        # la forma (filtros y tamaño de cada IN) determina el texto
+        sql = REGISTRO.sql(("orden.listar", tuple(where), asc, page_size is not None), _armar)
+        if page_size is not None:
+            binds["n"] = max(1, int(page_size))
+
+        conn = self.db.get_connection()
+        cur = conn.cursor()
+        cur.execute(sql, binds)
         base = fetchall_dict(cur)
+        if not base:
+            return []
 
-        # Técnicos por orden
-        tecnicos_map: dict[int, list[str]] = {}
-        cur.execute("""
+        # Técnicos por orden (sólo los de la página si hay filtros/paginación)
+        tec_sql = """
             SELECT ot.cve_orden, e.nombre, e.paterno
             FROM orden_tecnicos ot
             JOIN empleado e ON e.cve_empleado = ot.cve_empleado
-        """)
-        for r in fetchall_dict(cur):
+        """
+        tec_rows: list[dict] = []
+        if page_size is None and not where:
+            cur.execute(tec_sql)
+            tec_rows = fetchall_dict(cur)
+        else:
+            ids = [int(r["cve_orden"]) for r in base]
+            # Oracle admite hasta 1000 expresiones en un IN
+            for i in range(0, len(ids), 1000):
+                ph, o_binds = lista_in("o", ids[i:i + 1000])
+                cur.execute(tec_sql + f" WHERE ot.cve_orden IN ({ph})", o_binds)
+                tec_rows.extend(fetchall_dict(cur))
+
+        tecnicos_map: dict[int, list[str]] = {}
+        for r in tec_rows:
             nom = (r.get("nombre") or "").strip()
             pat = (r.get("paterno") or "").strip()
             full = (nom + " " + pat).strip()
@@ -81,6 +193,98 @@ class OrdenModelo(IOrdenRepo):
             )
         return out
 
+    # === Detalle completo: encabezado + (partes, servicios, técnicos, notas) ===
+    def _orden_parte_map(self) -> dict:
+        if self.schema is not None:
+            try:
+                m = self.schema.orden_parte()
+                if m.get("_table"):
+                    return m
+            except Exception:
+                pass
+        return {"_table": "orden_parte", "pk": "cve_orden_parte", "fk": "cve_parte"}
+
+    def detalle(self, cve_orden: int) -> OrdenDetalle | None:
+        """
+        Dos idas a la base: el encabezado y un UNION ALL con las partes,
+        servicios, técnicos (con horas) y notas de la orden, distinguidos
+        por la columna `kind` (P/S/T/N).
+        """
+        ord_id = int(cve_orden)
+        conn = self.db.get_connection()
+        cur = conn.cursor()
+        try:
+            cur.execute("""
+                SELECT  o.cve_orden, o.cve_status, o.eq_marca, o.eq_modelo,
+                        o.cve_tipo_equipo, o.cve_taller, o.cve_cliente, o.notas_cliente,
+                        c.nombre || ' ' || c.paterno || ' ' || NVL(c.materno,'') AS cliente
+                FROM orden o
+                LEFT JOIN cliente c ON c.cve_cliente = o.cve_cliente
+                WHERE o.cve_orden = :ord
+            """, dict(ord=ord_id))
+            head = fetchall_dict(cur)
+            if not head:
+                return None
+            h = head[0]
+
+            op = self._orden_parte_map()
+            # columnas homogéneas para poder unir las cuatro listas
+            sql = f"""
+                SELECT 'P' AS kind, op.{op['pk']} AS id, p.cve_parte AS ref_id,
+                       TO_CHAR(p.part_no) AS txt1, TO_CHAR(p.descripcion) AS txt2,
+                       p.precio AS num1, CAST(NULL AS DATE) AS fecha
+                FROM {op['_table']} op
+                JOIN parte p ON p.cve_parte = op.{op['fk']}
+                WHERE op.cve_orden = :ord
+                UNION ALL
+                SELECT 'S', os.cve_orden_servicio, s.cve_servicio,
+                       CAST(NULL AS VARCHAR2(1)), TO_CHAR(s.descripcion), s.precio, CAST(NULL AS DATE)
+                FROM orden_servicio os
+                JOIN servicio s ON s.cve_servicio = os.cve_servicio
+                WHERE os.cve_orden = :ord
+                UNION ALL
+                SELECT 'T', NULL, ot.cve_empleado,
+                       TO_CHAR(e.nombre), TO_CHAR(e.paterno), ot.horas, CAST(NULL AS DATE)
+                FROM orden_tecnicos ot
+                JOIN empleado e ON e.cve_empleado = ot.cve_empleado
+                WHERE ot.cve_orden = :ord
+                UNION ALL
+                SELECT 'N', NULL, NULL, CAST(NULL AS VARCHAR2(1)), TO_CHAR(n.nota), NULL, n.fecha
+                FROM orden_nota n
+                WHERE n.cve_orden = :ord
+                ORDER BY 1, 7 DESC NULLS LAST, 2 DESC NULLS LAST
+            """
+            cur.execute(sql, dict(ord=ord_id))
+            rows = cur.fetchall() or []
+        finally:
+            try: cur.close()
+            except: pass
+
+        det = OrdenDetalle(
+            cve_orden=int(h["cve_orden"]),
+            cve_status=int(h["cve_status"]),
+            eq_marca=str(h.get("eq_marca") or ""),
+            eq_modelo=str(h.get("eq_modelo") or ""),
+            cve_tipo_equipo=int(h["cve_tipo_equipo"]),
+            cve_taller=int(h["cve_taller"]) if h.get("cve_taller") is not None else None,
+            cve_cliente=int(h["cve_cliente"]) if h.get("cve_cliente") is not None else None,
+            notas_cliente=str(h.get("notas_cliente") or ""),
+            cliente=str(h.get("cliente") or "").strip(),
+        )
+        for kind, _id, ref_id, txt1, txt2, num1, fecha in rows:
+            if kind == "P":
+                det.partes.append({"cve_orden_parte": int(_id), "cve_parte": int(ref_id),
+                                   "part_no": txt1, "descripcion": txt2, "precio": num1})
+            elif kind == "S":
+                det.servicios.append({"cve_orden_servicio": int(_id), "cve_orden": ord_id,
+                                      "cve_servicio": int(ref_id), "descripcion": txt2, "precio": num1})
+            elif kind == "T":
+                det.tecnicos.append({"cve_empleado": ref_id, "nombre": txt1,
+                                     "paterno": txt2, "horas": num1})
+            elif kind == "N":
+                det.notas.append({"nota": txt2, "fecha": fecha})
+        return det
+
     # === NUEVO: requerido por la fachada ===
     def cliente_id_por_orden(self, cve_orden: int) -> int | None:
         conn = self.db.get_connection()
@@ -96,6 +300,143 @@ class OrdenModelo(IOrdenRepo):
             try: cur.close()
             except: pass
 
+    def _fecha_orden_col(self) -> str | None:
+        if self.schema is not None:
+            try:
+                return self.schema.orden().get("fecha")
+            except Exception:
+                pass
+        return None
+
+    def conteo(
+        self,
+        agrupar: Iterable[str] = ("status",),
+        taller: int | None = None,
+        desde=None,
+        hasta=None,
+    ) -> list[dict]:
+        """
+        Conteo de órdenes con GROUP BY en la base (no trae las órdenes).
+        - agrupar: combinación de "status", "taller" y "mes" ('YYYY-MM').
+        - desde/hasta (date, incluyentes) filtran por la fecha de la orden: la
+          columna de fecha de ORDEN si existe; si no, la de su primera nota.
+        Devuelve dicts con las llaves agrupadas (cve_status, cve_taller, mes) y n.
+        """
+        agrupar = [g for g in agrupar if g in ("status", "taller", "mes")]
+        usa_fecha = "mes" in agrupar or desde is not None or hasta is not None
+
+        joins = ""
+        fecha = None
+        if usa_fecha:
+            col = self._fecha_orden_col()
+            if col:
+                fecha = f"o.{col}"
+            else:
+                joins = (" LEFT JOIN (SELECT cve_orden, MIN(fecha) AS fecha FROM orden_nota"
+                         " GROUP BY cve_orden) nf ON nf.cve_orden = o.cve_orden")
+                fecha = "nf.fecha"
+
+        cols = {"status": "o.cve_status", "taller": "o.cve_taller",
+                "mes": f"TO_CHAR({fecha}, 'YYYY-MM')"}
+        alias = {"status": "cve_status", "taller": "cve_taller", "mes": "mes"}
+        select = [f"{cols[g]} AS {alias[g]}" for g in agrupar] + ["COUNT(*) AS n"]
+
+        where: list[str] = []
+        binds: dict = {}
+        if taller is not None:
+            where.append("o.cve_taller = :taller")
+            binds["taller"] = int(taller)
+        if desde is not None:
+            where.append(f"{fecha} >= TRUNC(:desde)")
+            binds["desde"] = desde
+        if hasta is not None:
+            where.append(f"{fecha} < TRUNC(:hasta) + 1")
+            binds["hasta"] = hasta
+
+        sql = f"SELECT {', '.join(select)} FROM orden o{joins}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if agrupar:
+            sql += " GROUP BY " + ", ".join(cols[g] for g in agrupar)
+
+        conn = self.db.get_connection()
+        with conn.cursor() as cur:
+            cur.execute(sql, binds)
+            return fetchall_dict(cur)
+
+    def totales(
+        self,
+        after_cve_orden: int | None = None,
+        page_size: int = 500,
+        taller: int | None = None,
+        desde=None,
+        hasta=None,
+    ) -> list[dict]:
+        """
+        Totales de muchas órdenes en una sola consulta (reportes por lote):
+        partes, servicios y horas se suman con GROUP BY y se unen a la orden,
+        con los importes como Decimal. El total se arma con
+        precios_repo.total_de() (mano de obra = tarifa × horas).
+        Página keyset ascendente por cve_orden (after_cve_orden = última de la
+        página anterior). desde/hasta filtran igual que conteo().
+        """
+        op = self._orden_parte_map()
+        col = self._fecha_orden_col()
+        if col:
+            fecha, joins = f"o.{col}", ""
+        else:
+            fecha = "nf.fecha"
+            joins = (" LEFT JOIN (SELECT cve_orden, MIN(fecha) AS fecha FROM orden_nota"
+                     " GROUP BY cve_orden) nf ON nf.cve_orden = o.cve_orden")
+
+        where: list[str] = []
+        binds: dict = {"n": max(1, int(page_size))}
+        if after_cve_orden is not None:
+            where.append("o.cve_orden > :after")
+            binds["after"] = int(after_cve_orden)
+        if taller is not None:
+            where.append("o.cve_taller = :taller")
+            binds["taller"] = int(taller)
+        if desde is not None:
+            where.append(f"{fecha} >= TRUNC(:desde)")
+            binds["desde"] = desde
+        if hasta is not None:
+            where.append(f"{fecha} < TRUNC(:hasta) + 1")
+            binds["hasta"] = hasta
+
+        # el filtro va en la página de órdenes: los agregados sólo se calculan
+        # para las cve_orden de esa página
+        sql = f"""
+            WITH pag AS (
+                SELECT o.cve_orden, o.cve_status, o.cve_taller, o.cve_tipo_equipo,
+                       o.cve_cliente, o.eq_marca, o.eq_modelo, {fecha} AS fecha
+                FROM orden o{joins}
+                {"WHERE " + " AND ".join(where) if where else ""}
+                ORDER BY o.cve_orden
+                FETCH FIRST :n ROWS ONLY
+            ),
+            {sql_agregados(op, "SELECT cve_orden FROM pag")}
+            SELECT pag.cve_orden, pag.cve_status, pag.cve_taller, pag.fecha,
+                   pag.cve_tipo_equipo, pag.eq_marca, pag.eq_modelo,
+                   c.nombre || ' ' || c.paterno || ' ' || NVL(c.materno,'') AS cliente,
+                   NVL(pp.n_partes, 0) AS n_partes, NVL(pp.partes, 0) AS partes,
+                   NVL(ss.n_servicios, 0) AS n_servicios, NVL(ss.servicios, 0) AS servicios,
+                   NVL(hh.horas, 0) AS horas, NVL(te.tarifa, 0) AS tarifa
+            FROM pag
+            LEFT JOIN cliente c ON c.cve_cliente = pag.cve_cliente
+            LEFT JOIN tipo_equipo te ON te.cve_tipo_equipo = pag.cve_tipo_equipo
+            LEFT JOIN pp ON pp.cve_orden = pag.cve_orden
+            LEFT JOIN ss ON ss.cve_orden = pag.cve_orden
+            LEFT JOIN hh ON hh.cve_orden = pag.cve_orden
+            ORDER BY pag.cve_orden
+        """
+        conn = self.db.get_connection()
+        with conn.cursor() as cur:
+            cur.outputtypehandler = decimal_output_handler
+            cur.arraysize = binds["n"]
+            cur.execute(sql, binds)
+            return fetchall_dict(cur)
+
     # === NUEVO: update con **kwargs mapeados a columnas ===
     def actualizar(self, cve_orden: int, **kwargs) -> int:
         """
@@ -117,7 +458,7 @@ class OrdenModelo(IOrdenRepo):
         }
 
         sets, params = [], {"id": int(cve_orden)}
-        for k, v in kwargs.items():
+        for k, v in sorted(kwargs.items()):  # mismo orden de columnas -> mismo texto SQL
             col = colmap.get(k)
             if col is None:
                 continue
@@ -129,7 +470,8 @@ class OrdenModelo(IOrdenRepo):
 
         try:
             if sets:
-                sql = f"UPDATE orden SET {', '.join(sets)} WHERE cve_orden = :id"
+                sql = REGISTRO.sql(("orden.actualizar", tuple(sets)),
+                                   lambda: f"UPDATE orden SET {', '.join(sets)} WHERE cve_orden = :id")
                 cur.execute(sql, params)
 
             # cve_tecnico (si viene): dejamos un único técnico asignado (simple)
@@ -152,15 +494,17 @@ class OrdenModelo(IOrdenRepo):
                  cliente: int, cve_taller: int, cve_tecnico: int) -> int:
         conn = self.db.get_connection()
         cur = conn.cursor()
-        # Si tienes secuencia, úsala; si no, dejamos MAX+1
-        cur.execute("SELECT NVL(MAX(cve_orden), 0) + 1 FROM orden")
-        new_id = int(cur.fetchone()[0])
-        cur.execute("""
-            INSERT INTO orden (cve_orden, cve_status, eq_marca, eq_modelo,
-                               cve_tipo_equipo, notas_cliente, cve_cliente, cve_taller)
-            VALUES (:id, :st, :ma, :mo, :ti, :no, :cli, :ta)
-        """, dict(id=new_id, st=int(cve_status), ma=eq_marca, mo=eq_modelo,
-                  ti=int(cve_tipo_equipo), no=notas_cliente, cli=int(cliente), ta=int(cve_taller)))
+        # secuencia/IDENTITY si existe; si no, MAX+1 (ver model/db/keys.py)
+        new_id = self.keys.next_id("orden", "cve_orden", conn)
+        new_id = self.keys.insertar(
+            cur, "orden", "cve_orden",
+            ["cve_status", "eq_marca", "eq_modelo", "cve_tipo_equipo",
+             "notas_cliente", "cve_cliente", "cve_taller"],
+            [":st", ":ma", ":mo", ":ti", ":no", ":cli", ":ta"],
+            dict(st=int(cve_status), ma=eq_marca, mo=eq_modelo,
+                 ti=int(cve_tipo_equipo), no=notas_cliente, cli=int(cliente), ta=int(cve_taller)),
+            new_id,
+        )
         if cve_tecnico:
             cur.execute("""
                 INSERT INTO orden_tecnicos (cve_orden, cve_empleado, horas)
@@ -1,14 +1,99 @@
 # model/repositories/parte_repo.py
 from __future__ import annotations
-from typing import Any, List, Dict
+from typing import Any, List, Dict, Optional
+import threading
 import oracledb  # pip install oracledb
 
 from model.oracle_model import OracleDB
+from model.db.keys import KeyAllocator
+from model.db.sentencias import lista_in
+
+_IN_MAX = 1000  # expresiones máximas en un IN de Oracle
+
+# posibles nombres según distintos esquemas: (tabla, pk, fk a parte)
+CANDIDATOS = (
+    ("orden_parte",  "cve_orden_parte", "cve_parte"),
+    ("orden_partes", "cve_orden_parte", "cve_parte"),
+    ("orden_pieza",  "cve_orden_pieza", "cve_parte"),
+    ("orden_piezas", "cve_orden_pieza", "cve_parte"),
+)
 
 
 class ParteModelo:
-    def __init__(self, db: OracleDB):
+    """
+    Partes por orden. La tabla que liga orden y parte (ORDEN_PARTE,
+    ORDEN_PIEZA, …) se resuelve una sola vez por sesión: del mapeo de
+    SchemaIntrospector si está disponible (sin ir a la base), o sondeando
+    los candidatos con un SELECT vacío. Después listar/insertar/eliminar
+    usan sentencias ya armadas y nunca ejecutan contra una tabla inexistente.
+    sondeos_fallidos cuenta los candidatos que no existían (monitoreo).
+    """
+
+    def __init__(self, db: OracleDB, schema=None, keys: KeyAllocator | None = None):
         self.db = db
+        self.schema = schema
+        self.keys = keys or KeyAllocator(db)
+        self._lock = threading.Lock()
+        self._resuelto: Optional[Dict[str, str]] = None
+        self.sondeos_fallidos = 0
+
+    # ====================== resolución ======================
+    def _resolver(self) -> Dict[str, str]:
+        r = self._resuelto
+        if r is not None:
+            return r
+        with self._lock:
+            if self._resuelto is None:
+                table, pk, fk = self._descubrir()
+                self._resuelto = {
+                    "table": table, "pk": pk, "fk": fk,
+                    "listar": f"""
+                        SELECT op.{pk}, p.cve_parte, p.part_no, p.descripcion, p.precio
+                        FROM {table} op
+                        JOIN parte p ON p.cve_parte = op.{fk}
+                        WHERE op.cve_orden = :ord
+                        ORDER BY op.{pk} DESC
+                    """,
+                    "eliminar": f"DELETE FROM {table} WHERE {pk} = :id",
+                    "ordenes_de": f"SELECT DISTINCT cve_orden FROM {table} WHERE {pk} IN ({{ph}})",
+                }
+            return self._resuelto
+
+    def _descubrir(self) -> tuple[str, str, str]:
+        if self.schema is not None:
+            try:
+                m = self.schema.orden_parte()
+                if m.get("_table") and m.get("pk") and m.get("fk"):
+                    return m["_table"], m["pk"], m["fk"]
+            except Exception:
+                pass
+
+        # sin mapeo: un SELECT que no trae filas por candidato, hasta dar con uno
+        last_err = None
+        with self.db.get_connection().cursor() as cur:
+            for tname, pk, fk in CANDIDATOS:
+                try:
+                    cur.execute(f"SELECT {pk}, cve_orden, {fk} FROM {tname} WHERE 1 = 0")
+                    return tname, pk, fk
+                except oracledb.DatabaseError as ex:
+                    err = ex.args[0]
+                    if getattr(err, "code", None) in (942, 904):  # tabla/columna inexistente
+                        self.sondeos_fallidos += 1
+                        last_err = ex
+                        continue
+                    raise
+        if last_err:
+            raise last_err
+        raise RuntimeError("No se encontró la tabla de partes por orden")
+
+    def olvidar(self) -> None:
+        """Vuelve a resolver en el siguiente uso (tras cambiar el esquema)."""
+        with self._lock:
+            self._resuelto = None
+
+    def stats(self) -> Dict[str, Any]:
+        r = self._resuelto or {}
+        return {"tabla": r.get("table"), "sondeos_fallidos": self.sondeos_fallidos}
 
     # Catálogo de partes
     def catalogo(self) -> List[Dict[str, Any]]:
@@ -30,106 +115,73 @@ class ParteModelo:
 
     # Partes por orden (JOIN con parte)
     def listar(self, cve_orden: int) -> List[Dict[str, Any]]:
-        conn = self.db.get_connection()
-        cur = conn.cursor()
-        ord_id = int(cve_orden)
-
-        # posibles nombres según distintos esquemas
-        candidates = [
-            ("orden_parte",  "cve_orden_parte", "cve_parte"),
-            ("orden_partes", "cve_orden_parte", "cve_parte"),
-            ("orden_pieza",  "cve_orden_pieza", "cve_parte"),
-            ("orden_piezas", "cve_orden_pieza", "cve_parte"),
+        sql = self._resolver()["listar"]
+        with self.db.get_connection().cursor() as cur:
+            cur.execute(sql, {"ord": int(cve_orden)})
+            rows = cur.fetchall()
+        return [
+            {
+                "cve_orden_parte": int(r[0]),
+                "cve_parte": int(r[1]),
+                "part_no": r[2],
+                "descripcion": r[3],
+                "precio": r[4],
+            }
+            for r in rows
         ]
 
-        last_err = None
-        for tname, pk, fk in candidates:
-            sql = f"""
-                SELECT op.{pk}, p.cve_parte, p.part_no, p.descripcion, p.precio
-                FROM {tname} op
-                JOIN parte p ON p.cve_parte = op.{fk}
-                WHERE op.cve_orden = :ord
-                ORDER BY op.{pk} DESC
-            """
-            try:
-                cur.execute(sql, {"ord": ord_id})
-                rows = cur.fetchall()
-                return [
-                    {
-                        "cve_orden_parte": int(r[0]),
-                        "cve_parte": int(r[1]),
-                        "part_no": r[2],
-                        "descripcion": r[3],
-                        "precio": r[4],
-                    }
-                    for r in rows
-                ]
-            except oracledb.DatabaseError as ex:
-                err = ex.args[0]
-                if getattr(err, "code", None) == 942:  # ORA-00942
-                    last_err = ex
-                    continue
-                raise
-        if last_err:
-            raise last_err
-        return []
-
-    # Insertar parte a orden
+    # Insertar parte a orden (devuelve la llave del renglón nuevo)
     def insertar(self, cve_orden: int, cve_parte: int) -> int:
+        r = self._resolver()
         conn = self.db.get_connection()
-        cur = conn.cursor()
-        ord_id = int(cve_orden)
-        parte_id = int(cve_parte)
-
-        candidates = [
-            ("orden_parte",  "cve_parte"),
-            ("orden_partes", "cve_parte"),
-            ("orden_pieza",  "cve_parte"),
-            ("orden_piezas", "cve_parte"),
-        ]
+        with conn.cursor() as cur:
+            new_id = self.keys.next_id(r["table"], r["pk"], conn)
+            return self.keys.insertar(
+                cur, r["table"], r["pk"],
+                ["cve_orden", r["fk"]], [":ord", ":parte"],
+                {"ord": int(cve_orden), "parte": int(cve_parte)}, new_id,
+            )
 
-        last_err = None
-        for tname, fk in candidates:
-            try:
-                cur.execute(
-                    f"INSERT INTO {tname} (cve_orden, {fk}) VALUES (:ord, :parte)",
-                    {"ord": ord_id, "parte": parte_id},
-                )
-                return 1
-            except oracledb.DatabaseError as ex:
-                err = ex.args[0]
-                if getattr(err, "code", None) == 942:
-                    last_err = ex
-                    continue
-                raise
-        if last_err:
-            raise last_err
-        return 0
+    # Varias partes a una orden en un solo executemany (sin commit)
+    def insertar_lote(self, cve_orden: int, partes: List[int]) -> int:
+        partes = [int(p) for p in partes]
+        if not partes:
+            return 0
+        r = self._resolver()
+        conn = self.db.get_connection()
+        ids = self.keys.reservar(r["table"], r["pk"], len(partes), conn=conn)
+        with conn.cursor() as cur:
+            return self.keys.insertar_lote(
+                cur, r["table"], r["pk"],
+                ["cve_orden", r["fk"]], [":ord", ":parte"],
+                [{"ord": int(cve_orden), "parte": p} for p in partes], ids,
+            )
 
     # Eliminar registro de parte en orden
     def eliminar(self, cve_orden_parte: int) -> int:
-        conn = self.db.get_connection()
-        cur = conn.cursor()
-        pk_val = int(cve_orden_parte)
-
-        candidates = [
-            ("orden_parte",  "cve_orden_parte"),
-            ("orden_partes", "cve_orden_parte"),
-            ("orden_pieza",  "cve_orden_pieza"),
-            ("orden_piezas", "cve_orden_pieza"),
-        ]
+        sql = self._resolver()["eliminar"]
+        with self.db.get_connection().cursor() as cur:
+            cur.execute(sql, {"id": int(cve_orden_parte)})
+            return cur.rowcount or 0
 
-        last_err = None
-        for tname, pk in candidates:
-            try:
-                cur.execute(f"DELETE FROM {tname} WHERE {pk} = :id", {"id": pk_val})
-                return cur.rowcount
-            except oracledb.DatabaseError as ex:
-                err = ex.args[0]
-                if getattr(err, "code", None) == 942:
-                    last_err = ex
-                    continue
-                raise
-        if last_err:
-            raise last_err
-        return 0
\ No newline at end of file
+    # Varios renglones en un solo executemany (sin commit)
+    def eliminar_lote(self, ids: List[int]) -> int:
+        filas = [{"id": int(i)} for i in ids]
+        if not filas:
+            return 0
+        sql = self._resolver()["eliminar"]
+        with self.db.get_connection().cursor() as cur:
+            cur.executemany(sql, filas, arraydmlrowcounts=True)
+            return sum(cur.getarraydmlrowcounts())
+
+    def ordenes_de(self, ids: List[int]) -> set:
+        """cve_orden de los renglones (para marcar KPIs antes de borrarlos)."""
+        ids = sorted({int(i) for i in ids})
+        out: set = set()
+        plantilla = self._resolver()["ordenes_de"]
+        with self.db.get_connection().cursor() as cur:
+            for i in range(0, len(ids), _IN_MAX):
+                ph, binds = lista_in("p", ids[i:i + _IN_MAX])
+                cur.execute(plantilla.format(ph=ph), binds)
+                out.update(int(r[0]) for r in cur.fetchall())
+        return out
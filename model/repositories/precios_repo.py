@@ -0,0 +1,138 @@
+# model/repositories/precios_repo.py
+from __future__ import annotations
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Iterable, Protocol
+from .base import DBLike
+from model.db.oracle import decimal_output_handler
+from model.db.sentencias import REGISTRO, lista_in, tamano_in
+from utils.dinero import CERO, a_decimal, centavos
+
+_IN_MAX = 1000  # expresiones máximas en un IN de Oracle
+
+
+@dataclass(slots=True)
+class TotalOrden:
+    """
+    Importes de una orden, exactos (Decimal). total = partes + servicios +
+    mano_obra, cada uno ya redondeado a centavos, así que el total siempre
+    es la suma de lo que se muestra.
+    """
+    cve_orden: int
+    partes: Decimal = CERO
+    n_partes: int = 0
+    servicios: Decimal = CERO
+    n_servicios: int = 0
+    horas: Decimal = CERO
+    tarifa: Decimal = CERO
+
+    @property
+    def mano_obra(self) -> Decimal:
+        return centavos(self.tarifa * self.horas)
+
+    @property
+    def total(self) -> Decimal:
+        return centavos(self.partes) + centavos(self.servicios) + self.mano_obra
+
+
+def sql_agregados(op: dict, ordenes: str) -> str:
+    """
+    CTEs pp/ss/hh (partes, servicios y horas por orden) restringidas a las
+    cve_orden de la subconsulta `ordenes`. Las comparten este módulo y
+    OrdenModelo.totales() para que el cálculo sea uno solo.
+    """
+    return f"""
+        pp AS (SELECT op.cve_orden, COUNT(*) AS n_partes, SUM(p.precio) AS partes
+               FROM {op['_table']} op JOIN parte p ON p.cve_parte = op.{op['fk']}
+               WHERE op.cve_orden IN ({ordenes})
+               GROUP BY op.cve_orden),
+        ss AS (SELECT os.cve_orden, COUNT(*) AS n_servicios, SUM(s.precio) AS servicios
+               FROM orden_servicio os JOIN servicio s ON s.cve_servicio = os.cve_servicio
+               WHERE os.cve_orden IN ({ordenes})
+               GROUP BY os.cve_orden),
+        hh AS (SELECT cve_orden, SUM(horas) AS horas FROM orden_tecnicos
+               WHERE cve_orden IN ({ordenes})
+               GROUP BY cve_orden)
+    """
+
+
+def total_de(r: dict) -> TotalOrden:
+    """Fila con partes/servicios/horas/tarifa (y n_*) -> TotalOrden."""
+    return TotalOrden(
+        cve_orden=int(r["cve_orden"]),
+        partes=a_decimal(r.get("partes")),
+        n_partes=int(r.get("n_partes") or 0),
+        servicios=a_decimal(r.get("servicios")),
+        n_servicios=int(r.get("n_servicios") or 0),
+        horas=a_decimal(r.get("horas")),
+        tarifa=a_decimal(r.get("tarifa")),
+    )
+
+
+class IPreciosRepo(Protocol):
+    def totales(self, ordenes: Iterable[int]) -> dict[int, TotalOrden]: ...
+    def total(self, cve_orden: int) -> TotalOrden | None: ...
+
+
+class PreciosModelo(IPreciosRepo):
+    """
+    Totales de órdenes en bloque: una consulta por cada 1000 órdenes (sumas
+    con GROUP BY en la base) y los NUMBER llegan como Decimal, no float.
+    """
+
+    def __init__(self, db: DBLike, schema=None) -> None:
+        self.db = db
+        self.schema = schema  # SchemaIntrospector opcional (tabla de partes por orden)
+
+    def _orden_parte_map(self) -> dict:
+        if self.schema is not None:
+            try:
+                m = self.schema.orden_parte()
+                if m.get("_table"):
+                    return m
+            except Exception:
+                pass
+        return {"_table": "orden_parte", "pk": "cve_orden_parte", "fk": "cve_parte"}
+
+    def totales(self, ordenes: Iterable[int]) -> dict[int, TotalOrden]:
+        """{cve_orden: TotalOrden} para las órdenes pedidas que existan."""
+        ids = sorted({int(i) for i in ordenes})
+        out: dict[int, TotalOrden] = {}
+        if not ids:
+            return out
+        op = self._orden_parte_map()
+        cur = self.db.get_connection().cursor()
+        try:
+            cur.outputtypehandler = decimal_output_handler
+            for i in range(0, len(ids), _IN_MAX):
+                chunk = ids[i:i + _IN_MAX]
+                lista, binds = lista_in("o", chunk)
+                cur.arraysize = len(chunk)
+                sql = REGISTRO.sql(("precios.totales", op["_table"], op["fk"], tamano_in(len(chunk))), lambda: f"""
+                    WITH {sql_agregados(op, lista)}
+                    SELECT o.cve_orden,
+                           NVL(pp.n_partes, 0) AS n_partes, NVL(pp.partes, 0) AS partes,
+                           NVL(ss.n_servicios, 0) AS n_servicios, NVL(ss.servicios, 0) AS servicios,
+                           NVL(hh.horas, 0) AS horas, NVL(te.tarifa, 0) AS tarifa
+                    FROM orden o
+                    LEFT JOIN tipo_equipo te ON te.cve_tipo_equipo = o.cve_tipo_equipo
+                    LEFT JOIN pp ON pp.cve_orden = o.cve_orden
+                    LEFT JOIN ss ON ss.cve_orden = o.cve_orden
+                    LEFT JOIN hh ON hh.cve_orden = o.cve_orden
+                    WHERE o.cve_orden IN ({lista})
+                """)
+                cur.execute(sql, binds)
+                cols = [d[0].lower() for d in cur.description]
+                for row in cur.fetchall():
+                    t = total_de(dict(zip(cols, row)))
+                    out[t.cve_orden] = t
+        finally:
+            try: cur.close()
+            except: pass
+        return out
+
+    def total(self, cve_orden: int) -> TotalOrden | None:
+        return self.totales([cve_orden]).get(int(cve_orden))
+
+
+__all__ = ["PreciosModelo", "TotalOrden", "sql_agregados", "total_de"]
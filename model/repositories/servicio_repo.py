@@ -2,16 +2,23 @@
 from __future__ import annotations
 from typing import Protocol
 from .base import DBLike, fetchall_dict
+from model.db.keys import KeyAllocator
+from model.db.sentencias import lista_in
+
+_IN_MAX = 1000  # expresiones máximas en un IN de Oracle
 
 class IServicioRepo(Protocol):
     def catalogo(self) -> list[dict]: ...
     def listar(self, cve_orden: int) -> list[dict]: ...
     def insertar(self, cve_orden: int, cve_servicio: int) -> int: ...
+    def insertar_lote(self, cve_orden: int, servicios: list[int]) -> int: ...
     def eliminar(self, cve_orden_servicio: int) -> int: ...
+    def eliminar_lote(self, ids: list[int]) -> int: ...
 
 class ServicioModelo(IServicioRepo):
-    def __init__(self, db: DBLike) -> None:
+    def __init__(self, db: DBLike, keys: KeyAllocator | None = None) -> None:
         self.db = db
+        self.keys = keys or KeyAllocator(db)
 
     def catalogo(self) -> list[dict]:
         cur = self.db.get_connection().cursor()
@@ -36,16 +43,51 @@ class ServicioModelo(IServicioRepo):
     def insertar(self, cve_orden: int, cve_servicio: int) -> int:
         conn = self.db.get_connection()
         cur = conn.cursor()
-        cur.execute("SELECT NVL(MAX(cve_orden_servicio),0)+1 FROM orden_servicio")
-        new_id = int(cur.fetchone()[0])
-        cur.execute("""
-            INSERT INTO orden_servicio (cve_orden_servicio, cve_orden, cve_servicio)
-            VALUES (:id, :ord, :srv)
-        """, dict(id=new_id, ord=int(cve_orden), srv=int(cve_servicio)))
-        return new_id
+        new_id = self.keys.next_id("orden_servicio", "cve_orden_servicio", conn)
+        return self.keys.insertar(
+            cur, "orden_servicio", "cve_orden_servicio",
+            ["cve_orden", "cve_servicio"], [":ord", ":srv"],
+            dict(ord=int(cve_orden), srv=int(cve_servicio)), new_id,
+        )
+
+    def insertar_lote(self, cve_orden: int, servicios: list[int]) -> int:
+        """Varios servicios a una orden en un solo executemany (sin commit)."""
+        servicios = [int(s) for s in servicios]
+        if not servicios:
+            return 0
+        conn = self.db.get_connection()
+        ids = self.keys.reservar("orden_servicio", "cve_orden_servicio", len(servicios), conn=conn)
+        with conn.cursor() as cur:
+            return self.keys.insertar_lote(
+                cur, "orden_servicio", "cve_orden_servicio",
+                ["cve_orden", "cve_servicio"], [":ord", ":srv"],
+                [dict(ord=int(cve_orden), srv=s) for s in servicios], ids,
+            )
 
     def eliminar(self, cve_orden_servicio: int) -> int:
         cur = self.db.get_connection().cursor()
         cur.execute("DELETE FROM orden_servicio WHERE cve_orden_servicio = :id",
                     dict(id=int(cve_orden_servicio)))
-        return cur.rowcount or 0
\ No newline at end of file
+        return cur.rowcount or 0
+
+    def eliminar_lote(self, ids: list[int]) -> int:
+        """Varios renglones en un solo executemany (sin commit)."""
+        filas = [dict(id=int(i)) for i in ids]
+        if not filas:
+            return 0
+        with self.db.get_connection().cursor() as cur:
+            cur.executemany("DELETE FROM orden_servicio WHERE cve_orden_servicio = :id",
+                            filas, arraydmlrowcounts=True)
+            return sum(cur.getarraydmlrowcounts())
+
+    def ordenes_de(self, ids: list[int]) -> set[int]:
+        """cve_orden de los renglones (para marcar KPIs antes de borrarlos)."""
+        ids = sorted({int(i) for i in ids})
+        out: set[int] = set()
+        with self.db.get_connection().cursor() as cur:
+            for i in range(0, len(ids), _IN_MAX):
+                ph, binds = lista_in("s", ids[i:i + _IN_MAX])
+                cur.execute("SELECT DISTINCT cve_orden FROM orden_servicio "
+                            f"WHERE cve_orden_servicio IN ({ph})", binds)
+                out.update(int(r[0]) for r in cur.fetchall())
+        return out
\ No newline at end of file
@@ -0,0 +1,24 @@
+# refresh_schema.py
+# Vuelve a descubrir los mapeos de CLIENTE/COLONIA/ORDEN_PARTE y reescribe
+# schema_cache.json (correr después de cambiar tablas/columnas).
+import json
+import os
+
+from model.db.oracle import OracleDB
+from model.db.schema import refresh_all
+
+HOST = "200.13.89.10"
+PORT = 1521
+SERVICE_NAME = "pdbcib.lci.ulsa.mx"
+USER = os.environ.get("ORA_USER", "cib700_01")
+
+pwd = os.environ.get("ORA_PWD")
+if not pwd:
+    raise SystemExit("Define ORA_PWD primero: export ORA_PWD='TU_PASSWORD'")
+
+db = OracleDB(HOST, PORT, SERVICE_NAME, USER, pwd)
+try:
+    maps = refresh_all(db)
+    print(json.dumps(maps, indent=2))
+finally:
+    db.close_connection()
@@ -0,0 +1,32 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+CERO = Decimal(0)
+CENTAVO = Decimal("0.01")
+
+
+def a_decimal(x) -> Decimal:
+    """
+    Cualquier valor a Decimal sin pasar por float binario.
+    Acepta números, Decimal y texto con formato de dinero ('$ 1,234.56').
+    """
+    if x is None:
+        return CERO
+    if isinstance(x, Decimal):
+        return x
+    if isinstance(x, int):
+        return Decimal(x)
+    try:
+        s = str(x).strip().replace("$", "").replace(",", "")
+        return Decimal(s) if s else CERO
+    except (InvalidOperation, ValueError):
+        return CERO
+
+
+def centavos(x) -> Decimal:
+    """Redondeo comercial a 2 decimales (half-up, no el de banquero)."""
+    return a_decimal(x).quantize(CENTAVO, rounding=ROUND_HALF_UP)
+
+
+def formato(x) -> str:
+    """'$1,234.56'"""
+    return f"${centavos(x):,.2f}"
@@ -0,0 +1,132 @@
+# utils/pdf.py
+from __future__ import annotations
+from typing import IO, List, Sequence, Tuple
+
+
+# Carta horizontal, en puntos
+ANCHO, ALTO = 792, 612
+MARGEN = 36
+TAM = 8          # tamaño de letra de las filas
+INTERLINEA = 11
+
+
+def _texto(s) -> bytes:
+    """Texto PDF literal en WinAnsi (acentos y ñ) con ( ) \\ escapados."""
+    b = str("" if s is None else s).encode("cp1252", errors="replace")
+    return b"(" + b.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _ancho_aprox(s: str, tam: float) -> float:
+    # Helvetica: ~0.5 em por carácter en promedio (para recortar y alinear a la derecha)
+    return len(s) * tam * 0.5
+
+
+class PdfTabla:
+    """
+    Escribe una tabla de texto a PDF en streaming, página por página:
+    cada página se escribe al archivo en cuanto se llena y en memoria sólo
+    quedan los offsets de los objetos (para la tabla xref del final).
+    Sin dependencias: Helvetica estándar, sin fuentes embebidas.
+      with PdfTabla(path, [("Orden", 50, "i"), ("Total", 70, "d")], "Reporte") as pdf:
+          pdf.fila([1, "$10.00"])
+          pdf.pie(["Total: $10.00"])
+    Las columnas son (título, ancho en puntos, "i" izquierda | "d" derecha).
+    """
+
+    def __init__(self, path: str, columnas: Sequence[Tuple[str, float, str]], titulo: str = "") -> None:
+        self._f: IO[bytes] = open(path, "wb")
+        self._cols = list(columnas)
+        self._titulo = titulo
+        self._offsets: dict[int, int] = {}
+        self._paginas: List[int] = []
+        self._sig = 4          # 1 catálogo, 2 páginas, 3 fuente
+        self._lineas: List[bytes] = []
+        self._y = 0.0
+        self._f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._obj(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica"
+                     b" /Encoding /WinAnsiEncoding >>")
+        self._nueva_pagina()
+
+    # ---------------- API ----------------
+    def fila(self, valores: Sequence) -> None:
+        if self._y < MARGEN + INTERLINEA:
+            self._cerrar_pagina()
+            self._nueva_pagina()
+        self._celdas([str("" if v is None else v) for v in valores], self._y)
+        self._y -= INTERLINEA
+
+    def pie(self, lineas: Sequence[str]) -> None:
+        """Líneas de resumen al final (en negrita visual: tamaño mayor)."""
+        for ln in lineas:
+            if self._y < MARGEN + INTERLINEA * 2:
+                self._cerrar_pagina()
+                self._nueva_pagina()
+            self._y -= 4
+            self._lineas.append(b"BT /F1 10 Tf %d %.1f Td %s Tj ET" % (MARGEN, self._y, _texto(ln)))
+            self._y -= INTERLINEA + 2
+
+    def cerrar(self) -> None:
+        if self._f.closed:
+            return
+        self._cerrar_pagina()
+        kids = b" ".join(b"%d 0 R" % n for n in self._paginas)
+        self._obj(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self._paginas)))
+        self._obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        xref = self._f.tell()
+        total = self._sig
+        self._f.write(b"xref\n0 %d\n0000000000 65535 f \n" % total)
+        for n in range(1, total):
+            self._f.write(b"%010d 00000 n \n" % self._offsets.get(n, 0))
+        self._f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (total, xref))
+        self._f.close()
+
+    def __enter__(self) -> "PdfTabla":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cerrar()
+
+    # ---------------- internos ----------------
+    def _obj(self, n: int, cuerpo: bytes) -> None:
+        self._offsets[n] = self._f.tell()
+        self._f.write(b"%d 0 obj\n" % n + cuerpo + b"\nendobj\n")
+
+    def _nuevo_num(self) -> int:
+        n = self._sig
+        self._sig += 1
+        return n
+
+    def _celdas(self, valores: List[str], y: float, tam: float = TAM) -> None:
+        x = float(MARGEN)
+        for (_t, ancho, alinear), v in zip(self._cols, valores):
+            while v and _ancho_aprox(v, tam) > ancho - 4:
+                v = v[:-1]
+            dx = x + (ancho - 4 - _ancho_aprox(v, tam) if alinear == "d" else 0)
+            self._lineas.append(b"BT /F1 %g Tf %.1f %.1f Td %s Tj ET" % (tam, dx, y, _texto(v)))
+            x += ancho
+
+    def _nueva_pagina(self) -> None:
+        self._lineas = []
+        y = ALTO - MARGEN
+        if self._titulo:
+            self._lineas.append(b"BT /F1 12 Tf %d %d Td %s Tj ET" % (MARGEN, y - 12, _texto(self._titulo)))
+            self._lineas.append(b"BT /F1 8 Tf %d %d Td %s Tj ET" % (
+                ANCHO - MARGEN - 60, y - 12, _texto(f"Página {len(self._paginas) + 1}")))
+            y -= 28
+        self._celdas([c[0] for c in self._cols], y)
+        self._lineas.append(b"%d %.1f m %d %.1f l S" % (MARGEN, y - 3, ANCHO - MARGEN, y - 3))
+        self._y = y - INTERLINEA - 2
+
+    def _cerrar_pagina(self) -> None:
+        contenido = b"\n".join(self._lineas)
+        n_cont = self._nuevo_num()
+        self._obj(n_cont, b"<< /Length %d >>\nstream\n" % len(contenido) + contenido + b"\nendstream")
+        n_pag = self._nuevo_num()
+        self._obj(n_pag, b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d]"
+                         b" /Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+                         % (ANCHO, ALTO, n_cont))
+        self._paginas.append(n_pag)
+        self._lineas = []
+
+
+__all__ = ["PdfTabla"]
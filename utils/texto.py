@@ -0,0 +1,53 @@
+import re
+import unicodedata
+
+_ESPACIOS = re.compile(r"\s+")
+
+
+def plegar(txt) -> str:
+    """
+    Llave de comparación: sin acentos, minúsculas y espacios colapsados.
+    'Álvaro  Obregón ' -> 'alvaro obregon'
+    """
+    s = unicodedata.normalize("NFKD", str(txt or ""))
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    return _ESPACIOS.sub(" ", s).strip().lower()
+
+
+_PALABRA = re.compile(r"[a-z0-9]+")
+
+# Palabras vacías (ya plegadas): no ayudan a distinguir una nota de otra
+VACIAS = frozenset("""
+    a al algo ante con contra de del desde donde durante e el en entre era es esta
+    este esto fue ha han hay la las le les lo los mas me mi muy ni no nos o para
+    pero por que se sea si sin sobre su sus te tiene un una uno unos unas y ya
+""".split())
+
+
+def raiz(palabra: str) -> str:
+    """
+    Raíz ligera en español (palabra ya plegada): quita plural y género, y
+    algunos sufijos comunes, para que 'bisagras rotas' encuentre 'bisagra rota'.
+    """
+    w = palabra
+    if len(w) <= 3 or w.isdigit():
+        return w
+    for suf in ("amiento", "imiento", "aciones", "iciones", "mente", "acion", "icion", "ciones", "cion"):
+        if w.endswith(suf) and len(w) - len(suf) >= 3:
+            w = w[: -len(suf)]
+            break
+    else:
+        if len(w) > 5 and w.endswith("eses"):
+            w = w[:-2]
+        elif len(w) > 4 and w.endswith("ces"):
+            w = w[:-3] + "z"
+        elif len(w) > 4 and w.endswith(("os", "as", "es")):
+            w = w[:-2]
+        elif len(w) > 3 and w.endswith(("o", "a", "e", "s")):
+            w = w[:-1]
+    return w
+
+
+def terminos(txt) -> list:
+    """Texto libre -> raíces buscables (plegadas, sin palabras vacías), en orden."""
+    return [raiz(w) for w in _PALABRA.findall(plegar(txt)) if w not in VACIAS]
@@ -1,24 +1,101 @@
 # view/charts.py
 from __future__ import annotations
 import flet as ft
-from typing import Callable, Dict
+from datetime import date
+from typing import Callable, Dict, List, Tuple
 
 
-def _count_statuses(db_instance, ui_status_name_fn: Callable[[int | str | None], str]) -> Dict[str, int]:
-    """Cuenta órdenes por estatus (En proceso, Terminado, Recogido) usando el nombre UI normalizado."""
-    try:
-        ordenes = db_instance.ordenes() or []
-    except Exception:
-        ordenes = []
+STATUS_UI = ("En proceso", "Terminado", "Recogido")
+COLORES_UI = {
+    "En proceso": ft.colors.DEEP_PURPLE,
+    "Terminado": ft.colors.GREEN,
+    "Recogido": ft.colors.AMBER_900,
+}
 
-    counts = {"En proceso": 0, "Terminado": 0, "Recogido": 0}
-    for o in ordenes:
-        ui = ui_status_name_fn(getattr(o, "cve_status", None))
+
+def _a_ui(por_id: Dict[int, int], ui_status_name_fn) -> Dict[str, int]:
+    """{cve_status: n} -> {nombre UI: n} (sólo los tres estatus de la gráfica)."""
+    counts = {k: 0 for k in STATUS_UI}
+    for sid, n in (por_id or {}).items():
+        ui = ui_status_name_fn(sid)
         if ui in counts:
-            counts[ui] += 1
+            counts[ui] += int(n)
     return counts
 
 
+def _count_statuses(db_instance, ui_status_name_fn: Callable[[int | str | None], str],
+                    taller: int | None = None, desde=None, hasta=None) -> Dict[str, int]:
+    """Cuenta órdenes por estatus (En proceso, Terminado, Recogido) con GROUP BY en la base."""
+    try:
+        por_id = db_instance.conteo_por_status(taller=taller, desde=desde, hasta=hasta)
+    except Exception:
+        por_id = {}
+    return _a_ui(por_id, ui_status_name_fn)
+
+
+def _hace_un_anio() -> date:
+    hoy = date.today()
+    y, m = (hoy.year, hoy.month - 11) if hoy.month > 11 else (hoy.year - 1, hoy.month + 1)
+    return date(y, m, 1)
+
+
+def _barras_apiladas(grupos: List[Tuple[str, Dict[str, int]]]) -> ft.Control:
+    """Una barra por grupo (taller o mes), apilada por estatus."""
+    if not grupos:
+        return ft.Text("Sin datos.", italic=True)
+    try:
+        bar_groups = []
+        for x, (_etq, counts) in enumerate(grupos):
+            y = 0.0
+            items = []
+            for ui in STATUS_UI:
+                n = float(counts.get(ui, 0))
+                items.append(ft.BarChartRodStackItem(from_y=y, to_y=y + n, color=COLORES_UI[ui]))
+                y += n
+            bar_groups.append(ft.BarChartGroup(
+                x=x,
+                bar_rods=[ft.BarChartRod(
+                    from_y=0, to_y=y, width=18, rod_stack_items=items,
+                    tooltip=f"{_etq}: " + ", ".join(f"{ui} {counts.get(ui, 0)}" for ui in STATUS_UI),
+                )],
+            ))
+        return ft.BarChart(
+            bar_groups=bar_groups,
+            bottom_axis=ft.ChartAxis(labels=[
+                ft.ChartAxisLabel(value=x, label=ft.Text(etq, size=10)) for x, (etq, _) in enumerate(grupos)
+            ]),
+            height=260,
+        )
+    except Exception:
+        # versiones de Flet sin BarChart: tabla de texto
+        return ft.Column([
+            ft.Text(f"{etq}: " + ", ".join(f"{ui} {c.get(ui, 0)}" for ui in STATUS_UI))
+            for etq, c in grupos
+        ], scroll=ft.ScrollMode.AUTO, height=260)
+
+
+def _por_taller(db_instance, ui_status_name_fn) -> ft.Control:
+    try:
+        datos = db_instance.conteo_por_taller()
+        nombres = db_instance.talleres() or {}
+    except Exception:
+        datos, nombres = {}, {}
+    grupos = [
+        (str(nombres.get(t, t)), _a_ui(por_id, ui_status_name_fn))
+        for t, por_id in sorted(datos.items())
+    ]
+    return _barras_apiladas(grupos)
+
+
+def _por_mes(db_instance, ui_status_name_fn) -> ft.Control:
+    try:
+        datos = db_instance.conteo_por_mes(desde=_hace_un_anio())
+    except Exception:
+        datos = {}
+    grupos = [(mes, _a_ui(por_id, ui_status_name_fn)) for mes, por_id in datos.items()]
+    return _barras_apiladas(grupos)
+
+
 def open_status_chart_dialog(page: ft.Page, db_instance, ui_status_name_fn: Callable[[int | str | None], str]) -> None:
     """Muestra un diálogo con una gráfica de barras por estatus de órdenes."""
     counts = _count_statuses(db_instance, ui_status_name_fn)
@@ -117,6 +194,29 @@ def open_status_chart_dialog(page: ft.Page, db_instance, ui_status_name_fn: Call
             ),
         )
 
+    # Desgloses por taller y por mes (últimos 12 meses), también agregados en SQL
+    leyenda = ft.Row(
+        [c for ui in STATUS_UI for c in (
+            ft.Container(width=14, height=14, bgcolor=COLORES_UI[ui], border_radius=3), ft.Text(ui))],
+        alignment=ft.MainAxisAlignment.CENTER,
+        spacing=8,
+    )
+    try:
+        content = ft.Tabs(
+            selected_index=0,
+            width=620,
+            height=380,
+            tabs=[
+                ft.Tab(text="Por estatus", content=content),
+                ft.Tab(text="Por taller", content=ft.Column(
+                    [_por_taller(db_instance, ui_status_name_fn), leyenda], tight=True)),
+                ft.Tab(text="Por mes", content=ft.Column(
+                    [_por_mes(db_instance, ui_status_name_fn), leyenda], tight=True)),
+            ],
+        )
+    except Exception:
+        pass  # sin Tabs: sólo la gráfica por estatus
+
     dlg = ft.AlertDialog(
         modal=True,
         title=ft.Text("Gráfica de estatus"),
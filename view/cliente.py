@@ -154,9 +154,7 @@ def open_editar_cliente_dialog(
 
             # Commit best-effort
             try:
-                conn = db_instance.get_connection()
-                if conn:
-                    conn.commit()
+                db_instance.commit()
             except Exception:
                 pass
 
@@ -170,9 +168,7 @@ def open_editar_cliente_dialog(
 
         except Exception as ex:
             try:
-                conn = db_instance.get_connection()
-                if conn:
-                    conn.rollback()
+                db_instance.rollback()
             except Exception:
                 pass
             error_lbl.value = f"Error al guardar: {ex}"
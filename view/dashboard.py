@@ -11,12 +11,17 @@ if not hasattr(ft, "icons") and hasattr(ft, "Icons"):
 
 from .chat_fab import make_chat_fab
 # Estos imports quedan, pero más abajo sobrescribimos con funciones locales
-from .notas import open_notas_dialog, open_nueva_nota_dialog
+from .notas import open_notas_dialog, open_nueva_nota_dialog, open_buscar_notas_dialog
 from .partes import open_partes_dialog, open_nueva_parte_dialog
 from .servicios import open_servicios_dialog, open_nuevo_servicio_dialog
 from .reporte import open_reporte_dialog
 from .nueva_orden import build_new_order_view
 from .charts import open_status_chart_dialog  # ← NUEVO
+from .kpis import open_kpis_dialog
+from .progreso import Progreso
+from .typeahead import Typeahead
+from .tabla_ordenes import TablaOrdenes
+from controller.order_index import OrderIndex
 
 # --- Validaciones ligeras usadas en los formularios ---
 EMAIL_RE = re.compile(r"^[A-Z0-9._%+-]+@[A-Z0-9.-]+\.[A-Z]{2,}$", re.I)
@@ -116,22 +121,6 @@ def build_dashboard_view(page: ft.Page, db_instance, connection, user) -> ft.Vie
 
     status_cat = _status_catalog_from_db()  # cache inicial
 
-    def _status_chip(nombre_ui: str):
-        color = {
-            "En proceso": ft.colors.DEEP_PURPLE,
-            "Terminado": ft.colors.GREEN,
-            "Recogido": ft.colors.AMBER_900,
-            "Alta": ft.colors.LIGHT_BLUE_200,
-        }.get(nombre_ui, ft.colors.AMBER)
-        return ft.Container(
-            content=ft.Text(nombre_ui, weight=ft.FontWeight.BOLD, text_align=ft.TextAlign.CENTER),
-            border_radius=10,
-            bgcolor=color,
-            width=100,
-            alignment=ft.alignment.center,
-            height=30,
-        )
-
     def _ui_status_name(name_or_id):
         try:
             sid = int(name_or_id)
@@ -231,7 +220,7 @@ def build_dashboard_view(page: ft.Page, db_instance, connection, user) -> ft.Vie
     def toggle_dir(e):
         btn_dir.selected = not btn_dir.selected
         btn_dir.update()
-        llenar_tabla(True)
+        _aplicar_vista()
 
     btn_dir = ft.IconButton(
         icon=ft.icons.ARROW_DOWNWARD,
@@ -247,8 +236,26 @@ def build_dashboard_view(page: ft.Page, db_instance, connection, user) -> ft.Vie
         on_click=lambda e: open_status_chart_dialog(page, db_instance, _ui_status_name),
         tooltip="Ver resumen por estatus",
     )
+    btn_kpis = ft.ElevatedButton(
+        "KPIs",
+        on_click=lambda e: open_kpis_dialog(page, db_instance, _ui_status_name),
+        tooltip="Ingresos, horas por técnico y tiempos por estatus",
+    )
 
-    filtros = ft.Row([filtro_estado, filtro_taller, btn_dir, btn_chart], spacing=12)
+    # búsqueda libre sobre el índice en memoria (se habilita cuando termina de cargar)
+    tf_buscar = ft.TextField(
+        hint_text="Buscar marca, modelo o cliente…", width=260, dense=True, disabled=True,
+    )
+
+    # recarga completa (órdenes de otras sesiones); lo que se guarda aquí se
+    # actualiza sólo en el índice
+    btn_recargar = ft.IconButton(
+        icon=ft.icons.REFRESH,
+        on_click=lambda e: llenar_tabla(True),
+        tooltip="Recargar órdenes",
+    )
+
+    filtros = ft.Row([filtro_estado, filtro_taller, btn_dir, btn_recargar, tf_buscar, btn_chart, btn_kpis], spacing=12)
 
     # ===== utilidades de diálogo (compat Flet) =====
     def _open_dialog(dlg: ft.AlertDialog):
@@ -283,6 +290,7 @@ def build_dashboard_view(page: ft.Page, db_instance, connection, user) -> ft.Vie
             """,
             dict(marca=marca, tipo_id=int(tipo_id), modelo=modelo, status_id=int(status_id), ord=int(orden_id)),
         )
+        db_instance.kpi_marcar(orden_id, status_id)  # historial de status y rollups
 
     def _actualizar_horas_orden(cve_orden: int, horas: int):
         cur = connection.cursor()
@@ -299,6 +307,7 @@ def build_dashboard_view(page: ft.Page, db_instance, connection, user) -> ft.Vie
             """,
             dict(horas=int(horas), ord=int(cve_orden)),
         )
+        db_instance.kpi_marcar(cve_orden)
 
     # ===== Diálogos de técnicos/taller, cliente y orden =====
     def open_tecnicos_taller_dialog(o):
@@ -436,15 +445,15 @@ def build_dashboard_view(page: ft.Page, db_instance, connection, user) -> ft.Vie
                         return
 
                 try:
-                    connection.commit()
+                    getattr(db_instance, "commit", connection.commit)()
                 except Exception:
                     pass
                 _close_dialog(dlg)
                 page.open(ft.SnackBar(ft.Text("Cliente actualizado con éxito")))
-                llenar_tabla(True)
+                actualizar_ordenes([o.cve_orden])
             except Exception as ex:
                 try:
-                    connection.rollback()
+                    getattr(db_instance, "rollback", connection.rollback)()
                 except Exception:
                     pass
                 err.value = f"Error al guardar: {ex}"
@@ -526,7 +535,7 @@ def build_dashboard_view(page: ft.Page, db_instance, connection, user) -> ft.Vie
                 _close_dialog(dlg)
                 nonlocal status_cat
                 status_cat = _status_catalog_from_db()
-                llenar_tabla(True)
+                actualizar_ordenes([o.cve_orden])
                 page.open(ft.SnackBar(ft.Text("Orden actualizada con éxito")))
             except Exception as ex:
                 try:
@@ -569,69 +578,211 @@ def build_dashboard_view(page: ft.Page, db_instance, connection, user) -> ft.Vie
         alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
     )
 
-    contenedor_ordenes = ft.Column(scroll=ft.ScrollMode.AUTO, expand=True)
-
-    def ver_tecnico(lista):
-        if not lista:
-            return ""
-        return lista[0] if len(lista) == 1 else f"{lista[0]}..."
+    # Filas por cve_orden: recargar sólo crea/quita/parcha lo que cambió
+    tabla = TablaOrdenes(
+        status_ui=_ui_status_name,
+        colores={
+            "En proceso": ft.colors.DEEP_PURPLE,
+            "Terminado": ft.colors.GREEN,
+            "Recogido": ft.colors.AMBER_900,
+            "Alta": ft.colors.LIGHT_BLUE_200,
+        },
+        on_tecnicos=lambda o: open_tecnicos_taller_dialog(o),
+        on_editar_cliente=lambda o: open_edit_client_dialog(o),
+        on_editar_orden=lambda o: open_edit_order_dialog(o),
+    )
+    contenedor_ordenes = tabla.control
 
     def _resumir(o) -> str:
         return f"{getattr(o,'cve_orden','')} {getattr(o,'eq_modelo','')} {getattr(o,'cliente','')}"
 
-    def llenar_tabla(cambio_dir: bool = False):
-        contenedor_ordenes.controls.clear()
+    # Paginación keyset: la primera pantalla pinta con una sola consulta pequeña
+    # y el resto se pide al hacer scroll hasta el final.
+    PAGE_SIZE = 50
+    # Las consultas corren fuera del hilo de la UI (AsyncDBFacade); cada
+    # recarga lleva un número (gen) y lo que vuelva de una anterior se descarta.
+    _pagina = {"cursor": None, "fin": True, "cargando": False, "dir": "desc", "snap": None, "gen": 0,
+               "resultado": None, "pos": 0, "gen_indice": 0}
+    # Todas las órdenes en memoria (se llena en segundo plano, en lotes de
+    # INDICE_LOTE); cuando está completo los filtros ya no consultan la base.
+    INDICE_LOTE = 1000
+    indice = OrderIndex()
+    adb = db_instance.asincrono()
+    progreso_tabla = Progreso(page, "Cargando órdenes…")
+
+    async def _catalogos_snapshot():
+        """Catálogos leídos una vez por repintado (no una consulta por fila)."""
         try:
-            ordenes = db_instance.ordenes() or []
+            return await adb.catalogos_snapshot()
         except Exception:
-            ordenes = []
-        data = list(reversed(ordenes)) if cambio_dir or btn_dir.selected else ordenes
+            return None
 
-        tipos_cat = _tipos_catalogo()  # id -> nombre
+    def _status_ids_filtro() -> list[int] | None:
+        if filtro_estado.value in (None, "", "Todos"):
+            return None
+        return [sid for sid in status_cat if _ui_status_name(sid) == filtro_estado.value]
 
-        for o in data:
-            nombre_status_ui = _ui_status_name(getattr(o, "cve_status", None))
-            pasa_estado = (filtro_estado.value == "Todos") or (nombre_status_ui == filtro_estado.value)
-            pasa_taller = (str(filtro_taller.value) == "0") or (str(getattr(o, "cve_taller", "")) == str(filtro_taller.value))
-            if not (pasa_estado and pasa_taller):
-                continue
+    def _taller_filtro() -> int | None:
+        val = str(filtro_taller.value or "0")
+        return None if val == "0" else int(val)
 
-            try:
-                tipo_nombre = tipos_cat.get(getattr(o, "cve_tipo_equipo", None), "")
-            except Exception:
-                tipo_nombre = ""
-
-            fila = ft.Row(
-                [
-                    ft.Text(str(getattr(o, "cve_orden", "")), width=50),
-                    _status_chip(nombre_status_ui),
-                    ft.Text(ver_tecnico(getattr(o, "tecnicos", [])), width=120),
-                    ft.IconButton(icon=ft.icons.REMOVE_RED_EYE, on_click=lambda e, oo=o: open_tecnicos_taller_dialog(oo), width=50),
-                    ft.Text(getattr(o, "eq_marca", ""), width=100),
-                    ft.Text(getattr(o, "eq_modelo", ""), width=100),
-                    ft.Text(tipo_nombre, width=100),
-                    ft.Text(str(getattr(o, "cliente", "")), width=120),
-                    ft.IconButton(icon=ft.icons.EDIT, on_click=lambda e, oo=o: open_edit_client_dialog(oo), width=110),
-                    ft.IconButton(icon=ft.icons.EDIT, on_click=lambda e, oo=o: open_edit_order_dialog(oo), width=110),
-                ],
-                alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
-                height=50,
+    async def _cargar_pagina(gen: int) -> list:
+        try:
+            filas, siguiente = await adb.ordenes_pagina(
+                PAGE_SIZE, _pagina["cursor"],
+                status=_status_ids_filtro(), taller=_taller_filtro(), direction=_pagina["dir"],
             )
-            contenedor_ordenes.controls += [fila, ft.Divider()]
+        except Exception:
+            filas, siguiente = [], None
+        if gen != _pagina["gen"]:
+            return []  # llegó tarde: ya hay otra recarga en curso
+        _pagina["cursor"] = siguiente
+        _pagina["fin"] = siguiente is None
+        return filas or []
 
+    def _direccion() -> str:
+        return "asc" if btn_dir.selected else "desc"
+
+    def llenar_tabla(cambio_dir: bool = False):
+        """Recarga todo desde la base y rehace el índice en segundo plano (botón Recargar)."""
+        indice.invalidar()
+        tf_buscar.disabled = True
+        _pagina["gen_indice"] += 1
+        _consultar()
+        page.run_task(_cargar_indice_async, _pagina["gen_indice"])
+
+    def _consultar():
+        _pagina["gen"] += 1
+        _pagina["resultado"] = None
+        progreso_tabla.lanzar(_llenar_tabla_async, _pagina["gen"], _direccion(), reemplazar=True)
+
+    def _aplicar_vista(e=None):
+        """Filtros, dirección y búsqueda: con el índice completo no se toca la base."""
+        if not indice.completo:
+            _consultar()
+            return
+        _pagina["gen"] += 1  # descarta lo que aún venga de la base
+        ids = indice.filtrar(
+            status=_status_ids_filtro(), taller=_taller_filtro(),
+            texto=tf_buscar.value or "", desc=_direccion() == "desc",
+        )
+        _pagina.update(resultado=ids, pos=PAGE_SIZE, fin=len(ids) <= PAGE_SIZE, cargando=False)
+        tabla.sincronizar(indice.ordenes(ids[:PAGE_SIZE]), _pagina["snap"])
         page.update()
 
-    def _refresh_orders_and_table():
-        """Recarga y repinta después de operaciones en partes/servicios/notas."""
+    def actualizar_ordenes(ids=None):
+        """
+        Tras guardar: relee sólo esas órdenes (None = las nuevas, con cve_orden
+        mayor a la última del índice) y las pone/quita del índice.
+        """
+        if not indice.completo:
+            llenar_tabla(True)  # el índice aún se está cargando
+            return
+        page.run_task(_actualizar_ordenes_async, None if ids is None else [int(i) for i in ids])
+
+    async def _actualizar_ordenes_async(ids):
+        gen = _pagina["gen_indice"]
+        try:
+            if ids is None:
+                filas, cursor = [], indice.ultima()
+                while True:
+                    lote, cursor = await adb.ordenes_pagina(INDICE_LOTE, cursor, direction="asc")
+                    filas.extend(lote or [])
+                    if cursor is None:
+                        break
+            else:
+                filas = await adb.ordenes_por_id(ids) if ids else []
+        except Exception:
+            llenar_tabla(True)
+            return
+        if gen != _pagina["gen_indice"]:
+            return  # hubo una recarga completa mientras tanto
+        vistas = set()
+        for o in filas:
+            indice.poner(o)
+            vistas.add(int(o.cve_orden))
+        for cve in ids or ():
+            if cve not in vistas:
+                indice.quitar(cve)  # ya no existe
+        _aplicar_vista()
+
+    async def _cargar_indice_async(gen: int):
+        todas, cursor = [], None
+        try:
+            while True:
+                filas, cursor = await adb.ordenes_pagina(INDICE_LOTE, cursor, direction="asc")
+                if gen != _pagina["gen_indice"]:
+                    return
+                todas.extend(filas or [])
+                if cursor is None:
+                    break
+        except Exception:
+            return  # sin índice: los filtros siguen yendo a la base
+        indice.cargar(todas)
+        tf_buscar.disabled = False
+        page.update()
+
+    async def _llenar_tabla_async(gen: int, direccion: str):
+        _pagina.update(cursor=None, fin=False, cargando=True, dir=direccion)
+        try:
+            snap = await _catalogos_snapshot()
+            filas = await _cargar_pagina(gen)
+            if gen != _pagina["gen"]:
+                return
+            _pagina["snap"] = snap
+            tabla.sincronizar(filas, snap)
+            page.update()
+        finally:
+            if gen == _pagina["gen"]:
+                _pagina["cargando"] = False
+
+    async def _mas_filas_async(gen: int):
+        try:
+            filas = await _cargar_pagina(gen)
+            if gen == _pagina["gen"]:
+                tabla.agregar(filas, _pagina["snap"])
+                page.update()
+        finally:
+            if gen == _pagina["gen"]:
+                _pagina["cargando"] = False
+
+    def _on_scroll_ordenes(e):
+        if _pagina["fin"] or _pagina["cargando"]:
+            return
+        try:
+            cerca_del_final = float(e.pixels) >= float(e.max_scroll_extent) - 200
+        except Exception:
+            return
+        if not cerca_del_final:
+            return
+        ids = _pagina["resultado"]
+        if ids is not None:
+            # resultado del índice: la siguiente página sale de memoria
+            pos = _pagina["pos"]
+            tabla.agregar(indice.ordenes(ids[pos:pos + PAGE_SIZE]), _pagina["snap"])
+            _pagina.update(pos=pos + PAGE_SIZE, fin=pos + PAGE_SIZE >= len(ids))
+            page.update()
+            return
+        _pagina["cargando"] = True
+        page.run_task(_mas_filas_async, _pagina["gen"])
+
+    contenedor_ordenes.on_scroll = _on_scroll_ordenes
+
+    def _refresh_orders_and_table(cve_orden):
+        """Repinta la orden tocada después de operaciones en partes/servicios/notas."""
+        page.run_task(_refresh_orders_and_table_async, cve_orden)
+
+    async def _refresh_orders_and_table_async(cve_orden):
         nonlocal status_cat
         try:
-            status_cat = _status_catalog_from_db()
+            status_cat = await adb.llamar(_status_catalog_from_db)
         except Exception:
             pass
-        llenar_tabla(True)
+        actualizar_ordenes([cve_orden])
 
-    filtro_estado.on_change = lambda e: llenar_tabla()
-    filtro_taller.on_change = lambda e: llenar_tabla()
+    filtro_estado.on_change = _aplicar_vista
+    filtro_taller.on_change = _aplicar_vista
+    tf_buscar.on_change = _aplicar_vista
     llenar_tabla(False)
 
     # ====== OVERRIDES: Partes / Servicios con commit+refresh inmediato ======
@@ -657,16 +808,8 @@ def build_dashboard_view(page: ft.Page, db_instance, connection, user) -> ft.Vie
         def _pieza_txt(n: dict) -> str:
             return f"{n['cve_parte']} {(n.get('part_no') or '')} {n['descripcion']} ${n['precio']}"
 
-        try:
-            piezas = db_.partes() or []
-        except Exception:
-            piezas = []
-
-        piezas_dropdown = ft.Dropdown(
-            options=[ft.dropdown.Option(text=_pieza_txt(n), key=str(n['cve_parte'])) for n in piezas],
-            label='Seleccione la pieza',
-            width=420,
-        )
+        piezas_dropdown = Typeahead(page_, db_.buscar_partes, texto=_pieza_txt, clave="cve_parte",
+                                    label='Busque la pieza', width=420)
 
         def guardar(e=None):
             if ordenes_dropdown.value and piezas_dropdown.value:
@@ -674,7 +817,7 @@ def build_dashboard_view(page: ft.Page, db_instance, connection, user) -> ft.Vie
                     db_.parte_orden(int(ordenes_dropdown.value), int(piezas_dropdown.value))
                     conn_.commit()
                     _close_dialog(dlg)
-                    _refresh_orders_and_table()
+                    _refresh_orders_and_table(int(ordenes_dropdown.value))
                     page_.open(ft.SnackBar(ft.Text('Parte agregada con éxito')))
                 except Exception as ex:
                     try:
@@ -690,7 +833,7 @@ def build_dashboard_view(page: ft.Page, db_instance, connection, user) -> ft.Vie
         dlg = ft.AlertDialog(
             modal=True,
             title=ft.Text('Añadir nueva parte a orden'),
-            content=ft.Column([ordenes_dropdown, piezas_dropdown, error], width=500),
+            content=ft.Column([ordenes_dropdown, piezas_dropdown.control, error], width=500),
             actions=[ft.ElevatedButton('Añadir', on_click=guardar),
                      ft.ElevatedButton('Cancelar', color=ft.colors.RED, on_click=lambda e: _close_dialog(dlg))],
             actions_alignment=ft.MainAxisAlignment.END,
@@ -744,7 +887,7 @@ def build_dashboard_view(page: ft.Page, db_instance, connection, user) -> ft.Vie
             try:
                 db_.eliminar_parte(p['cve_orden_parte'])
                 connection.commit()
-                _refresh_orders_and_table()
+                _refresh_orders_and_table(int(ordenes_dd.value))
                 actualizar()
                 page_.open(ft.SnackBar(ft.Text('Parte eliminada')))
             except Exception as ex:
@@ -789,16 +932,8 @@ def build_dashboard_view(page: ft.Page, db_instance, connection, user) -> ft.Vie
         def _serv_txt(s: dict) -> str:
             return f"{s['cve_servicio']} ${s['precio']} {s['descripcion']}"
 
-        try:
-            servs = db_.servicios() or []
-        except Exception:
-            servs = []
-
-        servicios_dd = ft.Dropdown(
-            options=[ft.dropdown.Option(text=_serv_txt(s), key=str(s['cve_servicio'])) for s in servs],
-            label='Servicio',
-            width=420,
-        )
+        servicios_dd = Typeahead(page_, db_.buscar_servicios, texto=_serv_txt, clave="cve_servicio",
+                                 label='Busque el servicio', width=420)
 
         def guardar(e=None):
             if ordenes_dd.value and servicios_dd.value:
@@ -806,7 +941,7 @@ def build_dashboard_view(page: ft.Page, db_instance, connection, user) -> ft.Vie
                     db_.servicio_orden(int(ordenes_dd.value), int(servicios_dd.value))
                     conn_.commit()
                     _close_dialog(dlg)
-                    _refresh_orders_and_table()
+                    _refresh_orders_and_table(int(ordenes_dd.value))
                     page_.open(ft.SnackBar(ft.Text('Servicio agregado con éxito')))
                 except Exception as ex:
                     try:
@@ -822,7 +957,7 @@ def build_dashboard_view(page: ft.Page, db_instance, connection, user) -> ft.Vie
         dlg = ft.AlertDialog(
             modal=True,
             title=ft.Text('Añadir nuevo servicio a orden'),
-            content=ft.Column([ordenes_dd, servicios_dd, error], width=500),
+            content=ft.Column([ordenes_dd, servicios_dd.control, error], width=500),
             actions=[ft.ElevatedButton('Añadir', on_click=guardar),
                      ft.ElevatedButton('Cancelar', color=ft.colors.RED, on_click=lambda e: _close_dialog(dlg))],
             actions_alignment=ft.MainAxisAlignment.END,
@@ -876,7 +1011,7 @@ def build_dashboard_view(page: ft.Page, db_instance, connection, user) -> ft.Vie
             try:
                 db_.eliminar_servicio(s['cve_orden_servicio'])
                 connection.commit()
-                _refresh_orders_and_table()
+                _refresh_orders_and_table(int(ordenes_dd.value))
                 actualizar()
                 page_.open(ft.SnackBar(ft.Text('Servicio eliminado')))
             except Exception as ex:
@@ -905,7 +1040,7 @@ def build_dashboard_view(page: ft.Page, db_instance, connection, user) -> ft.Vie
     def nueva_orden(e=None):
         def _refrescar():
             try:
-                llenar_tabla(True)
+                actualizar_ordenes()  # sólo las órdenes nuevas
             except Exception:
                 pass
         page.views.append(build_new_order_view(page, db_instance, connection, on_saved=_refrescar))
@@ -981,6 +1116,7 @@ def build_dashboard_view(page: ft.Page, db_instance, connection, user) -> ft.Vie
                     [
                         ft.ElevatedButton("Nueva", on_click=lambda e: open_nueva_nota_dialog(page, db_instance, connection), visible=permisos.get("Nueva_Nota", True)),
                         ft.ElevatedButton("Ver", on_click=lambda e: open_notas_dialog(page, db_instance), visible=permisos.get("Ver_Nota", True)),
+                        ft.ElevatedButton("Buscar", on_click=lambda e: open_buscar_notas_dialog(page, db_instance), visible=permisos.get("Ver_Nota", True)),
                     ],
                     alignment=ft.MainAxisAlignment.SPACE_AROUND,
                 ),
@@ -998,6 +1134,7 @@ def build_dashboard_view(page: ft.Page, db_instance, connection, user) -> ft.Vie
             ft.Divider(height=20, thickness=1),
             filtros,  # ← aquí ya aparece el botón "Gráfica" junto a la flecha
             encabezado_tabla,
+            progreso_tabla.control,
             contenedor_ordenes,
         ],
         vertical_alignment=ft.MainAxisAlignment.START,
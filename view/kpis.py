@@ -0,0 +1,161 @@
+# view/kpis.py
+from __future__ import annotations
+from datetime import date, timedelta
+from typing import Callable
+import flet as ft
+
+from .progreso import Progreso
+
+
+RANGOS = {
+    "30": ("Últimos 30 días", 30),
+    "90": ("Últimos 90 días", 90),
+    "365": ("Último año", 365),
+    "todo": ("Todo", None),
+}
+
+
+def _dinero(v) -> str:
+    return f"${float(v or 0):,.2f}"
+
+
+def _horas(v) -> str:
+    return f"{float(v or 0):,.1f} h"
+
+
+def _tabla(columnas, filas) -> ft.Control:
+    if not filas:
+        return ft.Text("Sin datos.", italic=True)
+    return ft.Column(
+        [ft.DataTable(
+            columns=[ft.DataColumn(ft.Text(c), numeric=i > 0) for i, c in enumerate(columnas)],
+            rows=[ft.DataRow(cells=[ft.DataCell(ft.Text(str(x))) for x in f]) for f in filas],
+        )],
+        scroll=ft.ScrollMode.AUTO,
+        height=300,
+    )
+
+
+def open_kpis_dialog(page: ft.Page, db_instance, ui_status_name_fn: Callable[[int | str | None], str]) -> None:
+    """
+    KPIs operativos leídos de los rollups diarios (ver kpi_rollup.py):
+    ingreso por taller, horas por técnico y tiempo promedio en cada estatus.
+    Al abrir se aplican primero los cambios pendientes (sólo los días tocados).
+    """
+    adb = db_instance.asincrono()
+    prog = Progreso(page, "Calculando KPIs…")
+
+    dd_rango = ft.Dropdown(
+        label="Periodo",
+        width=180,
+        value="30",
+        options=[ft.dropdown.Option(k, v[0]) for k, v in RANGOS.items()],
+    )
+    dd_taller = ft.Dropdown(label="Taller", width=180, value="0",
+                            options=[ft.dropdown.Option("0", "Todos")])
+    try:
+        for tid, nombre in (db_instance.talleres() or {}).items():
+            dd_taller.options.append(ft.dropdown.Option(str(tid), nombre))
+    except Exception:
+        pass
+
+    totales = ft.Row(spacing=24)
+    tab_ingresos = ft.Container()
+    tab_tecnicos = ft.Container()
+    tab_tiempos = ft.Container()
+
+    def _tarjeta(titulo: str, valor: str) -> ft.Control:
+        return ft.Column([ft.Text(titulo, size=12), ft.Text(valor, size=18, weight=ft.FontWeight.BOLD)],
+                         spacing=2)
+
+    async def _cargar():
+        dias = RANGOS.get(dd_rango.value or "todo", (None, None))[1]
+        desde = date.today() - timedelta(days=dias) if dias else None
+        taller = int(dd_taller.value) if dd_taller.value and dd_taller.value != "0" else None
+
+        if not await adb.kpi_disponible():
+            totales.controls = [ft.Text(
+                "Las tablas de KPIs no existen en este esquema (correr kpi_rollup.py --crear).",
+                italic=True,
+            )]
+            page.update()
+            return
+
+        aviso = None
+        try:
+            await adb.kpi_refrescar()
+        except Exception as ex:
+            aviso = f"No se aplicaron los cambios pendientes a los KPIs: {ex}"
+        resumen = await adb.kpi_resumen(desde=desde, taller=taller)
+        tecnicos = await adb.kpi_horas_tecnico(desde=desde, taller=taller)
+        tiempos = await adb.kpi_turnaround(desde=desde, taller=taller)
+        try:
+            nombres = db_instance.talleres() or {}
+        except Exception:
+            nombres = {}
+
+        ingreso = sum(float(r.get("ingreso") or 0) for r in resumen)
+        ordenes = sum(int(r.get("ordenes") or 0) for r in resumen)
+        horas = sum(float(r.get("horas") or 0) for r in resumen)
+        totales.controls = [
+            _tarjeta("Ingreso", _dinero(ingreso)),
+            _tarjeta("Órdenes", str(ordenes)),
+            _tarjeta("Horas", _horas(horas)),
+            _tarjeta("Ticket promedio", _dinero(ingreso / ordenes if ordenes else 0)),
+        ]
+        if aviso:
+            totales.controls.append(ft.Text(aviso, color="red", size=12))
+        tab_ingresos.content = _tabla(
+            ["Taller", "Órdenes", "Partes", "Servicios", "Mano de obra", "Ingreso"],
+            [[nombres.get(int(r["cve_taller"]), r["cve_taller"]), int(r["ordenes"] or 0),
+              _dinero(r["partes"]), _dinero(r["servicios"]), _dinero(r["mano_obra"]),
+              _dinero(r["ingreso"])] for r in resumen],
+        )
+        tab_tecnicos.content = _tabla(
+            ["Técnico", "Órdenes", "Horas"],
+            [[r["tecnico"], int(r["ordenes"] or 0), _horas(r["horas"])] for r in tecnicos],
+        )
+        tab_tiempos.content = _tabla(
+            ["Taller", "Estatus", "Cambios", "Promedio"],
+            [[nombres.get(int(r["cve_taller"]), r["cve_taller"]), ui_status_name_fn(r["cve_status"]),
+              int(r["intervalos"] or 0), _horas(r["horas_promedio"])] for r in tiempos],
+        )
+        page.update()
+
+    def recargar(e=None):
+        prog.lanzar(_cargar, texto="Calculando KPIs…", reemplazar=True)
+
+    dd_rango.on_change = recargar
+    dd_taller.on_change = recargar
+
+    try:
+        cuerpo = ft.Tabs(
+            selected_index=0,
+            height=320,
+            tabs=[
+                ft.Tab(text="Ingresos por taller", content=tab_ingresos),
+                ft.Tab(text="Horas por técnico", content=tab_tecnicos),
+                ft.Tab(text="Tiempo por estatus", content=tab_tiempos),
+            ],
+        )
+    except Exception:
+        cuerpo = ft.Column([tab_ingresos, tab_tecnicos, tab_tiempos], scroll=ft.ScrollMode.AUTO, height=320)
+
+    dlg = ft.AlertDialog(
+        modal=True,
+        title=ft.Text("KPIs del taller"),
+        content=ft.Container(
+            width=720,
+            content=ft.Column([ft.Row([dd_rango, dd_taller, prog.control], spacing=12), totales, cuerpo],
+                              tight=True),
+        ),
+        actions=[ft.ElevatedButton("Cerrar", on_click=lambda e: page.close(dlg))],
+        actions_alignment=ft.MainAxisAlignment.END,
+    )
+    try:
+        page.open(dlg)
+    except Exception:
+        page.dialog = dlg
+        dlg.open = True
+        page.update()
+    recargar()
@@ -70,6 +70,9 @@ def build_login_view(page: ft.Page) -> ft.View:
             page.update()
             return
 
+        # al cerrar la pestaña/ventana: vacía notas y devuelve la conexión al pool
+        page.on_disconnect = lambda e: controller.close()
+
         # Usuario app (como en simple_view.py)
         usuarios = usuarios_default() or []
         user = next((x for x in usuarios if x.name == u), None) or usuarios[0]
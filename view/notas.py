@@ -3,23 +3,31 @@ import flet as ft
 
 if not hasattr(ft, "colors") and hasattr(ft, "Colors"):
     ft.colors = ft.Colors
+if not hasattr(ft, "icons") and hasattr(ft, "Icons"):
+    ft.icons = ft.Icons
 
-def open_notas_dialog(page: ft.Page, db):
+def open_notas_dialog(page: ft.Page, db, cve_orden=None):
     ordenes = db.ordenes() or []
     dd = ft.Dropdown(
         label="Orden",
         options=[ft.dropdown.Option(text=f"{o.cve_orden} {o.eq_modelo}", key=o.cve_orden) for o in ordenes],
-        width=540
+        width=540,
+        value=cve_orden,
     )
+    encabezado = ft.Text("", size=13, italic=True)
     lista = ft.Column(expand=True, scroll=ft.ScrollMode.AUTO)
 
     def actualizar(e=None):
         lista.controls.clear()
+        encabezado.value = ""
         if dd.value:
             try:
-                notas = db.notas(int(dd.value)) or []
+                det = db.orden_detalle(int(dd.value))
             except Exception:
-                notas = []
+                det = None
+            notas = det.notas if det else []
+            if det:
+                encabezado.value = f"{det.eq_marca} {det.eq_modelo} · {det.cliente}".strip()
             for n in notas:
                 txt = n.get("nota") if isinstance(n, dict) else str(n)
                 lista.controls.append(ft.ListTile(title=ft.Text(txt or "(nota vacía)")))
@@ -28,7 +36,7 @@ def open_notas_dialog(page: ft.Page, db):
     dd.on_change = actualizar
     dlg = ft.AlertDialog(
         title=ft.Text("Notas por orden"),
-        content=ft.Column([dd, ft.Container(lista, height=260, width=540)], tight=True, width=560),
+        content=ft.Column([dd, encabezado, ft.Container(lista, height=260, width=540)], tight=True, width=560),
         actions=[ft.TextButton("Cerrar", on_click=lambda e: close())],
         open=True,
     )
@@ -48,28 +56,87 @@ def open_nueva_nota_dialog(page: ft.Page, db, conn):
     )
     campo = ft.TextField(label="Nota", multiline=True, min_lines=4, expand=True, border_color=ft.colors.BLUE_300)
     err = ft.Text("", color="red")
+    estado = ft.Text("", size=12, italic=True)
 
     def guardar(e=None):
+        # sólo encola: las notas se escriben juntas al cerrar el diálogo
         if not dd.value or not (campo.value or "").strip():
             err.value = "Rellene todos los campos"; page.update(); return
         try:
-            db.insertar_nota(int(dd.value), campo.value.strip())
-            conn.commit()
-            close()
-            page.open(ft.SnackBar(ft.Text("Nota agregada con éxito")))
-            open_notas_dialog(page, db)  # abre el visor
+            n = db.encolar_nota(int(dd.value), campo.value.strip())
+            campo.value = ""
+            err.value = ""
+            estado.value = f"{n} nota(s) por guardar" if n else "Notas guardadas"
+            page.update()
         except Exception as ex:
             err.value = f"Error: {ex}"; page.update()
 
+    def cerrar(e=None):
+        try:
+            n = db.vaciar_notas()
+        except Exception as ex:
+            # las notas siguen en el lote; el diálogo queda abierto para reintentar
+            dlg.open = True
+            err.value = f"Error al guardar notas: {ex}"; page.update()
+            return
+        dlg.open = False; page.update()
+        if n:
+            page.open(ft.SnackBar(ft.Text(f"{n} nota(s) agregada(s) con éxito")))
+            open_notas_dialog(page, db)  # abre el visor
+
     dlg = ft.AlertDialog(
         title=ft.Text("Nueva nota"),
-        content=ft.Column([dd, campo, err], tight=True, width=560),
-        actions=[ft.ElevatedButton("Agregar", on_click=guardar), ft.TextButton("Cancelar", on_click=lambda e: close())],
+        content=ft.Column([dd, campo, estado, err], tight=True, width=560),
+        actions=[ft.ElevatedButton("Agregar", on_click=guardar), ft.TextButton("Cerrar", on_click=cerrar)],
+        on_dismiss=cerrar,
         open=True,
     )
-    def close(): dlg.open=False; page.update()
+    page.overlay.append(dlg); page.update()
+
+def open_buscar_notas_dialog(page: ft.Page, db):
+    """Busca texto en todas las notas; clic en un resultado abre las notas de esa orden."""
+    ordenes = {int(o.cve_orden): o for o in (db.ordenes() or [])}
+    campo = ft.TextField(label="Buscar en notas", hint_text="p. ej. bisagra rota", autofocus=True, width=540)
+    estado = ft.Text("", size=12, italic=True)
+    lista = ft.Column(expand=True, scroll=ft.ScrollMode.AUTO)
+
+    def abrir(cve):
+        dlg.open = False; page.update()
+        open_notas_dialog(page, db, cve)
+
+    def buscar(e=None):
+        lista.controls.clear()
+        texto = (campo.value or "").strip()
+        if not texto:
+            estado.value = ""; page.update(); return
+        try:
+            res = db.buscar_notas(texto)
+        except Exception as ex:
+            estado.value = f"Error: {ex}"; page.update(); return
+        estado.value = f"{len(res)} orden(es)" if res else "Sin coincidencias"
+        for cve, puntaje in res:
+            o = ordenes.get(cve)
+            titulo = f"{cve} {getattr(o, 'eq_marca', '') or ''} {getattr(o, 'eq_modelo', '') or ''}".strip()
+            lista.controls.append(ft.ListTile(
+                title=ft.Text(titulo),
+                subtitle=ft.Text(getattr(o, "cliente", "") or "") if o else None,
+                trailing=ft.Text(f"{puntaje:.2f}", size=12),
+                on_click=lambda e, c=cve: abrir(c),
+            ))
+        page.update()
+
+    campo.on_submit = buscar
+    dlg = ft.AlertDialog(
+        title=ft.Text("Buscar notas"),
+        content=ft.Column([ft.Row([campo, ft.IconButton(ft.icons.SEARCH, on_click=buscar)]), estado,
+                           ft.Container(lista, height=300, width=540)], tight=True, width=600),
+        actions=[ft.TextButton("Cerrar", on_click=lambda e: close())],
+        open=True,
+    )
+    def close(): dlg.open = False; page.update()
     page.overlay.append(dlg); page.update()
 
 # Aliases (por si importaste en inglés)
 open_notes_dialog = open_notas_dialog
-open_new_note_dialog = open_nueva_nota_dialog
\ No newline at end of file
+open_new_note_dialog = open_nueva_nota_dialog
+open_search_notes_dialog = open_buscar_notas_dialog
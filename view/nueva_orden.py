@@ -1,8 +1,11 @@
 # view/nueva_orden.py
 from __future__ import annotations
+import asyncio
 import re
 import flet as ft
 
+from .progreso import Progreso
+
 # Compat Flet
 if not hasattr(ft, "colors") and hasattr(ft, "Colors"):
     ft.colors = ft.Colors
@@ -89,6 +92,8 @@ def build_new_order_view(page: ft.Page, db_instance, connection, on_saved: calla
     tf_cp      = ft.TextField(label="Código Postal", expand=True, border_color=ft.colors.BLUE_300)
     tf_colonia = ft.TextField(label="Colonia", expand=True, border_color=ft.colors.BLUE_300)
     tf_mpio    = ft.TextField(label="Municipio", expand=True, border_color=ft.colors.BLUE_300)
+    # colonias ya registradas del CP (índice en memoria, sin ir a la base)
+    dd_colonias = ft.Dropdown(label="Colonias del CP", options=[], expand=True, visible=False)
 
     # ===== País / Estado =====
     _paises = _as_id_name_dict(db_instance.paises() or {})
@@ -203,12 +208,38 @@ def build_new_order_view(page: ft.Page, db_instance, connection, on_saved: calla
     def _cp_live(e=None):
         raw = (tf_cp.value or "")
         tf_cp.value = "".join(ch for ch in raw if ch.isdigit())[:5]
+        dd_colonias.options, dd_colonias.value, dd_colonias.visible = [], None, False
+        page.update()
+        if len(tf_cp.value) == 5:
+            # el primer uso carga el índice de direcciones: fuera del hilo de la UI
+            page.run_task(_sugerir_colonias_async, tf_cp.value)
+
+    async def _sugerir_colonias_async(cp_txt: str):
+        try:
+            info = await adb.cp_info(cp_txt)
+            cols = await adb.sugerir_colonias(cp_txt, tf_colonia.value or "")
+        except Exception:
+            info, cols = None, []
+        if tf_cp.value != cp_txt:
+            return  # el usuario ya cambió el CP
+        if info and info.get("municipio") and not (tf_mpio.value or "").strip():
+            tf_mpio.value = info["municipio"]
+        if cols:
+            dd_colonias.options = [ft.dropdown.Option(text=n, key=str(c)) for c, n in cols]
+            dd_colonias.visible = True
         page.update()
 
+    def _colonia_sel(e=None):
+        sel = next((o for o in dd_colonias.options if o.key == dd_colonias.value), None)
+        if sel:
+            tf_colonia.value = sel.text
+            page.update()
+
     tf_correo.on_change = _email_live
     tf_tel.on_change = _tel_live
     tf_numero.on_change = _num_live
     tf_cp.on_change = _cp_live
+    dd_colonias.on_change = _colonia_sel
 
     # ===== Orden =====
     tf_marca  = ft.TextField(label="Marca", expand=True, border_color=ft.colors.BLUE_300)
@@ -263,7 +294,13 @@ def build_new_order_view(page: ft.Page, db_instance, connection, on_saved: calla
             page.go("/dashboard")
         page.update()
 
+    btn_guardar = ft.ElevatedButton("Guardar")
+    progreso = Progreso(page)
+    adb = db_instance.asincrono()
+
     def guardar_orden(e=None):
+        if progreso.ocupado:
+            return
         error.value = ""
         tf_correo.error_text = None
         tf_tel.error_text = None
@@ -320,80 +357,89 @@ def build_new_order_view(page: ft.Page, db_instance, connection, on_saved: calla
             page.update()
             return
 
-        # === Estado: si usuario dejó "Otro" + texto pero NO pulsó el botón, lo creamos ahora ===
-        estado_id: int | None = None
-        if estado_sel == "Otro":
-            if not estado_otro:
-                error.value = "Escriba el nombre del nuevo estado."
-                page.update()
-                return
-            try:
-                new_id = db_instance.upsert_estado(_int_or_none(pais_val), estado_otro)
-            except Exception as ex:
-                print("WARN upsert_estado(save):", ex)
-                new_id = None
-
-            if new_id is None:
-                error.value = "No se pudo crear el estado. Intente de nuevo."
-                page.update()
-                return
-
-            estado_id = int(new_id)
-            try:
-                connection.commit()
-            except Exception:
-                pass
-        else:
-            estado_id = _int_or_none(estado_sel)
-
-        if not estado_id:
+        if estado_sel != "Otro" and not _int_or_none(estado_sel):
             error.value = "Seleccione un estado o escríbalo y agréguelo."
             page.update()
             return
+        if estado_sel == "Otro" and not estado_otro:
+            error.value = "Escriba el nombre del nuevo estado."
+            page.update()
+            return
 
-        # === Colonia opcionalmente normalizada ===
-        colonia_param = colonia_txt
-        try:
-            resolver_fn = getattr(db_instance, "resolve_or_create_colonia", None)
-            if resolver_fn:
-                cid = resolver_fn(
-                    cp=cp,
-                    nombre=colonia_txt,
-                    municipio=(mpio or None),
-                    estado=estado_id,
-                    pais=_int_or_none(pais_val)
+        def _guardar_bd():
+            """Todos los pasos en el hilo de BD, en una sola transacción."""
+            try:
+                # === Estado: si usuario dejó "Otro" + texto pero NO pulsó el botón, lo creamos ahora ===
+                if estado_sel == "Otro":
+                    try:
+                        new_id = db_instance.upsert_estado(_int_or_none(pais_val), estado_otro)
+                    except Exception as ex:
+                        print("WARN upsert_estado(save):", ex)
+                        new_id = None
+                    if new_id is None:
+                        raise RuntimeError("No se pudo crear el estado. Intente de nuevo.")
+                    estado_id = int(new_id)
+                else:
+                    estado_id = _int_or_none(estado_sel)
+
+                # === Colonia opcionalmente normalizada ===
+                colonia_param = colonia_txt
+                try:
+                    resolver_fn = getattr(db_instance, "resolve_or_create_colonia", None)
+                    if resolver_fn:
+                        cid = resolver_fn(
+                            cp=cp,
+                            nombre=colonia_txt,
+                            municipio=(mpio or None),
+                            estado=estado_id,
+                            pais=_int_or_none(pais_val)
+                        )
+                        if not cid:
+                            cid = resolver_fn(cp=cp, nombre=colonia_txt)
+                        if cid:
+                            colonia_param = int(cid)
+                except Exception as ex:
+                    print("WARN resolver_colonia:", ex)
+
+                # ==== Guardar ====
+                cli_id = db_instance.insertar_cliente_y_verificar_datos(
+                    nombre, paterno, materno, correo, tel_norm,
+                    calle, numero_norm, cp, colonia_param,
+                    mpio, estado_id, pais_val
                 )
-                if not cid:
-                    cid = resolver_fn(cp=cp, nombre=colonia_txt)
-                if cid:
-                    colonia_param = int(cid)
-        except Exception as ex:
-            print("WARN resolver_colonia:", ex)
+                if not cli_id:
+                    raise RuntimeError("No fue posible crear el cliente.")
+
+                db_instance.insertar_orden(
+                    1,  # cve_status inicial
+                    marca,
+                    modelo,
+                    tipo,
+                    nota,
+                    cli_id,
+                    taller,
+                    tecnico
+                )
+                # la fachada confirma y publica las colonias nuevas en el índice
+                getattr(db_instance, "commit", connection.commit)()
+            except Exception:
+                try:
+                    getattr(db_instance, "rollback", connection.rollback)()
+                except Exception:
+                    pass
+                raise
 
-        # ==== Guardar ====
-        try:
-            cli_id = db_instance.insertar_cliente_y_verificar_datos(
-                nombre, paterno, materno, correo, tel_norm,
-                calle, numero_norm, cp, colonia_param,
-                mpio, estado_id, pais_val
-            )
-            if not cli_id:
-                raise RuntimeError("No fue posible crear el cliente.")
-
-            db_instance.insertar_orden(
-                1,  # cve_status inicial
-                marca,
-                modelo,
-                tipo,
-                nota,
-                cli_id,
-                taller,
-                tecnico
-            )
+        async def _guardar_async():
             try:
-                connection.commit()
-            except Exception:
-                pass
+                await adb.llamar(_guardar_bd)
+            except asyncio.CancelledError:
+                error.value = "Guardado cancelado."
+                page.update()
+                raise
+            except Exception as ex:
+                error.value = f"Error al guardar: {ex}"
+                page.update()
+                return
 
             page.open(ft.SnackBar(ft.Text("Orden creada con éxito")))
             if callable(on_saved):
@@ -403,13 +449,10 @@ def build_new_order_view(page: ft.Page, db_instance, connection, on_saved: calla
                     pass
             cancelar()
 
-        except Exception as ex:
-            try:
-                connection.rollback()
-            except Exception:
-                pass
-            error.value = f"Error al guardar: {ex}"
-            page.update()
+        # la ventana sigue respondiendo mientras Oracle trabaja
+        progreso.lanzar(_guardar_async, texto="Guardando orden…", bloquear=[btn_guardar])
+
+    btn_guardar.on_click = guardar_orden
 
     # ===== UI =====
     return ft.View(
@@ -421,7 +464,8 @@ def build_new_order_view(page: ft.Page, db_instance, connection, on_saved: calla
                         ft.Text("Nueva Orden", size=24, weight=ft.FontWeight.BOLD),
                         error,
                         ft.Row([
-                            ft.ElevatedButton("Guardar", on_click=guardar_orden),
+                            progreso.control,
+                            btn_guardar,
                             ft.ElevatedButton("Cancelar", on_click=cancelar, color=ft.colors.RED),
                         ]),
                     ],
@@ -433,7 +477,7 @@ def build_new_order_view(page: ft.Page, db_instance, connection, on_saved: calla
                         ft.Row([tf_nombre, tf_pat, tf_mat]),
                         ft.Row([tf_correo, tf_tel]),
                         ft.Row([tf_calle, tf_numero, tf_cp]),
-                        ft.Row([tf_colonia, tf_mpio]),
+                        ft.Row([tf_colonia, dd_colonias, tf_mpio]),
                         ft.Row([dd_pais, dd_estado, tf_estado_otro, btn_estado_agregar]),
                     ],
                     spacing=5,
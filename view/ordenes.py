@@ -135,6 +135,7 @@ def open_editar_orden_dialog(
     orden_obj,
     on_saved=None,
     connection=None,
+    catalogos=None,
 ):
     """
     Diálogo de edición de orden:
@@ -143,6 +144,8 @@ def open_editar_orden_dialog(
       - Status (catálogo de status)
       - Nota del cliente
       - Taller / Técnico
+    `catalogos` (CatalogosSnapshot) evita volver a leer los catálogos si ya
+    los cargó la tabla.
     """
 
     # Getter flexible para dict/objeto
@@ -161,10 +164,24 @@ def open_editar_orden_dialog(
         page.open(ft.SnackBar(ft.Text("No se pudo identificar la orden.")))
         return
 
+    # La fila de la tabla no trae nota del cliente ni técnico: usa el detalle
+    if hasattr(db_instance, "orden_detalle"):
+        try:
+            det = db_instance.orden_detalle(int(cve_orden))
+            if det is not None:
+                orden_obj = det
+        except Exception:
+            pass
+
     # --- catálogos ---
-    status_cat = _status_catalog(db_instance)     # {id: nombre}
-    tipos_cat  = db_instance.tipos() or {}        # {id: (tarifa, nombre) | dict | str}
-    talls_cat  = db_instance.talleres() or {}     # {id: nombre}
+    if catalogos is not None:
+        status_cat = dict(catalogos.statuses) or _status_catalog(db_instance)
+        tipos_cat  = catalogos.tipos
+        talls_cat  = catalogos.talleres
+    else:
+        status_cat = _status_catalog(db_instance)     # {id: nombre}
+        tipos_cat  = db_instance.tipos() or {}        # {id: (tarifa, nombre) | dict | str}
+        talls_cat  = db_instance.talleres() or {}     # {id: nombre}
 
     # --- campos ---
     dd_status = ft.Dropdown(
@@ -354,9 +371,17 @@ def open_ordenes_page(page: ft.Page, db_instance):
         except Exception:
             ordenes = []
 
+        # Catálogos una sola vez por repintado; se inyectan a filas y diálogos
+        try:
+            snap = db_instance.catalogos_snapshot()
+        except Exception:
+            snap = None
+
         for o in ordenes:
             cve_orden = gv(o, "cve_orden", "orden", "id")
             status    = gv(o, "status", "estatus", default="")
+            if not status and snap is not None:
+                status = snap.status_nombre(gv(o, "cve_status"))
             tecnico   = gv(o, "tecnico", "empleado", default="")
             cliente   = gv(o, "cliente", "nombre_cliente", default="")
             modelo    = gv(o, "eq_modelo", "modelo", default="")
@@ -370,7 +395,9 @@ def open_ordenes_page(page: ft.Page, db_instance):
             btn_editar_orden = ft.IconButton(
                 icon=ft.icons.EDIT,
                 tooltip="Editar orden",
-                on_click=lambda e, orden=o: open_editar_orden_dialog(page, db_instance, orden, on_saved=recargar_tabla),
+                on_click=lambda e, orden=o: open_editar_orden_dialog(
+                    page, db_instance, orden, on_saved=recargar_tabla, catalogos=snap
+                ),
             )
 
             fila = ft.Row(
@@ -1,38 +1,71 @@
 # view/partes.py
 import flet as ft
 
+from .typeahead import Typeahead
+
 if not hasattr(ft, "colors") and hasattr(ft, "Colors"):
     ft.colors = ft.Colors
+if not hasattr(ft, "icons") and hasattr(ft, "Icons"):
+    ft.icons = ft.Icons
 
-def open_partes_dialog(page: ft.Page, db):
+def open_partes_dialog(page: ft.Page, db, cve_orden=None):
     cont = ft.Column(scroll=ft.ScrollMode.AUTO, expand=True, width=520)
     dd = ft.Dropdown(
         label="Orden",
         options=[ft.dropdown.Option(text=f"{o.cve_orden} {o.eq_modelo}", key=o.cve_orden) for o in (db.ordenes() or [])],
-        width=520
+        width=520,
+        value=cve_orden,
     )
+    marcadas: set = set()
+    err = ft.Text("", color="red")
+
+    def marcar(e, cve):
+        (marcadas.add if e.control.value else marcadas.discard)(cve)
+        btn_quitar.disabled = not marcadas
+        page.update()
+
     def fila(p):
-        txt = f"{p.get('cve_orden_parte')}# {p.get('part_no') or ''} ${p.get('precio',0)}\n{p.get('descripcion','')}"
-        return ft.ListTile(title=ft.Text(txt))
+        cve = int(p.get("cve_orden_parte"))
+        txt = f"{cve}# {p.get('part_no') or ''} ${p.get('precio',0)}\n{p.get('descripcion','')}"
+        return ft.ListTile(leading=ft.Checkbox(value=cve in marcadas, on_change=lambda e, c=cve: marcar(e, c)),
+                           title=ft.Text(txt))
 
     def actualizar(e=None):
         cont.controls.clear()
+        marcadas.clear()
+        btn_quitar.disabled = True
         if dd.value:
             for p in db.partes_orden(dd.value):
                 cont.controls.append(fila(p))
         page.update()
 
+    def quitar(e=None):
+        # todas las marcadas en un solo lote (un executemany + COMMIT)
+        try:
+            n = db.eliminar_partes(sorted(marcadas))
+            page.open(ft.SnackBar(ft.Text(f"{n} parte(s) eliminada(s)")))
+            err.value = ""
+        except Exception as ex:
+            err.value = f"Error: {ex}"
+        actualizar()
+
+    btn_quitar = ft.ElevatedButton("Eliminar seleccionadas", on_click=quitar, disabled=True)
     dd.on_change = actualizar
     dlg = ft.AlertDialog(
         title=ft.Text("Ver partes"),
-        content=ft.Column([dd, ft.Container(cont, height=260, width=540)], tight=True, width=560),
-        actions=[ft.TextButton("Cerrar", on_click=lambda e: close())],
+        content=ft.Column([dd, ft.Container(cont, height=260, width=540), err], tight=True, width=560),
+        actions=[btn_quitar, ft.TextButton("Cerrar", on_click=lambda e: close())],
         open=True,
     )
     def close(): dlg.open=False; page.update()
     page.overlay.append(dlg); page.update(); actualizar()
 
-def open_nueva_parte_dialog(page: ft.Page, db, conn):
+def open_nueva_parte_dialog(page: ft.Page, db, conn=None):
+    """
+    Varias partes a la vez: se buscan y se van juntando en la lista; "Añadir"
+    las inserta todas en un lote. Un kit se agrega completo (partes y
+    servicios) y la lista se puede guardar como kit.
+    """
     ordenes = db.ordenes() or []
     if not ordenes:
         page.open(ft.SnackBar(ft.Text("No hay órdenes para agregar partes.")))
@@ -42,30 +75,82 @@ def open_nueva_parte_dialog(page: ft.Page, db, conn):
         options=[ft.dropdown.Option(text=f"{o.cve_orden} {o.eq_modelo}", key=o.cve_orden) for o in ordenes],
         value=ordenes[0].cve_orden, width=540
     )
-    dd_parte = ft.Dropdown(
-        label="Pieza",
-        options=[ft.dropdown.Option(text=f"{p['cve_parte']} {(p['part_no'] or '')} {p['descripcion']} ${p['precio']}",
-                                    key=p["cve_parte"]) for p in db.partes()],
-        width=540
+    elegidas: list = []  # filas del catálogo (se pueden repetir)
+    lista = ft.Column(spacing=0, scroll=ft.ScrollMode.AUTO)
+    texto = lambda p: f"{p['cve_parte']} {(p.get('part_no') or '')} {p['descripcion']} ${p['precio']}"
+
+    def pintar():
+        lista.controls = [
+            ft.ListTile(title=ft.Text(texto(p), size=13), dense=True,
+                        trailing=ft.IconButton(ft.icons.CLOSE, on_click=lambda e, i=i: quitar(i)))
+            for i, p in enumerate(elegidas)
+        ]
+        btn_agregar.text = f"Añadir ({len(elegidas)})" if elegidas else "Añadir"
+        page.update()
+
+    def elegir(p):
+        elegidas.append(p)
+        dd_parte.limpiar()
+        pintar()
+
+    def quitar(i):
+        del elegidas[i]
+        pintar()
+
+    dd_parte = Typeahead(page, db.buscar_partes, clave="cve_parte", label="Pieza", texto=texto, on_select=elegir)
+    kits = db.kits()
+    dd_kit = ft.Dropdown(
+        label="Kit",
+        options=[ft.dropdown.Option(text=f"{k['nombre']} ({k['partes']} partes, {k['servicios']} servicios)",
+                                    key=k["cve_kit"]) for k in kits],
+        width=380, disabled=not kits,
     )
+    tf_kit = ft.TextField(label="Guardar lista como kit", width=380)
     err = ft.Text("", color="red")
 
+    def terminar(msg):
+        close()
+        page.open(ft.SnackBar(ft.Text(msg)))
+        open_partes_dialog(page, db, dd_ord.value)
+
     def guardar(e=None):
-        if not dd_ord.value or not dd_parte.value:
-            err.value = "Seleccione todos los campos"; page.update(); return
+        if not dd_ord.value or not elegidas:
+            err.value = "Seleccione la orden y al menos una pieza"; page.update(); return
+        try:
+            n = db.agregar_partes(int(dd_ord.value), [p["cve_parte"] for p in elegidas])
+            terminar(f"{n} parte(s) agregada(s) con éxito")
+        except Exception as ex:
+            err.value = f"Error: {ex}"; page.update()
+
+    def aplicar_kit(e=None):
+        if not dd_ord.value or not dd_kit.value:
+            err.value = "Seleccione la orden y el kit"; page.update(); return
+        try:
+            n = db.aplicar_kit(int(dd_ord.value), int(dd_kit.value))
+            terminar(f"Kit agregado: {n['partes']} parte(s), {n['servicios']} servicio(s)")
+        except Exception as ex:
+            err.value = f"Error: {ex}"; page.update()
+
+    def guardar_kit(e=None):
+        if not (tf_kit.value or "").strip() or not elegidas:
+            err.value = "Escriba el nombre y junte al menos una pieza"; page.update(); return
         try:
-            db.parte_orden(orden=dd_ord.value, parte=dd_parte.value)
-            conn.commit()
-            close()
-            page.open(ft.SnackBar(ft.Text("Parte agregada con éxito")))
-            open_partes_dialog(page, db)
+            db.guardar_kit(tf_kit.value.strip(), partes=[p["cve_parte"] for p in elegidas])
+            page.open(ft.SnackBar(ft.Text(f"Kit '{tf_kit.value.strip()}' guardado")))
+            err.value = ""; page.update()
         except Exception as ex:
             err.value = f"Error: {ex}"; page.update()
 
+    btn_agregar = ft.ElevatedButton("Añadir", on_click=guardar)
     dlg = ft.AlertDialog(
-        title=ft.Text("Añadir parte a orden"),
-        content=ft.Column([dd_ord, dd_parte, err], tight=True, width=560),
-        actions=[ft.ElevatedButton("Añadir", on_click=guardar), ft.TextButton("Cancelar", on_click=lambda e: close())],
+        title=ft.Text("Añadir partes a orden"),
+        content=ft.Column([
+            dd_ord, dd_parte.control, ft.Container(lista, height=160, width=540),
+            ft.Row([dd_kit, ft.TextButton("Agregar kit", on_click=aplicar_kit)]),
+            ft.Row([tf_kit, ft.TextButton("Guardar kit", on_click=guardar_kit)]),
+            err,
+        ], tight=True, width=560),
+        actions=[btn_agregar, ft.TextButton("Cancelar", on_click=lambda e: close())],
         open=True,
     )
     def close(): dlg.open=False; page.update()
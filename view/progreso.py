@@ -0,0 +1,90 @@
+# view/progreso.py
+from __future__ import annotations
+import asyncio
+import flet as ft
+
+
+class Progreso:
+    """
+    Indicador "trabajando…" con botón Cancelar para tareas async de la vista.
+      prog = Progreso(page)
+      ... ft.Row([..., prog.control]) ...
+      prog.lanzar(guardar_async, texto="Guardando…", bloquear=[btn_guardar])
+    Mientras corre, los controles de `bloquear` quedan deshabilitados y el
+    resto del formulario sigue respondiendo.
+    """
+
+    def __init__(self, page: ft.Page, texto: str = "Cargando…") -> None:
+        self.page = page
+        self._tarea = None     # lo que devuelve page.run_task (se puede cancelar)
+        self._vigente = None   # marca de la tarea actual; None = libre
+        self._texto_def = texto
+        self.texto = ft.Text(texto, size=12)
+        self.btn_cancelar = ft.TextButton("Cancelar", on_click=lambda e: self.cancelar())
+        self.control = ft.Row(
+            [ft.ProgressRing(width=16, height=16, stroke_width=2), self.texto, self.btn_cancelar],
+            spacing=8,
+            visible=False,
+        )
+
+    @property
+    def ocupado(self) -> bool:
+        return self._vigente is not None
+
+    def lanzar(self, coro_fn, *args, texto: str | None = None, bloquear=(),
+               cancelable: bool = True, reemplazar: bool = False) -> None:
+        """
+        Corre `await coro_fn(*args)` en el loop de Flet con el indicador visible.
+        Si ya hay una tarea corriendo se ignora la nueva, o con reemplazar=True
+        se cancela la anterior (recargas: gana la última).
+        Queda ocupado y bloquea desde aquí, antes de que el loop arranque la
+        tarea: un doble clic no lanza dos guardados.
+        """
+        if self.ocupado:
+            if not reemplazar:
+                return
+            if self._tarea is not None:
+                self._tarea.cancel()
+
+        yo = object()
+        self._vigente, self._tarea = yo, None
+        self._mostrar(True, texto, bloquear, cancelable)
+
+        async def _run():
+            try:
+                await coro_fn(*args)
+            except asyncio.CancelledError:
+                pass
+            finally:
+                _liberar()
+
+        def _liberar(*_):
+            if self._vigente is yo:
+                self._vigente = self._tarea = None
+                self._mostrar(False, None, bloquear, cancelable)
+
+        tarea = self.page.run_task(_run)
+        if self._vigente is yo:  # si ya terminó, no se guarda
+            self._tarea = tarea
+            # cancelada antes de que el loop la arrancara: _run no corre su finally
+            tarea.add_done_callback(_liberar)
+
+    def cancelar(self) -> None:
+        if self.ocupado:
+            self.texto.value = "Cancelando…"
+            self.btn_cancelar.disabled = True
+            self.page.update()
+            if self._tarea is not None:
+                self._tarea.cancel()
+
+    def _mostrar(self, on: bool, texto, bloquear, cancelable: bool) -> None:
+        self.texto.value = texto or self._texto_def
+        self.btn_cancelar.visible = cancelable
+        self.btn_cancelar.disabled = False
+        self.control.visible = on
+        for c in bloquear or ():
+            c.disabled = on
+        try:
+            self.page.update()
+        except Exception:
+            pass
@@ -1,34 +1,17 @@
 # view/reporte.py
+import asyncio
 import flet as ft
-from decimal import Decimal
+from datetime import date
+
+from utils.dinero import formato as _fmt_money
+
+from .progreso import Progreso
 
 # Compat Colors (algunos entornos exponen Colors en vez de colors)
 if not hasattr(ft, "colors") and hasattr(ft, "Colors"):
     ft.colors = ft.Colors
 
 
-# -------------------- Helpers numéricos --------------------
-def _D(x) -> Decimal:
-    """Convierte cualquier valor a Decimal de forma segura."""
-    try:
-        if x is None:
-            return Decimal(0)
-        if isinstance(x, (int, float, Decimal)):
-            return Decimal(str(x))
-        s = str(x).strip()
-        # limpia formato común de dinero: $ 1,234.56
-        s = s.replace("$", "").replace(",", "")
-        return Decimal(s) if s else Decimal(0)
-    except Exception:
-        return Decimal(0)
-
-
-def _fmt_money(x) -> str:
-    """Formatea Decimal a string de dinero."""
-    v = _D(x)
-    return f"${v:,.2f}"
-
-
 def open_reporte_dialog(page: ft.Page, db):
     # Carga inicial de órdenes
     ordenes = db.ordenes() or []
@@ -45,82 +28,26 @@ def open_reporte_dialog(page: ft.Page, db):
     )
     body = ft.Column(expand=True, alignment=ft.MainAxisAlignment.SPACE_AROUND)
 
-    def _tarifa_y_nombre_tipo(cve_tipo):
-        """
-        Obtiene (tarifa_hora, nombre_tipo) desde db.tipos() tolerando formatos:
-        - {id: "nombre"}
-        - {id: {"nombre": "...", "tarifa_h": 250}} (o claves similares)
-        - {id: [tarifa, nombre]} o (tarifa, nombre)
-        - {id: {"descripcion": "...", "tarifa": "250"}}
-        """
-        tipos = db.tipos() or {}
-        t = tipos.get(cve_tipo)
-
-        tarifa = Decimal(0)
-        nombre = str(cve_tipo)
-
-        if isinstance(t, (list, tuple)):
-            # Busca un número como tarifa y un string como nombre
-            num = next(
-                (
-                    it for it in t
-                    if isinstance(it, (int, float, Decimal))
-                    or str(it).replace("$", "").replace(",", "").replace(".", "", 1).isdigit()
-                ),
-                None
-            )
-            txt = next((it for it in t if isinstance(it, str)), None)
-            tarifa = _D(num)
-            nombre = txt if txt is not None else str(t[-1])
-        elif isinstance(t, dict):
-            # nombres posibles
-            for k in ("nombre", "descripcion", "tipo"):
-                if k in t and t[k]:
-                    nombre = str(t[k]).strip()
-                    break
-            # tarifas posibles
-            for k in ("tarifa_h", "tarifa", "tarifa_hora"):
-                if k in t and t[k] is not None:
-                    tarifa = _D(t[k])
-                    break
-        elif isinstance(t, str):
-            nombre = t
-        elif t is not None:
-            nombre = str(t)
-
-        return tarifa, nombre
+    # La consulta corre fuera del hilo de la UI; elegir otra orden reemplaza la anterior
+    adb = db.asincrono()
+    prog = Progreso(page, "Calculando reporte…")
 
     def crear(ord_id):
         if not ord_id:
             return
-
-        actual = next((o for o in db.ordenes() if str(o.cve_orden) == str(ord_id)), None)
-        if not actual:
+        prog.lanzar(_crear_async, int(ord_id), reemplazar=True)
+
+    async def _crear_async(ord_id: int):
+        # Partes, servicios, horas y tarifa sumados en la base, como Decimal
+        try:
+            t = await adb.total_orden(ord_id)
+        except Exception:
+            t = None
+        if t is None or str(dd.value) != str(ord_id):
             return
 
-        # Tarifa y nombre del tipo (se usa para el cálculo, no se muestra)
-        tarifa, _tipo_txt = _tarifa_y_nombre_tipo(actual.cve_tipo_equipo)
-
-        # Partes y servicios (precios robustos)
-        piezas = db.partes_orden(actual.cve_orden) or []
-        servicios = db.servicios_orden(actual.cve_orden) or []
-
-        def _precio_from(d: dict) -> Decimal:
-            if not isinstance(d, dict):
-                return Decimal(0)
-            for k in ("precio", "PRECIO", "costo", "monto", "importe"):
-                if k in d and d[k] is not None:
-                    return _D(d[k])
-            return Decimal(0)
-
-        total_piezas = sum((_precio_from(p) for p in piezas), Decimal(0))
-        total_serv = sum((_precio_from(s) for s in servicios), Decimal(0))
-
-        # Horas (suma de horas de técnicos de la orden)
-        tecs = db.tecnicos_orden(actual.cve_orden, horas=True) or []
-        horas = sum((_D(t.get("horas")) for t in tecs if isinstance(t, dict)), Decimal(0))
-
-        total = total_piezas + total_serv + (tarifa * horas)
+        total_piezas, total_serv, horas, total = t.partes, t.servicios, t.horas, t.total
+        n_piezas, n_serv = t.n_partes, t.n_servicios
 
         # Render
         body.controls.clear()
@@ -130,13 +57,13 @@ def open_reporte_dialog(page: ft.Page, db):
                     ft.Text(f"Total de la orden: {_fmt_money(total)}", size=22, weight=ft.FontWeight.BOLD),
                     # Solo mostramos horas (se quitó la línea de Tarifa ...)
                     ft.Row(
-                        [ft.Text(f"Horas: {horas}")],
+                        [ft.Text(f"Horas: {horas.normalize():f}")],
                         alignment=ft.MainAxisAlignment.START,
                     ),
                     ft.Text(f"Total de piezas: {_fmt_money(total_piezas)}", size=22),
-                    ft.Text(f"   Cant. de piezas: {len(piezas)}", size=16),
+                    ft.Text(f"   Cant. de piezas: {n_piezas}", size=16),
                     ft.Text(f"Total de servicios: {_fmt_money(total_serv)}", size=22),
-                    ft.Text(f"   Cant. de servicios: {len(servicios)}", size=16),
+                    ft.Text(f"   Cant. de servicios: {n_serv}", size=16),
                 ],
                 spacing=8,
                 alignment=ft.MainAxisAlignment.START,
@@ -153,8 +80,11 @@ def open_reporte_dialog(page: ft.Page, db):
 
     dlg = ft.AlertDialog(
         title=ft.Text("Reporte por orden"),
-        content=ft.Column([dd, body], tight=True, width=560, height=320),
-        actions=[ft.TextButton("Salir", on_click=lambda e: close())],
+        content=ft.Column([dd, prog.control, body], tight=True, width=560, height=320),
+        actions=[
+            ft.TextButton("Reporte por lote…", on_click=lambda e: open_reporte_lote_dialog(page, db)),
+            ft.TextButton("Salir", on_click=lambda e: close()),
+        ],
         open=True,
     )
 
@@ -162,5 +92,124 @@ def open_reporte_dialog(page: ft.Page, db):
     page.update()
 
 
+def _fecha(txt):
+    """'AAAA-MM-DD' -> date; vacío -> None. ValueError si no es fecha."""
+    txt = (txt or "").strip()
+    return date.fromisoformat(txt) if txt else None
+
+
+def open_reporte_lote_dialog(page: ft.Page, db):
+    """
+    Totales de todas las órdenes de un taller y/o rango de fechas a CSV o PDF.
+    El archivo se genera en otro proceso; aquí sólo se muestra el avance.
+    """
+    dd_taller = ft.Dropdown(label="Taller", width=200, value="0",
+                            options=[ft.dropdown.Option("0", "Todos")])
+    try:
+        for tid, nombre in (db.talleres() or {}).items():
+            dd_taller.options.append(ft.dropdown.Option(str(tid), nombre))
+    except Exception:
+        pass
+    tf_desde = ft.TextField(label="Desde (AAAA-MM-DD)", width=170)
+    tf_hasta = ft.TextField(label="Hasta (AAAA-MM-DD)", width=170)
+    dd_formato = ft.Dropdown(
+        label="Formato", width=120, value="csv",
+        options=[ft.dropdown.Option("csv", "CSV"), ft.dropdown.Option("pdf", "PDF")],
+    )
+    tf_archivo = ft.TextField(label="Archivo", width=360,
+                              value=f"reporte_ordenes_{date.today():%Y%m%d}.csv")
+    estado = ft.Text("")
+    anillo = ft.ProgressRing(width=16, height=16, stroke_width=2, visible=False)
+    btn_generar = ft.ElevatedButton("Generar")
+    btn_cancelar = ft.TextButton("Cancelar", visible=False)
+    trabajo = {"t": None}
+
+    def _cambio_formato(e):
+        base = (tf_archivo.value or "reporte_ordenes").rsplit(".", 1)[0]
+        tf_archivo.value = f"{base}.{dd_formato.value}"
+        page.update()
+
+    dd_formato.on_change = _cambio_formato
+
+    def _ocupado(on: bool):
+        anillo.visible = on
+        btn_cancelar.visible = on
+        btn_generar.disabled = on
+        page.update()
+
+    async def _seguir(t):
+        while not t.terminado:
+            t.sondear()
+            estado.value = f"{t.filas} órdenes escritas…"
+            page.update()
+            await asyncio.sleep(0.5)
+        if t.error:
+            estado.value = f"Error: {t.error}"
+        elif t.cancelado:
+            estado.value = "Cancelado."
+        else:
+            r = t.resumen or {}
+            estado.value = (f"Listo: {r.get('ordenes', t.filas)} órdenes, "
+                            f"total {_fmt_money(r.get('total'))} → {t.path}")
+        trabajo["t"] = None
+        _ocupado(False)
+
+    def generar(e):
+        if trabajo["t"] is not None:
+            return
+        try:
+            desde, hasta = _fecha(tf_desde.value), _fecha(tf_hasta.value)
+        except ValueError:
+            estado.value = "Fechas inválidas (use AAAA-MM-DD)."
+            page.update()
+            return
+        path = (tf_archivo.value or "").strip()
+        if not path:
+            estado.value = "Indique el archivo de salida."
+            page.update()
+            return
+        taller = int(dd_taller.value) if dd_taller.value and dd_taller.value != "0" else None
+        try:
+            t = db.reporte_lote(path, dd_formato.value or "csv", taller=taller, desde=desde, hasta=hasta)
+        except Exception as ex:
+            estado.value = f"No se pudo iniciar: {ex}"
+            page.update()
+            return
+        trabajo["t"] = t
+        estado.value = "Iniciando…"
+        _ocupado(True)
+        page.run_task(_seguir, t)
+
+    def cancelar(e):
+        if trabajo["t"] is not None:
+            trabajo["t"].cancelar()
+            estado.value = "Cancelando…"
+            page.update()
+
+    btn_generar.on_click = generar
+    btn_cancelar.on_click = cancelar
+
+    def close():
+        dlg.open = False
+        page.update()
+
+    dlg = ft.AlertDialog(
+        title=ft.Text("Reporte por lote"),
+        content=ft.Column(
+            [
+                ft.Row([dd_taller, dd_formato]),
+                ft.Row([tf_desde, tf_hasta]),
+                tf_archivo,
+                ft.Row([anillo, estado], spacing=8),
+            ],
+            tight=True, width=560,
+        ),
+        actions=[btn_cancelar, btn_generar, ft.TextButton("Salir", on_click=lambda e: close())],
+        open=True,
+    )
+    page.overlay.append(dlg)
+    page.update()
+
+
 # Alias
 open_report_dialog = open_reporte_dialog
\ No newline at end of file
@@ -1,39 +1,71 @@
 # view/servicios.py
 import flet as ft
 
+from .typeahead import Typeahead
+
 if not hasattr(ft, "colors") and hasattr(ft, "Colors"):
     ft.colors = ft.Colors
+if not hasattr(ft, "icons") and hasattr(ft, "Icons"):
+    ft.icons = ft.Icons
 
-def open_servicios_dialog(page: ft.Page, db):
+def open_servicios_dialog(page: ft.Page, db, cve_orden=None):
     cont = ft.Column(scroll=ft.ScrollMode.AUTO, expand=True, width=520)
     dd = ft.Dropdown(
         label="Orden",
         options=[ft.dropdown.Option(text=f"{o.cve_orden} {o.eq_modelo}", key=o.cve_orden) for o in (db.ordenes() or [])],
-        width=520
+        width=520,
+        value=cve_orden,
     )
+    marcadas: set = set()
+    err = ft.Text("", color="red")
+
+    def marcar(e, cve):
+        (marcadas.add if e.control.value else marcadas.discard)(cve)
+        btn_quitar.disabled = not marcadas
+        page.update()
 
     def fila(s):
-        txt = f"{s.get('cve_orden_servicio')}#  ${s.get('precio',0)}\n{s.get('descripcion','')}"
-        return ft.ListTile(title=ft.Text(txt))
+        cve = int(s.get("cve_orden_servicio"))
+        txt = f"{cve}#  ${s.get('precio',0)}\n{s.get('descripcion','')}"
+        return ft.ListTile(leading=ft.Checkbox(value=cve in marcadas, on_change=lambda e, c=cve: marcar(e, c)),
+                           title=ft.Text(txt))
 
     def actualizar(e=None):
         cont.controls.clear()
+        marcadas.clear()
+        btn_quitar.disabled = True
         if dd.value:
             for s in db.servicios_orden(dd.value):
                 cont.controls.append(fila(s))
         page.update()
 
+    def quitar(e=None):
+        # todas las marcadas en un solo lote (un executemany + COMMIT)
+        try:
+            n = db.eliminar_servicios(sorted(marcadas))
+            page.open(ft.SnackBar(ft.Text(f"{n} servicio(s) eliminado(s)")))
+            err.value = ""
+        except Exception as ex:
+            err.value = f"Error: {ex}"
+        actualizar()
+
+    btn_quitar = ft.ElevatedButton("Eliminar seleccionados", on_click=quitar, disabled=True)
     dd.on_change = actualizar
     dlg = ft.AlertDialog(
         title=ft.Text("Ver servicios"),
-        content=ft.Column([dd, ft.Container(cont, height=260, width=540)], tight=True, width=560),
-        actions=[ft.TextButton("Cerrar", on_click=lambda e: close())],
+        content=ft.Column([dd, ft.Container(cont, height=260, width=540), err], tight=True, width=560),
+        actions=[btn_quitar, ft.TextButton("Cerrar", on_click=lambda e: close())],
         open=True,
     )
     def close(): dlg.open=False; page.update()
     page.overlay.append(dlg); page.update(); actualizar()
 
-def open_nuevo_servicio_dialog(page: ft.Page, db, conn):
+def open_nuevo_servicio_dialog(page: ft.Page, db, conn=None):
+    """
+    Varios servicios a la vez: se buscan y se van juntando en la lista;
+    "Añadir" los inserta todos en un lote. Un kit se agrega completo (partes
+    y servicios) y la lista se puede guardar como kit.
+    """
     ordenes = db.ordenes() or []
     if not ordenes:
         page.open(ft.SnackBar(ft.Text("No hay órdenes para agregar servicios.")))
@@ -43,30 +75,82 @@ def open_nuevo_servicio_dialog(page: ft.Page, db, conn):
         options=[ft.dropdown.Option(text=f"{o.cve_orden} {o.eq_modelo}", key=o.cve_orden) for o in ordenes],
         value=ordenes[0].cve_orden, width=540
     )
-    dd_srv = ft.Dropdown(
-        label="Servicio",
-        options=[ft.dropdown.Option(text=f"{s['cve_servicio']} ${s['precio']} {s['descripcion']}",
-                                    key=s["cve_servicio"]) for s in db.servicios()],
-        width=540
+    elegidos: list = []  # filas del catálogo
+    lista = ft.Column(spacing=0, scroll=ft.ScrollMode.AUTO)
+    texto = lambda s: f"{s['cve_servicio']} ${s['precio']} {s['descripcion']}"
+
+    def pintar():
+        lista.controls = [
+            ft.ListTile(title=ft.Text(texto(s), size=13), dense=True,
+                        trailing=ft.IconButton(ft.icons.CLOSE, on_click=lambda e, i=i: quitar(i)))
+            for i, s in enumerate(elegidos)
+        ]
+        btn_agregar.text = f"Añadir ({len(elegidos)})" if elegidos else "Añadir"
+        page.update()
+
+    def elegir(s):
+        elegidos.append(s)
+        dd_srv.limpiar()
+        pintar()
+
+    def quitar(i):
+        del elegidos[i]
+        pintar()
+
+    dd_srv = Typeahead(page, db.buscar_servicios, clave="cve_servicio", label="Servicio", texto=texto, on_select=elegir)
+    kits = db.kits()
+    dd_kit = ft.Dropdown(
+        label="Kit",
+        options=[ft.dropdown.Option(text=f"{k['nombre']} ({k['partes']} partes, {k['servicios']} servicios)",
+                                    key=k["cve_kit"]) for k in kits],
+        width=380, disabled=not kits,
     )
+    tf_kit = ft.TextField(label="Guardar lista como kit", width=380)
     err = ft.Text("", color="red")
 
+    def terminar(msg):
+        close()
+        page.open(ft.SnackBar(ft.Text(msg)))
+        open_servicios_dialog(page, db, dd_ord.value)
+
     def guardar(e=None):
-        if not dd_ord.value or not dd_srv.value:
-            err.value = "Seleccione todos los campos"; page.update(); return
+        if not dd_ord.value or not elegidos:
+            err.value = "Seleccione la orden y al menos un servicio"; page.update(); return
+        try:
+            n = db.agregar_servicios(int(dd_ord.value), [s["cve_servicio"] for s in elegidos])
+            terminar(f"{n} servicio(s) agregado(s) con éxito")
+        except Exception as ex:
+            err.value = f"Error: {ex}"; page.update()
+
+    def aplicar_kit(e=None):
+        if not dd_ord.value or not dd_kit.value:
+            err.value = "Seleccione la orden y el kit"; page.update(); return
+        try:
+            n = db.aplicar_kit(int(dd_ord.value), int(dd_kit.value))
+            terminar(f"Kit agregado: {n['partes']} parte(s), {n['servicios']} servicio(s)")
+        except Exception as ex:
+            err.value = f"Error: {ex}"; page.update()
+
+    def guardar_kit(e=None):
+        if not (tf_kit.value or "").strip() or not elegidos:
+            err.value = "Escriba el nombre y junte al menos un servicio"; page.update(); return
         try:
-            db.servicio_orden(orden=dd_ord.value, servicio=dd_srv.value)
-            conn.commit()
-            close()
-            page.open(ft.SnackBar(ft.Text("Servicio agregado con éxito")))
-            open_servicios_dialog(page, db)
+            db.guardar_kit(tf_kit.value.strip(), servicios=[s["cve_servicio"] for s in elegidos])
+            page.open(ft.SnackBar(ft.Text(f"Kit '{tf_kit.value.strip()}' guardado")))
+            err.value = ""; page.update()
         except Exception as ex:
             err.value = f"Error: {ex}"; page.update()
 
+    btn_agregar = ft.ElevatedButton("Añadir", on_click=guardar)
     dlg = ft.AlertDialog(
-        title=ft.Text("Añadir servicio a orden"),
-        content=ft.Column([dd_ord, dd_srv, err], tight=True, width=560),
-        actions=[ft.ElevatedButton("Añadir", on_click=guardar), ft.TextButton("Cancelar", on_click=lambda e: close())],
+        title=ft.Text("Añadir servicios a orden"),
+        content=ft.Column([
+            dd_ord, dd_srv.control, ft.Container(lista, height=160, width=540),
+            ft.Row([dd_kit, ft.TextButton("Agregar kit", on_click=aplicar_kit)]),
+            ft.Row([tf_kit, ft.TextButton("Guardar kit", on_click=guardar_kit)]),
+            err,
+        ], tight=True, width=560),
+        actions=[btn_agregar, ft.TextButton("Cancelar", on_click=lambda e: close())],
         open=True,
     )
     def close(): dlg.open=False; page.update()
@@ -65,6 +65,10 @@ from utils.config import cargar_datos_conexion, guardar_datos_conexion
 from controller.app_controller import AppController
 
 from model.usuario import usuarios_default
+from utils.dinero import formato as formato_dinero
+from view.progreso import Progreso
+from view.typeahead import Typeahead
+from view.tabla_ordenes import TablaOrdenes
 
 # En tu clase de BD / Fachada
 
@@ -242,6 +246,9 @@ def main(page: ft.Page):
             page.update()
             return
 
+        # al cerrar la pestaña/ventana: vacía notas y devuelve la conexión al pool
+        page.on_disconnect = lambda e: controller.close()
+
         # éxito: limpia campos y avanza
         user_input.value = ""
         password_input.value = ""
@@ -376,6 +383,8 @@ def main(page: ft.Page):
         )
 
     def create_dashboard_view(db_instance, connection, user):
+        # guardados fuera del hilo de la UI (ver controller/async_facade.py)
+        adb = db_instance.asincrono()
 
         def attach_chatbot_ui():
             # 1) Controlador siguiendo tu UML (estrategia 4o_mini por defecto)
@@ -564,6 +573,7 @@ def main(page: ft.Page):
                     ord=int(orden_id),
                 ),
             )
+            db_instance.kpi_marcar(orden_id, status_id)  # historial de status y rollups
 
         def _status_id_from_control(value_from_ui, status_cat):
             """
@@ -696,6 +706,7 @@ def main(page: ft.Page):
                 """,
                 dict(horas=int(horas), ord=int(cve_orden)),
             )
+            db_instance.kpi_marcar(cve_orden)
         # Colócalo al inicio de create_dashboard_view(...) o encima de guardar_cambios()
         STATUS_LABEL_TO_ID = {
             "alta": 7,
@@ -713,6 +724,7 @@ def main(page: ft.Page):
                 "UPDATE orden SET cve_status = :sid WHERE cve_orden = :ord",
                 dict(sid=int(status_id), ord=int(cve_orden)),
             )
+            db_instance.kpi_marcar(cve_orden, status_id)
         # Carga catálogo inicial
         status_cat = _status_catalog_from_db()
 
@@ -801,6 +813,7 @@ def main(page: ft.Page):
                     ord=int(orden_id),
                 ),
             )
+            db_instance.kpi_marcar(orden_id, status_id)  # historial de status y rollups
 
 
         def _status_id_from_ui(value_from_ui):
@@ -925,6 +938,7 @@ def main(page: ft.Page):
                 """,
                 dict(horas=int(horas), ord=int(cve_orden)),
             )
+            db_instance.kpi_marcar(cve_orden)
             # Si no hay técnico, rowcount puede ser 0: no es error.
 
 
@@ -971,6 +985,7 @@ def main(page: ft.Page):
                         ord=int(orden.cve_orden),
                     ),
                 )
+                db_instance.kpi_marcar(orden.cve_orden, status_id)  # historial de status y rollups
 
                 # --- Horas en ORDEN_TECNICOS ---
                 try:
@@ -1058,6 +1073,7 @@ def main(page: ft.Page):
                 """,
                 dict(horas=int(horas), ord=int(cve_orden)),
             )
+            db_instance.kpi_marcar(cve_orden)
 
         def abrir_dialogo_edicion(orden):
             def cerrar():
@@ -1236,32 +1252,46 @@ def main(page: ft.Page):
                     return
                 num_calle.value = num_norm  # usar el normalizado
 
-                try:
-                    # Guarda usando los valores normalizados
-                    cliente.guardar(
-                        db_instance,
-                        nom, pat, mat, mail, tel_norm,  # tel normalizado
-                        cal, num_norm
-                    )
-                    # refresca UI
+                async def _guardar_async():
+                    try:
+                        # Guarda usando los valores normalizados
+                        await adb.llamar(
+                            cliente.guardar,
+                            db_instance,
+                            nom, pat, mat, mail, tel_norm,  # tel normalizado
+                            cal, num_norm
+                        )
+                    except asyncio.CancelledError:
+                        error.value = "Guardado cancelado."
+                        page.update()
+                        raise
+                    except Exception as ex:
+                        error.value = f"Error al guardar: {ex}"
+                        page.update()
+                        return
+                    # refresca UI (lecturas fuera del loop)
                     try:
-                        llenar_tabla_ordenes(filtro_estado.value, filtro_direccion.selected, filtro_taller.value, True)
+                        await llenar_tabla_ordenes_async(
+                            filtro_estado.value, filtro_direccion.selected, filtro_taller.value, True
+                        )
                     except Exception:
                         pass
                     cerrar_dialogo_edicion()
                     page.open(ft.SnackBar(ft.Text("Cliente actualizado con éxito")))
                     page.update()
-                except Exception as ex:
-                    error.value = f"Error al guardar: {ex}"
-                    page.update()
+
+                progreso.lanzar(_guardar_async, texto="Guardando cliente…", bloquear=[btn_guardar])
+
+            progreso = Progreso(page)
+            btn_guardar = ft.ElevatedButton("Guardar", on_click=guardar_cliente)
 
             dialogo_edicion = ft.AlertDialog(
                 title=ft.Text(f"Editar Cliente Orden #{cve}"),
                 content=ft.Column(
-                    [nombre, paterno, materno, correo, telefono, calle, num_calle, error]
+                    [nombre, paterno, materno, correo, telefono, calle, num_calle, error, progreso.control]
                 ),
                 actions=[
-                    ft.ElevatedButton("Guardar", on_click=guardar_cliente),
+                    btn_guardar,
                     ft.ElevatedButton("Cancelar", on_click=cerrar_dialogo_edicion, color=ft.colors.RED),
                 ],
                 open=True,
@@ -1385,14 +1415,14 @@ def main(page: ft.Page):
         filtro_taller = ft.Dropdown(label="Filtrar ordenes por Taller",
                                     options=[ft.dropdown.Option(text=talleres[tal], key=tal) for tal in
                                                talleres.keys()],
-                                    on_change=lambda e: llenar_tabla_ordenes(filtro_estado.value, filtro_direccion.selected, filtro_taller.value, True)(filtro_estado.value, filtro_direccion.selected, filtro_taller.value))
+                                    on_change=lambda e: llenar_tabla_ordenes(filtro_estado.value, filtro_direccion.selected, filtro_taller.value))
         filtro_taller.options.insert(0, ft.dropdown.Option(text='Todos', key='0'))
         filtro_taller.value = '0'
 
         def toggle_icon_button(e):
             e.control.selected = not e.control.selected
             e.control.update()
-            llenar_tabla_ordenes(filtro_estado.value, filtro_direccion.selected, filtro_taller.value, True)(filtro_estado.value, filtro_direccion.selected, filtro_taller.value)
+            llenar_tabla_ordenes(filtro_estado.value, filtro_direccion.selected, filtro_taller.value)
 
         filtro_direccion = ft.IconButton(
             icon=ft.icons.ARROW_DOWNWARD,
@@ -1408,10 +1438,21 @@ def main(page: ft.Page):
             ],
         )
 
-        contenedor_ordenes = ft.Column(
-            scroll=ft.ScrollMode.AUTO,
-            expand=True
+        # Filas por cve_orden: los filtros y guardados sólo crean/quitan/parchan
+        # las filas que cambiaron (ver view/tabla_ordenes.py)
+        tabla_ordenes = TablaOrdenes(
+            status_ui=lambda sid: _ui_status_name(sid),
+            colores={
+                "En proceso": ft.colors.AMBER,
+                "Terminado":  ft.colors.GREEN,
+                "Recogido":   ft.colors.INDIGO_200,
+            },
+            on_tecnicos=lambda o: abrir_dialogo_tecnicos_taller(o),
+            on_editar_cliente=lambda o: abrir_dialogo_edicion_cliente(o.cliente, o.cve_orden),
+            on_editar_orden=lambda o: abrir_dialogo_edicion(o),
+            anchos={"tecnico": 100, "cliente": 100, "editar_cliente": 100, "editar_orden": 100},
         )
+        contenedor_ordenes = tabla_ordenes.control
 
 
         status_boton={
@@ -1449,103 +1490,101 @@ def main(page: ft.Page):
             ),
         }
 
-        def _status_chip(nombre_ui: str):
-            # Colores por estado ya normalizado
-            color = {
-                "En proceso": ft.colors.AMBER,
-                "Terminado":  ft.colors.GREEN,
-                "Recogido":   ft.colors.INDIGO_200,
-            }.get(nombre_ui, ft.colors.AMBER)
-
-            return ft.Container(
-                content=ft.Text(nombre_ui, weight=ft.FontWeight.BOLD, text_align=ft.alignment.center),
-                border_radius=10,
-                bgcolor=color,
-                width=100,
-                alignment=ft.alignment.center,
-                height=30,
-            )
+        # Paginación keyset de la tabla: una consulta pequeña por pantalla y
+        # más páginas al llegar al final del scroll.
+        PAGE_SIZE = 50
+        _pagina = {"cursor": None, "fin": True, "cargando": False, "filtros": {}, "snap": None}
 
-        
-        def llenar_tabla_ordenes(filtro_estado, cambio_dir, filtro_taller, actualizar=False):
+        # Normalizador de nombre de status para que coincida con las llaves de tu UI
+        def _ui_status_name(name_or_id):
+            # Convierte id->nombre con el catálogo; si ya es texto, lo normaliza
+            try:
+                sid = int(name_or_id)
+                raw = status_cat.get(sid, str(sid))
+            except Exception:
+                raw = str(name_or_id or "")
+            s = raw.strip().lower()
+            mapping = {
+                "alta": "Alta",
+                "en proceso": "En proceso",
+                "en progreso": "En proceso",
+                "terminado": "Terminado",
+                "terminada": "Terminado",
+                "recogido": "Recogido",
+                "recogida": "Recogido",
+            }
+            # Si ya viene exactamente como lo espera la UI, respétalo
+            if raw in ("Alta", "En proceso", "Terminado", "Recogido"):
+                return raw
+            return mapping.get(s, "En proceso")
+
+        def _cargar_pagina_ordenes():
+            if _pagina["fin"] or _pagina["cargando"]:
+                return []
+            _pagina["cargando"] = True
+            try:
+                filas, siguiente = db_instance.ordenes_pagina(
+                    PAGE_SIZE, _pagina["cursor"], **_pagina["filtros"]
+                )
+            except Exception:
+                filas, siguiente = [], None
+            finally:
+                _pagina["cargando"] = False
+            _pagina["cursor"] = siguiente
+            _pagina["fin"] = siguiente is None
+            return filas or []
+
+        def _leer_tabla_ordenes(filtro_estado, cambio_dir, filtro_taller, actualizar):
+            """Lecturas de llenar_tabla_ordenes (no toca controles): puede ir en el hilo de BD."""
             nonlocal ordenes, status_cat  # 'ordenes' y 'status_cat' viven en el scope exterior
 
-            # Si pides recargar, vuelve a leer órdenes y catálogo de status desde BD
+            # Si pides recargar, vuelve a leer órdenes (para los combos) y catálogo de status
             if actualizar:
                 ordenes = db_instance.ordenes()
                 status_cat = _status_catalog_from_db()
 
-            # Normalizador de nombre de status para que coincida con las llaves de tu UI
-            def _ui_status_name(name_or_id):
-                # Convierte id->nombre con el catálogo; si ya es texto, lo normaliza
-                try:
-                    sid = int(name_or_id)
-                    raw = status_cat.get(sid, str(sid))
-                except Exception:
-                    raw = str(name_or_id or "")
-                s = raw.strip().lower()
-                mapping = {
-                    "alta": "Alta",
-                    "en proceso": "En proceso",
-                    "en progreso": "En proceso",
-                    "terminado": "Terminado",
-                    "terminada": "Terminado",
-                    "recogido": "Recogido",
-                    "recogida": "Recogido",
-                }
-                # Si ya viene exactamente como lo espera la UI, respétalo
-                if raw in ("Alta", "En proceso", "Terminado", "Recogido"):
-                    return raw
-                return mapping.get(s, "En proceso")
-
-            contenedor_ordenes.controls.clear()
-            data = ordenes if not cambio_dir else list(reversed(ordenes))
-
-            for o in data:
-                nombre_status_ui = _ui_status_name(o.cve_status)
-
-                # Filtros
-                pasa_estado = (filtro_estado == "Todos") or (nombre_status_ui == filtro_estado)
-                pasa_taller = (str(filtro_taller) == "0") or (str(o.cve_taller) == str(filtro_taller))
-                if not (pasa_estado and pasa_taller):
-                    continue
-
-                fila_orden = ft.Row(
-                    [
-                        ft.Text(str(o.cve_orden), width=50),
-                        _status_chip(nombre_status_ui),  # <- chip dinámico por estado (¡ya no chip_status!)
-                        ft.Text(ver_tecnico(o.tecnicos), width=100),
-                        ft.IconButton(
-                            icon=ft.icons.REMOVE_RED_EYE,
-                            on_click=lambda e, ord=o: abrir_dialogo_tecnicos_taller(ord),
-                            width=50,
-                            alignment=ft.alignment.center,
-                        ),
-                        ft.Text(o.eq_marca, width=100),
-                        ft.Text(o.eq_modelo, width=100),
-                        ft.Text(db_instance.tipos()[o.cve_tipo_equipo][1], width=100),
-                        ft.Text(str(o.cliente), width=100),
-                        ft.IconButton(
-                            icon=ft.icons.EDIT,
-                            on_click=lambda e, ord=o: abrir_dialogo_edicion_cliente(ord.cliente, o.cve_orden),
-                            width=100,
-                            alignment=ft.alignment.center,
-                        ),
-                        ft.IconButton(
-                            icon=ft.icons.EDIT,
-                            on_click=lambda e, ord=o: abrir_dialogo_edicion(ord),
-                            width=100,
-                            alignment=ft.alignment.center,
-                        ),
-                    ],
-                    alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
-                    height=50,
-                )
-                contenedor_ordenes.controls.append(fila_orden)
-                contenedor_ordenes.controls.append(ft.Divider())
+            # Los filtros de status/taller y la dirección se resuelven en SQL
+            status_ids = None
+            if filtro_estado not in (None, "", "Todos"):
+                status_ids = [sid for sid in status_cat if _ui_status_name(sid) == filtro_estado]
+            taller = None if str(filtro_taller or "0") == "0" else int(filtro_taller)
+
+            _pagina.update(
+                cursor=None,
+                fin=False,
+                filtros=dict(
+                    status=status_ids,
+                    taller=taller,
+                    direction="asc" if cambio_dir else "desc",
+                ),
+                snap=db_instance.catalogos_snapshot(),
+            )
+            return _cargar_pagina_ordenes()
+
+        def llenar_tabla_ordenes(filtro_estado, cambio_dir, filtro_taller, actualizar=False):
+            filas = _leer_tabla_ordenes(filtro_estado, cambio_dir, filtro_taller, actualizar)
+            tabla_ordenes.sincronizar(filas, _pagina["snap"])
+            page.update()
 
+        async def llenar_tabla_ordenes_async(filtro_estado, cambio_dir, filtro_taller, actualizar=False):
+            """Para handlers async: las lecturas van por adb y sólo se pinta en el loop."""
+            filas = await adb.llamar(_leer_tabla_ordenes, filtro_estado, cambio_dir, filtro_taller, actualizar)
+            tabla_ordenes.sincronizar(filas, _pagina["snap"])
             page.update()
 
+        def _on_scroll_ordenes(e):
+            if _pagina["fin"] or _pagina["cargando"]:
+                return
+            try:
+                cerca_del_final = float(e.pixels) >= float(e.max_scroll_extent) - 200
+            except Exception:
+                return
+            if cerca_del_final:
+                tabla_ordenes.agregar(_cargar_pagina_ordenes(), _pagina["snap"])
+                page.update()
+
+        contenedor_ordenes.on_scroll = _on_scroll_ordenes
+
 
         llenar_tabla_ordenes('Todos', False, '0')
 
@@ -2015,54 +2054,80 @@ def main(page: ft.Page):
                     page.update()
                     return
 
-                # 7) Persistencia
-                cli_id = None  # <- ¡siempre definimos!
-                try:
-                    # Crear/obtener cliente
-                    if estado_d == 'Otro':
+                # 7) Persistencia (en el hilo de BD; la ventana sigue respondiendo)
+                estado_val = (estado.value or "").strip() if estado_d == 'Otro' else estado_d
+
+                def _guardar_bd():
+                    try:
+                        # Colonia por id desde el índice de direcciones (sin
+                        # búsquedas en COLONIA); si no se puede, va el nombre
+                        colonia_param = colonia
+                        try:
+                            cid = db_instance.resolve_or_create_colonia(
+                                cp_digits, colonia, municipio or None,
+                                int(estado_val) if str(estado_val).isdigit() else None,
+                                int(pais) if str(pais).isdigit() else None,
+                            )
+                            if cid:
+                                colonia_param = int(cid)
+                        except Exception as ex:
+                            print("WARN resolver_colonia:", ex)
+
+                        # Crear/obtener cliente
                         cli_id = db_instance.insertar_cliente_y_verificar_datos(
                             nombre, apellido_p, apellido_m, correo, tel_norm,
-                            calle, num_calle, cp_digits, colonia, municipio,
-                            (estado.value or "").strip(), pais
+                            calle, num_calle, cp_digits, colonia_param, municipio,
+                            estado_val, pais
                         )
-                    else:
-                        cli_id = db_instance.insertar_cliente_y_verificar_datos(
-                            nombre, apellido_p, apellido_m, correo, tel_norm,
-                            calle, num_calle, cp_digits, colonia, municipio,
-                            estado_d, pais
+                        if not cli_id:
+                            raise RuntimeError("No fue posible crear el cliente.")
+
+                        # Estado inicial de la orden: En proceso (1)
+                        db_instance.insertar_orden(
+                            1,           # cve_status
+                            marca,
+                            modelo,
+                            tipo,        # id de tipo (tu dropdown ya da el id)
+                            nota_inicial,
+                            cli_id,      # cliente creado
+                            taller,
+                            tecnico,
                         )
+                        # la fachada confirma y publica las colonias nuevas en el índice
+                        db_instance.commit()
+                    except Exception:
+                        try:
+                            db_instance.rollback()
+                        except Exception:
+                            pass
+                        raise
 
-                    if not cli_id:
-                        raise RuntimeError("No fue posible crear el cliente.")
-
-                    # Estado inicial de la orden: En proceso (1)
-                    db_instance.insertar_orden(
-                        1,           # cve_status
-                        marca,
-                        modelo,
-                        tipo,        # id de tipo (tu dropdown ya da el id)
-                        nota_inicial,
-                        cli_id,      # cliente creado
-                        taller,
-                        tecnico,
-                    )
+                async def _guardar_async():
+                    try:
+                        await adb.llamar(_guardar_bd)
+                    except asyncio.CancelledError:
+                        error.value = "Guardado cancelado."
+                        page.update()
+                        raise
+                    except Exception as ex:
+                        error.value = f"Error al guardar: {ex}"
+                        page.update()
+                        return
 
-                    connection.commit()
                     page.open(ft.SnackBar(ft.Text("Orden creada con éxito")))
-                    # refresca y vuelve
-                    refrescar_tabla()
-                    llenar_tabla_ordenes(filtro_estado.value, filtro_direccion.selected, filtro_taller.value, True)
-                    page.update()
-                    cancelar_orden(e)
-
-                except Exception as ex:
+                    # refresca (lecturas fuera del loop) y vuelve
                     try:
-                        connection.rollback()
+                        await llenar_tabla_ordenes_async(
+                            filtro_estado.value, filtro_direccion.selected, filtro_taller.value, True
+                        )
                     except Exception:
                         pass
-                    error.value = f"Error al guardar: {ex}"
-                    page.update()
+                    cancelar_orden(e)
+
+                progreso_orden.lanzar(_guardar_async, texto="Guardando orden…", bloquear=[btn_guardar_orden])
 
+            progreso_orden = Progreso(page)
+            btn_guardar_orden = ft.ElevatedButton("Guardar", on_click=guardar_orden)
 
             def cancelar_orden(e):
                 page.title = 'Pagina principal'
@@ -2077,7 +2142,7 @@ def main(page: ft.Page):
                             [
                                 ft.Text("Nueva Orden", size=24, weight=ft.FontWeight.BOLD),
                                 error,
-                                ft.Row([ft.ElevatedButton("Guardar", on_click=guardar_orden),
+                                ft.Row([progreso_orden.control, btn_guardar_orden,
                                 ft.ElevatedButton("Cancelar", on_click=cancelar_orden, color=ft.colors.RED)])
                             ],
                             alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
@@ -2139,20 +2204,17 @@ def main(page: ft.Page):
                 value=None
             )
 
-            piezas_dropdown = ft.Dropdown(
-                options=[
-                    ft.dropdown.Option(text=str(n['cve_parte'])+ ' '+
-                                            (str(n['part_no']) if n['part_no'] is not None else '')+ ' '+ n['descripcion'] + ' $'+ str(n['precio']),
-                                       key=n['cve_parte']) for n in db_instance.partes()
-                ],
-                label='Seleccione la pieza'
+            piezas_dropdown = Typeahead(
+                page, db_instance.buscar_partes, clave='cve_parte', label='Busque la pieza', width=500,
+                texto=lambda n: str(n['cve_parte'])+ ' '+
+                                (str(n['part_no']) if n['part_no'] is not None else '')+ ' '+ n['descripcion'] + ' $'+ str(n['precio']),
             )
             dialogo_nueva_parte = ft.AlertDialog(
                 title=ft.Text('Añadir nueva parte a orden'),
                 content = ft.Column(
                     [ordenes_dropdown,
-                    piezas_dropdown, error],
-                    height=125,
+                    piezas_dropdown.control, error],
+                    height=360,
                     width=500
                 ),
                 actions=[
@@ -2186,19 +2248,16 @@ def main(page: ft.Page):
                 value=None
             )
 
-            servicios_dropdown = ft.Dropdown(
-                options=[
-                    ft.dropdown.Option(text=str(n['cve_servicio'])+' $' +str(n['precio']) +' ' + n['descripcion'],
-                                       key=n['cve_servicio']) for n in db_instance.servicios()
-                ],
-                label='Seleccione el servicio'
+            servicios_dropdown = Typeahead(
+                page, db_instance.buscar_servicios, clave='cve_servicio', label='Busque el servicio', width=500,
+                texto=lambda n: str(n['cve_servicio'])+' $' +str(n['precio']) +' ' + n['descripcion'],
             )
             dialogo_nueva_parte = ft.AlertDialog(
                 title=ft.Text('Añadir nuevo servicio a orden'),
                 content=ft.Column(
                     [ordenes_dropdown,
-                     servicios_dropdown, error],
-                    height=125,
+                     servicios_dropdown.control, error],
+                    height=360,
                     width=500
                 ),
                 actions=[
@@ -2274,66 +2333,57 @@ def main(page: ft.Page):
                 on_change=lambda e: crear_reporte(ordenes_dropdown.value),
             )
 
-            def _tarifa_y_nombre_tipo(cve_tipo):
-                tipos = db_instance.tipos() or {}
-                try:
-                    # dict: {id: (tarifa, "nombre")}
-                    tarifa, nombre = tipos[cve_tipo][0], tipos[cve_tipo][1]
-                except Exception:
-                    t = tipos.get(cve_tipo)
-                    if isinstance(t, dict):
-                        tarifa = t.get("tarifa", 0)
-                        nombre = t.get("descripcion", str(cve_tipo))
-                    else:
-                        tarifa = 0
-                        nombre = str(t or cve_tipo)
-                return tarifa, nombre
+            def _nombre_tipo(cve_tipo):
+                t = (db_instance.tipos() or {}).get(cve_tipo)
+                if isinstance(t, (list, tuple)) and len(t) > 1:
+                    return str(t[1])
+                if isinstance(t, dict):
+                    return str(t.get("descripcion", cve_tipo))
+                return str(t or cve_tipo)
 
             def crear_reporte(ord_id):
                 if not ord_id:
                     return
 
-                # Releer la orden DESDE BD (para no usar un objeto viejo en memoria)
+                # Importes exactos (Decimal) sumados en la base: una sola consulta
                 try:
+                    t = db_instance.total_orden(int(ord_id))
                     actual = next((o for o in db_instance.ordenes() if str(o.cve_orden) == str(ord_id)), None)
                 except Exception as ex:
                     page.open(ft.SnackBar(ft.Text(f"Error cargando orden: {ex}")))
                     return
-                if not actual:
+                if not actual or t is None:
                     return
 
-                tarifa, tipo_txt = _tarifa_y_nombre_tipo(actual.cve_tipo_equipo)
-
-                piezas = db_instance.partes_orden(actual.cve_orden) or []
-                servicios = db_instance.servicios_orden(actual.cve_orden) or []
-
-                total_piezas = sum(p.get("precio", 0) for p in piezas if isinstance(p, dict))
-                total_serv   = sum(s.get("precio", 0) for s in servicios if isinstance(s, dict))
-                horas        = int(actual.horas or 0)
-                total        = total_piezas + total_serv + (tarifa * horas)
+                tipo_txt = _nombre_tipo(actual.cve_tipo_equipo)
+                tarifa = formato_dinero(t.tarifa)
+                horas = f"{t.horas.normalize():f}"
+                total = formato_dinero(t.total)
+                total_piezas = formato_dinero(t.partes)
+                total_serv = formato_dinero(t.servicios)
 
                 reporte.controls.clear()
                 reporte.controls.append(
                     ft.Column(
                         [
-                            ft.Text(f"Total de la orden: ${total}", size=22, weight=ft.FontWeight.BOLD),
+                            ft.Text(f"Total de la orden: {total}", size=22, weight=ft.FontWeight.BOLD),
 
                             ft.Row(
                                 [
                                     ft.Text(f"\tTarifa {tipo_txt}:", size=18),
-                                    ft.Text(f" ${tarifa}", size=18),
+                                    ft.Text(f" {tarifa}", size=18),
                                     ft.Text("Horas:", size=18, expand=True, text_align=ft.TextAlign.END),
                                     ft.Text(f" {horas}", size=18),
                                 ],
                                 alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
                             ),
 
-                            ft.Text(f"Total de piezas: ${total_piezas}", size=22),
-                            ft.Row([ft.Text(f"\tCant. de piezas: {len(piezas)}", size=18)],
+                            ft.Text(f"Total de piezas: {total_piezas}", size=22),
+                            ft.Row([ft.Text(f"\tCant. de piezas: {t.n_partes}", size=18)],
                                 alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
 
-                            ft.Text(f"Total de servicios: ${total_serv}", size=22),
-                            ft.Row([ft.Text(f"\tCant. de servicios: {len(servicios)}", size=18)],
+                            ft.Text(f"Total de servicios: {total_serv}", size=22),
+                            ft.Row([ft.Text(f"\tCant. de servicios: {t.n_servicios}", size=18)],
                                 alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
                         ],
                         spacing=8,
@@ -21,4 +21,10 @@ def main(page: ft.Page):
     page.update()
 
 if __name__ == "__main__":
-    ft.app(target=main)
\ No newline at end of file
+    from controller.async_facade import cerrar_executor
+    from model.db.oracle import close_pools
+    try:
+        ft.app(target=main)
+    finally:
+        cerrar_executor()
+        close_pools()
\ No newline at end of file
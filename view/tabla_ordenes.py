@@ -0,0 +1,193 @@
+# view/tabla_ordenes.py
+from __future__ import annotations
+from typing import Any, Callable, Dict, List
+import flet as ft
+
+# Compat Flet
+if not hasattr(ft, "colors") and hasattr(ft, "Colors"):
+    ft.colors = ft.Colors
+if not hasattr(ft, "icons") and hasattr(ft, "Icons"):
+    ft.icons = ft.Icons
+
+
+ALTO_FILA = 51  # 50 de la fila + 1 del borde inferior (ListView con item_extent fijo)
+
+ANCHOS = {
+    "orden": 50, "status": 100, "tecnico": 120, "ver": 50, "marca": 100,
+    "modelo": 100, "tipo": 100, "cliente": 120, "editar_cliente": 110, "editar_orden": 110,
+}
+
+
+def ver_tecnico(lista) -> str:
+    lista = list(lista or [])
+    if not lista:
+        return ""
+    return str(lista[0]) if len(lista) == 1 else f"{lista[0]}..."
+
+
+class _Fila:
+    """Controles de una orden ya pintada; se parchan en lugar de recrearse."""
+    __slots__ = ("orden", "firma", "control", "chip", "chip_txt", "tecnico",
+                 "marca", "modelo", "tipo", "cliente")
+
+
+class TablaOrdenes:
+    """
+    Tabla de órdenes con filas por llave (cve_orden).
+    - sincronizar(ordenes, snap): compara contra lo pintado; sólo crea las
+      filas nuevas, quita las que ya no están y parcha las que cambiaron
+      (status, técnicos, marca/modelo/tipo, cliente). Las demás se reusan tal
+      cual y page.update() no las vuelve a mandar.
+    - agregar(ordenes, snap): siguiente página del scroll.
+    - ListView con item_extent fijo: sólo se construyen las filas visibles.
+    """
+
+    def __init__(self, *,
+                 status_ui: Callable[[Any], str],
+                 colores: Dict[str, str],
+                 on_tecnicos: Callable[[Any], None],
+                 on_editar_cliente: Callable[[Any], None],
+                 on_editar_orden: Callable[[Any], None],
+                 anchos: Dict[str, int] | None = None) -> None:
+        self._status_ui = status_ui
+        self._colores = colores
+        self._on_tecnicos = on_tecnicos
+        self._on_editar_cliente = on_editar_cliente
+        self._on_editar_orden = on_editar_orden
+        self._w = {**ANCHOS, **(anchos or {})}
+        self._filas: Dict[int, _Fila] = {}
+        self.control = ft.ListView(expand=True, spacing=0, item_extent=ALTO_FILA)
+
+    # ====================== API ======================
+    def sincronizar(self, ordenes: List[Any], snap) -> Dict[str, int]:
+        """Deja la tabla igual a `ordenes` (en ese orden). Devuelve el conteo de cambios."""
+        vistas: Dict[int, _Fila] = {}
+        controles = []
+        nuevas = parchadas = 0
+        for o in ordenes or []:
+            key = self._key(o)
+            if key in vistas:
+                continue
+            fila = self._filas.get(key)
+            if fila is None:
+                fila = self._crear(o, snap)
+                nuevas += 1
+            elif self._parchar(fila, o, snap):
+                parchadas += 1
+            vistas[key] = fila
+            controles.append(fila.control)
+        quitadas = sum(1 for k in self._filas if k not in vistas)
+        self._filas = vistas
+        self.control.controls = controles
+        return {"nuevas": nuevas, "parchadas": parchadas, "quitadas": quitadas}
+
+    def agregar(self, ordenes: List[Any], snap) -> int:
+        """Agrega al final las órdenes que aún no están pintadas."""
+        n = 0
+        for o in ordenes or []:
+            key = self._key(o)
+            fila = self._filas.get(key)
+            if fila is not None:
+                self._parchar(fila, o, snap)
+                continue
+            fila = self._filas[key] = self._crear(o, snap)
+            self.control.controls.append(fila.control)
+            n += 1
+        return n
+
+    def actualizar(self, o, snap) -> bool:
+        """Parcha una sola fila (p. ej. tras editar la orden). False si no está pintada."""
+        fila = self._filas.get(self._key(o))
+        if fila is None:
+            return False
+        self._parchar(fila, o, snap)
+        return True
+
+    def limpiar(self) -> None:
+        self._filas.clear()
+        self.control.controls.clear()
+
+    def __len__(self) -> int:
+        return len(self._filas)
+
+    # ====================== filas ======================
+    @staticmethod
+    def _key(o) -> int:
+        return int(getattr(o, "cve_orden"))
+
+    def _firma(self, o, snap) -> tuple:
+        return (
+            self._status_ui(getattr(o, "cve_status", None)),
+            ver_tecnico(getattr(o, "tecnicos", None)),
+            getattr(o, "eq_marca", "") or "",
+            getattr(o, "eq_modelo", "") or "",
+            snap.tipo_nombre(getattr(o, "cve_tipo_equipo", None)) if snap else "",
+            str(getattr(o, "cliente", "") or ""),
+        )
+
+    def _crear(self, o, snap) -> _Fila:
+        w = self._w
+        f = _Fila()
+        f.orden = o
+        f.firma = self._firma(o, snap)
+        status, tecnico, marca, modelo, tipo, cliente = f.firma
+
+        f.chip_txt = ft.Text(status, weight=ft.FontWeight.BOLD, text_align=ft.TextAlign.CENTER)
+        f.chip = ft.Container(
+            content=f.chip_txt,
+            border_radius=10,
+            bgcolor=self._colores.get(status, ft.colors.AMBER),
+            width=w["status"],
+            alignment=ft.alignment.center,
+            height=30,
+        )
+        f.tecnico = ft.Text(tecnico, width=w["tecnico"])
+        f.marca = ft.Text(marca, width=w["marca"])
+        f.modelo = ft.Text(modelo, width=w["modelo"])
+        f.tipo = ft.Text(tipo, width=w["tipo"])
+        f.cliente = ft.Text(cliente, width=w["cliente"])
+
+        # los handlers leen f.orden: siguen valiendo cuando la fila se reusa
+        f.control = ft.Container(
+            content=ft.Row(
+                [
+                    ft.Text(str(self._key(o)), width=w["orden"]),
+                    f.chip,
+                    f.tecnico,
+                    ft.IconButton(icon=ft.icons.REMOVE_RED_EYE, width=w["ver"],
+                                  on_click=lambda e: self._on_tecnicos(f.orden)),
+                    f.marca,
+                    f.modelo,
+                    f.tipo,
+                    f.cliente,
+                    ft.IconButton(icon=ft.icons.EDIT, width=w["editar_cliente"],
+                                  on_click=lambda e: self._on_editar_cliente(f.orden)),
+                    ft.IconButton(icon=ft.icons.EDIT, width=w["editar_orden"],
+                                  on_click=lambda e: self._on_editar_orden(f.orden)),
+                ],
+                alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+                height=ALTO_FILA - 1,
+            ),
+            border=ft.border.only(bottom=ft.border.BorderSide(1, ft.colors.OUTLINE_VARIANT)),
+        )
+        return f
+
+    def _parchar(self, f: _Fila, o, snap) -> bool:
+        f.orden = o
+        firma = self._firma(o, snap)
+        if firma == f.firma:
+            return False
+        status, tecnico, marca, modelo, tipo, cliente = firma
+        if status != f.firma[0]:
+            f.chip_txt.value = status
+            f.chip.bgcolor = self._colores.get(status, ft.colors.AMBER)
+        f.tecnico.value = tecnico
+        f.marca.value = marca
+        f.modelo.value = modelo
+        f.tipo.value = tipo
+        f.cliente.value = cliente
+        f.firma = firma
+        return True
+
+
+__all__ = ["TablaOrdenes", "ver_tecnico", "ALTO_FILA"]
@@ -0,0 +1,71 @@
+# view/typeahead.py
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional
+import flet as ft
+
+
+class Typeahead:
+    """
+    Campo de búsqueda con sugerencias, en lugar de un Dropdown con todo el
+    catálogo:
+      ta = Typeahead(page, db.buscar_partes, texto=_pieza_txt, clave="cve_parte", label="Pieza")
+      ... ft.Column([..., ta.control]) ...
+      ta.value  -> clave del renglón elegido (str) o None
+    En cada tecla se piden sólo los k mejores a la fachada (índice en
+    memoria), así que al cliente nunca viaja el catálogo completo.
+    """
+
+    def __init__(self, page: ft.Page, buscar: Callable[[str, int], List[Dict[str, Any]]],
+                 texto: Callable[[Dict[str, Any]], str], clave: str,
+                 label: str = "Buscar", k: int = 8, width: int = 540,
+                 on_select: Optional[Callable[[Dict[str, Any]], None]] = None) -> None:
+        self.page = page
+        self._buscar = buscar
+        self._texto = texto
+        self._clave = clave
+        self._k = k
+        self._on_select = on_select
+        self.seleccion: Optional[Dict[str, Any]] = None
+        self.campo = ft.TextField(label=label, hint_text="Escriba código o descripción",
+                                  width=width, on_change=self._cambio)
+        self.sugerencias = ft.Column(spacing=0, width=width)
+        self.control = ft.Column([self.campo, self.sugerencias], spacing=2, tight=True)
+
+    @property
+    def value(self) -> Optional[str]:
+        return None if self.seleccion is None else str(self.seleccion[self._clave])
+
+    def limpiar(self) -> None:
+        self.seleccion = None
+        self.campo.value = ""
+        self.sugerencias.controls.clear()
+
+    def _cambio(self, e=None) -> None:
+        self.seleccion = None
+        self.sugerencias.controls.clear()
+        texto = (self.campo.value or "").strip()
+        if texto:
+            try:
+                filas = self._buscar(texto, self._k)
+            except Exception as ex:
+                filas = []
+                self.sugerencias.controls.append(ft.Text(f"Error: {ex}", color="red", size=12))
+            for f in filas:
+                self.sugerencias.controls.append(ft.ListTile(
+                    title=ft.Text(self._texto(f), size=13), dense=True,
+                    on_click=lambda e, f=f: self._elegir(f),
+                ))
+            if not filas and not self.sugerencias.controls:
+                self.sugerencias.controls.append(ft.Text("Sin coincidencias", size=12, italic=True))
+        self.page.update()
+
+    def _elegir(self, fila: Dict[str, Any]) -> None:
+        self.seleccion = fila
+        self.campo.value = self._texto(fila)
+        self.sugerencias.controls.clear()
+        if self._on_select:
+            self._on_select(fila)
+        self.page.update()
+
+
+__all__ = ["Typeahead"]